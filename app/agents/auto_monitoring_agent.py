@@ -19,6 +19,7 @@ from typing import Dict, List, Any, Optional
 from datetime import datetime, timedelta, timezone
 
 from .base import BaseAgent, AgentResult
+from ..core.candles import candle_frame
 from ..core.market_hours import now_ist, is_cash_market_open_ist
 from ..models.strategy import StrategyAdvisory
 from ..services.support_resistance_redis import support_resistance_service
@@ -450,7 +451,7 @@ class AutoMonitoringAgent(BaseAgent):
         if not candles or len(candles) < 20:
             return []
 
-        df = pd.DataFrame(candles)
+        df = candle_frame(candles)
         required_cols = {'open', 'high', 'low', 'close'}
         if not required_cols.issubset(df.columns):
             return []
@@ -948,22 +949,24 @@ class AutoMonitoringAgent(BaseAgent):
         near_zones: List[str] = []
         broken_zones: List[str] = []
 
+        # All scopes in one batched lookup (one candle fetch on a miss).
+        try:
+            levels_many = await support_resistance_service.get_levels_many([symbol], timeframes)
+        except Exception as e:
+            logger.error(
+                "[AutoMonitoring] SR levels fetch failed for %s: %s",
+                symbol,
+                e,
+                exc_info=True,
+            )
+            return []
+        levels_by_scope = levels_many.get(str(symbol).upper(), {})
+
         for scope in timeframes:
             near_thr = float(near_thresholds.get(scope, 0.7))
             break_margin = float(break_margins.get(scope, 0.3))
 
-            try:
-                levels = await support_resistance_service.get_levels(symbol, scope)
-            except Exception as e:
-                logger.error(
-                    "[AutoMonitoring] SR levels fetch failed for %s/%s: %s",
-                    symbol,
-                    scope,
-                    e,
-                    exc_info=True,
-                )
-                continue
-
+            levels = levels_by_scope.get(scope)
             if levels is None:
                 continue
 
@@ -1126,7 +1129,7 @@ class AutoMonitoringAgent(BaseAgent):
         if not candles or len(candles) < 160:
             return []
 
-        df = pd.DataFrame(candles)
+        df = candle_frame(candles)
         required_cols = {'open', 'high', 'low', 'close'}
         if not required_cols.issubset(df.columns):
             return []
@@ -1313,7 +1316,7 @@ class AutoMonitoringAgent(BaseAgent):
         if not candles or len(candles) < 40:
             return []
 
-        df = pd.DataFrame(candles)
+        df = candle_frame(candles)
         required_cols = {'open', 'high', 'low', 'close'}
         if not required_cols.issubset(df.columns):
             return []
@@ -3,8 +3,10 @@ Base Agent Class
 All agents inherit from this base class
 """
 
+import hashlib
+import json
 from abc import ABC, abstractmethod
-from typing import Dict, List, Any, Optional
+from typing import Dict, List, Any, Optional, Tuple, Union
 from datetime import datetime
 from pydantic import BaseModel, Field
 
@@ -42,7 +44,19 @@ class BaseAgent(ABC):
     """
     Base class for all agents.
     Each agent must implement the analyze() method.
+
+    CPU-heavy agents may additionally split their work into prepare()
+    (async data fetching) and compute() (pure pandas/NumPy work on the
+    prepared inputs) and set ``offload_compute = True``; the coordinator
+    then runs compute() in the agent compute process pool.
     """
+
+    # Whether compute() can run in a worker process (see compute_pool)
+    offload_compute: bool = False
+
+    # Context entries that change this agent's result (e.g. the universe
+    # matrix slice); they are part of the result cache key, see cache_scope()
+    context_keys: Tuple[str, ...] = ()
     
     def __init__(self, name: str, weight: float = 1.0):
         self.name = name
@@ -66,6 +80,33 @@ class BaseAgent(ABC):
             AgentResult with score, signals, reasoning
         """
         pass
+
+    async def prepare(
+        self,
+        symbol: str,
+        context: Optional[Dict[str, Any]] = None
+    ) -> Union[Dict[str, Any], AgentResult]:
+        """
+        Fetch the inputs needed by compute().
+
+        Returns a dict of inputs (DataFrames and plain values), or a final
+        AgentResult when there is nothing to compute (e.g. insufficient data).
+        """
+        raise NotImplementedError(f"{self.__class__.__name__} does not implement prepare()")
+
+    def compute(
+        self,
+        symbol: str,
+        inputs: Dict[str, Any],
+        context: Optional[Dict[str, Any]] = None
+    ) -> AgentResult:
+        """
+        Pure CPU phase: turn prepared inputs into an AgentResult.
+
+        Must not perform I/O or depend on instance state mutated at runtime,
+        since it may run on a fresh instance in a worker process.
+        """
+        raise NotImplementedError(f"{self.__class__.__name__} does not implement compute()")
     
     def normalize_score(self, raw_score: float, min_val: float, max_val: float) -> float:
         """
@@ -103,18 +144,37 @@ class BaseAgent(ABC):
         else:
             return "Low"
     
-    async def get_cached_result(self, symbol: str, ttl: int = 300) -> Optional[AgentResult]:
+    def cache_scope(self, context: Optional[Dict[str, Any]] = None) -> str:
+        """
+        Fingerprint of the ``context_keys`` entries present in ``context``.
+        
+        Empty when the agent does not depend on context or none of its keys
+        are set, so context-free callers keep sharing one cache entry.
+        """
+        if not self.context_keys or not context:
+            return ""
+        values = {k: context[k] for k in self.context_keys if context.get(k)}
+        if not values:
+            return ""
+        raw = json.dumps(values, sort_keys=True, default=str).encode("utf-8")
+        return hashlib.blake2b(raw, digest_size=8).hexdigest()
+    
+    def _cache_key(self, symbol: str, scope: str = "") -> str:
+        return f"{self.name}:{symbol}:{scope}" if scope else f"{self.name}:{symbol}"
+    
+    async def get_cached_result(self, symbol: str, ttl: int = 300, scope: str = "") -> Optional[AgentResult]:
         """
         Get cached result if available and not expired.
         
         Args:
             symbol: Stock symbol
             ttl: Time to live in seconds (default 5 min)
+            scope: cache_scope() of the caller's context
             
         Returns:
             Cached AgentResult or None
         """
-        cache_key = f"{self.name}:{symbol}"
+        cache_key = self._cache_key(symbol, scope)
         if cache_key in self.cache:
             cached_time, result = self.cache[cache_key]
             age = (datetime.utcnow() - cached_time).total_seconds()
@@ -122,9 +182,9 @@ class BaseAgent(ABC):
                 return result
         return None
     
-    async def cache_result(self, symbol: str, result: AgentResult):
+    async def cache_result(self, symbol: str, result: AgentResult, scope: str = ""):
         """Store result in cache with timestamp"""
-        cache_key = f"{self.name}:{symbol}"
+        cache_key = self._cache_key(symbol, scope)
         self.cache[cache_key] = (datetime.utcnow(), result)
     
     def __repr__(self):
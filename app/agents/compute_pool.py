@@ -0,0 +1,296 @@
+"""
+Agent Compute Pool
+Runs the pure CPU ("compute") phase of agents in a persistent process pool
+so that pandas/NumPy work does not block the FastAPI event loop.
+
+Agents opt in by setting ``offload_compute = True`` and splitting
+``analyze()`` into ``prepare()`` (async I/O, runs on the loop) and
+``compute()`` (pure function of its inputs, runs in a worker).
+
+DataFrames in the prepared inputs are copied into POSIX shared memory
+column by column; only a small descriptor is pickled to the worker, which
+rebuilds the frame from the shared buffers. Frames with non-NumPy dtypes
+(object/extension columns, tz-aware indexes) fall back to regular pickling.
+
+Configuration (environment):
+- AGENT_COMPUTE_OFFLOAD: "0"/"false" disables offloading (default enabled)
+- AGENT_COMPUTE_WORKERS: pool size (default: CPU count - 1, capped at 4)
+"""
+
+import asyncio
+import importlib
+import multiprocessing
+import os
+import traceback
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from multiprocessing import shared_memory
+from typing import Any, Dict, List, Optional, Tuple
+
+import numpy as np
+import pandas as pd
+
+from .base import AgentResult, BaseAgent
+
+
+# Modules of agents with offload_compute = True (pre-imported by warmup)
+OFFLOAD_AGENT_MODULES = (
+    "app.agents.technical_agent",
+    "app.agents.pattern_recognition_agent",
+    "app.agents.market_regime_agent",
+)
+
+
+def _default_workers() -> int:
+    raw = os.getenv("AGENT_COMPUTE_WORKERS")
+    if raw:
+        try:
+            return max(1, int(raw))
+        except ValueError:
+            pass
+    return max(1, min(4, (os.cpu_count() or 2) - 1))
+
+
+def _offload_enabled() -> bool:
+    return os.getenv("AGENT_COMPUTE_OFFLOAD", "1").strip().lower() not in ("0", "false", "no", "off")
+
+
+# ==================== Shared-memory frame packing ====================
+
+_SHM_FRAME = "__shm_frame__"
+
+
+def _is_packable(df: pd.DataFrame) -> bool:
+    if len(df) == 0:
+        return False
+    if not isinstance(df.index, (pd.RangeIndex, pd.DatetimeIndex)):
+        return False
+    if isinstance(df.index, pd.DatetimeIndex) and df.index.tz is not None:
+        return False
+    return all(isinstance(dt, np.dtype) and dt.kind in "biufM" for dt in df.dtypes)
+
+
+def _pack_frame(df: pd.DataFrame, blocks: List[shared_memory.SharedMemory]) -> Any:
+    """Copy a DataFrame into one shared-memory block and return a descriptor."""
+    if not _is_packable(df):
+        return df
+
+    arrays: List[Tuple[str, np.ndarray]] = [(str(c), np.ascontiguousarray(df[c].to_numpy())) for c in df.columns]
+    if isinstance(df.index, pd.DatetimeIndex):
+        arrays.append(("__index__", np.ascontiguousarray(df.index.to_numpy())))
+
+    total = sum(a.nbytes for _, a in arrays) or 1
+    shm = shared_memory.SharedMemory(create=True, size=total)
+    blocks.append(shm)
+
+    columns = []
+    offset = 0
+    for name, arr in arrays:
+        view = np.ndarray(arr.shape, dtype=arr.dtype, buffer=shm.buf, offset=offset)
+        view[:] = arr
+        columns.append((name, arr.dtype.str, offset))
+        offset += arr.nbytes
+
+    index: Any = None
+    if isinstance(df.index, pd.RangeIndex):
+        index = ("range", df.index.start, df.index.stop, df.index.step, df.index.name)
+    else:
+        index = ("datetime", df.index.name)
+
+    return {
+        _SHM_FRAME: shm.name,
+        "rows": len(df),
+        "columns": columns,
+        "index": index,
+    }
+
+
+def _unpack_frame(desc: Dict[str, Any]) -> pd.DataFrame:
+    # Spawned workers share the parent's resource tracker, so attaching
+    # here does not change ownership: the parent still unlinks the segment.
+    shm = shared_memory.SharedMemory(name=desc[_SHM_FRAME])
+    try:
+        rows = desc["rows"]
+        data: Dict[str, np.ndarray] = {}
+        index_values = None
+        for name, dtype, offset in desc["columns"]:
+            arr = np.ndarray((rows,), dtype=np.dtype(dtype), buffer=shm.buf, offset=offset).copy()
+            if name == "__index__":
+                index_values = arr
+            else:
+                data[name] = arr
+    finally:
+        shm.close()
+
+    kind = desc["index"][0]
+    if kind == "range":
+        _, start, stop, step, name = desc["index"]
+        index = pd.RangeIndex(start, stop, step, name=name)
+    else:
+        index = pd.DatetimeIndex(index_values, name=desc["index"][1])
+    return pd.DataFrame(data, index=index)
+
+
+def pack_inputs(inputs: Dict[str, Any], blocks: List[shared_memory.SharedMemory]) -> Dict[str, Any]:
+    return {k: _pack_frame(v, blocks) if isinstance(v, pd.DataFrame) else v for k, v in inputs.items()}
+
+
+def unpack_inputs(inputs: Dict[str, Any]) -> Dict[str, Any]:
+    return {
+        k: _unpack_frame(v) if isinstance(v, dict) and _SHM_FRAME in v else v
+        for k, v in inputs.items()
+    }
+
+
+def _release(blocks: List[shared_memory.SharedMemory]) -> None:
+    for shm in blocks:
+        try:
+            shm.close()
+            shm.unlink()
+        except Exception:
+            pass
+
+
+# ==================== Worker side ====================
+
+class AgentComputeError(Exception):
+    """An exception raised by ``agent.compute`` inside a worker.
+
+    Carries the original type and traceback as text so it always pickles
+    back to the parent; the pool re-raises it instead of re-running
+    ``compute`` in-process.
+    """
+
+    def __init__(self, message: str, worker_traceback: str = ""):
+        super().__init__(message)
+        self.worker_traceback = worker_traceback
+
+    def __reduce__(self):
+        return (type(self), (str(self), self.worker_traceback))
+
+
+_worker_agents: Dict[Tuple[str, str], BaseAgent] = {}
+
+
+def _compute_in_worker(
+    module: str,
+    qualname: str,
+    weight: float,
+    symbol: str,
+    inputs: Dict[str, Any],
+    context: Dict[str, Any],
+) -> Dict[str, Any]:
+    """Worker entry point: rebuild inputs and run ``agent.compute``."""
+    key = (module, qualname)
+    agent = _worker_agents.get(key)
+    if agent is None:
+        cls = getattr(importlib.import_module(module), qualname)
+        agent = cls(weight=weight)
+        _worker_agents[key] = agent
+    inputs = unpack_inputs(inputs)
+    try:
+        result = agent.compute(symbol, inputs, context)
+    except Exception as e:
+        raise AgentComputeError(f"{qualname}.compute: {type(e).__name__}: {e}", traceback.format_exc()) from None
+    return result.model_dump()
+
+
+def _warmup(modules: List[str]) -> int:
+    for module in modules:
+        importlib.import_module(module)
+    return os.getpid()
+
+
+# ==================== Pool ====================
+
+class AgentComputePool:
+    """Persistent process pool for agent ``compute()`` phases."""
+
+    def __init__(self, max_workers: Optional[int] = None):
+        self.max_workers = max_workers or _default_workers()
+        self.enabled = _offload_enabled()
+        self._executor: Optional[ProcessPoolExecutor] = None
+        self.stats: Dict[str, int] = {"offloaded": 0, "fallbacks": 0, "compute_errors": 0}
+
+    def _get_executor(self) -> ProcessPoolExecutor:
+        if self._executor is None:
+            # spawn: forked workers would inherit the parent's event loop,
+            # Redis clients and background threads.
+            ctx = multiprocessing.get_context("spawn")
+            self._executor = ProcessPoolExecutor(max_workers=self.max_workers, mp_context=ctx)
+        return self._executor
+
+    async def warmup(self, modules: Tuple[str, ...] = OFFLOAD_AGENT_MODULES) -> None:
+        """Start workers and pre-import offloadable agent modules.
+
+        Every worker is attempted; the first failure is re-raised afterwards.
+        """
+        if not self.enabled:
+            return
+        loop = asyncio.get_running_loop()
+        executor = self._get_executor()
+        results = await asyncio.gather(
+            *[loop.run_in_executor(executor, _warmup, list(modules)) for _ in range(self.max_workers)],
+            return_exceptions=True,
+        )
+        errors = [r for r in results if isinstance(r, BaseException)]
+        if errors:
+            raise errors[0]
+
+    async def run(
+        self,
+        agent: BaseAgent,
+        symbol: str,
+        inputs: Dict[str, Any],
+        context: Optional[Dict[str, Any]] = None,
+    ) -> AgentResult:
+        """Run ``agent.compute`` in the pool.
+
+        Falls back to in-process only when the inputs cannot be shipped or
+        the pool itself fails; an exception raised by ``compute`` in the
+        worker is re-raised as AgentComputeError (no second run on the loop).
+        """
+        context = {k: v for k, v in (context or {}).items() if k != "candles"}
+
+        if not self.enabled:
+            return agent.compute(symbol, inputs, context)
+
+        blocks: List[shared_memory.SharedMemory] = []
+        try:
+            packed = pack_inputs(inputs, blocks)
+            loop = asyncio.get_running_loop()
+            cls = type(agent)
+            payload = await loop.run_in_executor(
+                self._get_executor(),
+                _compute_in_worker,
+                cls.__module__,
+                cls.__qualname__,
+                agent.weight,
+                symbol,
+                packed,
+                context,
+            )
+            self.stats["offloaded"] += 1
+            return AgentResult(**payload)
+        except AgentComputeError:
+            self.stats["compute_errors"] += 1
+            raise
+        except BrokenProcessPool as e:
+            print(f"  WARN compute pool broken ({e}); restarting and running {agent.name} in-process")
+            self._executor = None
+        except Exception as e:
+            print(f"  WARN offload failed for {agent.name}: {str(e)[:80]}; running in-process")
+        finally:
+            _release(blocks)
+
+        self.stats["fallbacks"] += 1
+        return agent.compute(symbol, inputs, context)
+
+    def shutdown(self) -> None:
+        if self._executor is not None:
+            self._executor.shutdown(wait=False, cancel_futures=True)
+            self._executor = None
+
+
+# Global instance
+agent_compute_pool = AgentComputePool()
@@ -4,9 +4,14 @@ Orchestrates multiple agents and aggregates their results
 """
 
 import asyncio
-from typing import Dict, List, Any, Optional
+import time
+from typing import Callable, Dict, List, Any, Optional, Set
 from datetime import datetime
 from .base import BaseAgent, AgentResult
+from .compute_pool import agent_compute_pool
+from .latency import HARD_TIMEOUT, SYMBOL_DEADLINE, agent_latency
+from ..core.tracing import span
+from ..services.candle_archive import is_replay_active
 
 
 class AgentCoordinator:
@@ -15,8 +20,17 @@ class AgentCoordinator:
     Implements parallel execution, error handling, and result blending.
     """
     
-    def __init__(self):
+    def __init__(self, registry=None):
         self.agents: Dict[str, BaseAgent] = {}
+        # Shared AgentRegistry (see registry.build_coordinator): concurrent
+        # runs of the same agent/symbol are de-duplicated across coordinators
+        self.registry = registry
+        self.profile: Optional[str] = None
+        # Overall deadline for one analyze_symbol call (None = wait for every agent)
+        self.symbol_deadline: Optional[float] = SYMBOL_DEADLINE or None
+        # Agent runs the caller stopped waiting for; they finish in the
+        # background and cache their result for the next cycle
+        self._background: Set[asyncio.Task] = set()
         # 10 Core Scoring Agents (weights sum to 1.00)
         # Trade Strategy, Auto-Monitoring, Personalization are utility agents (weight = 0)
         self.weights: Dict[str, float] = {
@@ -75,70 +89,158 @@ class AgentCoordinator:
         if not agents_to_run:
             raise ValueError("No agents available for analysis")
         
-        # Build context with global/policy data
-        full_context = await self._build_context(symbol, context or {})
+        with span("coordinator", self.profile or "default", symbol=symbol, agents=len(agents_to_run)) as s:
+            # Build context with global/policy data
+            full_context = await self._build_context(symbol, context or {})
         
-        # Run agents in parallel
-        tasks = [
-            self._run_agent_safely(agent, symbol, full_context)
-            for agent in agents_to_run
-        ]
+            # Every agent wait ends by the symbol deadline. Replays wait for all
+            # agents so that their results do not depend on wall-clock timing.
+            deadline = None
+            if self.symbol_deadline and not is_replay_active():
+                deadline = asyncio.get_running_loop().time() + self.symbol_deadline
         
-        results = await asyncio.gather(*tasks)
+            # Run agents in parallel
+            tasks = [
+                self._run_agent_safely(agent, symbol, full_context, deadline)
+                for agent in agents_to_run
+            ]
+        
+            results = await asyncio.gather(*tasks)
         
-        # Filter out failed agents (None results)
-        valid_results = [r for r in results if r is not None]
+            # Filter out failed/late agents (None results)
+            valid_results = [r for r in results if r is not None]
+            missing = [agent.name for agent, r in zip(agents_to_run, results) if r is None]
         
-        if not valid_results:
-            raise RuntimeError("All agents failed to produce results")
+            if not valid_results:
+                raise RuntimeError("All agents failed to produce results")
         
-        # Aggregate results
-        aggregated = self._aggregate_results(symbol, valid_results)
+            # Aggregate results (weights are re-normalised over the agents that answered)
+            aggregated = self._aggregate_results(symbol, valid_results)
+            aggregated['partial'] = bool(missing)
+            aggregated['missing_agents'] = missing
+            s.set('missing_agents', len(missing))
         
-        return aggregated
+            return aggregated
     
     async def _run_agent_safely(
         self, 
         agent: BaseAgent, 
         symbol: str, 
-        context: Dict[str, Any]
+        context: Dict[str, Any],
+        deadline: Optional[float] = None
     ) -> Optional[AgentResult]:
         """
-        Run a single agent with error handling and timeout.
+        Run a single agent with error handling and an adaptive deadline.
+        
+        The caller waits at most the agent's latency budget (derived from
+        its observed p95, see latency.py), capped by the symbol deadline.
+        A run that misses it is not cancelled: it keeps going in the
+        background and its result is cached for the next cycle.
         
         Args:
             agent: Agent to run
             symbol: Stock symbol
             context: Context data
+            deadline: Event loop time by which to give up (None = budget only)
             
         Returns:
-            AgentResult or None if agent fails
+            AgentResult or None if agent fails or misses its deadline
         """
         try:
             # Check cache first
-            cached = await agent.get_cached_result(symbol)
+            # Context-dependent agents (matrix beta, index regime) cache per context
+            scope = agent.cache_scope(context)
+            with span("cache", "agent_results", agent=agent.name, symbol=symbol) as s:
+                cached = await agent.get_cached_result(symbol, scope=scope)
+                s.set("cache_hit", cached is not None)
             if cached:
                 print(f"  CACHE {agent.name}: Using cached result")
                 return cached
-            
-            # Run agent with 15 second timeout (increased for data fetching)
-            result = await asyncio.wait_for(
-                agent.analyze(symbol, context),
-                timeout=15.0
-            )
-            
-            # Cache result
-            await agent.cache_result(symbol, result)
 
-            print(f"  OK {agent.name}: Score {result.score:.1f}, Confidence {result.confidence}")
-            return result
+            if deadline is None and is_replay_active():
+                budget = HARD_TIMEOUT
+            else:
+                budget = agent_latency.budget(agent.name)
+            if deadline is not None:
+                budget = min(budget, max(0.0, deadline - asyncio.get_running_loop().time()))
+
+            run = lambda: self._run_agent(agent, symbol, context)
+            if self.registry is None:
+                task, joined = asyncio.get_running_loop().create_task(run()), False
+                self._background.add(task)
+                task.add_done_callback(self._background.discard)
+            else:
+                task, joined = self.registry.start(agent.name, symbol, run, scope)
+            if joined:
+                print(f"  SHARED {agent.name}: Joined in-flight analysis")
+
+            try:
+                return await asyncio.wait_for(asyncio.shield(task), timeout=budget)
+            except asyncio.TimeoutError:
+                if task.done():
+                    raise  # the run itself hit HARD_TIMEOUT
+                agent_latency.record_deadline_miss(agent.name)
+                task.add_done_callback(lambda t: self._late_result(agent.name, t))
+                print(f"  LATE {agent.name}: No result within {budget:.1f}s, caching it for next cycle")
+                return None
             
         except asyncio.TimeoutError:
-            print(f"  TIMEOUT {agent.name}: Timeout (>15s)")
+            print(f"  TIMEOUT {agent.name}: Timeout (>{HARD_TIMEOUT:.0f}s)")
             return None
         except Exception as e:
             print(f"  ERROR {agent.name}: Error - {str(e)[:50]}")
             return None
+
+    @staticmethod
+    def _late_result(agent_name: str, task: asyncio.Task) -> None:
+        """Done-callback for runs that finished after the caller gave up."""
+        if not task.cancelled() and task.exception() is None:
+            agent_latency.record_late_result(agent_name)
+    
+    async def _run_agent(
+        self,
+        agent: BaseAgent,
+        symbol: str,
+        context: Dict[str, Any]
+    ) -> AgentResult:
+        # Run agent with the hard timeout (15s by default); callers usually
+        # stop waiting earlier, see _run_agent_safely.
+        # Agents with a pure compute phase run it in the process pool so
+        # pandas/NumPy work does not block the event loop.
+        offloaded = agent.offload_compute and agent_compute_pool.enabled
+        if offloaded:
+            run = self._prepare_and_compute(agent, symbol, context)
+        else:
+            run = agent.analyze(symbol, context)
+        started = time.perf_counter()
+        with span("agent", agent.name, symbol=symbol, offloaded=offloaded):
+            try:
+                result = await asyncio.wait_for(run, timeout=HARD_TIMEOUT)
+            except asyncio.TimeoutError:
+                agent_latency.record_timeout(agent.name)
+                raise
+            except Exception:
+                agent_latency.record(agent.name, time.perf_counter() - started)
+                raise
+        agent_latency.record(agent.name, time.perf_counter() - started)
+
+        # Cache result
+        await agent.cache_result(symbol, result, scope=agent.cache_scope(context))
+
+        print(f"  OK {agent.name}: Score {result.score:.1f}, Confidence {result.confidence}")
+        return result
+
+    async def _prepare_and_compute(
+        self,
+        agent: BaseAgent,
+        symbol: str,
+        context: Dict[str, Any]
+    ) -> AgentResult:
+        """Fetch inputs on the event loop, then compute in the worker pool."""
+        inputs = await agent.prepare(symbol, context)
+        if isinstance(inputs, AgentResult):
+            return inputs
+        return await agent_compute_pool.run(agent, symbol, inputs, context)
     
     def _aggregate_results(self, symbol: str, results: List[AgentResult]) -> Dict[str, Any]:
         """
@@ -293,7 +395,8 @@ class AgentCoordinator:
         self, 
         symbols: List[str], 
         agent_names: Optional[List[str]] = None,
-        max_concurrent: int = 5
+        max_concurrent: int = 5,
+        context_for: Optional[Callable[[str], Dict[str, Any]]] = None
     ) -> List[Dict[str, Any]]:
         """
         Analyze multiple symbols with controlled concurrency.
@@ -302,6 +405,8 @@ class AgentCoordinator:
             symbols: List of stock symbols
             agent_names: Which agents to run
             max_concurrent: Maximum concurrent analyses
+            context_for: Optional per-symbol base context (e.g. the
+                universe matrix slice built once for the whole batch)
             
         Returns:
             List of aggregated results
@@ -311,7 +416,8 @@ class AgentCoordinator:
         async def analyze_with_semaphore(symbol: str):
             async with semaphore:
                 try:
-                    return await self.analyze_symbol(symbol, agent_names)
+                    context = context_for(symbol) if context_for else None
+                    return await self.analyze_symbol(symbol, agent_names, context)
                 except Exception as e:
                     print(f"ERROR {symbol}: Analysis failed - {e}")
                     return None
@@ -334,5 +440,8 @@ class AgentCoordinator:
                 }
                 for agent in self.agents.values()
             ],
-            'weights': self.weights
+            'weights': self.weights,
+            'profile': self.profile,
+            'registry': self.registry.get_stats() if self.registry is not None else None,
+            'latency': agent_latency.get_stats(),
         }
@@ -0,0 +1,156 @@
+"""
+Agent Latency Tracker
+Per-agent latency history used to derive adaptive deadlines.
+
+The coordinator used to give every agent the same fixed 15s timeout and
+wait for all of them, so one slow (news/LLM backed) agent set the latency of
+every symbol. Each agent now gets a budget derived from its own observed
+p95; results that arrive after the caller's budget still complete in the
+background and land in the agent cache for the next cycle.
+
+Configuration (environment):
+- AGENT_HARD_TIMEOUT: absolute cap on a single agent run (default 15s)
+- AGENT_SYMBOL_DEADLINE: overall deadline for one analyze_symbol call (default 12s)
+- AGENT_BUDGET_MULTIPLIER: budget = p95 * multiplier (default 1.5)
+- AGENT_BUDGET_MIN: lower bound on the adaptive budget (default 1s)
+"""
+
+import os
+import threading
+from bisect import bisect_left
+from collections import deque
+from typing import Any, Deque, Dict, List, Optional
+
+from ..core.metrics import metrics
+
+
+def _env_float(name: str, default: float) -> float:
+    raw = os.getenv(name)
+    if raw:
+        try:
+            return max(0.0, float(raw))
+        except ValueError:
+            pass
+    return default
+
+
+HARD_TIMEOUT = _env_float("AGENT_HARD_TIMEOUT", 15.0)
+SYMBOL_DEADLINE = _env_float("AGENT_SYMBOL_DEADLINE", 12.0)
+BUDGET_MULTIPLIER = _env_float("AGENT_BUDGET_MULTIPLIER", 1.5)
+BUDGET_MIN = _env_float("AGENT_BUDGET_MIN", 1.0)
+
+# Samples kept per agent, and samples needed before the budget adapts
+WINDOW = 200
+MIN_SAMPLES = 20
+
+# Histogram bucket upper bounds in seconds (last bucket is open-ended)
+BUCKETS = (0.05, 0.1, 0.25, 0.5, 1.0, 2.0, 5.0, 10.0, 15.0)
+
+
+class _AgentLatency:
+    __slots__ = ("samples", "buckets", "runs", "timeouts", "deadline_misses", "late_results", "_p95")
+
+    def __init__(self):
+        self.samples: Deque[float] = deque(maxlen=WINDOW)
+        self.buckets: List[int] = [0] * (len(BUCKETS) + 1)
+        self.runs = 0
+        self.timeouts = 0          # hit HARD_TIMEOUT (run abandoned)
+        self.deadline_misses = 0   # caller stopped waiting (run continued)
+        self.late_results = 0      # completed after a deadline miss, cached for later
+        self._p95: Optional[float] = None
+
+    def p95(self) -> Optional[float]:
+        if self._p95 is None and self.samples:
+            ordered = sorted(self.samples)
+            self._p95 = ordered[min(len(ordered) - 1, int(len(ordered) * 0.95))]
+        return self._p95
+
+
+class AgentLatencyTracker:
+    """Rolling latency samples, timeout counters and a histogram per agent."""
+
+    def __init__(self):
+        self._agents: Dict[str, _AgentLatency] = {}
+        self._lock = threading.Lock()
+
+    def _get(self, agent_name: str) -> _AgentLatency:
+        entry = self._agents.get(agent_name)
+        if entry is None:
+            with self._lock:
+                entry = self._agents.setdefault(agent_name, _AgentLatency())
+        return entry
+
+    def record(self, agent_name: str, seconds: float) -> None:
+        """Record a completed run (success or agent error)."""
+        entry = self._get(agent_name)
+        entry.samples.append(seconds)
+        entry.buckets[bisect_left(BUCKETS, seconds)] += 1
+        entry.runs += 1
+        entry._p95 = None
+
+    def record_timeout(self, agent_name: str) -> None:
+        """Record a run abandoned at HARD_TIMEOUT (counts as a full-cap sample)."""
+        entry = self._get(agent_name)
+        self.record(agent_name, HARD_TIMEOUT)
+        entry.timeouts += 1
+
+    def record_deadline_miss(self, agent_name: str) -> None:
+        self._get(agent_name).deadline_misses += 1
+
+    def record_late_result(self, agent_name: str) -> None:
+        self._get(agent_name).late_results += 1
+
+    def budget(self, agent_name: str) -> float:
+        """Seconds a caller should wait for ``agent_name``.
+
+        HARD_TIMEOUT until enough samples exist, then p95 * multiplier
+        clamped to [BUDGET_MIN, HARD_TIMEOUT].
+        """
+        entry = self._agents.get(agent_name)
+        if entry is None or len(entry.samples) < MIN_SAMPLES:
+            return HARD_TIMEOUT
+        return min(HARD_TIMEOUT, max(BUDGET_MIN, entry.p95() * BUDGET_MULTIPLIER))
+
+    def reset(self) -> None:
+        with self._lock:
+            self._agents.clear()
+
+    def collect(self):
+        """Metric families for ``/metrics`` (run durations are in the stage histogram)."""
+        agents = sorted(self._agents.items())
+        yield ('fyntrix_agent_budget_seconds', 'gauge', 'Current adaptive wait budget per agent',
+               [({'agent': name}, self.budget(name)) for name, _ in agents])
+        for field, help in (('timeouts', 'Agent runs abandoned at the hard timeout'),
+                            ('deadline_misses', 'Agent runs the caller stopped waiting for'),
+                            ('late_results', 'Agent runs completed after a deadline miss')):
+            yield (f'fyntrix_agent_{field}_total', 'counter', help,
+                   [({'agent': name}, getattr(entry, field)) for name, entry in agents])
+
+    def get_stats(self) -> Dict[str, Any]:
+        labels = [f"le_{b:g}s" for b in BUCKETS] + [f"gt_{BUCKETS[-1]:g}s"]
+        stats = {}
+        for name, entry in sorted(self._agents.items()):
+            p95 = entry.p95()
+            stats[name] = {
+                'runs': entry.runs,
+                'p95_s': round(p95, 3) if p95 is not None else None,
+                'budget_s': round(self.budget(name), 3),
+                'timeouts': entry.timeouts,
+                'deadline_misses': entry.deadline_misses,
+                'late_results': entry.late_results,
+                'histogram': dict(zip(labels, entry.buckets)),
+            }
+        return {
+            'hard_timeout_s': HARD_TIMEOUT,
+            'symbol_deadline_s': SYMBOL_DEADLINE,
+            'agents': stats,
+        }
+
+
+# Global instance
+agent_latency = AgentLatencyTracker()
+metrics.register_collector(agent_latency.collect)
+
+
+def get_agent_latency() -> AgentLatencyTracker:
+    return agent_latency
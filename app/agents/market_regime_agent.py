@@ -15,6 +15,7 @@ from typing import Dict, List, Any, Optional
 from datetime import datetime, timedelta
 
 from .base import BaseAgent, AgentResult
+from ..core.candles import candle_frame
 
 
 class MarketRegimeAgent(BaseAgent):
@@ -29,6 +30,10 @@ class MarketRegimeAgent(BaseAgent):
     - Support/Resistance levels
     """
     
+    offload_compute = True
+    # Batch runs supply an index-level regime (NIFTY or BANKNIFTY)
+    context_keys = ('market_regime',)
+
     def __init__(self, weight: float = 0.15):
         super().__init__(name="market_regime", weight=weight)
         self.regimes = {
@@ -54,10 +59,26 @@ class MarketRegimeAgent(BaseAgent):
         Returns:
             AgentResult with regime analysis
         """
+        inputs = await self.prepare(symbol, context)
+        if isinstance(inputs, AgentResult):
+            return inputs
+        return self.compute(symbol, inputs, context)
+
+    async def prepare(
+        self,
+        symbol: str,
+        context: Optional[Dict[str, Any]] = None
+    ):
+        """Resolve candles (from context or 1Y chart data) for compute()."""
         context = context or {}
         
         # Fetch OHLCV data
         candles = context.get('candles')
+
+        # Batch runs share one index-level regime from the universe matrix
+        shared = context.get('market_regime')
+        if candles is None and shared:
+            return self._shared_regime_response(symbol, shared)
         
         if candles is None or len(candles) == 0:
             # Fetch from chart data service
@@ -65,7 +86,7 @@ class MarketRegimeAgent(BaseAgent):
                 from ..services.chart_data_service import chart_data_service
                 chart_data = await chart_data_service.fetch_chart_data(symbol, '1Y')
                 if chart_data and 'candles' in chart_data:
-                    candles = pd.DataFrame(chart_data['candles'])
+                    candles = candle_frame(chart_data['candles'])
                 else:
                     return self._insufficient_data_response(symbol)
             except Exception as e:
@@ -73,12 +94,22 @@ class MarketRegimeAgent(BaseAgent):
                 return self._insufficient_data_response(symbol)
         
         # Convert to DataFrame if needed
-        if isinstance(candles, list):
-            candles = pd.DataFrame(candles)
+        candles = candle_frame(candles)
         
         if len(candles) < 50:
             return self._insufficient_data_response(symbol, len(candles))
-        
+
+        return {"candles": candles}
+
+    def compute(
+        self,
+        symbol: str,
+        inputs: Dict[str, Any],
+        context: Optional[Dict[str, Any]] = None
+    ) -> AgentResult:
+        """Classify the regime from prepared candles (CPU only)."""
+        candles = inputs["candles"]
+
         # Analyze regime components
         trend_analysis = self._analyze_trend(candles)
         volatility_analysis = self._analyze_volatility(candles)
@@ -481,6 +512,18 @@ class MarketRegimeAgent(BaseAgent):
         except:
             return 0
     
+    def _shared_regime_response(self, symbol: str, shared: Dict[str, Any]) -> AgentResult:
+        """Return the precomputed index-level regime for this symbol"""
+        return AgentResult(
+            agent_type=self.name,
+            symbol=symbol,
+            score=float(shared.get('score', 50.0)),
+            confidence=shared.get('confidence', 'Low'),
+            signals=list(shared.get('signals') or []),
+            reasoning=shared.get('reasoning', ''),
+            metadata=dict(shared.get('metadata') or {})
+        )
+    
     def _insufficient_data_response(self, symbol: str, candle_count: int = 0) -> AgentResult:
         """Return response when insufficient data"""
         return AgentResult(
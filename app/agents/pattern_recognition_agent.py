@@ -37,6 +37,7 @@ from typing import Dict, List, Any, Optional, Tuple
 from datetime import datetime
 
 from .base import BaseAgent, AgentResult
+from ..core.candles import candle_frame
 
 
 class PatternRecognitionAgent(BaseAgent):
@@ -44,6 +45,8 @@ class PatternRecognitionAgent(BaseAgent):
     Advanced pattern recognition using price action and volume analysis
     """
     
+    offload_compute = True
+
     def __init__(self, weight: float = 0.18):
         super().__init__(name="pattern_recognition", weight=weight)
         self.min_candles = 50  # Minimum candles needed for pattern detection
@@ -63,9 +66,19 @@ class PatternRecognitionAgent(BaseAgent):
         Returns:
             Analysis with detected patterns, score, and signal
         """
+        inputs = await self.prepare(symbol, context)
+        if isinstance(inputs, AgentResult):
+            return inputs
+        return self.compute(symbol, inputs, context)
+
+    async def prepare(
+        self,
+        symbol: str,
+        context: Optional[Dict[str, Any]] = None
+    ):
+        """Resolve candles (from context or 1Y chart data) for compute()."""
         context = context or {}
-        debug_mode = bool(context.get('debug_mode'))
-        
+
         # Extract candles from context
         candles = context.get('candles')
         current_price = context.get('current_price', 0)
@@ -78,7 +91,7 @@ class PatternRecognitionAgent(BaseAgent):
                 from ..services.chart_data_service import chart_data_service
                 chart_data = await chart_data_service.fetch_chart_data(symbol, '1Y')
                 if chart_data and 'candles' in chart_data:
-                    candles = pd.DataFrame(chart_data['candles'])
+                    candles = candle_frame(chart_data['candles'])
                     current_price = chart_data.get('current', {}).get('price', current_price)
                 else:
                     return self._insufficient_data_response(0)
@@ -86,13 +99,26 @@ class PatternRecognitionAgent(BaseAgent):
                 print(f"  Pattern Recognition: Could not fetch candles: {e}")
                 return self._insufficient_data_response(0)
         
-        # Convert to DataFrame if it's a list of dicts
-        if isinstance(candles, list):
-            candles = pd.DataFrame(candles)
+        # Convert to DataFrame if it's a list of dicts or Candles
+        candles = candle_frame(candles)
         
         if len(candles) < self.min_candles:
             return self._insufficient_data_response(len(candles))
-        
+
+        return {"candles": candles, "current_price": current_price}
+
+    def compute(
+        self,
+        symbol: str,
+        inputs: Dict[str, Any],
+        context: Optional[Dict[str, Any]] = None
+    ) -> AgentResult:
+        """Detect patterns and score them (CPU only)."""
+        context = context or {}
+        debug_mode = bool(context.get('debug_mode'))
+        candles = inputs["candles"]
+        current_price = inputs.get("current_price", 0)
+
         # Detect all patterns
         patterns = []
         
@@ -0,0 +1,227 @@
+"""
+Agent Registry
+Process-wide agent instances shared by every coordinator.
+
+The Top Picks engine/scheduler, global score store, ARIS chat and the agents
+API used to build their own coordinator with fresh agent instances, so each
+kept a private result cache and the same symbol was analysed several times
+within seconds. Coordinators are now thin views over this registry: each
+caller keeps its own weight profile (applied at blend time), while agent
+instances, their result caches and in-flight analyses are shared.
+
+Sharing is per (agent, symbol, context scope): agents whose result depends
+on caller context (BaseAgent.context_keys, e.g. the universe matrix beta or
+index regime) only share runs and cached results with callers supplying the
+same context.
+"""
+
+import asyncio
+import importlib
+import threading
+from typing import Any, Awaitable, Callable, Dict, List, Tuple
+
+from .base import BaseAgent, AgentResult
+
+
+# name -> (module, class); modules are imported when the agent is first needed
+AGENT_CLASSES: Dict[str, Tuple[str, str]] = {
+    'technical': ('.technical_agent', 'TechnicalAgent'),
+    'global': ('.global_market_agent', 'GlobalMarketAgent'),
+    'policy': ('.policy_macro_agent', 'PolicyMacroAgent'),
+    'options': ('.options_agent', 'OptionsAgent'),
+    'sentiment': ('.sentiment_agent', 'SentimentAgent'),
+    'microstructure': ('.microstructure_agent', 'MicrostructureAgent'),
+    'risk': ('.risk_agent', 'RiskAgent'),
+    'pattern_recognition': ('.pattern_recognition_agent', 'PatternRecognitionAgent'),
+    'market_regime': ('.market_regime_agent', 'MarketRegimeAgent'),
+    'watchlist_intelligence': ('.watchlist_intelligence_agent', 'WatchlistIntelligenceAgent'),
+    'scalping': ('.scalping_agent', 'ScalpingAgent'),
+    'trade_strategy': ('.trade_strategy_agent', 'TradeStrategyAgent'),
+    'auto_monitoring': ('.auto_monitoring_agent', 'AutoMonitoringAgent'),
+    'personalization': ('.personalization_agent', 'PersonalizationAgent'),
+}
+
+_CORE_AGENTS = [
+    'technical', 'global', 'policy', 'options', 'sentiment', 'microstructure', 'risk',
+    'pattern_recognition', 'market_regime', 'watchlist_intelligence',
+]
+_UTILITY_AGENTS = ['trade_strategy', 'auto_monitoring', 'personalization']
+
+# Per-caller agent sets and blend weights
+WEIGHT_PROFILES: Dict[str, Dict[str, Any]] = {
+    # TopPicksEngine and GlobalScoreStore (the engine overrides these per mode)
+    'top_picks': {
+        'agents': _CORE_AGENTS + _UTILITY_AGENTS,
+        'weights': {
+            'technical': 0.2233,
+            'global': 0.12,
+            'policy': 0.08,
+            'options': 0.12,
+            'sentiment': 0.12,
+            'microstructure': 0.0893,
+            'risk': 0.08,
+            'pattern': 0.1116,
+            'regime': 0.0558,
+            'watchlist': 0.00,
+            'trade_strategy': 0.00,
+            'auto_monitoring': 0.00,
+            'personalization': 0.00,
+        },
+    },
+    # TopPicksScheduler
+    'scheduler': {
+        'agents': _CORE_AGENTS + _UTILITY_AGENTS,
+        'weights': {
+            'technical': 0.2111,
+            'pattern_recognition': 0.19,
+            'market_regime': 0.1583,
+            'global': 0.12,
+            'options': 0.12,
+            'sentiment': 0.10,
+            'policy': 0.08,
+            'watchlist_intelligence': 0.00,
+            'microstructure': 0.0106,
+            'risk': 0.01,
+            'trade_strategy': 0.00,
+            'auto_monitoring': 0.00,
+            'personalization': 0.00,
+        },
+    },
+    # ARIS chat and the /agents API (11 scoring + 3 utility agents)
+    'chat': {
+        'agents': _CORE_AGENTS + ['scalping'] + _UTILITY_AGENTS,
+        'weights': {
+            'technical': 0.2037,
+            'pattern_recognition': 0.1833,
+            'market_regime': 0.1528,
+            'global': 0.12,
+            'options': 0.12,
+            'sentiment': 0.10,
+            'policy': 0.08,
+            'scalping': 0.03,
+            'watchlist_intelligence': 0.00,
+            'microstructure': 0.0102,
+            'risk': 0.00,
+            'trade_strategy': 0.00,
+            'auto_monitoring': 0.00,
+            'personalization': 0.00,
+        },
+    },
+}
+
+
+class AgentRegistry:
+    """Owns one instance per agent and de-duplicates concurrent runs."""
+
+    def __init__(self):
+        self._agents: Dict[str, BaseAgent] = {}
+        self._lock = threading.Lock()
+        # (agent, symbol, scope) -> (event loop, task) for analyses in progress
+        self._inflight: Dict[Tuple[str, str, str], Tuple[asyncio.AbstractEventLoop, asyncio.Task]] = {}
+        self.stats = {'runs': 0, 'joined': 0}
+
+    def get(self, name: str) -> BaseAgent:
+        """Shared instance of agent ``name`` (created on first request)."""
+        agent = self._agents.get(name)
+        if agent is not None:
+            return agent
+        if name not in AGENT_CLASSES:
+            raise KeyError(f"Unknown agent: {name}")
+        with self._lock:
+            if name not in self._agents:
+                module_name, class_name = AGENT_CLASSES[name]
+                cls = getattr(importlib.import_module(module_name, __package__), class_name)
+                self._agents[name] = cls()
+                print(f"[OK] Registered agent: {name}")
+            return self._agents[name]
+
+    def agents(self) -> List[BaseAgent]:
+        return list(self._agents.values())
+
+    def start(
+        self,
+        agent_name: str,
+        symbol: str,
+        run: Callable[[], Awaitable[AgentResult]],
+        scope: str = "",
+    ) -> Tuple[asyncio.Task, bool]:
+        """Task running ``run()``, or the one already running for (agent, symbol, scope).
+
+        ``scope`` is the agent's cache_scope() of the caller's context.
+        Returns (task, joined), where joined is True when another caller's
+        run is reused. Callers should await the task through
+        ``asyncio.shield`` so that giving up does not cancel it for others.
+        """
+        loop = asyncio.get_running_loop()
+        key = (agent_name, symbol, scope)
+        entry = self._inflight.get(key)
+        if entry is not None and entry[0] is loop and not entry[1].done():
+            self.stats['joined'] += 1
+            return entry[1], True
+
+        task = loop.create_task(run())
+        self._inflight[key] = (loop, task)
+        self.stats['runs'] += 1
+
+        def _done(t: asyncio.Task) -> None:
+            if self._inflight.get(key, (None, None))[1] is t:
+                del self._inflight[key]
+            if not t.cancelled():
+                t.exception()  # mark retrieved when every waiter has gone
+
+        task.add_done_callback(_done)
+        return task, False
+
+    async def run_once(
+        self,
+        agent_name: str,
+        symbol: str,
+        run: Callable[[], Awaitable[AgentResult]],
+        scope: str = "",
+    ) -> Tuple[AgentResult, bool]:
+        """Run ``run()`` unless the same (agent, symbol, scope) is already running.
+
+        Concurrent callers await the same task. Returns (result, joined).
+        Waiters are shielded, so a caller giving up does not cancel the
+        analysis for the others.
+        """
+        task, joined = self.start(agent_name, symbol, run, scope)
+        return await asyncio.shield(task), joined
+
+    def clear_caches(self) -> None:
+        """Drop every agent's cached results (e.g. around replay runs)."""
+        for agent in self.agents():
+            agent.cache.clear()
+
+    def get_stats(self) -> Dict[str, Any]:
+        return {
+            'agents': sorted(self._agents),
+            'cached_results': sum(len(a.cache) for a in self.agents()),
+            'in_flight': len(self._inflight),
+            **self.stats,
+        }
+
+
+# Global instance
+agent_registry = AgentRegistry()
+
+
+def get_agent_registry() -> AgentRegistry:
+    return agent_registry
+
+
+def build_coordinator(profile: str):
+    """New coordinator view over the shared agents with ``profile``'s weights.
+
+    Each caller gets its own view so that per-run weight changes (e.g. the
+    Top Picks engine's mode weights) do not leak into other callers.
+    """
+    from .coordinator import AgentCoordinator
+
+    spec = WEIGHT_PROFILES[profile]
+    coordinator = AgentCoordinator(registry=agent_registry)
+    for name in spec['agents']:
+        coordinator.agents[name] = agent_registry.get(name)
+    coordinator.set_weights(dict(spec['weights']))
+    coordinator.profile = profile
+    return coordinator
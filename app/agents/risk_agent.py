@@ -11,6 +11,7 @@ import pandas as pd
 
 from .base import BaseAgent, AgentResult
 from ..services.market_data_provider import market_data_provider
+from ..services.universe_matrix import estimate_beta
 
 
 class RiskAgent(BaseAgent):
@@ -28,6 +29,9 @@ class RiskAgent(BaseAgent):
     # Default risk parameters
     DEFAULT_RISK_PER_TRADE = 0.02  # 2% of capital per trade
     DEFAULT_PORTFOLIO_SIZE = 1000000  # ₹10 lakhs
+
+    # Beta comes from the caller's benchmark when a universe matrix is supplied
+    context_keys = ('universe_matrix',)
     
     def __init__(self, weight: float = 0.10):
         super().__init__(name="risk", weight=weight)
@@ -76,7 +80,7 @@ class RiskAgent(BaseAgent):
         position_size_analysis = self._calculate_position_size(
             entry_price, stop_loss_analysis['stop_loss'], portfolio_size, risk_per_trade
         )
-        beta_analysis = await self._calculate_beta(df_daily)
+        beta_analysis = await self._calculate_beta(df_daily, context)
         
         # Aggregate signals
         signals = []
@@ -103,6 +107,7 @@ class RiskAgent(BaseAgent):
             'atr': volatility_analysis.get('atr'),
             'volatility': volatility_analysis.get('volatility_pct'),
             'beta': beta_analysis.get('beta'),
+            'market_correlation': beta_analysis.get('correlation'),
             'stop_loss': stop_loss_analysis.get('stop_loss'),
             'position_size': position_size_analysis.get('position_size'),
             'quantity': position_size_analysis.get('quantity'),
@@ -255,16 +260,30 @@ class RiskAgent(BaseAgent):
             'position_pct': round(position_pct, 2)
         }
     
-    async def _calculate_beta(self, df: pd.DataFrame) -> Dict[str, Any]:
+    async def _calculate_beta(self, df: pd.DataFrame, context: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
         """Calculate beta (market correlation)"""
-        # For demo, use simplified calculation
-        # In production, fetch NIFTY data and calculate correlation
-        
-        # Placeholder beta (random but realistic)
-        beta = 1.1  # Slightly more volatile than market
+        # Batch runs read beta from the universe matrix slice; single-symbol
+        # calls estimate it against NIFTY directly
+        matrix_slice = (context or {}).get('universe_matrix') or {}
+        beta = matrix_slice.get('beta')
+        correlation = matrix_slice.get('correlation')
+        if beta is None:
+            try:
+                beta = await estimate_beta(df['close'], 'NIFTY')
+            except Exception as e:
+                print(f"  Risk: Beta estimate failed: {e}")
+                beta = None
         
         signals = []
         
+        if beta is None:
+            # Unknown market sensitivity: treat as market-like, no signal
+            return {
+                'signals': signals,
+                'score': 50,
+                'beta': None
+            }
+        
         if beta > 1.3:
             signals.append({
                 'type': 'BETA',
@@ -290,7 +309,8 @@ class RiskAgent(BaseAgent):
         return {
             'signals': signals,
             'score': score,
-            'beta': beta
+            'beta': beta,
+            'correlation': correlation
         }
     
     def _calculate_risk_score(
@@ -22,6 +22,7 @@ from datetime import datetime, timedelta
 import numpy as np
 
 from .base import BaseAgent, AgentResult
+from ..services.live_candles import get_live_candles
 
 
 class ScalpingAgent(BaseAgent):
@@ -155,11 +156,9 @@ class ScalpingAgent(BaseAgent):
         
         For now, we'll use available market data and calculate proxies.
         """
-        # Get recent candle data from context (1-min and 5-min)
-        if not context or 'candles' not in context:
-            return None
-        
-        candles = context.get('candles', [])
+        # Get recent candle data from context (1-min and 5-min), else
+        # 1-min bars built from live ticks
+        candles = (context or {}).get('candles') or get_live_candles().recent(symbol, "1m", 60)
         if len(candles) < 20:
             return None
         
@@ -9,6 +9,7 @@ from datetime import datetime, timedelta
 
 from .base import BaseAgent, AgentResult
 from ..services.news_aggregator import aggregate_news, get_symbol_news
+from ..services.news_index import news_index, sentiment_label
 from ..llm import llm_manager
 
 
@@ -46,51 +47,18 @@ class SentimentAgent(BaseAgent):
         # Fetch recent general news plus symbol-specific feeds so that
         # large-cap events (earnings, regulatory actions, disruptions)
         # reliably show up even when headlines use company names instead
-        # of NSE tickers.
+        # of NSE tickers. The news index tags each article with the symbols
+        # it mentions once per feed refresh, so this is a lookup per symbol.
         all_news = await aggregate_news(category="general", limit=50)
+        news_index.update(all_news)
         try:
             symbol_specific = await get_symbol_news(symbol_upper, limit=10)
         except Exception as e:
             print(f"  ⚠️  SentimentAgent: get_symbol_news failed for {symbol_upper}: {e}")
             symbol_specific = []
+        news_index.add_symbol_news(symbol_upper, symbol_specific)
 
-        # Simple alias map for common NIFTY/NIFTY-like names where media
-        # headlines often use full company name instead of ticker.
-        alias_map = {
-            "INDIGO": ["interglobe aviation", "interglobe", "indigo"],
-            "RELIANCE": ["reliance industries"],
-            "HDFCBANK": ["hdfc bank"],
-            "SBIN": ["state bank of india"],
-        }
-        aliases = [a.lower() for a in alias_map.get(symbol_upper, [])]
-
-        def _matches_symbol(news: Dict[str, Any]) -> bool:
-            title = str(news.get("title", "")).lower()
-            desc = str(news.get("description", "")).lower()
-            sym_field = str(news.get("symbol", "")).upper()
-
-            if sym_field and sym_field == symbol_upper:
-                return True
-            if symbol_upper and symbol_upper.lower() in title:
-                return True
-            if symbol_upper and symbol_upper.lower() in desc:
-                return True
-            for alias in aliases:
-                if alias and (alias in title or alias in desc):
-                    return True
-            return False
-
-        merged_news = list(all_news) + list(symbol_specific)
-        seen_ids = set()
-        deduped: List[Dict[str, Any]] = []
-        for n in merged_news:
-            key = (str(n.get("source", "")).lower(), str(n.get("title", "")).strip().lower())
-            if key in seen_ids:
-                continue
-            seen_ids.add(key)
-            deduped.append(n)
-
-        symbol_news = [n for n in deduped if _matches_symbol(n)]
+        symbol_news = news_index.articles_for(symbol_upper)
         
         if not symbol_news:
             # No specific news - use general market sentiment
@@ -144,61 +112,32 @@ class SentimentAgent(BaseAgent):
     
     async def _analyze_news_sentiment(self, news: List[Dict]) -> Dict[str, Any]:
         """
-        Analyze news sentiment using OpenAI.
-        Falls back to keyword-based if OpenAI unavailable.
+        Average the per-headline LLM sentiment of the latest headlines.
+        Headlines are scored once and cached (see news_index); falls back
+        to keyword-based analysis if OpenAI is unavailable.
         """
         if not llm_manager.client:
             # Fallback to keyword analysis
             return self._keyword_sentiment_analysis(news)
         
         try:
-            # Use OpenAI for sophisticated sentiment analysis
-            headlines = [n.get('title', '') for n in news[:10]]
-            
-            prompt = f"""Analyze the sentiment of these news headlines for a stock:
-
-{chr(10).join(f"{i+1}. {h}" for i, h in enumerate(headlines))}
-
-Provide:
-1. Overall sentiment (Bullish/Bearish/Neutral)
-2. Sentiment score (0-100, where 0=very bearish, 50=neutral, 100=very bullish)
-3. Key themes (brief)
-
-Format: sentiment|score|themes"""
-            
-            result = await llm_manager.chat_completion(
-                messages=[
-                    {"role": "system", "content": "You are a financial news analyst."},
-                    {"role": "user", "content": prompt}
-                ],
-                complexity="simple",
-                max_tokens=150
-            )
-            
-            # Parse response
-            content = result.get('content', '').strip()
-            parts = content.split('|')
-            
-            if len(parts) >= 2:
-                sentiment = parts[0].strip()
-                try:
-                    score = float(parts[1].strip())
-                except:
-                    score = 50.0
-                
-                themes = parts[2].strip() if len(parts) > 2 else "General news"
+            entries = [e for e in await news_index.headline_sentiment(news[:10]) if e]
+            if entries:
+                score = sum(e['score'] for e in entries) / len(entries)
+                sentiment = sentiment_label(score)
+                themes = "; ".join(list(dict.fromkeys(e['themes'] for e in entries if e.get('themes')))[:3])
                 
                 signals = [{
                     'type': 'NEWS_SENTIMENT',
                     'value': sentiment,
-                    'signal': themes
+                    'signal': themes or "General news"
                 }]
                 
                 return {
                     'signals': signals,
                     'score': score,
                     'sentiment': sentiment,
-                    'themes': themes
+                    'themes': themes or "General news"
                 }
         
         except Exception as e:
@@ -29,14 +29,6 @@ from typing import Dict, List, Any, Optional
 from datetime import datetime, timedelta
 import asyncio
 
-try:
-    import pandas_ta as ta
-except ImportError:
-    ta = None
-    import logging
-    logger = logging.getLogger(__name__)
-    logger.warning("pandas_ta not installed. Install with: pip install pandas-ta")
-
 from .base import BaseAgent, AgentResult
 from ..services.market_data_provider import market_data_provider
 
@@ -54,6 +46,8 @@ class TechnicalAgent(BaseAgent):
     6. Elliott Wave (simplified pattern recognition)
     """
     
+    offload_compute = True
+
     def __init__(self, weight: float = 0.25):
         super().__init__(name="technical", weight=weight)
         self.strategies = {
@@ -92,6 +86,17 @@ class TechnicalAgent(BaseAgent):
         Returns:
             AgentResult with technical signals
         """
+        inputs = await self.prepare(symbol, context)
+        if isinstance(inputs, AgentResult):
+            return inputs
+        return self.compute(symbol, inputs, context)
+
+    async def prepare(
+        self,
+        symbol: str,
+        context: Optional[Dict[str, Any]] = None
+    ):
+        """Fetch daily, hourly and 15-minute OHLCV for compute()."""
         # Fetch historical data (multiple timeframes)
         df_daily = await self._fetch_ohlcv(symbol, interval="1d", days=365)
         df_hourly = await self._fetch_ohlcv(symbol, interval="60m", days=60)
@@ -107,7 +112,20 @@ class TechnicalAgent(BaseAgent):
                 signals=[],
                 reasoning="Insufficient historical data for technical analysis"
             )
-        
+
+        return {"daily": df_daily, "hourly": df_hourly, "min15": df_15min}
+
+    def compute(
+        self,
+        symbol: str,
+        inputs: Dict[str, Any],
+        context: Optional[Dict[str, Any]] = None
+    ) -> AgentResult:
+        """Run all strategies on prepared OHLCV frames (CPU only)."""
+        df_daily = inputs["daily"]
+        df_hourly = inputs.get("hourly")
+        df_15min = inputs.get("min15")
+
         # Run all strategies
         signals = []
         strategy_scores = []
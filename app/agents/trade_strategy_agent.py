@@ -19,6 +19,7 @@ from typing import Dict, List, Any, Optional
 from datetime import datetime, timedelta
 
 from .base import BaseAgent, AgentResult
+from ..core.candles import candle_frame
 
 
 class TradeStrategyAgent(BaseAgent):
@@ -58,15 +59,14 @@ class TradeStrategyAgent(BaseAgent):
                 from ..services.chart_data_service import chart_data_service
                 chart_data = await chart_data_service.fetch_chart_data(symbol, '1M')
                 if chart_data and 'candles' in chart_data:
-                    candles = pd.DataFrame(chart_data['candles'])
+                    candles = candle_frame(chart_data['candles'])
                     current_price = chart_data.get('current', {}).get('price', 0)
                 else:
                     return self._no_trade_response(symbol, "Insufficient data")
             except Exception as e:
                 return self._no_trade_response(symbol, f"Data fetch error: {e}")
         
-        if isinstance(candles, list):
-            candles = pd.DataFrame(candles)
+        candles = candle_frame(candles)
         
         if len(candles) < 20 or current_price == 0:
             return self._no_trade_response(symbol, "Insufficient data for strategy")
@@ -4,12 +4,14 @@ Handles database connection, session management, and initialization
 """
 import os
 from pathlib import Path
-from typing import Generator
+from typing import AsyncGenerator, Generator
 from sqlalchemy import create_engine, event
 from sqlalchemy.orm import declarative_base, sessionmaker, Session
 from sqlalchemy.pool import Pool
 import logging
 
+from ..core.async_db import AsyncDBSession, AsyncSessionFactory
+
 # Load .env file before reading environment variables
 from dotenv import load_dotenv
 _env_path = Path(__file__).resolve().parent.parent.parent / '.env'
@@ -32,6 +34,11 @@ class DatabaseConfig:
             autoflush=False,
             bind=self.engine
         )
+        self.AsyncSessionLocal = AsyncSessionFactory(
+            self.database_url,
+            sessionmaker(autocommit=False, autoflush=False, expire_on_commit=False, bind=self.engine),
+            **self._async_engine_kwargs()
+        )
         
     def _get_database_url(self) -> str:
         """
@@ -88,6 +95,19 @@ class DatabaseConfig:
         
         return engine
     
+    def _async_engine_kwargs(self) -> dict:
+        """Async engine settings, mirroring the sync engine's pool"""
+        echo = os.getenv("SQL_ECHO", "false").lower() == "true"
+        if self.database_url.startswith("sqlite"):
+            return {"echo": echo}
+        return {
+            "pool_pre_ping": True,
+            "pool_size": 10,
+            "max_overflow": 20,
+            "pool_recycle": 3600,
+            "echo": echo,
+        }
+    
     def create_tables(self):
         """Create all tables defined in models"""
         try:
@@ -146,6 +166,22 @@ def get_db() -> Generator[Session, None, None]:
     yield from db_config.get_session()
 
 
+async def get_async_db() -> AsyncGenerator[AsyncDBSession, None]:
+    """
+    FastAPI dependency for async database sessions
+    
+    Usage in async routes:
+    @router.get("/users")
+    async def get_users(db: AsyncDBSession = Depends(get_async_db)):
+        return await db.run_sync(UserService.list_users)
+    """
+    session = get_database_config().AsyncSessionLocal()
+    try:
+        yield session
+    finally:
+        await session.close()
+
+
 def init_database():
     """Initialize database - create tables if they don't exist"""
     db_config = get_database_config()
@@ -159,5 +195,6 @@ __all__ = [
     "DatabaseConfig",
     "get_database_config",
     "get_db",
+    "get_async_db",
     "init_database"
 ]
@@ -0,0 +1,140 @@
+"""Async database sessions for request handlers.
+
+Async routes used to query through a sync ``Session`` directly, so every
+query ran on the event loop and requests were served one query at a time.
+``AsyncSessionFactory`` hands out sessions with the ``AsyncSession.run_sync``
+API instead. When the async driver for the configured database is installed
+(asyncpg for Postgres, aiosqlite for SQLite) the session is a real
+``AsyncSession``; otherwise ``ThreadedAsyncSession`` runs the same work on a
+sync session in the threadpool. Route code is identical in both cases: the
+existing sync service methods are awaited as ``await db.run_sync(fn, ...)``.
+
+Work passed to ``run_sync`` must only touch the database. With a native
+``AsyncSession`` it runs on the event loop (as a greenlet), so broker or
+other blocking HTTP calls belong outside it.
+"""
+
+from __future__ import annotations
+
+import importlib.util
+import logging
+import os
+import threading
+from typing import Any, Callable, Dict, Optional, Protocol, Tuple, TypeVar
+
+from fastapi.concurrency import run_in_threadpool
+from sqlalchemy.engine import make_url
+from sqlalchemy.orm import Session
+
+logger = logging.getLogger(__name__)
+
+T = TypeVar("T")
+
+# backend -> (driver module, SQLAlchemy drivername)
+ASYNC_DRIVERS: Dict[str, Tuple[str, str]] = {
+    "postgresql": ("asyncpg", "postgresql+asyncpg"),
+    "sqlite": ("aiosqlite", "sqlite+aiosqlite"),
+}
+
+
+class AsyncDBSession(Protocol):
+    """What request handlers may use: ``AsyncSession`` or ``ThreadedAsyncSession``."""
+
+    async def run_sync(self, fn: Callable[..., T], *args: Any, **kwargs: Any) -> T: ...
+
+    async def close(self) -> None: ...
+
+
+def async_database_url(database_url: str) -> Optional[str]:
+    """Async-driver URL for ``database_url``, or None if the driver is not installed.
+
+    ``ASYNC_DB_DRIVER=off`` forces the threadpool fallback.
+    """
+    if os.getenv("ASYNC_DB_DRIVER", "auto").strip().lower() in ("off", "false", "0"):
+        return None
+    try:
+        url = make_url(database_url)
+    except Exception:
+        return None
+    backend = url.get_backend_name()
+    if backend not in ASYNC_DRIVERS:
+        return None
+    driver, drivername = ASYNC_DRIVERS[backend]
+    if importlib.util.find_spec(driver) is None:
+        return None
+    url = url.set(drivername=drivername)
+    if backend == "postgresql" and "sslmode" in url.query:
+        # asyncpg takes ``ssl`` rather than libpq's ``sslmode``
+        mode = url.query["sslmode"]
+        url = url.difference_update_query(["sslmode"]).update_query_dict({"ssl": mode})
+    return url.render_as_string(hide_password=False)
+
+
+class ThreadedAsyncSession:
+    """``run_sync``-compatible session over sync Sessions, run in the threadpool.
+
+    Each ``run_sync`` call is its own unit of work: the session is closed in
+    the same worker, so its connection is back in the pool before the
+    handler resumes. (Holding it until the request ends lets worker threads
+    blocked on an exhausted pool starve the closes that would free it.)
+    Returned objects are detached but fully loaded; see ``expire_on_commit``.
+    """
+
+    def __init__(self, sync_factory: Callable[[], Session]):
+        self._factory = sync_factory
+
+    def _call(self, fn: Callable[..., T], args: Tuple[Any, ...], kwargs: Dict[str, Any]) -> T:
+        session = self._factory()
+        try:
+            return fn(session, *args, **kwargs)
+        finally:
+            session.close()
+
+    async def run_sync(self, fn: Callable[..., T], *args: Any, **kwargs: Any) -> T:
+        return await run_in_threadpool(self._call, fn, args, kwargs)
+
+    async def close(self) -> None:
+        return None
+
+
+class AsyncSessionFactory:
+    """Creates request sessions; the async engine is built on first use."""
+
+    def __init__(self, database_url: str, sync_factory: Callable[[], Session], **engine_kwargs: Any):
+        self.async_url = async_database_url(database_url)
+        self._sync_factory = sync_factory
+        self._engine_kwargs = engine_kwargs
+        self._maker = None
+        self._lock = threading.Lock()
+
+    @property
+    def native(self) -> bool:
+        return self.async_url is not None
+
+    def _build(self):
+        from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
+
+        engine = create_async_engine(self.async_url, **self._engine_kwargs)
+        logger.info("Async DB sessions on %s", engine.dialect.driver)
+        # Objects returned from run_sync are read after it returns, so they must
+        # not expire on commit (a refresh there would need IO outside run_sync)
+        return async_sessionmaker(engine, autoflush=False, expire_on_commit=False)
+
+    def __call__(self) -> AsyncDBSession:
+        if not self.native:
+            return ThreadedAsyncSession(self._sync_factory)
+        if self._maker is None:
+            with self._lock:
+                if self._maker is None:
+                    self._maker = self._build()
+        return self._maker()
+
+    async def dispose(self) -> None:
+        """Close the async engine's pooled connections (app shutdown).
+
+        aiosqlite runs each connection on its own non-daemon thread, so an
+        engine left open keeps the process from exiting.
+        """
+        maker, self._maker = self._maker, None
+        if maker is not None:
+            await maker.kw["bind"].dispose()
@@ -0,0 +1,194 @@
+"""Columnar OHLCV candles shared by the chart service, agents and the HTTP layer.
+
+``Candles`` keeps one NumPy array per field (struct of arrays) instead of a
+list of per-bar dicts. Consumers that want a DataFrame get one without a
+per-row conversion (``candle_frame``), and the HTTP layer can send the arrays
+as columns or packed binary. Existing code that indexes, slices or iterates
+candles as dicts keeps working: ``Candles`` is a read-only sequence whose
+items are ``{'time', 'open', 'high', 'low', 'close', 'volume'}`` dicts.
+
+``downsample(points)`` reduces a long series with Largest-Triangle-Three-
+Buckets (LTTB) on the close. Each kept bar absorbs the bars skipped before
+it (first open, max high, min low, summed volume), so extremes and total
+volume survive the reduction.
+"""
+
+from __future__ import annotations
+
+import json
+import struct
+from collections.abc import Sequence
+from typing import Any, Dict, Iterator, List, Optional, Union
+
+import numpy as np
+import pandas as pd
+
+FIELDS = ("time", "open", "high", "low", "close", "volume")
+PRICE_FIELDS = ("open", "high", "low", "close")
+
+# Packed layout: magic, meta length, meta JSON, then time (int64), open/high/
+# low/close (float64) and volume (int64) arrays, little-endian, n each.
+BINARY_MAGIC = b"FYC1"
+BINARY_CONTENT_TYPE = "application/x-fyntrix-candles"
+
+
+class Candles(Sequence):
+    """Immutable struct-of-arrays OHLCV series (``time`` in UTC epoch seconds)."""
+
+    __slots__ = FIELDS
+
+    def __init__(self, time, open, high, low, close, volume):
+        self.time = np.asarray(time, dtype=np.int64)
+        self.open = np.asarray(open, dtype=np.float64)
+        self.high = np.asarray(high, dtype=np.float64)
+        self.low = np.asarray(low, dtype=np.float64)
+        self.close = np.asarray(close, dtype=np.float64)
+        self.volume = np.asarray(volume, dtype=np.int64)
+
+    @classmethod
+    def from_frame(cls, df: pd.DataFrame, decimals: Optional[int] = 2) -> "Candles":
+        """Build from a frame with time/open/high/low/close/volume columns.
+
+        Non-numeric prices drop the row, missing volume becomes 0 and prices
+        are rounded to ``decimals`` (as the chart API has always returned).
+        """
+        prices = {c: pd.to_numeric(df[c], errors="coerce").to_numpy(dtype=np.float64) for c in PRICE_FIELDS}
+        time = pd.to_numeric(df["time"], errors="coerce").to_numpy(dtype=np.float64)
+        volume = pd.to_numeric(df["volume"], errors="coerce").fillna(0).to_numpy(dtype=np.float64)
+        keep = ~np.isnan(time)
+        for values in prices.values():
+            keep &= ~np.isnan(values)
+        if decimals is not None:
+            prices = {c: np.round(v, decimals) for c, v in prices.items()}
+        return cls(time[keep], *(prices[c][keep] for c in PRICE_FIELDS), volume[keep])
+
+    @classmethod
+    def from_records(cls, records: List[Dict[str, Any]]) -> "Candles":
+        return cls.from_frame(pd.DataFrame.from_records(records, columns=list(FIELDS)), decimals=None)
+
+    # ----------------------------------------------------------- sequence API
+
+    def __len__(self) -> int:
+        return len(self.time)
+
+    def __getitem__(self, index: Union[int, slice]):
+        if isinstance(index, slice):
+            return Candles(*(getattr(self, f)[index] for f in FIELDS))
+        return {
+            "time": int(self.time[index]),
+            "open": float(self.open[index]),
+            "high": float(self.high[index]),
+            "low": float(self.low[index]),
+            "close": float(self.close[index]),
+            "volume": int(self.volume[index]),
+        }
+
+    def __iter__(self) -> Iterator[Dict[str, Any]]:
+        return iter(self.to_records())
+
+    def __repr__(self) -> str:
+        return f"Candles(n={len(self)})"
+
+    def __eq__(self, other) -> bool:
+        if not isinstance(other, Candles):
+            return NotImplemented
+        return all(np.array_equal(getattr(self, f), getattr(other, f)) for f in FIELDS)
+
+    __hash__ = None
+
+    # ------------------------------------------------------------ conversions
+
+    def to_frame(self) -> pd.DataFrame:
+        return pd.DataFrame({f: getattr(self, f) for f in FIELDS})
+
+    def to_columns(self) -> Dict[str, list]:
+        return {f: getattr(self, f).tolist() for f in FIELDS}
+
+    def to_records(self) -> List[Dict[str, Any]]:
+        columns = self.to_columns()
+        return [dict(zip(FIELDS, row)) for row in zip(*(columns[f] for f in FIELDS))]
+
+    def to_bytes(self, meta: Optional[Dict[str, Any]] = None) -> bytes:
+        """Packed little-endian arrays prefixed with a JSON header (``meta`` plus ``count``)."""
+        header = json.dumps({**(meta or {}), "count": len(self)}, separators=(",", ":"), default=str).encode()
+        parts = [BINARY_MAGIC, struct.pack("<I", len(header)), header]
+        parts.append(self.time.astype("<i8").tobytes())
+        parts.extend(getattr(self, f).astype("<f8").tobytes() for f in PRICE_FIELDS)
+        parts.append(self.volume.astype("<i8").tobytes())
+        return b"".join(parts)
+
+    @classmethod
+    def from_bytes(cls, payload: bytes) -> "tuple[Candles, Dict[str, Any]]":
+        if payload[:4] != BINARY_MAGIC:
+            raise ValueError("Not a packed candle payload")
+        (size,) = struct.unpack_from("<I", payload, 4)
+        meta = json.loads(payload[8:8 + size])
+        n = int(meta["count"])
+        offset = 8 + size
+        arrays = []
+        for dtype in ("<i8", "<f8", "<f8", "<f8", "<f8", "<i8"):
+            arrays.append(np.frombuffer(payload, dtype=dtype, count=n, offset=offset))
+            offset += 8 * n
+        return cls(*arrays), meta
+
+    # ---------------------------------------------------------- downsampling
+
+    def downsample(self, points: int) -> "Candles":
+        """At most ``points`` bars chosen by LTTB on the close (see module docstring)."""
+        n = len(self)
+        if points <= 0 or n <= points:
+            return self
+        keep = lttb_indices(self.time.astype(np.float64), self.close, points)
+        # Bar keep[k] spans the bars after keep[k-1] up to itself
+        starts = np.r_[0, keep[:-1] + 1]
+        return Candles(
+            self.time[starts],
+            self.open[starts],
+            np.maximum.reduceat(self.high, starts),
+            np.minimum.reduceat(self.low, starts),
+            self.close[keep],
+            np.add.reduceat(self.volume, starts),
+        )
+
+
+def lttb_indices(x: np.ndarray, y: np.ndarray, points: int) -> np.ndarray:
+    """Indices of the ``points`` samples Largest-Triangle-Three-Buckets keeps.
+
+    The first and last samples are always kept; the rest are split into
+    ``points - 2`` equal buckets and each bucket keeps the sample forming the
+    largest triangle with the previously kept sample and the next bucket's
+    mean.
+    """
+    n = len(x)
+    if points >= n or points < 3:
+        return np.arange(n) if points >= n else np.array([0, n - 1])[:max(points, 0)]
+    edges = np.linspace(1, n - 1, points - 1).astype(np.int64)
+    out = np.empty(points, dtype=np.int64)
+    out[0], out[-1] = 0, n - 1
+    a = 0
+    for i in range(points - 2):
+        lo, hi = edges[i], edges[i + 1]
+        nlo, nhi = hi, (edges[i + 2] if i + 2 < len(edges) else n)
+        avg_x, avg_y = x[nlo:nhi].mean(), y[nlo:nhi].mean()
+        area = np.abs((x[a] - avg_x) * (y[lo:hi] - y[a]) - (x[a] - x[lo:hi]) * (avg_y - y[a]))
+        a = lo + int(np.argmax(area))
+        out[i + 1] = a
+    return out
+
+
+def candle_frame(candles) -> pd.DataFrame:
+    """DataFrame view of ``Candles``, a list of candle dicts or an existing frame."""
+    if isinstance(candles, pd.DataFrame):
+        return candles
+    if isinstance(candles, Candles):
+        return candles.to_frame()
+    return pd.DataFrame(candles)
+
+
+def candle_payload(candles, fmt: str = "rows", points: Optional[int] = None):
+    """Candles for a JSON response: ``rows`` (list of dicts) or ``columnar`` (dict of lists)."""
+    if not isinstance(candles, Candles):
+        candles = Candles.from_records(list(candles))
+    if points:
+        candles = candles.downsample(points)
+    return candles.to_columns() if fmt == "columnar" else candles.to_records()
@@ -0,0 +1,203 @@
+"""Lazy singletons and startup instrumentation.
+
+Module-level service instances used to be constructed at import time, so
+importing ``app.main`` built every provider, LLM client and agent
+coordinator before the first health check could be answered.
+``LazySingleton`` keeps the familiar ``from x import service`` style but
+defers construction to first attribute access. ``import_timer`` records how
+long each module took to import while ``app.main`` loads, and
+``get_startup_report`` combines both for the ``/health/startup`` endpoint.
+"""
+
+from __future__ import annotations
+
+import importlib.abc
+import importlib.machinery
+import sys
+import threading
+import time
+from collections import defaultdict
+from typing import Any, Callable, Dict, Generic, List, Optional, TypeVar
+
+T = TypeVar("T")
+
+_process_start = time.perf_counter()
+_inits: List[Dict[str, Any]] = []
+_inits_lock = threading.Lock()
+
+
+def record_init(name: str, seconds: float, error: Optional[str] = None) -> None:
+    """Record a deferred initializer in the startup report."""
+    with _inits_lock:
+        _inits.append({
+            "name": name,
+            "ms": round(seconds * 1000.0, 1),
+            "at_ms": round((time.perf_counter() - _process_start) * 1000.0, 1),
+            "thread": threading.current_thread().name,
+            "error": error,
+        })
+
+
+class LazySingleton(Generic[T]):
+    """Stand-in for a module-level instance, built on first use.
+
+    Attribute access, assignment and calls are forwarded to the real object,
+    so call sites keep using ``service.method()`` unchanged. Construction is
+    guarded by a lock (concurrent first users build it once) and timed into
+    the startup report. Code that needs the object itself (identity or
+    isinstance checks) should call ``get()``.
+    """
+
+    __slots__ = ("_name", "_factory", "_instance", "_lock")
+
+    def __init__(self, name: str, factory: Callable[[], T]):
+        object.__setattr__(self, "_name", name)
+        object.__setattr__(self, "_factory", factory)
+        object.__setattr__(self, "_instance", None)
+        object.__setattr__(self, "_lock", threading.RLock())
+
+    def get(self) -> T:
+        instance = self._instance
+        if instance is not None:
+            return instance
+        with self._lock:
+            if self._instance is None:
+                start = time.perf_counter()
+                try:
+                    instance = self._factory()
+                except Exception as e:
+                    record_init(self._name, time.perf_counter() - start, error=str(e))
+                    raise
+                record_init(self._name, time.perf_counter() - start)
+                object.__setattr__(self, "_instance", instance)
+            return self._instance
+
+    @property
+    def initialized(self) -> bool:
+        return self._instance is not None
+
+    def __getattr__(self, attr: str) -> Any:
+        return getattr(self.get(), attr)
+
+    def __setattr__(self, attr: str, value: Any) -> None:
+        setattr(self.get(), attr, value)
+
+    def __delattr__(self, attr: str) -> None:
+        delattr(self.get(), attr)
+
+    def __call__(self, *args: Any, **kwargs: Any) -> Any:
+        return self.get()(*args, **kwargs)
+
+    def __repr__(self) -> str:
+        if self._instance is None:
+            return f"<LazySingleton {self._name} (not initialized)>"
+        return repr(self._instance)
+
+
+class _TimedLoader(importlib.abc.Loader):
+    def __init__(self, timer: "ImportTimer", loader: importlib.abc.Loader):
+        self._timer = timer
+        self._loader = loader
+
+    def create_module(self, spec):
+        return self._loader.create_module(spec)
+
+    def exec_module(self, module) -> None:
+        self._timer._enter(module.__name__)
+        try:
+            self._loader.exec_module(module)
+        finally:
+            self._timer._exit(module.__name__)
+
+    def __getattr__(self, attr: str) -> Any:
+        # get_resource_reader, get_source, ... used by importlib.resources etc.
+        return getattr(self._loader, attr)
+
+
+class ImportTimer(importlib.abc.MetaPathFinder):
+    """Meta-path hook recording inclusive and self import time per module."""
+
+    def __init__(self) -> None:
+        self.modules: Dict[str, Dict[str, float]] = {}
+        self._stack: List[List[Any]] = []
+        self._resolving = threading.local()
+        self._installed_at: Optional[float] = None
+        self.total_s = 0.0
+
+    def install(self) -> None:
+        if self not in sys.meta_path:
+            sys.meta_path.insert(0, self)
+            self._installed_at = time.perf_counter()
+
+    def uninstall(self) -> None:
+        if self in sys.meta_path:
+            sys.meta_path.remove(self)
+            if self._installed_at is not None:
+                self.total_s += time.perf_counter() - self._installed_at
+                self._installed_at = None
+
+    def find_spec(self, fullname, path=None, target=None):
+        if getattr(self._resolving, "active", False) or threading.current_thread() is not threading.main_thread():
+            return None
+        self._resolving.active = True
+        try:
+            for finder in sys.meta_path:
+                if finder is self or not hasattr(finder, "find_spec"):
+                    continue
+                spec = finder.find_spec(fullname, path, target)
+                if spec is not None:
+                    break
+            else:
+                return None
+        finally:
+            self._resolving.active = False
+        if spec.loader is not None and hasattr(spec.loader, "exec_module"):
+            spec.loader = _TimedLoader(self, spec.loader)
+        return spec
+
+    def _enter(self, name: str) -> None:
+        # [name, start, time spent in nested imports]
+        self._stack.append([name, time.perf_counter(), 0.0])
+
+    def _exit(self, name: str) -> None:
+        _, start, children = self._stack.pop()
+        inclusive = time.perf_counter() - start
+        self.modules[name] = {"inclusive_s": inclusive, "self_s": inclusive - children}
+        if self._stack:
+            self._stack[-1][2] += inclusive
+
+    def report(self, top: int = 20) -> Dict[str, Any]:
+        by_package: Dict[str, float] = defaultdict(float)
+        for name, t in self.modules.items():
+            # app.services.x stays per-module; third-party code rolls up per top-level package
+            parts = name.split(".")
+            package = ".".join(parts[:3]) if parts[0] == "app" else parts[0]
+            by_package[package] += t["self_s"]
+        slowest = sorted(self.modules.items(), key=lambda kv: kv[1]["self_s"], reverse=True)[:top]
+        return {
+            "total_ms": round(self.total_s * 1000.0, 1),
+            "modules_imported": len(self.modules),
+            "slowest_modules": [
+                {"module": name, "self_ms": round(t["self_s"] * 1000.0, 1), "inclusive_ms": round(t["inclusive_s"] * 1000.0, 1)}
+                for name, t in slowest
+            ],
+            "by_package": [
+                {"package": name, "ms": round(s * 1000.0, 1)}
+                for name, s in sorted(by_package.items(), key=lambda kv: kv[1], reverse=True)[:top]
+            ],
+        }
+
+
+# Global instance
+import_timer = ImportTimer()
+
+
+def get_startup_report(top: int = 20) -> Dict[str, Any]:
+    """Import timings plus every lazy initializer that has run so far."""
+    with _inits_lock:
+        inits = list(_inits)
+    return {
+        "uptime_ms": round((time.perf_counter() - _process_start) * 1000.0, 1),
+        "imports": import_timer.report(top),
+        "initializers": sorted(inits, key=lambda r: r["ms"], reverse=True),
+    }
@@ -0,0 +1,169 @@
+"""Process-local counters and histograms in the Prometheus text format.
+
+prometheus_client is not a dependency, and the pipeline only needs labelled
+counters, histograms and a way to publish values other modules already keep
+(agent latency stats, for example). ``metrics.render()`` produces the text
+exposition format (version 0.0.4) served by ``/metrics``.
+"""
+
+from __future__ import annotations
+
+import math
+import threading
+from bisect import bisect_left
+from typing import Callable, Dict, Iterable, List, Optional, Sequence, Tuple
+
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+# Seconds; covers a dict lookup up to a full scheduler run
+DEFAULT_BUCKETS = (0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0, 120.0, 300.0)
+
+# (labels, value) pairs published by a collector for one metric family
+Samples = Iterable[Tuple[Dict[str, str], float]]
+# name, type, help, samples
+Family = Tuple[str, str, str, Samples]
+
+
+def _escape(value: str) -> str:
+    return str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _labels(pairs: Iterable[Tuple[str, str]]) -> str:
+    body = ",".join(f'{k}="{_escape(v)}"' for k, v in pairs)
+    return "{" + body + "}" if body else ""
+
+
+def _number(value: float) -> str:
+    if math.isinf(value):
+        return "+Inf" if value > 0 else "-Inf"
+    if float(value).is_integer():
+        return str(int(value))
+    return repr(float(value))
+
+
+class Counter:
+    """Monotonic counter with a fixed set of label names."""
+
+    kind = "counter"
+
+    def __init__(self, name: str, help: str, labelnames: Sequence[str] = ()):
+        self.name = name
+        self.help = help
+        self.labelnames = tuple(labelnames)
+        self._values: Dict[Tuple[str, ...], float] = {}
+        self._lock = threading.Lock()
+
+    def inc(self, *labelvalues: str, amount: float = 1.0) -> None:
+        with self._lock:
+            self._values[labelvalues] = self._values.get(labelvalues, 0.0) + amount
+
+    def value(self, *labelvalues: str) -> float:
+        return self._values.get(labelvalues, 0.0)
+
+    def render(self) -> List[str]:
+        with self._lock:
+            items = sorted(self._values.items())
+        return [f"{self.name}{_labels(zip(self.labelnames, key))} {_number(v)}" for key, v in items]
+
+
+class Histogram:
+    """Cumulative-bucket histogram with a fixed set of label names."""
+
+    kind = "histogram"
+
+    def __init__(self, name: str, help: str, labelnames: Sequence[str] = (), buckets: Sequence[float] = DEFAULT_BUCKETS):
+        self.name = name
+        self.help = help
+        self.labelnames = tuple(labelnames)
+        self.buckets = tuple(sorted(buckets))
+        # labels -> [bucket counts..., +Inf count, sum]
+        self._series: Dict[Tuple[str, ...], List[float]] = {}
+        self._lock = threading.Lock()
+
+    def observe(self, value: float, *labelvalues: str) -> None:
+        index = bisect_left(self.buckets, value)
+        with self._lock:
+            series = self._series.get(labelvalues)
+            if series is None:
+                series = self._series[labelvalues] = [0] * (len(self.buckets) + 1) + [0.0]
+            series[index] += 1
+            series[-1] += value
+
+    def count(self, *labelvalues: str) -> int:
+        series = self._series.get(labelvalues)
+        return int(sum(series[:-1])) if series else 0
+
+    def render(self) -> List[str]:
+        with self._lock:
+            items = sorted((k, list(v)) for k, v in self._series.items())
+        lines = []
+        for key, series in items:
+            pairs = list(zip(self.labelnames, key))
+            cumulative = 0
+            for bound, n in zip(self.buckets + (math.inf,), series[:-1]):
+                cumulative += n
+                lines.append(f"{self.name}_bucket{_labels(pairs + [('le', _number(bound))])} {cumulative}")
+            lines.append(f"{self.name}_sum{_labels(pairs)} {_number(series[-1])}")
+            lines.append(f"{self.name}_count{_labels(pairs)} {cumulative}")
+        return lines
+
+
+class MetricsRegistry:
+    """Owns the metric objects and renders them, plus collector output, as one page."""
+
+    def __init__(self):
+        self._metrics: Dict[str, object] = {}
+        self._collectors: List[Callable[[], Iterable[Family]]] = []
+        self._lock = threading.Lock()
+
+    def _register(self, metric):
+        with self._lock:
+            existing = self._metrics.get(metric.name)
+            if existing is not None:
+                return existing
+            self._metrics[metric.name] = metric
+            return metric
+
+    def counter(self, name: str, help: str, labelnames: Sequence[str] = ()) -> Counter:
+        return self._register(Counter(name, help, labelnames))
+
+    def histogram(
+        self,
+        name: str,
+        help: str,
+        labelnames: Sequence[str] = (),
+        buckets: Optional[Sequence[float]] = None,
+    ) -> Histogram:
+        return self._register(Histogram(name, help, labelnames, buckets or DEFAULT_BUCKETS))
+
+    def register_collector(self, collector: Callable[[], Iterable[Family]]) -> None:
+        """Publish values kept elsewhere; ``collector`` is called on every scrape."""
+        with self._lock:
+            self._collectors.append(collector)
+
+    def render(self) -> str:
+        lines: List[str] = []
+        for metric in list(self._metrics.values()):
+            lines.append(f"# HELP {metric.name} {metric.help}")
+            lines.append(f"# TYPE {metric.name} {metric.kind}")
+            lines.extend(metric.render())
+        for collector in list(self._collectors):
+            try:
+                families = list(collector())
+            except Exception as e:
+                print(f"[Metrics] Collector {getattr(collector, '__name__', collector)} failed: {e}")
+                continue
+            for name, kind, help, samples in families:
+                lines.append(f"# HELP {name} {help}")
+                lines.append(f"# TYPE {name} {kind}")
+                for labels, value in samples:
+                    lines.append(f"{name}{_labels(labels.items())} {_number(value)}")
+        return "\n".join(lines) + "\n"
+
+
+# Global instance
+metrics = MetricsRegistry()
+
+
+def get_metrics() -> MetricsRegistry:
+    return metrics
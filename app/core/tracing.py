@@ -0,0 +1,359 @@
+"""Per-stage spans for the analysis pipeline.
+
+Timing used to be limited to print lines ("Analysis complete in X seconds",
+the OK/TIMEOUT lines per agent, data source successes), so a slow scheduler
+run could not be broken down. Code now wraps each stage in a span::
+
+    with span("fetch", "ohlcv:zerodha", symbol=symbol) as s:
+        df = await ...
+        s.set("bars", len(df))
+
+Stages used: run, coordinator, agent, cache, fetch, llm, persist. Every
+span feeds ``fyntrix_pipeline_stage_seconds{stage,name}`` (and error and
+cache-hit counters when it raised or carries a ``cache_hit`` attribute), so
+``name`` must stay low-cardinality: agent, source or purpose names, never
+symbols. Symbols and other details go in attributes.
+
+``trace_run()`` opens the root span of one run (a scheduler cycle or one
+generate_top_picks call); spans opened inside it, including in tasks it
+starts, are collected into that run's trace. When the run ends it is kept
+if it was sampled or slower than the slow-run threshold. Kept runs feed the
+slow-run report (top contributors by self time) and, when an OTLP endpoint
+is configured, are exported as OTLP/HTTP JSON. Spans outside a run only
+update the metrics.
+
+Configuration (environment):
+- PIPELINE_TRACING: set to 0/off to disable spans and stage metrics (default on)
+- TRACE_SAMPLE_RATE: share of runs kept regardless of duration (default 0.1)
+- TRACE_SLOW_RUN_S: runs at least this long are always kept (default 60s)
+- TRACE_KEEP_RUNS: kept runs held for the slow-run report (default 20)
+- TRACE_MAX_SPANS: spans recorded per run; later spans only count in metrics (default 5000)
+- OTEL_EXPORTER_OTLP_ENDPOINT / OTEL_EXPORTER_OTLP_TRACES_ENDPOINT: OTLP/HTTP collector
+- OTEL_SERVICE_NAME: service.name resource attribute (default fyntrix-backend)
+"""
+
+from __future__ import annotations
+
+import os
+import queue
+import random
+import threading
+import time
+from collections import deque
+from contextvars import ContextVar
+from datetime import datetime
+from typing import Any, Deque, Dict, List, Optional
+
+from .metrics import metrics
+
+
+def _env_float(name: str, default: float) -> float:
+    raw = os.getenv(name)
+    if raw:
+        try:
+            return max(0.0, float(raw))
+        except ValueError:
+            pass
+    return default
+
+
+TRACING_ENABLED = os.getenv("PIPELINE_TRACING", "1").strip().lower() not in ("0", "off", "false", "no")
+SAMPLE_RATE = min(1.0, _env_float("TRACE_SAMPLE_RATE", 0.1))
+SLOW_RUN_S = _env_float("TRACE_SLOW_RUN_S", 60.0)
+KEEP_RUNS = int(_env_float("TRACE_KEEP_RUNS", 20)) or 1
+MAX_SPANS = int(_env_float("TRACE_MAX_SPANS", 5000))
+SERVICE_NAME = os.getenv("OTEL_SERVICE_NAME", "fyntrix-backend")
+
+STAGE_SECONDS = metrics.histogram(
+    "fyntrix_pipeline_stage_seconds", "Duration of pipeline stages", ("stage", "name"))
+STAGE_ERRORS = metrics.counter(
+    "fyntrix_pipeline_stage_errors_total", "Pipeline stages that raised", ("stage", "name"))
+CACHE_LOOKUPS = metrics.counter(
+    "fyntrix_pipeline_cache_lookups_total", "Cache lookups by outcome", ("stage", "name", "result"))
+SLOW_RUNS = metrics.counter(
+    "fyntrix_pipeline_slow_runs_total", f"Runs slower than TRACE_SLOW_RUN_S ({SLOW_RUN_S:g}s)", ("name",))
+
+_current: ContextVar[Optional["Span"]] = ContextVar("pipeline_span", default=None)
+
+
+class _Trace:
+    """Spans recorded for one run."""
+
+    __slots__ = ("trace_id", "spans", "closed", "dropped")
+
+    def __init__(self):
+        self.trace_id = f"{random.getrandbits(128):032x}"
+        self.spans: List[Span] = []
+        self.closed = False
+        self.dropped = 0
+
+
+class Span:
+    __slots__ = ("stage", "name", "attrs", "parent", "trace", "span_id", "start_ns",
+                 "_t0", "duration", "child_time", "error", "_token")
+
+    def __init__(self, stage: str, name: str, attrs: Dict[str, Any], trace: Optional[_Trace] = None):
+        self.stage = stage
+        self.name = name
+        self.attrs = attrs
+        self.parent: Optional[Span] = None
+        self.trace = trace
+        self.span_id = ""
+        self.start_ns = 0
+        self._t0 = 0.0
+        self.duration = 0.0
+        self.child_time = 0.0
+        self.error: Optional[str] = None
+        self._token = None
+
+    def set(self, key: str, value: Any) -> None:
+        self.attrs[key] = value
+
+    def __enter__(self) -> "Span":
+        parent = _current.get()
+        if self.trace is None and parent is not None:
+            self.parent = parent
+            self.trace = parent.trace
+        if self.trace is not None:
+            self.span_id = f"{random.getrandbits(64):016x}"
+            self.start_ns = time.time_ns()
+        self._token = _current.set(self)
+        self._t0 = time.perf_counter()
+        return self
+
+    def __exit__(self, exc_type, exc, tb) -> None:
+        self.duration = time.perf_counter() - self._t0
+        try:
+            _current.reset(self._token)
+        except ValueError:
+            # Exited from a different context than the one it was entered in
+            _current.set(self.parent)
+        STAGE_SECONDS.observe(self.duration, self.stage, self.name)
+        if exc_type is not None:
+            self.error = exc_type.__name__
+            STAGE_ERRORS.inc(self.stage, self.name)
+        hit = self.attrs.get("cache_hit")
+        if hit is not None:
+            CACHE_LOOKUPS.inc(self.stage, self.name, "hit" if hit else "miss")
+        if self.parent is not None:
+            self.parent.child_time += self.duration
+        trace = self.trace
+        if trace is not None and not trace.closed and self.parent is not None:
+            if len(trace.spans) < MAX_SPANS:
+                trace.spans.append(self)
+            else:
+                trace.dropped += 1
+
+
+class _NoopSpan:
+    __slots__ = ()
+
+    def set(self, key: str, value: Any) -> None:
+        pass
+
+    def __enter__(self) -> "_NoopSpan":
+        return self
+
+    def __exit__(self, exc_type, exc, tb) -> None:
+        return None
+
+
+_NOOP = _NoopSpan()
+
+
+def span(stage: str, name: str, **attrs: Any):
+    """Context manager timing one pipeline stage (a no-op when tracing is off)."""
+    if not tracer.enabled:
+        return _NOOP
+    return Span(stage, name, attrs)
+
+
+def trace_run(name: str, **attrs: Any):
+    """Root span of a run; nested inside another run it is an ordinary ``run`` span."""
+    if not tracer.enabled:
+        return _NOOP
+    if _current.get() is not None:
+        return Span("run", name, attrs)
+    return _RunSpan(name, attrs)
+
+
+def current_trace_id() -> Optional[str]:
+    current = _current.get()
+    if current is None or current.trace is None:
+        return None
+    return current.trace.trace_id
+
+
+class _RunSpan(Span):
+    __slots__ = ()
+
+    def __init__(self, name: str, attrs: Dict[str, Any]):
+        super().__init__("run", name, attrs, _Trace())
+
+    def __exit__(self, exc_type, exc, tb) -> None:
+        super().__exit__(exc_type, exc, tb)
+        self.trace.closed = True
+        tracer.finish(self)
+
+
+class Tracer:
+    """Keeps sampled and slow runs and hands them to the OTLP exporter."""
+
+    def __init__(self):
+        self.enabled = TRACING_ENABLED
+        self.sample_rate = SAMPLE_RATE
+        self.slow_run_s = SLOW_RUN_S
+        self._runs: Deque[Dict[str, Any]] = deque(maxlen=KEEP_RUNS)
+        self._exporter: Optional[OTLPExporter] = None
+        endpoint = os.getenv("OTEL_EXPORTER_OTLP_TRACES_ENDPOINT")
+        if not endpoint and os.getenv("OTEL_EXPORTER_OTLP_ENDPOINT"):
+            endpoint = os.getenv("OTEL_EXPORTER_OTLP_ENDPOINT").rstrip("/") + "/v1/traces"
+        if endpoint and self.enabled:
+            self._exporter = OTLPExporter(endpoint)
+        self.stats = {"runs": 0, "kept": 0, "slow": 0}
+
+    def finish(self, root: _RunSpan) -> None:
+        self.stats["runs"] += 1
+        slow = self.slow_run_s > 0 and root.duration >= self.slow_run_s
+        if slow:
+            self.stats["slow"] += 1
+            SLOW_RUNS.inc(root.name)
+        if not slow and random.random() >= self.sample_rate:
+            return
+        self.stats["kept"] += 1
+        self._runs.append(self._summarize(root, slow))
+        if self._exporter is not None:
+            self._exporter.submit(root)
+
+    @staticmethod
+    def _summarize(root: _RunSpan, slow: bool, top: int = 10) -> Dict[str, Any]:
+        """Per (stage, name) totals, ordered by self time (span time not spent in child spans).
+
+        Sibling spans overlap (agents run concurrently), so totals can exceed
+        the run's wall time; self time shows where the work actually went.
+        """
+        groups: Dict[tuple, Dict[str, Any]] = {}
+        for s in root.trace.spans:
+            g = groups.get((s.stage, s.name))
+            if g is None:
+                g = groups[(s.stage, s.name)] = {"stage": s.stage, "name": s.name, "count": 0,
+                                                 "total_s": 0.0, "self_s": 0.0, "max_s": 0.0, "errors": 0}
+            g["count"] += 1
+            g["total_s"] += s.duration
+            g["self_s"] += max(0.0, s.duration - s.child_time)
+            g["max_s"] = max(g["max_s"], s.duration)
+            g["errors"] += s.error is not None
+        contributors = sorted(groups.values(), key=lambda g: g["self_s"], reverse=True)[:top]
+        for g in contributors:
+            for key in ("total_s", "self_s", "max_s"):
+                g[key] = round(g[key], 3)
+        slowest = sorted(root.trace.spans, key=lambda s: s.duration, reverse=True)[:top]
+        return {
+            "trace_id": root.trace.trace_id,
+            "name": root.name,
+            "attributes": dict(root.attrs),
+            "started_at": datetime.utcfromtimestamp(root.start_ns / 1e9).isoformat() + "Z",
+            "duration_s": round(root.duration, 3),
+            "slow": slow,
+            "error": root.error,
+            "spans": len(root.trace.spans),
+            "dropped_spans": root.trace.dropped,
+            "top_contributors": contributors,
+            "slowest_spans": [
+                {"stage": s.stage, "name": s.name, "duration_s": round(s.duration, 3),
+                 "attributes": dict(s.attrs), "error": s.error}
+                for s in slowest
+            ],
+        }
+
+    def get_slow_runs(self, limit: int = 10, slow_only: bool = False) -> Dict[str, Any]:
+        """Most recent kept runs first."""
+        runs = [r for r in reversed(self._runs) if r["slow"] or not slow_only][:limit]
+        return {
+            "enabled": self.enabled,
+            "sample_rate": self.sample_rate,
+            "slow_run_s": self.slow_run_s,
+            "otlp_endpoint": self._exporter.endpoint if self._exporter is not None else None,
+            "stats": dict(self.stats, exported=self._exporter.stats if self._exporter is not None else None),
+            "runs": runs,
+        }
+
+
+def _otlp_value(value: Any) -> Dict[str, Any]:
+    if isinstance(value, bool):
+        return {"boolValue": value}
+    if isinstance(value, int):
+        return {"intValue": str(value)}
+    if isinstance(value, float):
+        return {"doubleValue": value}
+    return {"stringValue": str(value)}
+
+
+def _otlp_span(s: Span) -> Dict[str, Any]:
+    attrs = {"pipeline.stage": s.stage, "pipeline.name": s.name, **s.attrs}
+    out = {
+        "traceId": s.trace.trace_id,
+        "spanId": s.span_id,
+        "name": f"{s.stage} {s.name}",
+        "kind": 1,  # SPAN_KIND_INTERNAL
+        "startTimeUnixNano": str(s.start_ns),
+        "endTimeUnixNano": str(s.start_ns + int(s.duration * 1e9)),
+        "attributes": [{"key": k, "value": _otlp_value(v)} for k, v in attrs.items() if v is not None],
+        "status": {"code": 2, "message": s.error} if s.error else {},
+    }
+    if s.parent is not None:
+        out["parentSpanId"] = s.parent.span_id
+    return out
+
+
+class OTLPExporter:
+    """Posts kept runs to an OTLP/HTTP collector (JSON encoding) from a background thread."""
+
+    def __init__(self, endpoint: str, timeout: float = 5.0):
+        self.endpoint = endpoint
+        self.timeout = timeout
+        self._queue: "queue.Queue[_RunSpan]" = queue.Queue(maxsize=100)
+        self._thread: Optional[threading.Thread] = None
+        self.stats = {"exported": 0, "failed": 0, "dropped": 0}
+
+    def submit(self, root: _RunSpan) -> None:
+        if self._thread is None:
+            self._thread = threading.Thread(target=self._worker, name="otlp-exporter", daemon=True)
+            self._thread.start()
+        try:
+            self._queue.put_nowait(root)
+        except queue.Full:
+            self.stats["dropped"] += 1
+
+    def payload(self, root: _RunSpan) -> Dict[str, Any]:
+        return {
+            "resourceSpans": [{
+                "resource": {"attributes": [{"key": "service.name", "value": {"stringValue": SERVICE_NAME}}]},
+                "scopeSpans": [{
+                    "scope": {"name": "app.core.tracing"},
+                    "spans": [_otlp_span(root)] + [_otlp_span(s) for s in root.trace.spans],
+                }],
+            }]
+        }
+
+    def _worker(self) -> None:
+        import httpx
+
+        with httpx.Client(timeout=self.timeout) as client:
+            while True:
+                root = self._queue.get()
+                try:
+                    response = client.post(self.endpoint, json=self.payload(root))
+                    response.raise_for_status()
+                    self.stats["exported"] += 1
+                except Exception as e:
+                    self.stats["failed"] += 1
+                    print(f"[Tracing] OTLP export to {self.endpoint} failed: {e}")
+
+
+# Global instance
+tracer = Tracer()
+
+
+def get_tracer() -> Tracer:
+    return tracer
@@ -3,6 +3,8 @@ import os
 from sqlalchemy import create_engine
 from sqlalchemy.orm import declarative_base, sessionmaker
 
+from .core.async_db import AsyncSessionFactory
+
 
 def _get_database_url() -> str:
     return (
@@ -14,4 +16,9 @@ def _get_database_url() -> str:
 
 engine = create_engine(_get_database_url(), pool_pre_ping=True)
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+AsyncSessionLocal = AsyncSessionFactory(
+    _get_database_url(),
+    sessionmaker(autocommit=False, autoflush=False, expire_on_commit=False, bind=engine),
+    pool_pre_ping=True,
+)
 Base = declarative_base()
@@ -1,10 +1,13 @@
-from typing import Generator
+from typing import AsyncGenerator, Generator
 
 from sqlalchemy.orm import Session
 from fastapi import Depends, HTTPException, status
+from fastapi.concurrency import run_in_threadpool
 from fastapi.security import HTTPBearer, HTTPAuthorizationCredentials
 
-from .db import SessionLocal
+from .core.async_db import AsyncDBSession
+from .db import AsyncSessionLocal, SessionLocal
+from .security import verify_bearer_token
 from .services.cognito_auth import CognitoAuthService, get_cognito_service
 
 
@@ -19,27 +22,62 @@ def get_db() -> Generator[Session, None, None]:
         db.close()
 
 
+async def get_async_db() -> AsyncGenerator[AsyncDBSession, None]:
+    db = AsyncSessionLocal()
+    try:
+        yield db
+    finally:
+        await db.close()
+
+
 async def get_current_user(
     credentials: HTTPAuthorizationCredentials = Depends(security),
-    cognito: CognitoAuthService = Depends(get_cognito_service)
 ) -> dict:
     """
     Get current authenticated user from JWT token
     
+    The token is verified locally against the issuer's cached JWKS (no
+    Cognito round-trip); user fields come from the token claims. Use
+    get_current_user_profile when a route needs the full Cognito profile.
+    
     Args:
         credentials: HTTP Bearer token credentials
-        cognito: Cognito authentication service
         
     Returns:
-        dict: User information with user_id, email, name, etc.
+        dict: User information with user_id, sub, email, name, etc.
         
     Raises:
         HTTPException: If token is invalid or expired
     """
+    claims = await verify_bearer_token(credentials.credentials)
+    email_verified = claims.get("email_verified")
+    return {
+        "user_id": claims.get("sub"),
+        "sub": claims.get("sub"),
+        "email": claims.get("email"),
+        "name": claims.get("name"),
+        "email_verified": email_verified in (True, "true"),
+        "username": claims.get("username") or claims.get("cognito:username"),
+        "provider": claims.get("_provider"),
+        "token_use": claims.get("token_use"),
+    }
+
+
+async def get_current_user_profile(
+    credentials: HTTPAuthorizationCredentials = Depends(security),
+    current_user: dict = Depends(get_current_user),
+    cognito: CognitoAuthService = Depends(get_cognito_service)
+) -> dict:
+    """
+    Current user merged with the Cognito profile (GetUser)
+    
+    Only for routes that need attributes not present in the token; the
+    boto call runs in the threadpool so it does not block the event loop.
+    """
+    if current_user.get("provider") != "cognito" or current_user.get("token_use") != "access":
+        return current_user
     try:
-        access_token = credentials.credentials
-        user_info = cognito.get_user_info(access_token=access_token)
-        return user_info
+        profile = await run_in_threadpool(cognito.get_user_info, access_token=credentials.credentials)
     except HTTPException:
         raise
     except Exception as e:
@@ -47,3 +85,4 @@ async def get_current_user(
             status_code=status.HTTP_401_UNAUTHORIZED,
             detail=f"Invalid authentication credentials: {str(e)}"
         )
+    return {**current_user, **{k: v for k, v in profile.items() if v is not None}}
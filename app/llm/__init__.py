@@ -5,5 +5,6 @@ OpenAI with cost optimization
 
 from .openai_manager import OpenAIManager, llm_manager
 from .cost_tracker import CostTracker, cost_tracker
+from .router import LLMRouter, LLMProvider
 
-__all__ = ['OpenAIManager', 'llm_manager', 'CostTracker', 'cost_tracker']
+__all__ = ['OpenAIManager', 'llm_manager', 'CostTracker', 'cost_tracker', 'LLMRouter', 'LLMProvider']
@@ -1,14 +1,27 @@
 """
 Cost Tracker for OpenAI API Usage
 Monitors spending and prevents budget overruns
+
+Today's spend is accounted in memory (seeded from the database once per
+UTC day), so budget checks never touch SQLite. Request rows are buffered
+and written in batches.
 """
 
+import asyncio
+import atexit
 import sqlite3
-from typing import Dict, Any
+import threading
+import time
+from typing import Dict, Any, List, Tuple
 from datetime import datetime, timedelta
 from pathlib import Path
 
 
+# Flush buffered rows when this many are pending or the oldest is this old
+FLUSH_BATCH_SIZE = 20
+FLUSH_INTERVAL_SECONDS = 30.0
+
+
 class CostTracker:
     """
     Track OpenAI API usage and costs.
@@ -26,6 +39,12 @@ class CostTracker:
         self.db_path = Path(db_path)
         self.db_path.parent.mkdir(parents=True, exist_ok=True)
         self._init_db()
+
+        self._lock = threading.Lock()
+        self._pending: List[Tuple[str, int, int, float, str]] = []
+        self._last_flush = time.monotonic()
+        self._spend_day = None
+        self._spend_today = 0.0
     
     def _init_db(self):
         """Initialize cost tracking database"""
@@ -79,6 +98,75 @@ class CostTracker:
         
         return cost_input + cost_output
     
+    def _record(self, model: str, tokens_input: int, tokens_output: int) -> Tuple[float, bool]:
+        """Add a request to today's spend and the write buffer.
+
+        Returns the cost and whether the buffer is due for a flush.
+        """
+        cost = self.calculate_cost(model, tokens_input, tokens_output)
+        now = datetime.utcnow()
+
+        with self._lock:
+            self._roll_day(now.date())
+            self._spend_today += cost
+            self._pending.append((model, tokens_input, tokens_output, cost, now.strftime('%Y-%m-%d %H:%M:%S')))
+            due = (
+                len(self._pending) >= FLUSH_BATCH_SIZE
+                or time.monotonic() - self._last_flush >= FLUSH_INTERVAL_SECONDS
+            )
+
+        return cost, due
+
+    def _roll_day(self, today) -> None:
+        """Reset the in-memory total on a new UTC day (caller holds the lock)."""
+        if self._spend_day == today:
+            return
+
+        conn = sqlite3.connect(self.db_path)
+        try:
+            cursor = conn.cursor()
+            cursor.execute("""
+                SELECT COALESCE(SUM(cost_usd), 0) FROM llm_requests
+                WHERE DATE(created_at) = ?
+            """, (today,))
+            persisted = float(cursor.fetchone()[0])
+        finally:
+            conn.close()
+
+        pending = sum(row[3] for row in self._pending if row[4][:10] == today.isoformat())
+        self._spend_day = today
+        self._spend_today = persisted + pending
+
+    def flush(self) -> int:
+        """Write buffered request rows in one transaction."""
+        with self._lock:
+            rows, self._pending = self._pending, []
+            self._last_flush = time.monotonic()
+
+        if not rows:
+            return 0
+
+        try:
+            conn = sqlite3.connect(self.db_path)
+            try:
+                conn.executemany("""
+                    INSERT INTO llm_requests (model, tokens_input, tokens_output, cost_usd, created_at)
+                    VALUES (?, ?, ?, ?, ?)
+                """, rows)
+                conn.commit()
+            finally:
+                conn.close()
+        except Exception as e:
+            print(f"  ⚠️  LLM cost flush failed ({len(rows)} rows kept): {e}")
+            with self._lock:
+                self._pending = rows + self._pending
+            return 0
+
+        return len(rows)
+
+    async def flush_async(self) -> int:
+        return await asyncio.to_thread(self.flush)
+
     async def log_request(
         self,
         model: str,
@@ -86,18 +174,9 @@ class CostTracker:
         tokens_output: int
     ):
         """Log API request and cost (async)"""
-        cost = self.calculate_cost(model, tokens_input, tokens_output)
-        
-        conn = sqlite3.connect(self.db_path)
-        cursor = conn.cursor()
-        
-        cursor.execute("""
-            INSERT INTO llm_requests (model, tokens_input, tokens_output, cost_usd)
-            VALUES (?, ?, ?, ?)
-        """, (model, tokens_input, tokens_output, cost))
-        
-        conn.commit()
-        conn.close()
+        cost, due = self._record(model, tokens_input, tokens_output)
+        if due:
+            await self.flush_async()
         
         print(f"  💵 Cost: ${cost:.4f} ({tokens_input}+{tokens_output} tokens)")
     
@@ -108,38 +187,22 @@ class CostTracker:
         tokens_output: int
     ):
         """Log API request and cost (sync)"""
-        cost = self.calculate_cost(model, tokens_input, tokens_output)
-        
-        conn = sqlite3.connect(self.db_path)
-        cursor = conn.cursor()
-        
-        cursor.execute("""
-            INSERT INTO llm_requests (model, tokens_input, tokens_output, cost_usd)
-            VALUES (?, ?, ?, ?)
-        """, (model, tokens_input, tokens_output, cost))
-        
-        conn.commit()
-        conn.close()
+        _, due = self._record(model, tokens_input, tokens_output)
+        if due:
+            self.flush()
     
     async def get_daily_spend(self) -> float:
-        """Get total spend for today"""
-        conn = sqlite3.connect(self.db_path)
-        cursor = conn.cursor()
-        
+        """Get total spend for today (in-memory, includes unflushed requests)"""
         today = datetime.utcnow().date()
-        
-        cursor.execute("""
-            SELECT COALESCE(SUM(cost_usd), 0) FROM llm_requests
-            WHERE DATE(created_at) = ?
-        """, (today,))
-        
-        total = cursor.fetchone()[0]
-        conn.close()
-        
-        return float(total)
+        with self._lock:
+            if self._spend_day != today:
+                self._roll_day(today)
+            return self._spend_today
     
     async def get_usage_stats(self, days: int = 7) -> Dict[str, Any]:
         """Get usage statistics for past N days"""
+        await self.flush_async()
+
         conn = sqlite3.connect(self.db_path)
         conn.row_factory = sqlite3.Row
         cursor = conn.cursor()
@@ -261,6 +324,8 @@ class CostTracker:
     
     def cleanup_old_records(self, days: int = 90):
         """Remove records older than N days"""
+        self.flush()
+
         conn = sqlite3.connect(self.db_path)
         cursor = conn.cursor()
         
@@ -280,3 +345,4 @@ class CostTracker:
 
 # Global cost tracker instance
 cost_tracker = CostTracker()
+atexit.register(cost_tracker.flush)
@@ -8,8 +8,10 @@ from typing import Dict, List, Any, Optional
 import hashlib
 import json
 from datetime import datetime, timedelta
-from openai import OpenAI, AsyncOpenAI
 from .cost_tracker import cost_tracker
+from .router import LLMProvider, LLMRouter
+from ..core.lazy import LazySingleton
+from ..core.tracing import span
 
 
 class OpenAIManager:
@@ -38,12 +40,14 @@ class OpenAIManager:
             self.async_client = None
         else:
             print(f"[OK] OpenAI API key loaded (first 20 chars): {self.api_key[:20]}...")
+            # Imported here: the SDK takes ~0.7s to import and is unused without a key
+            from openai import OpenAI, AsyncOpenAI
             self.client = OpenAI(api_key=self.api_key)
             self.async_client = AsyncOpenAI(api_key=self.api_key)
         
         # Optional SambaNova fallback (OpenAI-compatible API)
         # Uses separate credentials so we never mix provider keys.
-        self.sambanova_async_client: Optional[AsyncOpenAI] = None
+        self.sambanova_async_client: Optional["AsyncOpenAI"] = None
         self.sambanova_model: str = os.getenv("SAMBANOVA_MODEL", "Meta-Llama-3.1-70B-Instruct")
 
         sambanova_key = os.getenv("SAMBANOVA_API_KEY")
@@ -51,6 +55,7 @@ class OpenAIManager:
 
         if sambanova_key and sambanova_base:
             try:
+                from openai import AsyncOpenAI
                 self.sambanova_async_client = AsyncOpenAI(
                     api_key=sambanova_key,
                     base_url=sambanova_base,
@@ -59,6 +64,14 @@ class OpenAIManager:
             except Exception as e:
                 print(f"[WARN] Failed to initialize SambaNova client: {e}")
                 self.sambanova_async_client = None
+
+        # Request router: OpenAI primary, SambaNova as fallback/hedge
+        providers = []
+        if self.async_client:
+            providers.append(LLMProvider(name='openai', client=self.async_client))
+        if self.sambanova_async_client:
+            providers.append(LLMProvider(name='sambanova', client=self.sambanova_async_client, model=self.sambanova_model))
+        self.router = LLMRouter(providers)
         
         # Response cache (in-memory)
         self.cache: Dict[str, tuple[datetime, Any]] = {}
@@ -139,6 +152,7 @@ class OpenAIManager:
         max_tokens: int = 500,
         temperature: float = 0.3,
         use_cache: bool = True,
+        purpose: str = 'default',
         **kwargs
     ) -> Dict[str, Any]:
         """
@@ -151,6 +165,8 @@ class OpenAIManager:
             max_tokens: Maximum response tokens
             temperature: Randomness (lower = more focused)
             use_cache: Whether to use response cache
+            purpose: Router purpose ('chat', 'insights', 'sentiment') for
+                concurrency limits, hedging and latency stats
             **kwargs: Additional OpenAI parameters
             
         Returns:
@@ -184,97 +200,43 @@ class OpenAIManager:
             temperature=temperature
         )
         
-        # Check cache
-        if use_cache:
-            cached = self._get_cached_response(cache_key)
-            if cached:
-                return cached
-        
-        try:
-            # Make API call
-            response = await self.async_client.chat.completions.create(
-                model=model,
-                messages=messages,
-                max_tokens=max_tokens,
-                temperature=temperature,
-                **kwargs
-            )
-            
-            # Extract response
-            content = response.choices[0].message.content
-            usage = response.usage
-            
-            # Track cost
-            await cost_tracker.log_request(
-                model=model,
-                tokens_input=usage.prompt_tokens,
-                tokens_output=usage.completion_tokens
-            )
-            
-            result = {
-                'content': content,
-                'model': model,
-                'usage': {
-                    'prompt_tokens': usage.prompt_tokens,
-                    'completion_tokens': usage.completion_tokens,
-                    'total_tokens': usage.total_tokens
-                },
-                'finish_reason': response.choices[0].finish_reason
-            }
-            
-            # Cache response
+        with span("llm", purpose, model=model) as s:
+            # Check cache
             if use_cache:
-                self._cache_response(cache_key, result)
-            
-            print(f"[LLM] chat_completion success model={model} total_tokens={usage.total_tokens}")
-            return result
+                cached = self._get_cached_response(cache_key)
+                s.set("cache_hit", bool(cached))
+                if cached:
+                    return cached
             
-        except Exception as e:
-            print(f"[LLM] ✗ OpenAI API error: {e}")
-            # Try SambaNova fallback if configured
-            if self.sambanova_async_client:
-                try:
-                    print("[LLM] ↪ Falling back to SambaNova chat completion...")
-                    response = await self.sambanova_async_client.chat.completions.create(
-                        model=self.sambanova_model,
-                        messages=messages,
-                        max_tokens=max_tokens,
-                        temperature=temperature,
-                        **kwargs
-                    )
-
-                    content = response.choices[0].message.content
-                    usage = getattr(response, 'usage', None)
-                    prompt_tokens = getattr(usage, 'prompt_tokens', 0) if usage else 0
-                    completion_tokens = getattr(usage, 'completion_tokens', 0) if usage else 0
-                    total_tokens = getattr(usage, 'total_tokens', prompt_tokens + completion_tokens) if usage else 0
+            try:
+                result = await self.router.dispatch(
+                    messages,
+                    model,
+                    purpose=purpose,
+                    max_tokens=max_tokens,
+                    temperature=temperature,
+                    **kwargs
+                )
+            except Exception as e:
+                print(f"[LLM] ✗ chat_completion failed purpose={purpose}: {e}")
+                raise
 
-                    # Track cost generically under a SambaNova label
-                    await cost_tracker.log_request(
-                        model=f"sambanova:{self.sambanova_model}",
-                        tokens_input=prompt_tokens,
-                        tokens_output=completion_tokens,
-                    )
+            usage = result['usage']
+            s.set("tokens", usage['total_tokens'])
 
-                    result = {
-                        'content': content,
-                        'model': f"sambanova:{self.sambanova_model}",
-                        'usage': {
-                            'prompt_tokens': prompt_tokens,
-                            'completion_tokens': completion_tokens,
-                            'total_tokens': total_tokens,
-                        },
-                        'finish_reason': response.choices[0].finish_reason,
-                    }
+        # Track cost (fallback/hedge responses are logged under the provider label)
+        await cost_tracker.log_request(
+            model=result['model'],
+            tokens_input=usage['prompt_tokens'],
+            tokens_output=usage['completion_tokens']
+        )
 
-                    if use_cache:
-                        self._cache_response(cache_key, result)
+        # Cache response
+        if use_cache:
+            self._cache_response(cache_key, result)
 
-                    print("[LLM] SambaNova fallback success")
-                    return result
-                except Exception as se:
-                    print(f"[LLM] ✗ SambaNova API error: {se}")
-            raise
+        print(f"[LLM] chat_completion success model={result['model']} total_tokens={usage['total_tokens']}")
+        return result
     
     def chat_completion_sync(
         self,
@@ -409,7 +371,8 @@ class OpenAIManager:
             'total_cached': len(self.cache),
             'valid_cached': valid_items,
             'cache_ttl_seconds': self.cache_ttl,
-            'daily_budget_usd': self.daily_budget
+            'daily_budget_usd': self.daily_budget,
+            'router': self.router.get_stats()
         }
     
     def clear_cache(self):
@@ -418,5 +381,5 @@ class OpenAIManager:
         print("✓ LLM cache cleared")
 
 
-# Global LLM manager instance
-llm_manager = OpenAIManager()
+# Global LLM manager instance (built on first use)
+llm_manager = LazySingleton("llm_manager", OpenAIManager)
@@ -0,0 +1,318 @@
+"""
+LLM Request Router
+Dispatches chat completions to OpenAI-compatible providers with:
+1. Global and per-purpose concurrency limits
+2. Hedged requests to the secondary provider when the primary is slow
+3. A circuit breaker per provider
+4. Per-purpose latency and token histograms
+
+Configuration (environment):
+- LLM_MAX_CONCURRENCY: global in-flight request cap (default 8)
+- LLM_CONCURRENCY_<PURPOSE>: per-purpose cap, e.g. LLM_CONCURRENCY_CHAT
+- LLM_HEDGE_PERCENTILE: primary latency percentile that triggers a hedge (default 0.95)
+- LLM_HEDGE_DEFAULT_SECONDS: hedge delay before enough samples exist (default 8)
+"""
+
+import asyncio
+import os
+import time
+from bisect import bisect_left
+from collections import deque
+from dataclasses import dataclass, field
+from typing import Any, Deque, Dict, List, Optional, Tuple
+
+
+# Purposes with their own concurrency limit; anything else shares 'default'
+PURPOSE_LIMITS = {
+    'insights': 4,
+    'chat': 4,
+    'sentiment': 2,
+    'default': 4,
+}
+
+LATENCY_BUCKETS_MS = (250, 500, 1000, 2000, 4000, 8000, 16000, 32000)
+TOKEN_BUCKETS = (100, 250, 500, 1000, 2000, 4000, 8000)
+
+# Hedging needs this many primary samples before trusting the percentile
+HEDGE_MIN_SAMPLES = 20
+HEDGE_WINDOW = 200
+HEDGE_MIN_SECONDS = 1.0
+HEDGE_MAX_SECONDS = 30.0
+
+BREAKER_FAILURE_THRESHOLD = 5
+BREAKER_COOLDOWN_SECONDS = 30.0
+
+
+def _env_float(name: str, default: float) -> float:
+    try:
+        return float(os.getenv(name, default))
+    except ValueError:
+        return default
+
+
+class Histogram:
+    """Fixed-bucket histogram (upper bounds, last bucket is +Inf)."""
+
+    def __init__(self, buckets: Tuple[float, ...]):
+        self.buckets = buckets
+        self.counts = [0] * (len(buckets) + 1)
+        self.total = 0.0
+        self.count = 0
+
+    def observe(self, value: float) -> None:
+        self.counts[bisect_left(self.buckets, value)] += 1
+        self.total += value
+        self.count += 1
+
+    def snapshot(self) -> Dict[str, Any]:
+        labels = [f"le_{b:g}" for b in self.buckets] + ['le_inf']
+        return {
+            'count': self.count,
+            'sum': round(self.total, 2),
+            'mean': round(self.total / self.count, 2) if self.count else 0.0,
+            'buckets': dict(zip(labels, self.counts)),
+        }
+
+
+class CircuitBreaker:
+    """Opens after consecutive failures; allows one trial call after cooldown."""
+
+    def __init__(self, threshold: int = BREAKER_FAILURE_THRESHOLD, cooldown: float = BREAKER_COOLDOWN_SECONDS):
+        self.threshold = threshold
+        self.cooldown = cooldown
+        self.failures = 0
+        self.opened_at: Optional[float] = None
+        self._trial_in_flight = False
+
+    @property
+    def state(self) -> str:
+        if self.opened_at is None:
+            return 'closed'
+        if time.monotonic() - self.opened_at >= self.cooldown:
+            return 'half_open'
+        return 'open'
+
+    def allow(self) -> bool:
+        state = self.state
+        if state == 'closed':
+            return True
+        if state == 'half_open' and not self._trial_in_flight:
+            self._trial_in_flight = True
+            return True
+        return False
+
+    def record_success(self) -> None:
+        self.failures = 0
+        self.opened_at = None
+        self._trial_in_flight = False
+
+    def record_failure(self) -> None:
+        self.failures += 1
+        self._trial_in_flight = False
+        if self.failures >= self.threshold or self.opened_at is not None:
+            self.opened_at = time.monotonic()
+
+
+@dataclass
+class LLMProvider:
+    """An OpenAI-compatible endpoint (AsyncOpenAI client)."""
+
+    name: str
+    client: Any
+    # Fixed model for providers that do not serve OpenAI model names
+    model: Optional[str] = None
+    breaker: CircuitBreaker = field(default_factory=CircuitBreaker)
+
+    def model_label(self, requested: str) -> str:
+        return f"{self.name}:{self.model}" if self.model else requested
+
+
+class LLMRouter:
+    """Routes chat completions across a primary and a secondary provider."""
+
+    def __init__(self, providers: List[LLMProvider]):
+        self.providers = providers
+        self.max_concurrency = int(_env_float('LLM_MAX_CONCURRENCY', 8))
+        self.hedge_percentile = _env_float('LLM_HEDGE_PERCENTILE', 0.95)
+        self.hedge_default_seconds = _env_float('LLM_HEDGE_DEFAULT_SECONDS', 8.0)
+
+        self._global = asyncio.Semaphore(self.max_concurrency)
+        self._purpose_limits = {
+            purpose: int(_env_float(f"LLM_CONCURRENCY_{purpose.upper()}", limit))
+            for purpose, limit in PURPOSE_LIMITS.items()
+        }
+        self._purpose_sems = {p: asyncio.Semaphore(n) for p, n in self._purpose_limits.items()}
+
+        # (provider, purpose) -> recent successful latencies in seconds
+        self._recent: Dict[Tuple[str, str], Deque[float]] = {}
+        self._latency: Dict[str, Histogram] = {}
+        self._tokens: Dict[str, Histogram] = {}
+        self.stats: Dict[str, int] = {'requests': 0, 'hedged': 0, 'hedge_wins': 0, 'fallbacks': 0, 'failures': 0}
+        self.in_flight = 0
+        self.peak_in_flight = 0
+
+    @property
+    def primary(self) -> Optional[LLMProvider]:
+        return self.providers[0] if self.providers else None
+
+    @property
+    def secondary(self) -> Optional[LLMProvider]:
+        return self.providers[1] if len(self.providers) > 1 else None
+
+    def _purpose(self, purpose: Optional[str]) -> str:
+        return purpose if purpose in self._purpose_sems else 'default'
+
+    def hedge_delay(self, purpose: str) -> float:
+        """Seconds to wait on the primary before sending a hedge."""
+        if self.primary is None:
+            return self.hedge_default_seconds
+        samples = self._recent.get((self.primary.name, purpose))
+        if not samples or len(samples) < HEDGE_MIN_SAMPLES:
+            return self.hedge_default_seconds
+        ordered = sorted(samples)
+        value = ordered[min(len(ordered) - 1, int(self.hedge_percentile * len(ordered)))]
+        return min(max(value, HEDGE_MIN_SECONDS), HEDGE_MAX_SECONDS)
+
+    def _observe(self, provider: LLMProvider, purpose: str, seconds: float, total_tokens: int) -> None:
+        key = (provider.name, purpose)
+        if key not in self._recent:
+            self._recent[key] = deque(maxlen=HEDGE_WINDOW)
+        self._recent[key].append(seconds)
+        self._latency.setdefault(purpose, Histogram(LATENCY_BUCKETS_MS)).observe(seconds * 1000.0)
+        self._tokens.setdefault(purpose, Histogram(TOKEN_BUCKETS)).observe(total_tokens)
+
+    async def _call(
+        self,
+        provider: LLMProvider,
+        purpose: str,
+        model: str,
+        messages: List[Dict[str, str]],
+        **params: Any,
+    ) -> Dict[str, Any]:
+        started = time.perf_counter()
+        try:
+            response = await provider.client.chat.completions.create(
+                model=provider.model or model,
+                messages=messages,
+                **params,
+            )
+        except asyncio.CancelledError:
+            # Lost a hedge race: not a provider failure
+            provider.breaker._trial_in_flight = False
+            raise
+        except Exception:
+            provider.breaker.record_failure()
+            raise
+
+        provider.breaker.record_success()
+        usage = getattr(response, 'usage', None)
+        prompt_tokens = getattr(usage, 'prompt_tokens', 0) if usage else 0
+        completion_tokens = getattr(usage, 'completion_tokens', 0) if usage else 0
+        total_tokens = getattr(usage, 'total_tokens', prompt_tokens + completion_tokens) if usage else 0
+        self._observe(provider, purpose, time.perf_counter() - started, total_tokens or 0)
+
+        choice = response.choices[0]
+        return {
+            'content': choice.message.content,
+            'model': provider.model_label(model),
+            'provider': provider.name,
+            'usage': {
+                'prompt_tokens': prompt_tokens or 0,
+                'completion_tokens': completion_tokens or 0,
+                'total_tokens': total_tokens or 0,
+            },
+            'finish_reason': choice.finish_reason,
+        }
+
+    async def dispatch(
+        self,
+        messages: List[Dict[str, str]],
+        model: str,
+        purpose: str = 'default',
+        **params: Any,
+    ) -> Dict[str, Any]:
+        """Run one chat completion under the concurrency limits.
+
+        The primary provider is tried first. If it has not answered within
+        ``hedge_delay(purpose)`` a hedge is sent to the secondary and the
+        first success wins; if it fails outright the secondary is used as a
+        plain fallback. Providers with an open circuit are skipped.
+        """
+        purpose = self._purpose(purpose)
+        self.stats['requests'] += 1
+        async with self._global, self._purpose_sems[purpose]:
+            self.in_flight += 1
+            self.peak_in_flight = max(self.peak_in_flight, self.in_flight)
+            try:
+                return await self._dispatch(messages, model, purpose, **params)
+            finally:
+                self.in_flight -= 1
+
+    async def _dispatch(self, messages, model, purpose, **params) -> Dict[str, Any]:
+        primary, secondary = self.primary, self.secondary
+        if primary is None:
+            raise RuntimeError("No LLM provider configured")
+
+        use_secondary = secondary is not None and secondary.breaker.allow()
+        if not primary.breaker.allow():
+            if not use_secondary:
+                self.stats['failures'] += 1
+                raise RuntimeError(f"LLM provider {primary.name} circuit open and no fallback available")
+            self.stats['fallbacks'] += 1
+            return await self._call(secondary, purpose, model, messages, **params)
+
+        primary_task = asyncio.ensure_future(self._call(primary, purpose, model, messages, **params))
+        if not use_secondary:
+            try:
+                return await primary_task
+            except Exception:
+                self.stats['failures'] += 1
+                raise
+
+        done, _ = await asyncio.wait({primary_task}, timeout=self.hedge_delay(purpose))
+        if primary_task in done:
+            if not primary_task.exception():
+                # Secondary was reserved by allow() but not used
+                secondary.breaker._trial_in_flight = False
+                return primary_task.result()
+            print(f"[LLM] ✗ {primary.name} error: {primary_task.exception()}; falling back to {secondary.name}")
+            self.stats['fallbacks'] += 1
+            try:
+                return await self._call(secondary, purpose, model, messages, **params)
+            except Exception:
+                self.stats['failures'] += 1
+                raise
+
+        # Primary is slow: hedge
+        self.stats['hedged'] += 1
+        hedge_task = asyncio.ensure_future(self._call(secondary, purpose, model, messages, **params))
+        pending = {primary_task, hedge_task}
+        errors: List[BaseException] = []
+        try:
+            while pending:
+                done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+                for task in done:
+                    if task.exception() is None:
+                        if task is hedge_task:
+                            self.stats['hedge_wins'] += 1
+                        return task.result()
+                    errors.append(task.exception())
+        finally:
+            for task in pending:
+                task.cancel()
+
+        self.stats['failures'] += 1
+        raise errors[-1]
+
+    def get_stats(self) -> Dict[str, Any]:
+        return {
+            **self.stats,
+            'in_flight': self.in_flight,
+            'peak_in_flight': self.peak_in_flight,
+            'max_concurrency': self.max_concurrency,
+            'purpose_limits': dict(self._purpose_limits),
+            'hedge_delay_seconds': {p: round(self.hedge_delay(p), 3) for p in self._purpose_sems},
+            'breakers': {p.name: p.breaker.state for p in self.providers},
+            'latency_ms': {p: h.snapshot() for p, h in self._latency.items()},
+            'tokens': {p: h.snapshot() for p, h in self._tokens.items()},
+        }
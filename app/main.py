@@ -1,3 +1,7 @@
+# Time every module imported below; see /health/startup
+from .core.lazy import import_timer, get_startup_report
+import_timer.install()
+
 # Load environment variables with override to ensure .env file takes precedence over system env vars
 from dotenv import load_dotenv
 import os
@@ -7,6 +11,7 @@ load_dotenv(dotenv_path=os.path.join(os.path.dirname(__file__), '../.env'), over
 
 from fastapi import FastAPI, Request, Depends
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import Response
 from fastapi.security import HTTPBearer, HTTPAuthorizationCredentials
 from contextlib import asynccontextmanager
 from .routers import market, agents, strategy, memory, news, chat, chart, zerodha_auth, zerodha_data, notifications, cache, websocket, performance, analytics, scalping, watchlist, auth
@@ -20,11 +25,15 @@ from .services.top_picks_scheduler import start_top_picks_scheduler, stop_top_pi
 from .services.scalping_monitor_scheduler import start_scalping_monitor, stop_scalping_monitor
 from .services.dashboard_scheduler import start_dashboard_scheduler, stop_dashboard_scheduler
 from .services.portfolio_monitor_scheduler import start_portfolio_monitor, stop_portfolio_monitor
+from .services.order_updates import start_order_updates, stop_order_updates
+from .services.live_candles import start_live_candles, stop_live_candles
 from .services.top_picks_positions_monitor_scheduler import (
     start_top_picks_positions_monitor,
     stop_top_picks_positions_monitor,
 )
 from .services.rl_scheduler import start_rl_scheduler, stop_rl_scheduler
+from .agents.compute_pool import agent_compute_pool
+from .utils.json_encoder import FastJSONResponse
 from .core.branding import (
     APP_NAME,
     APP_OWNER,
@@ -36,6 +45,18 @@ from .core.branding import (
     get_branding_meta,
 )
 from .security import get_token_payload
+from .core.metrics import CONTENT_TYPE as METRICS_CONTENT_TYPE, metrics
+from .core.tracing import tracer
+
+import_timer.uninstall()
+
+def _log_compute_pool_warmup(task: asyncio.Task) -> None:
+    """Done-callback for the agent compute pool warmup task."""
+    if task.cancelled():
+        return
+    if task.exception() is not None:
+        logging.getLogger(__name__).warning("Failed to warm agent compute pool: %s", task.exception())
+
 
 @asynccontextmanager
 async def lifespan(app: FastAPI):
@@ -51,6 +72,13 @@ async def lifespan(app: FastAPI):
         short_signature(),
         ENV_FINGERPRINT,
     )
+    startup = get_startup_report(top=5)
+    logging.getLogger(__name__).info(
+        "Imports took %.0fms (%d modules); slowest: %s",
+        startup["imports"]["total_ms"],
+        startup["imports"]["modules_imported"],
+        ", ".join(f"{p['package']} {p['ms']:.0f}ms" for p in startup["imports"]["by_package"]),
+    )
     # TEMPORARILY DISABLED - Schedulers commented out for deployment testing
     await start_token_monitoring()
     await start_index_universe_monitoring()
@@ -62,8 +90,16 @@ async def lifespan(app: FastAPI):
     await start_scalping_monitor()  # Start scalping auto-monitor (every 5 mins)
     await start_dashboard_scheduler()  # Start dashboard/overview worker
     await start_portfolio_monitor()  # Start portfolio monitor worker
+    await start_order_updates()  # Stream + reconcile broker order state
+    await start_live_candles()  # Build intraday candles from ticks
     await start_top_picks_positions_monitor()  # Start Top Picks positions monitor
     await start_rl_scheduler()  # Start nightly RL scheduler (16:30 IST, Mon-Fri)
+    try:
+        # Keep a reference so the task is not garbage-collected mid-warmup
+        app.state.compute_pool_warmup = asyncio.create_task(agent_compute_pool.warmup())  # Spawn agent compute workers
+        app.state.compute_pool_warmup.add_done_callback(_log_compute_pool_warmup)
+    except Exception as e:
+        logging.getLogger(__name__).warning("Failed to warm agent compute pool: %s", e)
     
     # Start WebSocket service if Zerodha is authenticated
     try:
@@ -85,8 +121,28 @@ async def lifespan(app: FastAPI):
     stop_scalping_monitor()  # Stop scalping monitor
     stop_dashboard_scheduler()  # Stop dashboard worker
     stop_portfolio_monitor()  # Stop portfolio monitor worker
+    stop_order_updates()  # Stop order update flushing/reconcile
+    stop_live_candles()  # Stop bar-close sweep
     stop_top_picks_positions_monitor()  # Stop Top Picks positions monitor
     stop_rl_scheduler()  # Stop nightly RL scheduler
+    agent_compute_pool.shutdown()  # Stop agent compute workers
+
+    # Close async DB engines (aiosqlite connections run on non-daemon threads)
+    try:
+        from .db import AsyncSessionLocal
+        from .config import database as database_config
+        await AsyncSessionLocal.dispose()
+        if database_config._db_config is not None:
+            await database_config._db_config.AsyncSessionLocal.dispose()
+    except Exception as e:
+        print(f"[WARN] Async DB dispose failed: {e}")
+
+    # Persist buffered LLM cost rows
+    try:
+        from .llm.cost_tracker import cost_tracker
+        cost_tracker.flush()
+    except Exception as e:
+        print(f"[WARN] LLM cost flush failed: {e}")
     
     # Stop WebSocket service
     try:
@@ -100,6 +156,7 @@ app = FastAPI(
     title=f"{APP_NAME} API",
     version="0.1.0",
     lifespan=lifespan,
+    default_response_class=FastJSONResponse,
     security=[{"BearerAuth": []}],
     components={
         "securitySchemes": {
@@ -146,6 +203,24 @@ def health():
     return {"ok": True}
 
 
+@app.get("/health/startup")
+def health_startup(top: int = 20):
+    """Import time per module/package and every lazy singleton built so far."""
+    return get_startup_report(top=top)
+
+
+@app.get("/health/slow-runs")
+def health_slow_runs(limit: int = 10, slow_only: bool = False):
+    """Recent sampled/slow pipeline runs with their top contributors; see core/tracing.py."""
+    return tracer.get_slow_runs(limit=limit, slow_only=slow_only)
+
+
+@app.get("/metrics", include_in_schema=False)
+def prometheus_metrics():
+    """Pipeline stage histograms and counters in the Prometheus text format."""
+    return Response(content=metrics.render(), media_type=METRICS_CONTENT_TYPE)
+
+
 @app.get("/meta/branding")
 def branding_meta():
     """Lightweight endpoint exposing non-sensitive branding metadata.
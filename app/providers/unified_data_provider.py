@@ -3,19 +3,57 @@ Unified Data Provider
 Uses Zerodha for real-time data with Yahoo Finance as fallback
 """
 
+import asyncio
 import logging
-from typing import Dict, List, Optional, Any
+import time
+from typing import Callable, Dict, List, Optional, Any, Tuple
 from datetime import datetime, timedelta, timezone
 import httpx
-import yfinance as yf
 import pandas as pd
 
 from .zerodha_provider import get_zerodha_provider
+from ..services.instrument_master import get_instrument_master
 from ..services.historical_cache import get_historical_cache
 from ..core.market_hours import now_ist, now_utc, to_iso_utc
 
 logger = logging.getLogger(__name__)
 
+# Batched quotes: instruments per upstream request. Kite `quote` accepts up
+# to 500 instruments per call; Yahoo batch downloads get slow and flaky
+# well before that.
+KITE_QUOTE_BATCH_SIZE = 250
+YAHOO_QUOTE_BATCH_SIZE = 50
+
+# Seconds a batched quote stays fresh in the in-process cache
+QUOTE_CACHE_TTL = 5.0
+
+QUOTE_COLUMNS = ['price', 'open', 'high', 'low', 'close', 'volume', 'change_percent', 'timestamp', 'source']
+
+
+def _chunked(items: List[str], size: int) -> List[List[str]]:
+    return [items[i:i + size] for i in range(0, len(items), size)]
+
+
+def _looks_like_nfo_symbol(sym: Any) -> bool:
+    # Instrument master knows the real exchange; unknown symbols fall back
+    # to the tradingsymbol heuristic inside exchange_for().
+    return get_instrument_master().exchange_for(sym) == "NFO"
+
+
+def _empty_quote(ts: str) -> Dict[str, Any]:
+    return {
+        "price": 0,
+        "open": 0,
+        "high": 0,
+        "low": 0,
+        "close": 0,
+        "volume": 0,
+        "oi": 0,
+        "change_percent": 0,
+        "timestamp": ts,
+    }
+
+
 class UnifiedDataProvider:
     """
     Unified data provider that uses Zerodha first, then falls back to Yahoo Finance
@@ -28,6 +66,8 @@ class UnifiedDataProvider:
         # Zerodha dynamically at runtime once authentication is available.
         self.use_zerodha = self.zerodha.is_authenticated()
         self.cache = get_historical_cache()
+        # symbol -> (monotonic fetch time, quote) for get_quote_async/get_quote_table
+        self._quote_cache: Dict[str, Tuple[float, Dict[str, Any]]] = {}
         
         # Re-check Zerodha authentication at call time so that if the
         # access token is set AFTER this provider is constructed, we
@@ -57,19 +97,6 @@ class UnifiedDataProvider:
         except Exception:
             pass
 
-        def _looks_like_nfo_symbol(sym: Any) -> bool:
-            try:
-                s = str(sym or "").upper().strip()
-            except Exception:
-                return False
-            if not s:
-                return False
-            if not any(c.isdigit() for c in s):
-                return False
-            if s.endswith("CE") or s.endswith("PE") or s.endswith("FUT"):
-                return True
-            return False
-
         nfo_symbols: List[str] = []
         nse_symbols: List[str] = []
         for sym in symbols or []:
@@ -120,61 +147,199 @@ class UnifiedDataProvider:
         if nfo_symbols:
             ts = to_iso_utc(now_utc())
             for sym in nfo_symbols:
-                out.setdefault(
-                    sym,
-                    {
-                        "price": 0,
-                        "open": 0,
-                        "high": 0,
-                        "low": 0,
-                        "close": 0,
-                        "volume": 0,
-                        "oi": 0,
-                        "change_percent": 0,
-                        "timestamp": ts,
-                    },
-                )
+                out.setdefault(sym, _empty_quote(ts))
 
         return out
     
     def _get_quote_yahoo(self, symbols: List[str]) -> Dict[str, Any]:
-        """Get quotes from Yahoo Finance"""
+        """Get quotes from Yahoo Finance (one batch download per chunk)"""
         result = {}
-        
-        for symbol in symbols:
+        for chunk in _chunked(list(symbols), YAHOO_QUOTE_BATCH_SIZE):
+            result.update(self._get_quote_yahoo_chunk(chunk))
+        return result
+
+    @staticmethod
+    def _yahoo_symbol(symbol: str) -> str:
+        # Add .NS suffix for Indian stocks
+        return f"{symbol}.NS" if not symbol.endswith(('.NS', '.BO')) else symbol
+
+    def _download_yahoo_daily(self, symbols: List[str]) -> Dict[str, pd.DataFrame]:
+        """Download recent daily bars for many symbols in one Yahoo request.
+
+        Returns symbol -> DataFrame (Open/High/Low/Close/Volume) for symbols
+        that had data.
+        """
+        import yfinance as yf
+
+        tickers = {self._yahoo_symbol(s): s for s in symbols}
+        data = yf.download(
+            tickers=list(tickers),
+            period='5d',
+            interval='1d',
+            group_by='ticker',
+            auto_adjust=False,
+            threads=False,
+            progress=False,
+        )
+        if data is None or data.empty:
+            return {}
+
+        frames: Dict[str, pd.DataFrame] = {}
+        for yahoo_symbol, symbol in tickers.items():
             try:
-                # Add .NS suffix for Indian stocks
-                yahoo_symbol = f"{symbol}.NS" if not symbol.endswith(('.NS', '.BO')) else symbol
-                ticker = yf.Ticker(yahoo_symbol)
-                info = ticker.info
-                hist = ticker.history(period='1d')
-                
-                if not hist.empty:
-                    result[symbol] = {
-                        'price': hist['Close'].iloc[-1],
-                        'open': hist['Open'].iloc[-1],
-                        'high': hist['High'].iloc[-1],
-                        'low': hist['Low'].iloc[-1],
-                        'close': hist['Close'].iloc[-1],
-                        'volume': hist['Volume'].iloc[-1],
-                        'change_percent': ((hist['Close'].iloc[-1] - hist['Open'].iloc[-1]) / hist['Open'].iloc[-1]) * 100,
-                        'timestamp': to_iso_utc(now_utc())
-                    }
+                if isinstance(data.columns, pd.MultiIndex):
+                    if yahoo_symbol not in data.columns.get_level_values(0):
+                        continue
+                    frame = data[yahoo_symbol]
+                else:
+                    frame = data
+                frame = frame.dropna(subset=['Close'])
+                if not frame.empty:
+                    frames[symbol] = frame
             except Exception as e:
-                logger.error(f"Error fetching Yahoo quote for {symbol}: {e}")
+                logger.debug(f"Yahoo batch frame missing for {symbol}: {e}")
+        return frames
+
+    def _get_quote_yahoo_chunk(self, symbols: List[str]) -> Dict[str, Any]:
+        ts = to_iso_utc(now_utc())
+        try:
+            frames = self._download_yahoo_daily(symbols)
+        except Exception as e:
+            logger.error(f"Error fetching Yahoo quotes for {len(symbols)} symbols: {e}")
+            frames = {}
+
+        result: Dict[str, Any] = {}
+        for symbol in symbols:
+            hist = frames.get(symbol)
+            if hist is None:
                 # Return default values
-                result[symbol] = {
-                    'price': 0,
-                    'open': 0,
-                    'high': 0,
-                    'low': 0,
-                    'close': 0,
-                    'volume': 0,
-                    'change_percent': 0,
-                    'timestamp': to_iso_utc(now_utc())
-                }
-        
+                result[symbol] = _empty_quote(ts)
+                continue
+            latest = hist.iloc[-1]
+            price = float(latest['Close'])
+            # Like Zerodha's quote, 'close' is the previous session's close
+            prev_close = float(hist['Close'].iloc[-2]) if len(hist) > 1 else float(latest['Open'])
+            result[symbol] = {
+                'price': price,
+                'open': float(latest['Open']),
+                'high': float(latest['High']),
+                'low': float(latest['Low']),
+                'close': prev_close,
+                'volume': float(latest['Volume']),
+                'change_percent': round((price - prev_close) / prev_close * 100, 2) if prev_close else 0.0,
+                'timestamp': ts,
+            }
         return result
+
+    # ==================== Batched async quotes ====================
+
+    async def _run_rate_limited(self, source: str, fn: Callable, *args) -> Any:
+        """Run a blocking upstream call off the event loop under the shared
+        per-source rate limiter of MarketDataProvider."""
+        from ..services.market_data_provider import market_data_provider
+
+        await market_data_provider._rate_limit_wait(source)
+        return await asyncio.to_thread(fn, *args)
+
+    async def _fetch_quotes_batched(self, symbols: List[str]) -> Dict[str, Any]:
+        """Fetch quotes in multi-symbol chunks, running chunks concurrently."""
+        if not self.use_zerodha and self.zerodha.is_authenticated():
+            self.use_zerodha = True
+            logger.info("✓ UnifiedDataProvider: Zerodha authenticated at runtime, enabling Zerodha quotes")
+
+        nfo_symbols = [s for s in symbols if _looks_like_nfo_symbol(s)]
+        nse_symbols = [s for s in symbols if not _looks_like_nfo_symbol(s)]
+        out: Dict[str, Any] = {}
+
+        if self.use_zerodha:
+            jobs = [
+                (exchange, chunk)
+                for exchange, group in (("NSE", nse_symbols), ("NFO", nfo_symbols))
+                for chunk in _chunked(group, KITE_QUOTE_BATCH_SIZE)
+            ]
+            results = await asyncio.gather(
+                *[self._run_rate_limited('zerodha', self.zerodha.get_quote, chunk, exchange) for exchange, chunk in jobs],
+                return_exceptions=True,
+            )
+            for res in results:
+                if isinstance(res, Exception):
+                    error_msg = str(res)
+                    if "api_key" in error_msg or "access_token" in error_msg:
+                        logger.warning("⚠️  Zerodha authentication expired. Re-authenticate via /v1/zerodha/login-url")
+                        self.use_zerodha = False
+                    else:
+                        logger.warning(f"Zerodha batch quote failed: {res}")
+                elif isinstance(res, dict):
+                    for sym, quote in res.items():
+                        out[sym] = {**quote, 'source': 'zerodha'}
+            if out:
+                logger.info(f"✓ Zerodha: Fetched quotes for {len(out)} symbols in {len(jobs)} request(s)")
+
+        # Yahoo for whatever Zerodha did not return (it cannot quote derivatives)
+        missing = [s for s in nse_symbols if s not in out]
+        if missing:
+            chunks = _chunked(missing, YAHOO_QUOTE_BATCH_SIZE)
+            results = await asyncio.gather(
+                *[self._run_rate_limited('yahoo', self._get_quote_yahoo_chunk, chunk) for chunk in chunks],
+                return_exceptions=True,
+            )
+            for res in results:
+                if isinstance(res, Exception):
+                    logger.warning(f"Yahoo batch quote failed: {res}")
+                    continue
+                for sym, quote in res.items():
+                    out[sym] = {**quote, 'source': 'yahoo'}
+
+        ts = to_iso_utc(now_utc())
+        for sym in nfo_symbols:
+            out.setdefault(sym, {**_empty_quote(ts), 'source': 'default'})
+
+        return out
+
+    async def get_quote_async(self, symbols: List[str], max_age: float = QUOTE_CACHE_TTL) -> Dict[str, Any]:
+        """
+        Async, batched equivalent of get_quote()
+
+        Quotes fetched within the last ``max_age`` seconds are served from
+        an in-process cache; the rest are fetched in multi-symbol chunks
+        (Zerodha first, Yahoo fallback) concurrently off the event loop.
+        Returns the same symbol -> quote dict shape as get_quote(), plus a
+        'source' field.
+        """
+        wanted = list(dict.fromkeys(str(s).strip() for s in symbols or [] if s))
+        now = time.monotonic()
+
+        result: Dict[str, Any] = {}
+        stale: List[str] = []
+        for sym in wanted:
+            cached = self._quote_cache.get(sym)
+            if cached and now - cached[0] <= max_age:
+                result[sym] = cached[1]
+            else:
+                stale.append(sym)
+
+        if stale:
+            fetched = await self._fetch_quotes_batched(stale)
+            fetched_at = time.monotonic()
+            for sym, quote in fetched.items():
+                self._quote_cache[sym] = (fetched_at, quote)
+                result[sym] = quote
+
+        return result
+
+    async def get_quote_table(self, symbols: List[str], max_age: float = QUOTE_CACHE_TTL) -> pd.DataFrame:
+        """
+        Batched quotes as a columnar table
+
+        Returns a DataFrame indexed by symbol with QUOTE_COLUMNS (plus any
+        extra provider fields such as 'oi'), one row per symbol with data.
+        """
+        quotes = await self.get_quote_async(symbols, max_age=max_age)
+        table = pd.DataFrame.from_dict(quotes, orient='index')
+        if table.empty:
+            return pd.DataFrame(columns=QUOTE_COLUMNS)
+        extra = [c for c in table.columns if c not in QUOTE_COLUMNS]
+        return table.reindex(columns=QUOTE_COLUMNS + extra)
     
     def get_historical_data(
         self, 
@@ -246,6 +411,8 @@ class UnifiedDataProvider:
     ) -> Optional[pd.DataFrame]:
         """Get historical data from Yahoo Finance"""
         try:
+            import yfinance as yf
+
             yahoo_symbol = f"{symbol}.NS" if not symbol.endswith(('.NS', '.BO')) else symbol
             ticker = yf.Ticker(yahoo_symbol)
             df = ticker.history(start=from_date, end=to_date, interval=interval)
@@ -295,26 +462,24 @@ class UnifiedDataProvider:
             except Exception as e:
                 logger.warning(f"Zerodha OHLC failed, falling back to Yahoo: {e}")
         
-        # Fallback to Yahoo
+        # Fallback to Yahoo (one batch download per chunk)
         result = {}
-        for symbol in symbols:
+        for chunk in _chunked(list(symbols), YAHOO_QUOTE_BATCH_SIZE):
             try:
-                yahoo_symbol = f"{symbol}.NS"
-                ticker = yf.Ticker(yahoo_symbol)
-                hist = ticker.history(period='5d')
-                
-                if not hist.empty:
-                    latest = hist.iloc[-1]
-                    result[symbol] = {
-                        'open': latest['Open'],
-                        'high': latest['High'],
-                        'low': latest['Low'],
-                        'close': latest['Close'],
-                        'last_price': latest['Close'],
-                        'volume': latest['Volume']
-                    }
+                frames = self._download_yahoo_daily(chunk)
             except Exception as e:
-                logger.error(f"Error fetching Yahoo OHLC for {symbol}: {e}")
+                logger.error(f"Error fetching Yahoo OHLC for {len(chunk)} symbols: {e}")
+                continue
+            for symbol, hist in frames.items():
+                latest = hist.iloc[-1]
+                result[symbol] = {
+                    'open': latest['Open'],
+                    'high': latest['High'],
+                    'low': latest['Low'],
+                    'close': latest['Close'],
+                    'last_price': latest['Close'],
+                    'volume': latest['Volume']
+                }
         
         return result
     
@@ -356,6 +521,8 @@ class UnifiedDataProvider:
             logger.warning(f"Yahoo chart indices fallback failed, trying yfinance: {e}")
 
         # Last resort (may be stale depending on Yahoo/yfinance caching)
+        import yfinance as yf
+
         result: Dict[str, Any] = {}
         for name, yahoo_symbol in indices_map.items():
             try:
@@ -380,6 +547,10 @@ class UnifiedDataProvider:
 
         return result
 
+    async def get_indices_quote_async(self) -> Dict[str, Any]:
+        """get_indices_quote() run off the event loop for async callers."""
+        return await asyncio.to_thread(self.get_indices_quote)
+
     def _get_indices_quote_yahoo_chart(self, indices_map: Dict[str, str]) -> Dict[str, Any]:
         """Fetch index quotes via Yahoo chart API (near-real-time).
 
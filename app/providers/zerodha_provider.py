@@ -7,11 +7,12 @@ import os
 import logging
 from typing import Dict, List, Optional, Any
 from datetime import datetime, timedelta
-from kiteconnect import KiteConnect
 import pandas as pd
 from functools import lru_cache
 import json
 
+from ..services.instrument_master import get_instrument_master
+
 logger = logging.getLogger(__name__)
 
 class ZerodhaProvider:
@@ -29,6 +30,7 @@ class ZerodhaProvider:
             logger.warning("⚠️  Zerodha API credentials not configured")
             self.kite = None
         else:
+            from kiteconnect import KiteConnect
             self.kite = KiteConnect(api_key=self.api_key)
             
             # Try to load saved access token from file
@@ -43,7 +45,6 @@ class ZerodhaProvider:
                             self.kite.set_access_token(saved_token)
                             logger.info("✅ Zerodha: Loaded saved access token")
                             # Load instruments
-                            self.symbol_map = {}
                             self._load_instruments()
                             logger.info("✅ Zerodha Kite connected (authenticated)")
                             return
@@ -51,17 +52,14 @@ class ZerodhaProvider:
                 logger.debug(f"Note: Could not load saved token: {e}")
             
             logger.info("⚠️  Zerodha available but not authenticated yet")
-        
-        # Symbol mapping for easier lookups
-        self.symbol_map = {}
     
     def _load_instruments(self):
-        """Load instrument list for symbol lookups"""
+        """Make sure the shared instrument master is loaded for symbol lookups"""
         try:
             if self.kite and self.access_token:
-                instruments = self.kite.instruments("NSE")
-                self.symbol_map = {inst['tradingsymbol']: inst for inst in instruments}
-                logger.info(f"✓ Loaded {len(self.symbol_map)} NSE instruments")
+                master = get_instrument_master()
+                master.ensure_fresh(self.kite)
+                logger.info(f"✓ Instrument master ready: {len(master)} instruments (snapshot {master.snapshot_date})")
         except Exception as e:
             logger.error(f"Failed to load instruments: {e}")
     
@@ -104,15 +102,7 @@ class ZerodhaProvider:
     def get_instrument_token(self, symbol: str, exchange: str = "NSE") -> Optional[int]:
         """Get instrument token for a symbol"""
         try:
-            if symbol in self.symbol_map:
-                return self.symbol_map[symbol]['instrument_token']
-            
-            # Try with exchange prefix
-            full_symbol = f"{exchange}:{symbol}"
-            if full_symbol in self.symbol_map:
-                return self.symbol_map[full_symbol]['instrument_token']
-            
-            return None
+            return get_instrument_master().token_for(symbol, exchange)
         except Exception as e:
             logger.error(f"Error getting instrument token for {symbol}: {e}")
             return None
@@ -1,88 +1,33 @@
-from fastapi import APIRouter, Query, HTTPException
+from fastapi import APIRouter, Query, HTTPException, Request
 from pydantic import BaseModel, Field
 from typing import List, Optional, Dict, Any
 from datetime import datetime
 import asyncio
 
 from ..services.memory import MEMORY
-from ..agents.coordinator import AgentCoordinator
-from ..agents.technical_agent import TechnicalAgent
 from ..utils.trading_modes import (
     TradingMode, get_agent_weights, get_strategy_parameters,
     get_mode_display_info, validate_mode_combination, MODE_CONFIGS,
     normalize_mode,
 )
-from ..agents.global_market_agent import GlobalMarketAgent
-from ..agents.policy_macro_agent import PolicyMacroAgent
-from ..agents.options_agent import OptionsAgent
-from ..agents.sentiment_agent import SentimentAgent
-from ..agents.microstructure_agent import MicrostructureAgent
-from ..agents.risk_agent import RiskAgent
-# Phase 2 New Agents
-from ..agents.pattern_recognition_agent import PatternRecognitionAgent
-from ..agents.market_regime_agent import MarketRegimeAgent
-from ..agents.trade_strategy_agent import TradeStrategyAgent
-from ..agents.watchlist_intelligence_agent import WatchlistIntelligenceAgent
-from ..agents.auto_monitoring_agent import AutoMonitoringAgent
-from ..agents.personalization_agent import PersonalizationAgent
-# Scalping Agent
-from ..agents.scalping_agent import ScalpingAgent
 from ..services.intelligent_insights import generate_batch_insights
 from ..services.top_picks_scheduler import get_cached_top_picks, force_refresh_universe, TOP_PICKS_CACHE
 from ..services.realtime_prices import enrich_picks_with_realtime_data
+from ..services.top_picks_responses import top_picks_envelope, top_picks_responses
 from ..services.redis_client import get_json
 from ..services.top_picks_store import get_top_picks_store
+from ..core.lazy import LazySingleton
+from ..agents.registry import build_coordinator
 
 router = APIRouter(tags=["agents"])
 
-# Initialize 14-Agent System
-# Architecture:
+# 14-Agent System (shared instances, see agents/registry.py)
 #   - 11 Scoring Agents (100% weight): Generate blend score
 #   - 1 Super Agent (Trade Strategy): Consumes scores, generates trade plans
 #   - 2 Utility Agents (Auto-Monitoring, Personalization): Support functions
-coordinator = AgentCoordinator()
-
-# 11 SCORING AGENTS (100% weight distributed)
-coordinator.register_agent(TechnicalAgent(weight=0.20))
-coordinator.register_agent(PatternRecognitionAgent(weight=0.18))
-coordinator.register_agent(MarketRegimeAgent(weight=0.15))
-coordinator.register_agent(GlobalMarketAgent(weight=0.12))
-coordinator.register_agent(OptionsAgent(weight=0.12))
-coordinator.register_agent(SentimentAgent(weight=0.10))
-coordinator.register_agent(PolicyMacroAgent(weight=0.08))
-coordinator.register_agent(ScalpingAgent(weight=0.03))  # NEW: Scalping-specific analysis
-coordinator.register_agent(WatchlistIntelligenceAgent(weight=0.01))
-coordinator.register_agent(MicrostructureAgent(weight=0.01))
-coordinator.register_agent(RiskAgent(weight=0.00))
-
-# SUPER AGENT (No weight - generates trade plans from other agents)
-coordinator.register_agent(TradeStrategyAgent(weight=0.00))
-
-# UTILITY AGENTS (No weight - monitoring & personalization)
-coordinator.register_agent(AutoMonitoringAgent(weight=0.00))
-coordinator.register_agent(PersonalizationAgent(weight=0.00))
-
-coordinator.set_weights({
-    # 11 SCORING AGENTS (100% total)
-    'technical': 0.2037,              # Technical analysis
-    'pattern_recognition': 0.1833,    # Chart patterns
-    'market_regime': 0.1528,          # Bull/Bear/Sideways
-    'global': 0.12,                   # Global markets
-    'options': 0.12,                  # Options flow
-    'sentiment': 0.10,                # Market sentiment
-    'policy': 0.08,                   # Policy/Macro
-    'scalping': 0.03,                 # NEW: Scalping-specific (spread, volume, order flow)
-    'watchlist_intelligence': 0.00,   # Watchlist recommendations (monitoring only, not scored)
-    'microstructure': 0.0102,         # Order flow
-    'risk': 0.00,                     # Risk management
-    
-    # SUPER AGENT (0% weight - not in blend score)
-    'trade_strategy': 0.00,           # Trade plan generator
-    
-    # UTILITY AGENTS (0% weight - not in blend score)
-    'auto_monitoring': 0.00,          # Position monitoring
-    'personalization': 0.00           # User preferences
-}) 
+# Built on the first request rather than at import time.
+coordinator = LazySingleton("agents_router.coordinator", lambda: build_coordinator('chat'))
+
 
 class TopPicksReq(BaseModel):
     symbols: List[str]
@@ -96,6 +41,7 @@ from ..services.global_score_store import get_consistent_top_picks, global_score
 
 @router.get("/top-picks")
 async def get_top_picks(
+    request: Request,
     universe: str = Query("nifty50", description="Universe: nifty50, nifty100, test"),
     mode: str = Query("Swing", description="Trading mode: Scalping, Intraday, Swing, Options, Futures, Commodities"),
     limit: int = Query(5, ge=1, le=10, description="Number of picks"),
@@ -120,44 +66,20 @@ async def get_top_picks(
         
         if cached_data and cached_data.get('items'):
             # Return cached picks - much faster!
+            if top_picks_responses.enabled:
+                # Pre-serialized body for this snapshot; 304 when unchanged
+                prepared = top_picks_responses.top_picks_body(universe, mode, limit, cached_data)
+                return top_picks_responses.respond(
+                    prepared,
+                    request.headers.get("if-none-match"),
+                    request.headers.get("accept-encoding"),
+                )
+
             items = cached_data['items'][:limit]
+            response = top_picks_envelope(cached_data, universe, mode, len(items), datetime.now())
+            response['picks'] = items
             
-            # Calculate cache age
-            cache_age_seconds = 0
-            last_updated = "Just now"
-            if 'as_of' in cached_data:
-                try:
-                    cache_age_seconds = (datetime.now() - datetime.fromisoformat(cached_data['as_of'].replace('Z', ''))).total_seconds()
-                    if cache_age_seconds < 60:
-                        last_updated = "Just now"
-                    elif cache_age_seconds < 3600:
-                        mins = int(cache_age_seconds / 60)
-                        last_updated = f"{mins} min{'s' if mins > 1 else ''} ago"
-                    else:
-                        hours = int(cache_age_seconds / 3600)
-                        last_updated = f"{hours} hour{'s' if hours > 1 else ''} ago"
-                except Exception:
-                    pass
-            
-            # Format to match expected response structure
-            response = {
-                'date': datetime.now().strftime('%Y-%m-%d'),
-                'generated_at': cached_data.get('as_of', datetime.now().isoformat() + 'Z'),
-                'universe': cached_data.get('universe', universe),
-                'mode': cached_data.get('mode', mode),
-                'picks_count': len(items),
-                'picks': items,
-                'cached': True,
-                'cache_age_seconds': cache_age_seconds,
-                'last_updated': last_updated,
-                'next_refresh': "Next refresh in ~1 hour during market hours",
-                'metadata': {
-                    'analysis_time_seconds': cached_data.get('elapsed_seconds', 0),
-                    'cache_status': 'fresh' if cache_age_seconds < 3600 else 'stale'
-                }
-            }
-            
-            print(f"✓ Serving cached picks for {universe} (age: {last_updated})")
+            print(f"✓ Serving cached picks for {universe} (age: {response['last_updated']})")
             return response
         else:
             print(f"⚠️  No cached picks for {universe}, generating fresh...")
@@ -360,6 +282,7 @@ async def batch_analyze(req: BatchAnalyzeRequest):
 
 @router.get("/agents/picks")
 async def agents_picks(
+    request: Request,
     limit: int = Query(5, ge=1, le=10),
     universe: str = "NIFTY50",
     session_id: Optional[str] = None,
@@ -399,6 +322,40 @@ async def agents_picks(
         requested_mode = primary_mode_enum.value
         cached = get_cached_top_picks(universe, requested_mode)
         if cached and isinstance(cached.get("items"), list):
+            as_of = cached.get("as_of") or datetime.utcnow().isoformat() + "Z"
+            session_date: Optional[str] = None
+            previous_session = False
+            try:
+                ts = datetime.fromisoformat(as_of.replace("Z", ""))
+                session_date = ts.date().isoformat()
+                previous_session = ts.date() < datetime.utcnow().date()
+            except Exception:
+                session_date = None
+
+            # Per-session fields layered over the snapshot's picks
+            envelope = {
+                "as_of": as_of,
+                "universe": cached.get("universe", universe),
+                "risk_profile": risk,
+                "primary_mode": primary_mode_enum.value,
+                "auxiliary_modes": [m.value for m in auxiliary_modes],
+                "mode_info": get_mode_display_info(primary_mode_enum),
+                "cached": True,
+                "session_date": session_date,
+                "previous_session": previous_session,
+            }
+
+            if top_picks_responses.enabled:
+                prepared = await top_picks_responses.agents_picks_body(
+                    universe, requested_mode, limit, cached, envelope
+                )
+                if prepared is not None:
+                    return top_picks_responses.respond(
+                        prepared,
+                        request.headers.get("if-none-match"),
+                        request.headers.get("accept-encoding"),
+                    )
+
             items = cached["items"][: limit]
 
             # Validate cached picks have required fields
@@ -451,28 +408,7 @@ async def agents_picks(
                 print(f"[agents_picks] Warning: realtime enrichment failed for cached picks: {e}")
 
             print(f"[agents_picks] Serving {len(valid_items)} cached picks for {universe} / {requested_mode}")
-            as_of = cached.get("as_of") or datetime.utcnow().isoformat() + "Z"
-            session_date: Optional[str] = None
-            previous_session = False
-            try:
-                ts = datetime.fromisoformat(as_of.replace("Z", ""))
-                session_date = ts.date().isoformat()
-                previous_session = ts.date() < datetime.utcnow().date()
-            except Exception:
-                session_date = None
-
-            return {
-                "items": valid_items,
-                "as_of": as_of,
-                "universe": cached.get("universe", universe),
-                "risk_profile": risk,
-                "primary_mode": primary_mode_enum.value,
-                "auxiliary_modes": [m.value for m in auxiliary_modes],
-                "mode_info": get_mode_display_info(primary_mode_enum),
-                "cached": True,
-                "session_date": session_date,
-                "previous_session": previous_session,
-            }
+            return {"items": valid_items, **envelope}
 
         # No cache available: escalate to fresh generation instead of returning empty
         print(f"[agents_picks] No cache available for {universe} / {requested_mode}. Escalating to fresh generation.")
@@ -4,7 +4,6 @@ Authentication router for AWS Cognito
 from fastapi import APIRouter, HTTPException, status, Depends, Header, Request
 from fastapi.security import HTTPBearer, HTTPAuthorizationCredentials
 from typing import Optional
-from sqlalchemy.orm import Session
 from ..schemas.auth import (
     SignupRequest,
     LoginRequest,
@@ -26,7 +25,7 @@ from ..schemas.auth import (
 from ..services.cognito_auth import get_cognito_service, CognitoAuthService
 from ..services.google_auth import get_google_auth_service, GoogleAuthService
 from ..services.user_service import UserService
-from ..config.database import get_db
+from ..config.database import AsyncDBSession, get_async_db
 
 router = APIRouter(prefix="/auth", tags=["Authentication"])
 
@@ -97,7 +96,7 @@ async def signup(
     request: SignupRequest,
     http_request: Request,
     cognito: CognitoAuthService = Depends(get_cognito_service),
-    db: Session = Depends(get_db)
+    db: AsyncDBSession = Depends(get_async_db)
 ):
     """
     Sign up a new user
@@ -116,8 +115,8 @@ async def signup(
     
     # Create user in database
     request_metadata = get_request_metadata(http_request)
-    user = UserService.create_user_from_cognito(
-        db=db,
+    user = await db.run_sync(
+        UserService.create_user_from_cognito,
         cognito_data={
             "sub": result['user_sub'],
             "email": result['email'],
@@ -168,7 +167,7 @@ async def login(
     request: LoginRequest,
     http_request: Request,
     cognito: CognitoAuthService = Depends(get_cognito_service),
-    db: Session = Depends(get_db)
+    db: AsyncDBSession = Depends(get_async_db)
 ):
     """
     Log in a user
@@ -186,8 +185,8 @@ async def login(
     # Get user info from Cognito and update database
     user_info = cognito.get_user_info(access_token=result['access_token'])
     request_metadata = get_request_metadata(http_request)
-    user = UserService.create_user_from_cognito(
-        db=db,
+    user = await db.run_sync(
+        UserService.create_user_from_cognito,
         cognito_data=user_info,
         request_metadata=request_metadata
     )
@@ -333,7 +332,7 @@ async def phone_signup(
     request: PhoneSignupRequest,
     http_request: Request,
     cognito: CognitoAuthService = Depends(get_cognito_service),
-    db: Session = Depends(get_db)
+    db: AsyncDBSession = Depends(get_async_db)
 ):
     """
     Sign up a new user with phone number
@@ -350,8 +349,8 @@ async def phone_signup(
     
     # Create user in database (will be updated on verification)
     request_metadata = get_request_metadata(http_request)
-    user = UserService.create_user_from_cognito(
-        db=db,
+    user = await db.run_sync(
+        UserService.create_user_from_cognito,
         cognito_data={
             "sub": result['user_sub'],
             "phone_number": result['phone_number'],
@@ -393,7 +392,7 @@ async def phone_verify_signup(
     request: PhoneVerifyOTPRequest,
     http_request: Request,
     cognito: CognitoAuthService = Depends(get_cognito_service),
-    db: Session = Depends(get_db)
+    db: AsyncDBSession = Depends(get_async_db)
 ):
     """
     Verify phone number with OTP and get authentication tokens
@@ -412,8 +411,8 @@ async def phone_verify_signup(
     if 'access_token' in result:
         user_info = cognito.get_user_info(access_token=result['access_token'])
         request_metadata = get_request_metadata(http_request)
-        user = UserService.create_user_from_cognito(
-            db=db,
+        user = await db.run_sync(
+            UserService.create_user_from_cognito,
             cognito_data=user_info,
             request_metadata=request_metadata
         )
@@ -540,7 +539,7 @@ async def phone_login_verify(
     request: PhoneLoginVerifyRequest,
     http_request: Request,
     cognito: CognitoAuthService = Depends(get_cognito_service),
-    db: Session = Depends(get_db)
+    db: AsyncDBSession = Depends(get_async_db)
 ):
     """
     Verify OTP and complete login
@@ -560,8 +559,8 @@ async def phone_login_verify(
     # Get user info and update database
     user_info = cognito.get_user_info(access_token=result['access_token'])
     request_metadata = get_request_metadata(http_request)
-    user = UserService.create_user_from_cognito(
-        db=db,
+    user = await db.run_sync(
+        UserService.create_user_from_cognito,
         cognito_data=user_info,
         request_metadata=request_metadata
     )
@@ -602,7 +601,7 @@ async def google_auth(
     request: GoogleAuthRequest,
     http_request: Request,
     google_service: GoogleAuthService = Depends(get_google_auth_service),
-    db: Session = Depends(get_db)
+    db: AsyncDBSession = Depends(get_async_db)
 ):
     """
     Authenticate with Google OAuth
@@ -620,8 +619,8 @@ async def google_auth(
     
     # Create/update user in database
     request_metadata = get_request_metadata(http_request)
-    user = UserService.create_user_from_cognito(
-        db=db,
+    user = await db.run_sync(
+        UserService.create_user_from_cognito,
         cognito_data={
             "sub": google_user['google_id'],
             "email": google_user['email'],
@@ -724,7 +723,7 @@ async def google_auth(
 async def delete_user(
     request: DeleteUserRequest,
     cognito: CognitoAuthService = Depends(get_cognito_service),
-    db: Session = Depends(get_db)
+    db: AsyncDBSession = Depends(get_async_db)
 ):
     """
     Delete user from all systems
@@ -755,7 +754,7 @@ async def delete_user(
     
     # Try to delete from database
     try:
-        db_result = UserService.delete_user_by_identifier(db, request.identifier)
+        db_result = await db.run_sync(UserService.delete_user_by_identifier, request.identifier)
         results['database_deleted'] = True
         results['database_message'] = db_result['message']
         results['user_id'] = db_result['user_id']
@@ -5,13 +5,17 @@ Integrates with real data sources: Zerodha, NSE, Yahoo Finance, etc.
 """
 
 from fastapi import APIRouter, HTTPException, Query
+from fastapi.responses import Response
 from typing import Optional
 from datetime import datetime, timedelta
+import numpy as np
+from ..core.candles import BINARY_CONTENT_TYPE, Candles, candle_payload
 from ..services.chart_data_service import chart_data_service
-from ..providers.unified_data_provider import UnifiedDataProvider
+from ..providers.unified_data_provider import get_data_provider
+from ..core.lazy import LazySingleton
 
 router = APIRouter(tags=["chart"])
-unified_provider = UnifiedDataProvider()
+unified_provider = LazySingleton("unified_data_provider", get_data_provider)
 
 
 def generate_mock_candles(symbol: str, timeframe: str = '3M'):
@@ -104,7 +108,9 @@ def generate_ai_signals(symbol: str, candles: list):
 @router.get("/chart/{symbol}")
 async def get_chart_data(
     symbol: str,
-    timeframe: Optional[str] = '3M'
+    timeframe: Optional[str] = '3M',
+    format: str = Query("rows", pattern="^(rows|columnar|binary)$", description="Candle encoding"),
+    points: Optional[int] = Query(None, ge=3, le=20000, description="Downsample candles (LTTB) to at most this many")
 ):
     """
     Get chart data with AI signals from real data sources.
@@ -122,6 +128,12 @@ async def get_chart_data(
     - AI-detected signals
     - Current price info
     - Data source used
+
+    Candle encodings:
+    - rows (default): list of {time, open, high, low, close, volume}
+    - columnar: {time: [...], open: [...], ...}
+    - binary: packed arrays (see app/core/candles.py) with the rest of
+      the response in the JSON header
     """
     
     try:
@@ -131,7 +143,16 @@ async def get_chart_data(
         if not chart_data or not chart_data.get('candles'):
             raise HTTPException(status_code=404, detail="No chart data available")
         
-        return chart_data
+        candles = chart_data['candles']
+        if format == "binary":
+            if not isinstance(candles, Candles):
+                candles = Candles.from_records(list(candles))
+            if points:
+                candles = candles.downsample(points)
+            meta = {k: v for k, v in chart_data.items() if k != 'candles'}
+            return Response(content=candles.to_bytes(meta), media_type=BINARY_CONTENT_TYPE)
+        
+        return {**chart_data, 'candles': candle_payload(candles, format, points)}
         
     except HTTPException:
         raise
@@ -168,7 +189,8 @@ async def detect_patterns(symbol: str):
 async def get_historical_data(
     symbol: str = Query(..., description="Stock symbol (e.g., RELIANCE, TCS, INFY)"),
     days: int = Query(30, ge=1, le=365, description="Number of days of historical data"),
-    interval: str = Query("1d", description="Data interval (1m, 5m, 15m, 1h, 1d)")
+    interval: str = Query("1d", description="Data interval (1m, 5m, 15m, 1h, 1d)"),
+    format: str = Query("rows", pattern="^(rows|columnar)$", description="Row dicts or one list per field")
 ):
     """
     Get historical OHLC data with intelligent caching
@@ -209,29 +231,20 @@ async def get_historical_data(
                 "data": []
             }
         
-        # Convert DataFrame to list of dicts
-        data = []
-        for idx, row in df.iterrows():
-            # Handle timestamp
-            if 'time' in df.columns:
-                time_val = row['time']
-            else:
-                time_val = idx
-            
-            # Convert to ISO format
-            if hasattr(time_val, 'isoformat'):
-                time_str = time_val.isoformat()
-            else:
-                time_str = str(time_val)
-            
-            data.append({
-                "time": time_str,
-                "open": float(row.get('open', row.get('Open', 0))),
-                "high": float(row.get('high', row.get('High', 0))),
-                "low": float(row.get('low', row.get('Low', 0))),
-                "close": float(row.get('close', row.get('Close', 0))),
-                "volume": int(row.get('volume', row.get('Volume', 0)))
-            })
+        # Convert DataFrame columns (time as ISO strings)
+        times = df['time'] if 'time' in df.columns else df.index
+        columns = {
+            "time": [t.isoformat() if hasattr(t, 'isoformat') else str(t) for t in times],
+            "open": _column(df, 'open').tolist(),
+            "high": _column(df, 'high').tolist(),
+            "low": _column(df, 'low').tolist(),
+            "close": _column(df, 'close').tolist(),
+            "volume": _column(df, 'volume').astype(np.int64).tolist(),
+        }
+        if format == "columnar":
+            data = columns
+        else:
+            data = [dict(zip(columns, row)) for row in zip(*columns.values())]
         
         return {
             "status": "success",
@@ -239,7 +252,7 @@ async def get_historical_data(
             "interval": interval,
             "from_date": from_date.isoformat(),
             "to_date": to_date.isoformat(),
-            "data_points": len(data),
+            "data_points": len(df),
             "data": data,
             "cached": True  # Will be from cache on subsequent calls
         }
@@ -251,6 +264,14 @@ async def get_historical_data(
         )
 
 
+def _column(df, name: str) -> np.ndarray:
+    """Float values of ``name`` (or its capitalised variant), 0 when missing."""
+    for col in (name, name.capitalize()):
+        if col in df.columns:
+            return df[col].to_numpy(dtype=float)
+    return np.zeros(len(df))
+
+
 @router.get("/chart/market-regime")
 async def get_market_regime():
     """
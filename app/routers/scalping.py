@@ -14,9 +14,7 @@ Features:
 from fastapi import APIRouter, Query, HTTPException
 from typing import Optional, List, Dict, Any
 from datetime import datetime, timezone, timedelta
-from pathlib import Path
 import logging
-import json
 
 from ..agents.auto_monitoring_agent import auto_monitoring_agent
 from ..services.scalping_exit_tracker import scalping_exit_tracker
@@ -473,48 +471,14 @@ async def get_scalping_stats(days: int = Query(7, ge=1, le=30, description="Numb
     try:
         logger.info(f"[ScalpingAPI] Fetching stats for last {days} days")
         
-        from datetime import timedelta
+        # Running per-day aggregates: O(1) per day, no exit lists scanned
+        stats = scalping_exit_tracker.get_period_stats(days)
         
-        total_exits = 0
-        total_wins = 0
-        total_losses = 0
-        total_return = 0
-        all_exits = []
-        
-        # Aggregate data for each day
-        for i in range(days):
-            date = (datetime.utcnow() - timedelta(days=i)).strftime('%Y-%m-%d')
-            summary = scalping_exit_tracker.get_daily_summary(date)
-            
-            total_exits += summary.get('total_exits', 0)
-            total_wins += summary.get('winning_exits', 0)
-            total_losses += summary.get('losing_exits', 0)
-            
-            for exit in summary.get('exits', []):
-                total_return += exit.get('return_pct', 0)
-                all_exits.append(exit)
-        
-        # Calculate aggregates
-        win_rate = (total_wins / total_exits * 100) if total_exits > 0 else 0
-        avg_return = (total_return / total_exits) if total_exits > 0 else 0
-        
-        # Exit reason breakdown
-        exit_reasons = {}
-        for exit in all_exits:
-            reason = exit.get('exit_reason', 'UNKNOWN')
-            exit_reasons[reason] = exit_reasons.get(reason, 0) + 1
-        
-        logger.info(f"[ScalpingAPI] Stats: {total_exits} exits, {win_rate:.1f}% win rate")
+        logger.info(f"[ScalpingAPI] Stats: {stats['total_exits']} exits, {stats['win_rate']:.1f}% win rate")
         
         return {
             "status": "success",
-            "period_days": days,
-            "total_exits": total_exits,
-            "winning_exits": total_wins,
-            "losing_exits": total_losses,
-            "win_rate": round(win_rate, 2),
-            "avg_return": round(avg_return, 2),
-            "exit_reason_breakdown": exit_reasons
+            **stats
         }
         
     except Exception as e:
@@ -526,94 +490,23 @@ async def get_scalping_stats(days: int = Query(7, ge=1, le=30, description="Numb
 async def get_monitor_occupancy():
     """Get scalping monitor occupancy metrics for last day and last week.
 
-    Uses scalping_monitor_cycle events written by event_logger under
-    data/events/scalping_monitor_cycle/YYYY/MM/DD/events.jsonl.
+    Uses the scalping_monitor_cycle rollups maintained by event_rollups as
+    event_logger writes those events (no per-request JSONL scans).
     """
     try:
-        now_utc = datetime.utcnow().replace(tzinfo=timezone.utc)
-
-        def _load_events(window_days: int) -> List[Dict[str, Any]]:
-            cutoff = now_utc - timedelta(days=window_days)
-            events: List[Dict[str, Any]] = []
-
-            base_dir = (
-                Path(__file__).resolve().parents[3]
-                / "data"
-                / "events"
-                / "scalping_monitor_cycle"
-            )
-
-            for i in range(window_days + 1):
-                day = now_utc - timedelta(days=i)
-                day_dir = (
-                    base_dir
-                    / f"{day.year:04d}"
-                    / f"{day.month:02d}"
-                    / f"{day.day:02d}"
-                )
-                file_path = day_dir / "events.jsonl"
-                if not file_path.exists():
-                    continue
+        from ..services.event_rollups import get_event_rollups
 
-                try:
-                    with open(file_path, "r", encoding="utf-8") as f:
-                        for line in f:
-                            line = line.strip()
-                            if not line:
-                                continue
-                            try:
-                                evt = json.loads(line)
-                            except Exception:
-                                continue
-
-                            ts_str = evt.get("ts")
-                            if ts_str:
-                                try:
-                                    ts_dt = datetime.fromisoformat(
-                                        ts_str.replace("Z", "+00:00")
-                                    )
-                                except Exception:
-                                    ts_dt = None
-                                if ts_dt is not None:
-                                    if ts_dt.tzinfo is None:
-                                        ts_dt = ts_dt.replace(tzinfo=timezone.utc)
-                                    else:
-                                        ts_dt = ts_dt.astimezone(timezone.utc)
-                                    if ts_dt < cutoff or ts_dt > now_utc:
-                                        continue
-
-                            if evt.get("event_type") != "scalping_monitor_cycle":
-                                continue
-
-                            events.append(evt)
-                except Exception as e:
-                    logger.warning(
-                        "[ScalpingAPI] Failed to read scalping monitor events from %s: %s",
-                        file_path,
-                        e,
-                        exc_info=True,
-                    )
-
-            return events
+        rollups = get_event_rollups()
+        now_utc = datetime.utcnow().replace(tzinfo=timezone.utc)
 
         def _compute_occupancy(window_days: int) -> Dict[str, Any]:
-            events = _load_events(window_days)
-            total_cycles = 0
-            cycles_with_positions = 0
-            total_active_positions = 0.0
-
-            for evt in events:
-                payload = evt.get("payload") or {}
-                active_positions = payload.get("active_positions")
-                try:
-                    active_val = float(active_positions)
-                except Exception:
-                    continue
+            cutoff = now_utc - timedelta(days=window_days)
+            active = rollups.total("scalping_monitor_cycle", cutoff, now_utc, metric="active_positions")
+            with_positions = rollups.total("scalping_monitor_cycle", cutoff, now_utc, metric="has_positions")
 
-                total_cycles += 1
-                total_active_positions += active_val
-                if active_val > 0:
-                    cycles_with_positions += 1
+            total_cycles = active["n"]
+            cycles_with_positions = int(with_positions["sum"])
+            total_active_positions = active["sum"]
 
             occupancy_pct = (
                 (cycles_with_positions / total_cycles) * 100.0
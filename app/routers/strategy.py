@@ -5,6 +5,7 @@ from datetime import datetime
 
 # Import services for real price data
 from ..services.chart_data_service import chart_data_service
+from ..core.candles import candle_frame
 from ..agents.trade_strategy_agent import TradeStrategyAgent
 from ..utils.trading_modes import (
     TradingMode,
@@ -86,8 +87,7 @@ async def strategy_suggest(req: SuggestReq):
         candles = chart_data['candles']
         
         # Run TradeStrategyAgent to get real trade plan
-        import pandas as pd
-        candles_df = pd.DataFrame(candles)
+        candles_df = candle_frame(candles)
         
         # Build context for agent
         context = {
@@ -8,12 +8,14 @@ from fastapi.security import HTTPAuthorizationCredentials, HTTPBearer
 from pydantic import BaseModel, Field
 from sqlalchemy.orm import Session
 
-from ..deps import get_db
+from ..core.async_db import AsyncDBSession
+from ..deps import get_async_db, get_db
 from ..security import TokenPayload, decode_token
 from ..db_models.trading import BrokerConnection, BrokerOrder, BrokerToken, BrokerPortfolioSnapshot, TradeIntent
 from ..services.broker_adapters import get_broker_adapter
 from ..services.brokers_zerodha import ZerodhaBroker
 from ..services.crypto_vault import decrypt_text, encrypt_text
+from ..services.order_updates import get_order_update_pipeline
 
 
 router = APIRouter(tags=["trading"])
@@ -98,8 +100,10 @@ async def zerodha_login_url() -> Dict[str, Any]:
         raise HTTPException(status_code=500, detail=str(e))
 
 
+# Handlers that call the broker are plain ``def`` so FastAPI runs them (DB
+# and Kite HTTP calls together) in the threadpool instead of on the event loop.
 @router.post("/trading/brokers/zerodha/connect")
-async def zerodha_connect(
+def zerodha_connect(
     req: ZerodhaConnectRequest,
     db: Session = Depends(get_db),
     token_payload: Optional[TokenPayload] = Depends(get_optional_token_payload),
@@ -205,7 +209,7 @@ def _intent_to_ticket(intent: TradeIntent) -> Dict[str, Any]:
 
 
 @router.post("/trading/orders/sync")
-async def sync_order_status(
+def sync_order_status(
     req: SyncOrderRequest,
     db: Session = Depends(get_db),
     token_payload: Optional[TokenPayload] = Depends(get_optional_token_payload),
@@ -270,8 +274,26 @@ async def sync_order_status(
         raise HTTPException(status_code=400, detail=f"Sync failed: {e}")
 
 
+@router.post("/trading/orders/reconcile")
+async def reconcile_orders(
+    account_id: Optional[str] = Query(None, description="Account id (ignored if Authorization token is present)"),
+    token_payload: Optional[TokenPayload] = Depends(get_optional_token_payload),
+) -> Dict[str, Any]:
+    """Sync every open Zerodha intent of the account with a single orders() call."""
+    resolved_account_id = _resolve_account_id(account_id, token_payload)
+    summary = await get_order_update_pipeline().reconcile(resolved_account_id)
+    if summary["errors"].get(resolved_account_id):
+        raise HTTPException(status_code=400, detail=f"Reconcile failed: {summary['errors'][resolved_account_id]}")
+    return {
+        "status": "success",
+        "open_orders": summary["open_orders"],
+        "updated": len(summary["changes"]),
+        "changes": summary["changes"],
+    }
+
+
 @router.post("/trading/execute")
-async def execute_trade(
+def execute_trade(
     req: ExecuteTradeRequest,
     db: Session = Depends(get_db),
     token_payload: Optional[TokenPayload] = Depends(get_optional_token_payload),
@@ -376,17 +398,9 @@ async def execute_trade(
         raise HTTPException(status_code=400, detail=f"Execute failed: {e}")
 
 
-@router.get("/trading/orders")
-async def get_order_status(
-    trade_intent_id: str = Query(...),
-    account_id: Optional[str] = Query(None),
-    db: Session = Depends(get_db),
-    token_payload: Optional[TokenPayload] = Depends(get_optional_token_payload),
-) -> Dict[str, Any]:
-    resolved_account_id = _resolve_account_id(account_id, token_payload)
-
+def _load_order_status(db: Session, trade_intent_id: str, account_id: str) -> Dict[str, Any]:
     intent = db.query(TradeIntent).filter(TradeIntent.id == trade_intent_id).one_or_none()
-    if intent is None or intent.account_id != resolved_account_id:
+    if intent is None or intent.account_id != account_id:
         raise HTTPException(status_code=404, detail="Trade intent not found")
 
     order = (
@@ -412,8 +426,19 @@ async def get_order_status(
     }
 
 
+@router.get("/trading/orders")
+async def get_order_status(
+    trade_intent_id: str = Query(...),
+    account_id: Optional[str] = Query(None),
+    db: AsyncDBSession = Depends(get_async_db),
+    token_payload: Optional[TokenPayload] = Depends(get_optional_token_payload),
+) -> Dict[str, Any]:
+    resolved_account_id = _resolve_account_id(account_id, token_payload)
+    return await db.run_sync(_load_order_status, trade_intent_id, resolved_account_id)
+
+
 @router.post("/trading/portfolio/refresh")
-async def refresh_portfolio(
+def refresh_portfolio(
     broker: str = Query("ZERODHA"),
     account_id: Optional[str] = Query(None),
     db: Session = Depends(get_db),
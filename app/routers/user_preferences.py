@@ -3,7 +3,7 @@ from sqlalchemy.orm import Session
 from pydantic import BaseModel, Field
 from typing import Optional, Dict, Any, List
 
-from ..config.database import get_db
+from ..config.database import AsyncDBSession, get_async_db
 from ..services.user_preferences_service import UserPreferencesService
 from ..deps import get_current_user
 
@@ -37,10 +37,19 @@ class PreferencesUpdateRequest(BaseModel):
     auxiliary_modes: Optional[List[str]] = Field(None, description="Auxiliary trading modes")
 
 
+def _upsert_preferences(db: Session, user_id: str, update_data: Dict[str, Any]):
+    """Update existing preferences or create new ones (one worker hop)"""
+    existing = UserPreferencesService.get_preferences(db, user_id)
+    
+    if existing:
+        return UserPreferencesService.update_preferences(db, user_id, update_data)
+    return UserPreferencesService.create_preferences(db, user_id, update_data)
+
+
 @router.get("", response_model=PreferencesResponse)
 async def get_preferences(
     current_user: dict = Depends(get_current_user),
-    db: Session = Depends(get_db)
+    db: AsyncDBSession = Depends(get_async_db)
 ):
     """
     Get user preferences
@@ -56,8 +65,8 @@ async def get_preferences(
         )
     
     # Get or create preferences with defaults
-    preferences = UserPreferencesService.get_or_create_preferences(
-        db, 
+    preferences = await db.run_sync(
+        UserPreferencesService.get_or_create_preferences,
         user_id,
         defaults={
             "disclosure_accepted": False,
@@ -77,7 +86,7 @@ async def get_preferences(
 async def update_preferences(
     request: PreferencesUpdateRequest,
     current_user: dict = Depends(get_current_user),
-    db: Session = Depends(get_db)
+    db: AsyncDBSession = Depends(get_async_db)
 ):
     """
     Update user preferences (full or partial update)
@@ -95,15 +104,7 @@ async def update_preferences(
     # Convert request to dict, excluding None values
     update_data = request.dict(exclude_none=True)
     
-    # Get existing preferences or create new
-    existing = UserPreferencesService.get_preferences(db, user_id)
-    
-    if existing:
-        # Update existing preferences
-        preferences = UserPreferencesService.update_preferences(db, user_id, update_data)
-    else:
-        # Create new preferences
-        preferences = UserPreferencesService.create_preferences(db, user_id, update_data)
+    preferences = await db.run_sync(_upsert_preferences, user_id, update_data)
     
     return PreferencesResponse(**preferences.to_dict())
 
@@ -112,7 +113,7 @@ async def update_preferences(
 async def patch_preferences(
     request: PreferencesUpdateRequest,
     current_user: dict = Depends(get_current_user),
-    db: Session = Depends(get_db)
+    db: AsyncDBSession = Depends(get_async_db)
 ):
     """
     Partially update user preferences
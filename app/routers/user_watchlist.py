@@ -1,9 +1,8 @@
 from fastapi import APIRouter, Depends, HTTPException, status
-from sqlalchemy.orm import Session
 from pydantic import BaseModel, Field
 from typing import Optional, List
 
-from ..config.database import get_db
+from ..config.database import AsyncDBSession, get_async_db
 from ..services.user_watchlist_service import UserWatchlistService
 from ..deps import get_current_user
 
@@ -42,7 +41,7 @@ class BulkAddRequest(BaseModel):
 @router.get("", response_model=List[WatchlistEntryResponse])
 async def get_watchlist(
     current_user: dict = Depends(get_current_user),
-    db: Session = Depends(get_db)
+    db: AsyncDBSession = Depends(get_async_db)
 ):
     """
     Get user's watchlist
@@ -57,7 +56,7 @@ async def get_watchlist(
             detail="User ID not found in token"
         )
     
-    watchlist = UserWatchlistService.get_watchlist(db, user_id)
+    watchlist = await db.run_sync(UserWatchlistService.get_watchlist, user_id)
     
     return [WatchlistEntryResponse(**entry.to_dict()) for entry in watchlist]
 
@@ -66,7 +65,7 @@ async def get_watchlist(
 async def add_to_watchlist(
     request: AddToWatchlistRequest,
     current_user: dict = Depends(get_current_user),
-    db: Session = Depends(get_db)
+    db: AsyncDBSession = Depends(get_async_db)
 ):
     """
     Add a symbol to watchlist
@@ -81,8 +80,8 @@ async def add_to_watchlist(
             detail="User ID not found in token"
         )
     
-    entry = UserWatchlistService.add_to_watchlist(
-        db, 
+    entry = await db.run_sync(
+        UserWatchlistService.add_to_watchlist,
         user_id, 
         request.symbol,
         request.exchange,
@@ -96,7 +95,7 @@ async def add_to_watchlist(
 async def remove_from_watchlist(
     symbol: str,
     current_user: dict = Depends(get_current_user),
-    db: Session = Depends(get_db)
+    db: AsyncDBSession = Depends(get_async_db)
 ):
     """
     Remove a symbol from watchlist
@@ -111,7 +110,7 @@ async def remove_from_watchlist(
             detail="User ID not found in token"
         )
     
-    UserWatchlistService.remove_from_watchlist(db, user_id, symbol)
+    await db.run_sync(UserWatchlistService.remove_from_watchlist, user_id, symbol)
     
     return None
 
@@ -121,7 +120,7 @@ async def update_watchlist_entry(
     symbol: str,
     request: UpdateWatchlistRequest,
     current_user: dict = Depends(get_current_user),
-    db: Session = Depends(get_db)
+    db: AsyncDBSession = Depends(get_async_db)
 ):
     """
     Update watchlist entry (notes or exchange)
@@ -136,8 +135,8 @@ async def update_watchlist_entry(
             detail="User ID not found in token"
         )
     
-    entry = UserWatchlistService.update_watchlist_entry(
-        db, 
+    entry = await db.run_sync(
+        UserWatchlistService.update_watchlist_entry,
         user_id, 
         symbol,
         request.notes,
@@ -151,7 +150,7 @@ async def update_watchlist_entry(
 async def bulk_add_to_watchlist(
     request: BulkAddRequest,
     current_user: dict = Depends(get_current_user),
-    db: Session = Depends(get_db)
+    db: AsyncDBSession = Depends(get_async_db)
 ):
     """
     Add multiple symbols to watchlist at once
@@ -166,7 +165,7 @@ async def bulk_add_to_watchlist(
             detail="User ID not found in token"
         )
     
-    entries = UserWatchlistService.bulk_add_to_watchlist(db, user_id, request.symbols)
+    entries = await db.run_sync(UserWatchlistService.bulk_add_to_watchlist, user_id, request.symbols)
     
     return [WatchlistEntryResponse(**entry.to_dict()) for entry in entries]
 
@@ -174,7 +173,7 @@ async def bulk_add_to_watchlist(
 @router.delete("", status_code=status.HTTP_204_NO_CONTENT)
 async def clear_watchlist(
     current_user: dict = Depends(get_current_user),
-    db: Session = Depends(get_db)
+    db: AsyncDBSession = Depends(get_async_db)
 ):
     """
     Clear all watchlist entries
@@ -189,7 +188,7 @@ async def clear_watchlist(
             detail="User ID not found in token"
         )
     
-    UserWatchlistService.clear_watchlist(db, user_id)
+    await db.run_sync(UserWatchlistService.clear_watchlist, user_id)
     
     return None
 
@@ -198,7 +197,7 @@ async def clear_watchlist(
 async def check_in_watchlist(
     symbol: str,
     current_user: dict = Depends(get_current_user),
-    db: Session = Depends(get_db)
+    db: AsyncDBSession = Depends(get_async_db)
 ):
     """
     Check if a symbol is in watchlist
@@ -213,6 +212,6 @@ async def check_in_watchlist(
             detail="User ID not found in token"
         )
     
-    in_watchlist = UserWatchlistService.is_in_watchlist(db, user_id, symbol)
+    in_watchlist = await db.run_sync(UserWatchlistService.is_in_watchlist, user_id, symbol)
     
     return {"symbol": symbol, "in_watchlist": in_watchlist}
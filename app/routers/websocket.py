@@ -11,6 +11,8 @@ from datetime import datetime
 
 from ..services.websocket_manager import get_websocket_manager
 from ..services.zerodha_websocket import get_zerodha_websocket
+from ..security import decode_token
+from .trading import _resolve_account_id
 
 router = APIRouter(tags=["websocket"])
 logger = logging.getLogger(__name__)
@@ -33,6 +35,13 @@ async def websocket_market_data(websocket: WebSocket):
         "symbols": ["RELIANCE", "TCS", "INFY"]
     }
     
+    Order updates for the caller's trade intents:
+    {
+        "action": "subscribe_orders",
+        "token": "<JWT>"  (or "account_id" outside production)
+    }
+    Pushed as {"type": "order_update", "trade_intent_id": ..., "intent_state": ..., "order": {...}}
+    
     Message format (Server → Client):
     {
         "type": "tick",
@@ -67,6 +76,18 @@ async def websocket_market_data(websocket: WebSocket):
                 elif action == 'unsubscribe':
                     await manager.unsubscribe(websocket, symbols)
                     
+                elif action == 'subscribe_orders':
+                    try:
+                        payload = await decode_token(message['token']) if message.get('token') else None
+                        account_id = _resolve_account_id(message.get('account_id'), payload)
+                    except HTTPException as e:
+                        await websocket.send_json({
+                            'type': 'error',
+                            'message': f'Order subscription refused: {e.detail}'
+                        })
+                        continue
+                    await manager.subscribe_orders(websocket, account_id)
+                    
                 elif action == 'ping':
                     await websocket.send_json({
                         'type': 'pong',
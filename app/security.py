@@ -1,5 +1,10 @@
+import asyncio
+import hashlib
 import os
-from typing import Any, Dict, List, Optional
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Any, Dict, List, Optional, Tuple
 
 import httpx
 import jwt
@@ -9,13 +14,23 @@ from pydantic import BaseModel, ValidationError
 
 
 security = HTTPBearer(auto_error=True)
-_jwks_cache: Optional[Dict[str, Any]] = None
 
 # OIDC configuration for the ARISE backend. These should be provided via backend/.env
 OIDC_ISSUER = os.getenv("OIDC_ISSUER")
 OIDC_AUDIENCE = os.getenv("OIDC_AUDIENCE")
 OIDC_JWKS_URL = os.getenv("OIDC_JWKS_URL")
 
+GOOGLE_ISSUERS = ("https://accounts.google.com", "accounts.google.com")
+GOOGLE_JWKS_URL = "https://www.googleapis.com/oauth2/v3/certs"
+
+# JWKS documents are re-fetched at most this often on an unknown `kid`
+# (key rotation), and unconditionally after JWKS_MAX_AGE_SECONDS.
+JWKS_MIN_REFRESH_SECONDS = 30
+JWKS_MAX_AGE_SECONDS = 6 * 3600
+
+# Verified-token cache (claims kept until the token's exp)
+VERIFIED_TOKEN_CACHE_SIZE = int(os.getenv("AUTH_TOKEN_CACHE_SIZE", "10000"))
+
 
 class TokenPayload(BaseModel):
     sub: str
@@ -30,20 +45,206 @@ class TokenPayload(BaseModel):
     iat: int
 
 
+class JWKSCache:
+    """JWKS document cache for one issuer that refreshes on `kid` miss."""
+
+    def __init__(self, url: str) -> None:
+        self.url = url
+        self.document: Optional[Dict[str, Any]] = None
+        self._keys: Dict[str, jwt.PyJWK] = {}
+        self._fetched_at = 0.0
+        self._inflight: Optional[asyncio.Task] = None
+        self.fetch_count = 0
+
+    async def _fetch(self) -> None:
+        async with httpx.AsyncClient(timeout=10) as client:
+            resp = await client.get(self.url)
+            resp.raise_for_status()
+            document = resp.json()
+
+        keys: Dict[str, jwt.PyJWK] = {}
+        for jwk in document.get("keys", []):
+            try:
+                keys[jwk.get("kid")] = jwt.PyJWK(jwk)
+            except jwt.PyJWTError:
+                continue  # unsupported key type/alg
+        self.document = document
+        self._keys = keys
+        self._fetched_at = time.monotonic()
+        self.fetch_count += 1
+
+    async def refresh(self) -> None:
+        # Single-flight: concurrent misses share one fetch
+        if self._inflight is None or self._inflight.done():
+            self._inflight = asyncio.ensure_future(self._fetch())
+        await asyncio.shield(self._inflight)
+
+    async def get_key(self, kid: Optional[str]) -> Optional[jwt.PyJWK]:
+        age = time.monotonic() - self._fetched_at
+        if self.document is None or age > JWKS_MAX_AGE_SECONDS:
+            await self.refresh()
+        elif kid not in self._keys and age > JWKS_MIN_REFRESH_SECONDS:
+            await self.refresh()
+        return self._keys.get(kid)
+
+
+@dataclass
+class TrustedIssuer:
+    """An accepted token issuer and how its tokens are validated."""
+
+    name: str
+    issuers: Tuple[str, ...]
+    jwks: JWKSCache
+    audience: Optional[str] = None
+    # Cognito access tokens carry `client_id` instead of `aud`
+    client_id: Optional[str] = None
+
+
+_jwks_caches: Dict[str, JWKSCache] = {}
+_issuers: Optional[List[TrustedIssuer]] = None
+_verified_tokens: "OrderedDict[bytes, Dict[str, Any]]" = OrderedDict()
+
+
+def _jwks_cache_for(url: str) -> JWKSCache:
+    cache = _jwks_caches.get(url)
+    if cache is None:
+        cache = JWKSCache(url)
+        _jwks_caches[url] = cache
+    return cache
+
+
+def get_trusted_issuers() -> List[TrustedIssuer]:
+    """Issuers configured via environment (built once, on first use)."""
+    global _issuers
+    if _issuers is not None:
+        return _issuers
+
+    issuers: List[TrustedIssuer] = []
+
+    region = os.getenv("AWS_COGNITO_REGION")
+    pool_id = os.getenv("AWS_COGNITO_USER_POOL_ID")
+    if region and pool_id:
+        iss = f"https://cognito-idp.{region}.amazonaws.com/{pool_id}"
+        client_id = os.getenv("AWS_COGNITO_CLIENT_ID")
+        issuers.append(
+            TrustedIssuer(
+                name="cognito",
+                issuers=(iss,),
+                jwks=_jwks_cache_for(f"{iss}/.well-known/jwks.json"),
+                audience=client_id,
+                client_id=client_id,
+            )
+        )
+
+    google_client_id = os.getenv("GOOGLE_CLIENT_ID")
+    if google_client_id:
+        issuers.append(
+            TrustedIssuer(
+                name="google",
+                issuers=GOOGLE_ISSUERS,
+                jwks=_jwks_cache_for(GOOGLE_JWKS_URL),
+                audience=google_client_id,
+            )
+        )
+
+    if OIDC_ISSUER and OIDC_JWKS_URL:
+        issuers.append(
+            TrustedIssuer(
+                name="oidc",
+                issuers=(OIDC_ISSUER,),
+                jwks=_jwks_cache_for(OIDC_JWKS_URL),
+                audience=OIDC_AUDIENCE,
+            )
+        )
+
+    _issuers = issuers
+    return _issuers
+
+
+def _unauthorized(detail: str) -> HTTPException:
+    return HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail=detail)
+
+
+def _cache_claims(token_key: bytes, claims: Dict[str, Any]) -> None:
+    _verified_tokens[token_key] = claims
+    _verified_tokens.move_to_end(token_key)
+    while len(_verified_tokens) > VERIFIED_TOKEN_CACHE_SIZE:
+        _verified_tokens.popitem(last=False)
+
+
+async def verify_bearer_token(token: str) -> Dict[str, Any]:
+    """Verify a Cognito/Google/OIDC JWT locally and return its claims.
+
+    Signatures are checked against cached JWKS (refreshed on unknown
+    `kid`); verified claims are kept in a bounded LRU until `exp`, so
+    repeat requests with the same token skip signature verification.
+    The issuer name is returned under the `_provider` claim.
+    """
+    token_key = hashlib.sha256(token.encode("utf-8")).digest()
+    cached = _verified_tokens.get(token_key)
+    if cached is not None:
+        if cached.get("exp", 0) > time.time():
+            _verified_tokens.move_to_end(token_key)
+            return cached
+        _verified_tokens.pop(token_key, None)
+
+    try:
+        header = jwt.get_unverified_header(token)
+        unverified = jwt.decode(token, options={"verify_signature": False})
+    except jwt.PyJWTError:
+        raise _unauthorized("Invalid token header")
+
+    iss = unverified.get("iss")
+    issuer = next((i for i in get_trusted_issuers() if iss in i.issuers), None)
+    if issuer is None:
+        raise _unauthorized("Untrusted token issuer")
+
+    try:
+        key = await issuer.jwks.get_key(header.get("kid"))
+    except httpx.HTTPError:
+        raise HTTPException(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail="Unable to fetch signing keys",
+        )
+    if key is None:
+        raise _unauthorized("Invalid token key")
+
+    # Cognito access tokens have no `aud`; they are bound to the app
+    # client via `client_id` instead.
+    is_access_token = unverified.get("token_use") == "access"
+    try:
+        claims = jwt.decode(
+            token,
+            key,
+            algorithms=["RS256"],
+            audience=None if is_access_token else issuer.audience,
+            issuer=list(issuer.issuers),
+            options={"verify_aud": bool(issuer.audience) and not is_access_token},
+        )
+    except jwt.ExpiredSignatureError:
+        raise _unauthorized("Token expired")
+    except jwt.PyJWTError:
+        raise _unauthorized("Invalid token")
+
+    if is_access_token and issuer.client_id and claims.get("client_id") != issuer.client_id:
+        raise _unauthorized("Invalid token audience")
+
+    claims["_provider"] = issuer.name
+    _cache_claims(token_key, claims)
+    return claims
+
+
 async def get_jwks() -> Dict[str, Any]:
     """Fetch and cache JWKS from the configured OIDC provider."""
-    global _jwks_cache
-    if _jwks_cache is None:
-        if not OIDC_JWKS_URL:
-            raise HTTPException(
-                status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
-                detail="OIDC_JWKS_URL is not configured on the backend",
-            )
-        async with httpx.AsyncClient() as client:
-            resp = await client.get(OIDC_JWKS_URL)
-            resp.raise_for_status()
-            _jwks_cache = resp.json()
-    return _jwks_cache
+    if not OIDC_JWKS_URL:
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail="OIDC_JWKS_URL is not configured on the backend",
+        )
+    cache = _jwks_cache_for(OIDC_JWKS_URL)
+    if cache.document is None:
+        await cache.refresh()
+    return cache.document
 
 
 async def decode_token(token: str) -> TokenPayload:
@@ -53,14 +254,14 @@ async def decode_token(token: str) -> TokenPayload:
             detail="OIDC_ISSUER / OIDC_AUDIENCE are not configured on the backend",
         )
 
-    jwks = await get_jwks()
+    await get_jwks()
     try:
         unverified = jwt.get_unverified_header(token)
     except jwt.PyJWTError:
         raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="Invalid token header")
 
     kid = unverified.get("kid")
-    key = next((k for k in jwks.get("keys", []) if k.get("kid") == kid), None)
+    key = await _jwks_cache_for(OIDC_JWKS_URL).get_key(kid)
     if not key:
         raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="Invalid token key")
 
@@ -17,6 +17,8 @@ from datetime import datetime, timezone
 from pathlib import Path
 from typing import Any, Dict, Optional
 
+from ..core.lazy import LazySingleton
+
 
 @dataclass
 class RecommendationContext:
@@ -510,8 +512,8 @@ class AiRecommendationStore:
         return results
 
 
-_ai_recommendation_store = AiRecommendationStore()
+_ai_recommendation_store = LazySingleton("ai_recommendation_store", AiRecommendationStore)
 
 
 def get_ai_recommendation_store() -> AiRecommendationStore:
-    return _ai_recommendation_store
+    return _ai_recommendation_store.get()
@@ -10,21 +10,6 @@ from typing import List, Dict, Any, Optional, Tuple
 from datetime import datetime, timedelta
 
 from ..llm.openai_manager import llm_manager
-from ..agents.coordinator import AgentCoordinator
-from ..agents.technical_agent import TechnicalAgent
-from ..agents.global_market_agent import GlobalMarketAgent
-from ..agents.policy_macro_agent import PolicyMacroAgent
-from ..agents.options_agent import OptionsAgent
-from ..agents.sentiment_agent import SentimentAgent
-from ..agents.microstructure_agent import MicrostructureAgent
-from ..agents.risk_agent import RiskAgent
-from ..agents.pattern_recognition_agent import PatternRecognitionAgent
-from ..agents.market_regime_agent import MarketRegimeAgent
-from ..agents.trade_strategy_agent import TradeStrategyAgent
-from ..agents.watchlist_intelligence_agent import WatchlistIntelligenceAgent
-from ..agents.auto_monitoring_agent import AutoMonitoringAgent
-from ..agents.personalization_agent import PersonalizationAgent
-from ..agents.scalping_agent import ScalpingAgent
 from ..services.top_picks_engine import get_latest_picks
 from ..providers.finnhub_provider import get_finnhub_provider
 from ..providers.alphavantage_provider import get_alphavantage_provider
@@ -33,6 +18,8 @@ from ..services.news_aggregator import get_symbol_news
 from ..services.external_fundamentals import fetch_external_fundamentals
 from ..services.redis_client import get_json
 from ..services.memory import MEMORY
+from ..core.lazy import LazySingleton
+from ..agents.registry import build_coordinator
 from pathlib import Path
 import json as _json
 
@@ -54,43 +41,9 @@ class ARISChat:
         
         print("[CHAT] ARISChat initializing (Fyntrix multi-agent chat service)...")
 
-        # Initialize multi-agent coordinator (10+ agents), aligned with agents router
-        self.coordinator = AgentCoordinator()
-
-        # 11 scoring agents
-        self.coordinator.register_agent(TechnicalAgent(weight=0.20))
-        self.coordinator.register_agent(PatternRecognitionAgent(weight=0.18))
-        self.coordinator.register_agent(MarketRegimeAgent(weight=0.15))
-        self.coordinator.register_agent(GlobalMarketAgent(weight=0.12))
-        self.coordinator.register_agent(OptionsAgent(weight=0.12))
-        self.coordinator.register_agent(SentimentAgent(weight=0.10))
-        self.coordinator.register_agent(PolicyMacroAgent(weight=0.08))
-        self.coordinator.register_agent(ScalpingAgent(weight=0.03))
-        self.coordinator.register_agent(WatchlistIntelligenceAgent(weight=0.01))
-        self.coordinator.register_agent(MicrostructureAgent(weight=0.01))
-        self.coordinator.register_agent(RiskAgent(weight=0.00))
-
-        # Super / utility agents (0 weight - do not affect blend score)
-        self.coordinator.register_agent(TradeStrategyAgent(weight=0.00))
-        self.coordinator.register_agent(AutoMonitoringAgent(weight=0.00))
-        self.coordinator.register_agent(PersonalizationAgent(weight=0.00))
-        
-        self.coordinator.set_weights({
-            'technical': 0.2037,
-            'pattern_recognition': 0.1833,
-            'market_regime': 0.1528,
-            'global': 0.12,
-            'options': 0.12,
-            'sentiment': 0.10,
-            'policy': 0.08,
-            'scalping': 0.03,
-            'watchlist_intelligence': 0.00,
-            'microstructure': 0.0102,
-            'risk': 0.00,
-            'trade_strategy': 0.00,
-            'auto_monitoring': 0.00,
-            'personalization': 0.00,
-        })
+        # Coordinator view over the shared agents (registry.py), same
+        # profile as the agents router
+        self.coordinator = build_coordinator('chat')
         
         # Conversation memory (in-memory for now)
         self.conversations: Dict[str, List[Dict[str, str]]] = {}
@@ -519,6 +472,7 @@ Respond ONLY in this JSON format:
 
             response = await asyncio.wait_for(
                 llm_manager.chat_completion(
+                    purpose="chat",
                     messages=[{"role": "user", "content": intent_prompt}],
                     complexity="simple",
                     max_tokens=150,
@@ -1060,6 +1014,7 @@ Generate a concise, intelligent response (max ~120 words):"""
         try:
             llm_response = await asyncio.wait_for(
                 llm_manager.chat_completion(
+                    purpose="chat",
                     messages=[
                         {
                             "role": "system",
@@ -1211,6 +1166,7 @@ Generate intelligent comparison (max 100 words):"""
         try:
             llm_response = await asyncio.wait_for(
                 llm_manager.chat_completion(
+                    purpose="chat",
                     messages=[
                         {
                             "role": "system",
@@ -1293,6 +1249,7 @@ Generate intelligent response (max 100 words):"""
 
             llm_response = await asyncio.wait_for(
                 llm_manager.chat_completion(
+                    purpose="chat",
                     messages=[
                         {
                             "role": "system",
@@ -1410,6 +1367,7 @@ Always end with exactly one short follow-up question to keep the conversation go
             
             llm_response = await asyncio.wait_for(
                 llm_manager.chat_completion(
+                    purpose="chat",
                     messages=[
                         {
                             "role": "system",
@@ -1497,6 +1455,7 @@ Keep response under ~150 words and actionable."""
 
             llm_response = await asyncio.wait_for(
                 llm_manager.chat_completion(
+                    purpose="chat",
                     messages=[
                         {"role": "system", "content": "You are Fyntrix, an intelligent trading assistant providing market insights. Be concise, structured, and always finish with one guiding follow-up question."},
                         {"role": "user", "content": market_prompt}
@@ -1566,6 +1525,7 @@ Keep response under ~150 words and actionable."""
             
             llm_response = await asyncio.wait_for(
                 llm_manager.chat_completion(
+                    purpose="chat",
                     messages=messages,
                     complexity="simple",
                     max_tokens=250,
@@ -1584,8 +1544,8 @@ Keep response under ~150 words and actionable."""
         }
 
 
-# Global instance
-aris_chat = ARISChat()
+# Global instance (built on first use)
+aris_chat = LazySingleton("aris_chat", ARISChat)
 
 
 # Convenience function
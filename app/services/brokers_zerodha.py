@@ -1,7 +1,11 @@
 import os
-from typing import Any, Dict, List, Optional
+from typing import TYPE_CHECKING, Any, Dict, List, Optional, Tuple
 
-from kiteconnect import KiteConnect
+if TYPE_CHECKING:
+    from kiteconnect import KiteConnect
+
+_KITE_CLIENTS: Dict[Tuple[str, str], "KiteConnect"] = {}
+_KITE_CLIENTS_MAX = 256
 
 
 class ZerodhaBroker:
@@ -11,17 +15,26 @@ class ZerodhaBroker:
         if not self.api_key or not self.api_secret:
             raise RuntimeError("ZERODHA_API_KEY/ZERODHA_API_SECRET not configured")
 
+    def _client(self) -> "KiteConnect":
+        from kiteconnect import KiteConnect
+        return KiteConnect(api_key=self.api_key)
+
     def get_login_url(self) -> str:
-        kite = KiteConnect(api_key=self.api_key)
-        return kite.login_url()
+        return self._client().login_url()
 
     def generate_session(self, request_token: str) -> Dict[str, Any]:
-        kite = KiteConnect(api_key=self.api_key)
-        return kite.generate_session(request_token=request_token, api_secret=self.api_secret)
-
-    def _kite(self, access_token: str) -> KiteConnect:
-        kite = KiteConnect(api_key=self.api_key)
-        kite.set_access_token(access_token)
+        return self._client().generate_session(request_token=request_token, api_secret=self.api_secret)
+
+    def _kite(self, access_token: str) -> "KiteConnect":
+        # Reuse one client (and its HTTP connection pool) per token
+        key = (self.api_key, access_token)
+        kite = _KITE_CLIENTS.get(key)
+        if kite is None:
+            kite = self._client()
+            kite.set_access_token(access_token)
+            if len(_KITE_CLIENTS) >= _KITE_CLIENTS_MAX:
+                _KITE_CLIENTS.pop(next(iter(_KITE_CLIENTS)))
+            _KITE_CLIENTS[key] = kite
         return kite
 
     def place_order(
@@ -9,6 +9,7 @@ from typing import Any, Dict, Optional
 from datetime import datetime, timedelta
 
 from ..core.market_hours import is_cash_market_open_ist
+from ..core.tracing import span
 from .redis_cache import general_cache
 
 # TTL configurations
@@ -58,18 +59,18 @@ async def get_cached(
     """
     market_open = _is_market_open(region)
     
-    # Check Redis cache first
-    cached_data = general_cache.get(key)
+    with span("cache", key.split(":", 1)[0], key=key) as s:
+        # Check Redis cache first
+        cached_data = general_cache.get(key)
+        
+        # If market closed and persist=True, try with longer TTL key
+        if cached_data is None and not market_open and persist:
+            cached_data = general_cache.get(f"{key}:persist")
+            s.set("persisted", cached_data is not None)
+        s.set("cache_hit", cached_data is not None)
     if cached_data is not None:
         return cached_data
     
-    # If market closed and persist=True, try with longer TTL key
-    if not market_open and persist:
-        persist_key = f"{key}:persist"
-        persistent_data = general_cache.get(persist_key)
-        if persistent_data is not None:
-            return persistent_data
-    
     # Fetch fresh data
     try:
         val = await fetcher()
@@ -0,0 +1,295 @@
+"""Local OHLCV candle archive and point-in-time replay sessions.
+
+The archive is a dedicated SQLite file (cache/candle_archive.db) holding
+candles per (symbol, interval) keyed by the bar open time in UTC epoch
+seconds, i.e. the same ``time`` convention used by ZerodhaService and
+ChartDataService.
+
+A *replay session* pins an ``as_of`` timestamp. While a session is active
+in the current context (see ``replay_session``), MarketDataProvider and
+ChartDataService serve candles from the archive instead of upstream
+sources, and only return bars that had fully closed at ``as_of``. This is
+what lets the replay backtester run agents for a historical date without
+look-ahead.
+"""
+
+from __future__ import annotations
+
+import contextlib
+import contextvars
+import sqlite3
+from dataclasses import dataclass
+from datetime import datetime, timedelta
+from pathlib import Path
+from typing import Any, Dict, Iterable, Iterator, List, Optional
+
+import pandas as pd
+
+from ..core.market_hours import IST_OFFSET
+
+
+DB_PATH = Path("cache/candle_archive.db")
+
+# Canonical archive intervals (MarketDataProvider naming) and their bar
+# length in seconds. Daily bars are handled separately because they close
+# at the end of the cash session, not 24h after they open.
+INTERVAL_SECONDS: Dict[str, int] = {
+    "1m": 60,
+    "5m": 5 * 60,
+    "15m": 15 * 60,
+    "60m": 60 * 60,
+    "1d": 24 * 60 * 60,
+}
+
+# ChartDataService timeframe -> (archive interval, lookback days). Mirrors
+# the interval/days maps in ChartDataService._fetch_from_zerodha.
+CHART_TIMEFRAMES: Dict[str, tuple] = {
+    "1D": ("5m", 3),
+    "1W": ("60m", 7),
+    "1M": ("60m", 30),
+    "1Y": ("1d", 365),
+}
+
+SESSION_CLOSE_MINUTES = 15 * 60 + 30
+
+_CANDLE_COLUMNS = ["time", "open", "high", "low", "close", "volume"]
+
+
+def _ist_date_of(ts: int) -> datetime:
+    """Return the naive IST calendar date (midnight) for a UTC epoch ts."""
+    ist = datetime.utcfromtimestamp(int(ts)) + IST_OFFSET
+    return ist.replace(hour=0, minute=0, second=0, microsecond=0)
+
+
+def bar_close_ts(ts: int, interval: str) -> int:
+    """Return the UTC epoch second at which a bar opened at ``ts`` closes."""
+    if interval == "1d":
+        close_ist = _ist_date_of(ts) + timedelta(minutes=SESSION_CLOSE_MINUTES)
+        return int((close_ist - IST_OFFSET - datetime(1970, 1, 1)).total_seconds())
+    return int(ts) + INTERVAL_SECONDS.get(interval, 60)
+
+
+def ist_to_epoch(dt_ist: datetime) -> int:
+    """Convert a naive IST datetime to UTC epoch seconds."""
+    return int((dt_ist - IST_OFFSET - datetime(1970, 1, 1)).total_seconds())
+
+
+class CandleArchive:
+    """SQLite-backed candle archive used for point-in-time replays.
+
+    Uses a dedicated DB file separate from production stores.
+    """
+
+    def __init__(self, db_path: Path = DB_PATH) -> None:
+        self.db_path = Path(db_path)
+        self.db_path.parent.mkdir(parents=True, exist_ok=True)
+        self._init_db()
+
+    def _connect(self) -> sqlite3.Connection:
+        return sqlite3.connect(self.db_path)
+
+    def _init_db(self) -> None:
+        conn = self._connect()
+        cursor = conn.cursor()
+        cursor.execute(
+            """
+            CREATE TABLE IF NOT EXISTS candles (
+                symbol TEXT NOT NULL,
+                interval TEXT NOT NULL,
+                ts INTEGER NOT NULL,
+                open REAL NOT NULL,
+                high REAL NOT NULL,
+                low REAL NOT NULL,
+                close REAL NOT NULL,
+                volume INTEGER NOT NULL DEFAULT 0,
+                PRIMARY KEY (symbol, interval, ts)
+            ) WITHOUT ROWID
+            """
+        )
+        conn.commit()
+        conn.close()
+
+    def upsert_frame(self, symbol: str, interval: str, df: pd.DataFrame) -> int:
+        """Insert or replace candles from a DataFrame with a ``time`` column.
+
+        Returns the number of rows written.
+        """
+        if df is None or len(df) == 0:
+            return 0
+
+        frame = df
+        if "time" not in frame.columns:
+            # MarketDataProvider fallbacks return a DatetimeIndex named 'date'.
+            idx = pd.to_datetime(frame.index)
+            if idx.tz is None:
+                idx = idx.tz_localize("Asia/Kolkata")
+            frame = frame.copy()
+            frame["time"] = idx.tz_convert("UTC").asi8 // 10**9
+
+        rows = [
+            (
+                symbol.upper(),
+                interval,
+                int(t),
+                float(o),
+                float(h),
+                float(l),
+                float(c),
+                int(v or 0),
+            )
+            for t, o, h, l, c, v in frame[_CANDLE_COLUMNS].itertuples(index=False, name=None)
+        ]
+
+        conn = self._connect()
+        conn.executemany(
+            """
+            INSERT OR REPLACE INTO candles
+                (symbol, interval, ts, open, high, low, close, volume)
+            VALUES (?, ?, ?, ?, ?, ?, ?, ?)
+            """,
+            rows,
+        )
+        conn.commit()
+        conn.close()
+        return len(rows)
+
+    def load_frame(
+        self,
+        symbol: str,
+        interval: str,
+        start_ts: Optional[int] = None,
+        end_ts: Optional[int] = None,
+    ) -> pd.DataFrame:
+        """Load candles with ``start_ts <= time <= end_ts`` ordered by time."""
+        clauses = ["symbol = ?", "interval = ?"]
+        params: List[Any] = [symbol.upper(), interval]
+        if start_ts is not None:
+            clauses.append("ts >= ?")
+            params.append(int(start_ts))
+        if end_ts is not None:
+            clauses.append("ts <= ?")
+            params.append(int(end_ts))
+
+        conn = self._connect()
+        rows = conn.execute(
+            "SELECT ts, open, high, low, close, volume FROM candles WHERE "
+            + " AND ".join(clauses)
+            + " ORDER BY ts",
+            tuple(params),
+        ).fetchall()
+        conn.close()
+        return pd.DataFrame(rows, columns=_CANDLE_COLUMNS)
+
+    def trading_days(self, symbol: str, start_ist: datetime, end_ist: datetime) -> List[datetime]:
+        """Return IST dates (midnight) with a daily bar for ``symbol`` in range."""
+        frame = self.load_frame(
+            symbol,
+            "1d",
+            start_ts=ist_to_epoch(start_ist) - 86400,
+            end_ts=ist_to_epoch(end_ist) + 86400,
+        )
+        days = sorted({_ist_date_of(t) for t in frame["time"].tolist()})
+        return [d for d in days if start_ist.date() <= d.date() <= end_ist.date()]
+
+    def symbols(self, interval: str = "1d") -> List[str]:
+        conn = self._connect()
+        rows = conn.execute(
+            "SELECT DISTINCT symbol FROM candles WHERE interval = ? ORDER BY symbol",
+            (interval,),
+        ).fetchall()
+        conn.close()
+        return [r[0] for r in rows]
+
+
+@dataclass
+class ReplaySession:
+    """Point-in-time view of a CandleArchive.
+
+    Only bars whose close time is at or before ``as_of_ts`` are visible,
+    so agents cannot observe prices from after the simulated decision time.
+    """
+
+    archive: CandleArchive
+    as_of_ts: int
+
+    @property
+    def as_of_ist(self) -> datetime:
+        return datetime.utcfromtimestamp(self.as_of_ts) + IST_OFFSET
+
+    def fetch_ohlcv(self, symbol: str, interval: str = "1d", days: int = 365) -> Optional[pd.DataFrame]:
+        """Archive-backed equivalent of MarketDataProvider.fetch_ohlcv."""
+        start_ts = self.as_of_ts - int(days) * 86400
+        frame = self.archive.load_frame(symbol, interval, start_ts=start_ts, end_ts=self.as_of_ts)
+        if frame.empty:
+            return None
+        closes = frame["time"].map(lambda t: bar_close_ts(t, interval))
+        frame = frame[closes <= self.as_of_ts].reset_index(drop=True)
+        return frame if len(frame) > 0 else None
+
+    def fetch_chart_frame(self, symbol: str, timeframe: str) -> Optional[pd.DataFrame]:
+        """Archive-backed candles for a ChartDataService timeframe."""
+        interval, days = CHART_TIMEFRAMES.get(timeframe, ("1d", 30))
+        return self.fetch_ohlcv(symbol, interval=interval, days=days)
+
+    def forward_candles(self, symbol: str, interval: str, end_ts: int) -> List[Dict[str, Any]]:
+        """Candles opening at or after ``as_of`` up to ``end_ts`` (for outcome scoring only).
+
+        The bar that opens exactly at the decision time (e.g. the 09:30 5m bar)
+        is the first forward bar and belongs in the outcome path.
+        """
+        frame = self.archive.load_frame(symbol, interval, start_ts=self.as_of_ts, end_ts=end_ts)
+        return frame.to_dict("records")
+
+
+_replay_session: contextvars.ContextVar[Optional[ReplaySession]] = contextvars.ContextVar(
+    "replay_session", default=None
+)
+
+
+def get_replay_session() -> Optional[ReplaySession]:
+    """Return the active ReplaySession for this context, if any."""
+    return _replay_session.get()
+
+
+def is_replay_active() -> bool:
+    return _replay_session.get() is not None
+
+
+@contextlib.contextmanager
+def replay_session(archive: CandleArchive, as_of_ts: int) -> Iterator[ReplaySession]:
+    """Activate a point-in-time replay for the current context."""
+    session = ReplaySession(archive=archive, as_of_ts=int(as_of_ts))
+    token = _replay_session.set(session)
+    try:
+        yield session
+    finally:
+        _replay_session.reset(token)
+
+
+async def archive_history(
+    symbols: Iterable[str],
+    intervals: Iterable[str] = ("1d",),
+    days: int = 730,
+    archive: Optional[CandleArchive] = None,
+) -> Dict[str, int]:
+    """Populate the archive from Zerodha for the given symbols/intervals.
+
+    Only the authenticated Zerodha source is used so that demo/fallback
+    data never ends up in the archive. Returns rows written per symbol.
+    """
+    from .market_data_provider import market_data_provider
+
+    archive = archive or CandleArchive()
+    written: Dict[str, int] = {}
+    for symbol in symbols:
+        total = 0
+        for interval in intervals:
+            try:
+                df = await market_data_provider._fetch_from_zerodha(symbol, interval, days)
+            except Exception as e:
+                print(f"[CandleArchive] Fetch failed for {symbol}/{interval}: {e}")
+                continue
+            total += archive.upsert_frame(symbol, interval, df)
+        written[symbol.upper()] = total
+        print(f"[CandleArchive] {symbol}: {total} candles archived")
+    return written
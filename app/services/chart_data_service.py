@@ -38,6 +38,11 @@ except ImportError:
     KITE_AVAILABLE = False
     zerodha_service = None
 
+from .candle_archive import CHART_TIMEFRAMES, get_replay_session
+from .live_candles import live_candles
+from ..core.candles import Candles
+from ..core.tracing import span
+
 
 class ChartDataService:
     """
@@ -45,12 +50,9 @@ class ChartDataService:
     """
     
     def __init__(self):
-        # Use the global zerodha_service instance that was authenticated via API
+        # Use the global zerodha_service instance that was authenticated via API.
+        # It is built on first use; ZerodhaService logs its own auth state then.
         self.zerodha = zerodha_service if KITE_AVAILABLE else None
-        if self.zerodha and self.zerodha.access_token:
-            print("[OK] Zerodha Kite connected (authenticated)")
-        elif self.zerodha:
-            print("[WARN] Zerodha available but not authenticated yet")
     
     async def fetch_chart_data(
         self,
@@ -65,8 +67,22 @@ class ChartDataService:
             timeframe: '1M', '3M', '6M', '1Y'
             
         Returns:
-            Dict with candles, signals, current price
+            Dict with candles (a columnar ``Candles``), signals, current price
         """
+
+        # Point-in-time replay: candles come from the local archive only.
+        replay = get_replay_session()
+        if replay is not None:
+            df = replay.fetch_chart_frame(symbol, timeframe)
+            if df is None or len(df) == 0:
+                raise ValueError(f"No archived candles for {symbol}/{timeframe}")
+            return self._format_chart_response(symbol, timeframe, df, "Replay Archive")
+
+        # Intraday timeframes (1D) can be served from tick-built candles
+        interval, days = CHART_TIMEFRAMES.get(timeframe, ("1d", 30))
+        df = live_candles.window(symbol, interval, days)
+        if df is not None:
+            return self._format_chart_response(symbol, timeframe, df, "Live Ticks")
         
         print(f"\n{'='*60}")
         print(f"Fetching chart data: {symbol} / {timeframe}")
@@ -91,7 +107,10 @@ class ChartDataService:
         for source_name, fetch_func in sources:
             try:
                 print(f"\nTrying {source_name}...")
-                df = await fetch_func(symbol, timeframe)
+                source = fetch_func.__name__.replace('_fetch_from_', '')
+                with span("fetch", f"chart:{source}", symbol=symbol, timeframe=timeframe) as s:
+                    df = await fetch_func(symbol, timeframe)
+                    s.set("bars", len(df) if df is not None else 0)
                 if df is not None and len(df) > 0:
                     print(f"SUCCESS: {source_name} returned {len(df)} candles")
                     return self._format_chart_response(symbol, timeframe, df, source_name)
@@ -496,18 +515,9 @@ class ChartDataService:
         # Calculate change
         change_pct = ((latest['close'] - first['open']) / first['open']) * 100
         
-        # Convert DataFrame to list of dicts with explicit float conversion
-        # Round prices to 2 decimal places for clarity
-        candles = []
-        for _, row in df.iterrows():
-            candles.append({
-                'time': int(row['time']),
-                'open': round(float(row['open']), 2),
-                'high': round(float(row['high']), 2),
-                'low': round(float(row['low']), 2),
-                'close': round(float(row['close']), 2),
-                'volume': int(row['volume'])
-            })
+        # Columnar candles (prices rounded to 2 decimals); consumers read
+        # them as dicts or as a DataFrame without a per-row conversion
+        candles = Candles.from_frame(df)
         
         return {
             'symbol': symbol,
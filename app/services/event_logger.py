@@ -5,13 +5,13 @@ import uuid
 from datetime import datetime
 from pathlib import Path
 from typing import Any, Dict
-from app.utils.json_encoder import safe_json_dumps, convert_numpy_types
+from app.utils.json_encoder import fast_json_dumps
+from app.services.event_rollups import event_rollups
 
 
 # Base directory: repo_root/data/events/{event_type}/YYYY/MM/DD/events.jsonl
 _REPO_ROOT = Path(__file__).resolve().parents[3]
 _BASE_DIR = _REPO_ROOT / "data" / "events"
-_BASE_DIR.mkdir(parents=True, exist_ok=True)
 
 
 # Simple runtime switches
@@ -60,26 +60,43 @@ def _writer() -> None:
             )
             day_dir.mkdir(parents=True, exist_ok=True)
             file_path = day_dir / "events.jsonl"
-            with open(file_path, "a", encoding="utf-8") as f:
-                # Convert numpy/pandas types before serialization
-                safe_event = convert_numpy_types(event)
-                f.write(safe_json_dumps(safe_event, separators=(",", ":")) + "\n")
+            with open(file_path, "ab") as f:
+                f.write(fast_json_dumps(event) + b"\n")
         except Exception as e:
             try:
                 print(f"[event_logger] write failed: {e}")
             except Exception:
                 pass
+        try:
+            event_rollups.record_event(event)
+        except Exception as e:
+            try:
+                print(f"[event_logger] rollup failed: {e}")
+            except Exception:
+                pass
         finally:
             _event_queue.task_done()
 
 
-_thread = threading.Thread(target=_writer, daemon=True)
-_thread.start()
+# Writer thread starts with the first event rather than at import
+_thread: "threading.Thread | None" = None
+_thread_lock = threading.Lock()
+
+
+def _ensure_writer() -> None:
+    global _thread
+    if _thread is not None:
+        return
+    with _thread_lock:
+        if _thread is None:
+            _thread = threading.Thread(target=_writer, name="event-logger", daemon=True)
+            _thread.start()
 
 
 def log_event(event_type: str, source: str, payload: Dict[str, Any]) -> None:
     if not _is_event_enabled(event_type):
         return
+    _ensure_writer()
 
     event: Dict[str, Any] = {
         "id": uuid.uuid4().hex,
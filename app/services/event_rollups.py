@@ -0,0 +1,615 @@
+"""
+Event Rollups
+Pre-aggregated per-minute/hour/day counters and gauges for event-log
+analytics, so dashboards do not re-parse raw JSONL files.
+
+Events are fed in by ``event_logger`` as they are written (and by
+``PicksAnalytics`` for its own logs). Each event updates one row per
+(resolution, bucket, event_type, source, dims, metric) where ``dims`` are
+the payload keys named in the event type's ``RollupSpec``. A row holds
+n/sum/min/max and a fixed-bucket histogram, which is enough for range
+queries, group-by on dims and approximate percentiles.
+
+Updates are merged in memory and flushed to SQLite (cache/event_rollups.db)
+every few seconds and before every query.
+
+Backfill existing logs:
+    python -m app.services.event_rollups backfill [--days N]
+"""
+
+import argparse
+import atexit
+import json
+import math
+import sqlite3
+import threading
+import time
+from bisect import bisect_left
+from dataclasses import dataclass, field
+from datetime import datetime, timedelta, timezone
+from pathlib import Path
+from typing import Any, Callable, Dict, Iterable, List, Optional, Sequence, Tuple
+
+from ..core.lazy import LazySingleton
+
+
+MINUTE = 60
+HOUR = 3600
+DAY = 86400
+
+# Resolution label -> (bucket size in seconds, retention in seconds)
+RESOLUTIONS: Dict[str, Tuple[int, int]] = {
+    'm': (MINUTE, 3 * DAY),
+    'h': (HOUR, 45 * DAY),
+    'd': (DAY, 400 * DAY),
+}
+
+# Histogram upper bounds (values <= bound); last bucket is +Inf
+HIST_BOUNDS: Tuple[float, ...] = (
+    0, 1, 2, 5, 10, 20, 50, 100, 200, 500,
+    1_000, 2_000, 5_000, 10_000, 20_000, 50_000, 100_000, 1_000_000,
+)
+
+COUNT_METRIC = '_count'
+FLUSH_INTERVAL_SECONDS = 5.0
+
+
+@dataclass(frozen=True)
+class RollupSpec:
+    """How an event type is rolled up.
+
+    dims: payload keys that become group-by dimensions
+    metrics: numeric payload keys tracked as gauges (None = every top-level
+        numeric field)
+    flags: derived 0/1 metrics; their ``sum`` is the number of matching events
+    """
+
+    dims: Tuple[str, ...] = ()
+    metrics: Optional[Tuple[str, ...]] = None
+    flags: Dict[str, Callable[[Dict[str, Any]], bool]] = field(default_factory=dict)
+
+
+def _positive(key: str) -> Callable[[Dict[str, Any]], bool]:
+    def check(payload: Dict[str, Any]) -> bool:
+        try:
+            return float(payload.get(key) or 0) > 0
+        except (TypeError, ValueError):
+            return False
+    return check
+
+
+ROLLUP_SPECS: Dict[str, RollupSpec] = {
+    'scalping_monitor_cycle': RollupSpec(
+        metrics=('active_positions', 'exits_detected'),
+        flags={'has_positions': _positive('active_positions')},
+    ),
+    'top_picks_generated': RollupSpec(
+        dims=('universe', 'mode'),
+        metrics=('analysis_time_seconds', 'total_analyzed', 'passed_filter'),
+    ),
+    'top_picks_scheduled': RollupSpec(
+        dims=('universe', 'mode', 'trigger'),
+        metrics=('elapsed_seconds', 'items_count'),
+    ),
+    # High-volume streams: counts only
+    'market_tick': RollupSpec(metrics=()),
+    'ui_tick': RollupSpec(metrics=()),
+    'top_picks_ws': RollupSpec(metrics=()),
+    'ws_broadcast': RollupSpec(dims=('type',), metrics=()),
+    # PicksAnalytics
+    'picks_generated': RollupSpec(
+        dims=('universe', 'returned'),
+        metrics=('returned', 'requested', 'neutral_filtered'),
+        flags={'fewer_than_requested': lambda p: bool(p.get('fewer_than_requested'))},
+    ),
+    'pick_interaction': RollupSpec(dims=('action', 'universe'), metrics=()),
+    'user_feedback': RollupSpec(
+        dims=('feedback_type',),
+        metrics=('rating',),
+    ),
+}
+
+DEFAULT_SPEC = RollupSpec()
+
+
+def _parse_ts(value: Any) -> Optional[float]:
+    """Epoch seconds from an ISO timestamp (naive = UTC)."""
+    if not isinstance(value, str) or not value:
+        return None
+    try:
+        dt = datetime.fromisoformat(value.replace('Z', '+00:00'))
+    except ValueError:
+        return None
+    if dt.tzinfo is None:
+        dt = dt.replace(tzinfo=timezone.utc)
+    return dt.timestamp()
+
+
+def _to_epoch(value: Any) -> float:
+    if isinstance(value, datetime):
+        if value.tzinfo is None:
+            value = value.replace(tzinfo=timezone.utc)
+        return value.timestamp()
+    return float(value)
+
+
+def _number(value: Any) -> Optional[float]:
+    if isinstance(value, bool) or value is None:
+        return None
+    if isinstance(value, (int, float)):
+        return float(value) if math.isfinite(value) else None
+    return None
+
+
+def _dims_key(payload: Dict[str, Any], dims: Sequence[str]) -> str:
+    return json.dumps({d: payload.get(d) for d in dims}, sort_keys=True, separators=(',', ':'), default=str)
+
+
+class _Agg:
+    """n/sum/min/max plus histogram counts for one rollup row."""
+
+    __slots__ = ('n', 'sum', 'min', 'max', 'hist')
+
+    def __init__(self, n: int = 0, total: float = 0.0, lo: float = math.inf, hi: float = -math.inf, hist: Optional[List[int]] = None):
+        self.n = n
+        self.sum = total
+        self.min = lo
+        self.max = hi
+        self.hist = hist or [0] * (len(HIST_BOUNDS) + 1)
+
+    def observe(self, value: float) -> None:
+        self.n += 1
+        self.sum += value
+        self.min = min(self.min, value)
+        self.max = max(self.max, value)
+        self.hist[bisect_left(HIST_BOUNDS, value)] += 1
+
+    def merge(self, other: '_Agg') -> None:
+        self.n += other.n
+        self.sum += other.sum
+        self.min = min(self.min, other.min)
+        self.max = max(self.max, other.max)
+        self.hist = [a + b for a, b in zip(self.hist, other.hist)]
+
+    def percentile(self, q: float) -> Optional[float]:
+        """Approximate percentile by linear interpolation inside the histogram bucket."""
+        if self.n == 0:
+            return None
+        rank = q * self.n
+        seen = 0
+        for i, count in enumerate(self.hist):
+            if count and seen + count >= rank:
+                lower = HIST_BOUNDS[i - 1] if i > 0 else self.min
+                upper = HIST_BOUNDS[i] if i < len(HIST_BOUNDS) else self.max
+                lower, upper = max(lower, self.min), min(upper, self.max)
+                return lower + (upper - lower) * ((rank - seen) / count)
+            seen += count
+        return self.max
+
+
+RowKey = Tuple[str, int, str, str, str, str]  # (resolution, bucket, event_type, source, dims, metric)
+
+
+class EventRollupStore:
+    """SQLite-backed rollup store with an in-memory write buffer."""
+
+    def __init__(self, db_path: str = "cache/event_rollups.db"):
+        self.db_path = Path(db_path)
+        self.db_path.parent.mkdir(parents=True, exist_ok=True)
+        self._lock = threading.Lock()
+        self._pending: Dict[RowKey, _Agg] = {}
+        self._last_flush = time.monotonic()
+        self._last_prune = 0.0
+        self._init_db()
+
+    def _connect(self) -> sqlite3.Connection:
+        conn = sqlite3.connect(self.db_path, timeout=10)
+        conn.execute("PRAGMA journal_mode=WAL")
+        return conn
+
+    def _init_db(self) -> None:
+        conn = self._connect()
+        try:
+            conn.execute("""
+                CREATE TABLE IF NOT EXISTS event_rollups (
+                    resolution TEXT NOT NULL,
+                    bucket INTEGER NOT NULL,
+                    event_type TEXT NOT NULL,
+                    source TEXT NOT NULL,
+                    dims TEXT NOT NULL,
+                    metric TEXT NOT NULL,
+                    n INTEGER NOT NULL,
+                    sum REAL NOT NULL,
+                    min REAL,
+                    max REAL,
+                    hist TEXT NOT NULL,
+                    PRIMARY KEY (event_type, resolution, bucket, source, dims, metric)
+                )
+            """)
+            conn.commit()
+        finally:
+            conn.close()
+
+    # ==================== Ingest ====================
+
+    def record(
+        self,
+        event_type: str,
+        source: str,
+        payload: Dict[str, Any],
+        ts: Any = None,
+    ) -> None:
+        """Roll up one event. ``ts`` is an ISO string, datetime or epoch (default: now)."""
+        if ts is None:
+            epoch = time.time()
+        elif isinstance(ts, str):
+            epoch = _parse_ts(ts) or time.time()
+        else:
+            epoch = _to_epoch(ts)
+
+        payload = payload if isinstance(payload, dict) else {}
+        spec = ROLLUP_SPECS.get(event_type, DEFAULT_SPEC)
+        dims = _dims_key(payload, spec.dims)
+
+        values: List[Tuple[str, float]] = [(COUNT_METRIC, 1.0)]
+        keys = spec.metrics if spec.metrics is not None else sorted(payload)
+        for key in keys:
+            value = _number(payload.get(key))
+            if value is not None:
+                values.append((key, value))
+        for name, check in spec.flags.items():
+            try:
+                values.append((name, 1.0 if check(payload) else 0.0))
+            except Exception:
+                continue
+
+        with self._lock:
+            for resolution, (size, _) in RESOLUTIONS.items():
+                bucket = int(epoch // size * size)
+                for metric, value in values:
+                    row = (resolution, bucket, event_type, source or '', dims, metric)
+                    agg = self._pending.get(row)
+                    if agg is None:
+                        agg = self._pending[row] = _Agg()
+                    agg.observe(value)
+            due = time.monotonic() - self._last_flush >= FLUSH_INTERVAL_SECONDS
+
+        if due:
+            self.flush()
+
+    def record_event(self, event: Dict[str, Any]) -> None:
+        """Roll up an ``event_logger`` record."""
+        self.record(
+            str(event.get('event_type', 'unknown')),
+            str(event.get('source', '')),
+            event.get('payload') or {},
+            event.get('ts'),
+        )
+
+    def flush(self) -> int:
+        """Merge buffered rows into SQLite. Returns the number of rows written."""
+        with self._lock:
+            pending, self._pending = self._pending, {}
+            self._last_flush = time.monotonic()
+        if not pending:
+            return 0
+
+        try:
+            conn = self._connect()
+            try:
+                self._merge(conn, pending)
+                if time.time() - self._last_prune > HOUR:
+                    self._prune(conn)
+                    self._last_prune = time.time()
+                conn.commit()
+            finally:
+                conn.close()
+        except Exception as e:
+            print(f"[event_rollups] flush failed ({len(pending)} rows re-queued): {e}")
+            with self._lock:
+                for row, agg in pending.items():
+                    current = self._pending.get(row)
+                    if current is None:
+                        self._pending[row] = agg
+                    else:
+                        current.merge(agg)
+            return 0
+
+        return len(pending)
+
+    def _merge(self, conn: sqlite3.Connection, pending: Dict[RowKey, _Agg]) -> None:
+        # Read the existing rows this batch touches, merge in Python, write back
+        by_type: Dict[Tuple[str, str], List[RowKey]] = {}
+        for row in pending:
+            by_type.setdefault((row[2], row[0]), []).append(row)
+
+        for (event_type, resolution), rows in by_type.items():
+            buckets = sorted({r[1] for r in rows})
+            cursor = conn.execute(
+                """
+                SELECT resolution, bucket, event_type, source, dims, metric, n, sum, min, max, hist
+                FROM event_rollups
+                WHERE event_type = ? AND resolution = ? AND bucket BETWEEN ? AND ?
+                """,
+                (event_type, resolution, buckets[0], buckets[-1]),
+            )
+            for r in cursor:
+                key = tuple(r[:6])
+                if key in pending:
+                    pending[key].merge(_Agg(r[6], r[7], r[8], r[9], json.loads(r[10])))
+
+        conn.executemany(
+            """
+            INSERT OR REPLACE INTO event_rollups
+                (resolution, bucket, event_type, source, dims, metric, n, sum, min, max, hist)
+            VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+            """,
+            [(*row, agg.n, agg.sum, agg.min, agg.max, json.dumps(agg.hist)) for row, agg in pending.items()],
+        )
+
+    def _prune(self, conn: sqlite3.Connection) -> None:
+        now = time.time()
+        for resolution, (_, retention) in RESOLUTIONS.items():
+            conn.execute(
+                "DELETE FROM event_rollups WHERE resolution = ? AND bucket < ?",
+                (resolution, int(now - retention)),
+            )
+
+    # ==================== Query ====================
+
+    @staticmethod
+    def _cover(start: float, end: float, now: float) -> List[Tuple[str, int, int]]:
+        """Split [start, end) into day/hour/minute bucket ranges.
+
+        Full days use day rows, leftover hours hour rows and the edges minute
+        rows. Edges older than a resolution's retention are widened to the
+        enclosing coarser bucket.
+        """
+        levels = [('d', DAY), ('h', HOUR)]
+
+        def split(s: int, e: int, depth: int) -> List[Tuple[str, int, int]]:
+            if s >= e:
+                return []
+            if depth == len(levels):
+                return [('m', s, e)]
+            label, size = levels[depth]
+            a = -(-s // size) * size
+            b = e // size * size
+            if a >= b:
+                return split(s, e, depth + 1)
+            return split(s, a, depth + 1) + [(label, a, b)] + split(b, e, depth + 1)
+
+        s = int(start) // MINUTE * MINUTE
+        e = -(-int(end) // MINUTE) * MINUTE
+        ranges = split(s, e, 0)
+
+        coarser = {'m': ('h', HOUR), 'h': ('d', DAY)}
+        widened: List[Tuple[str, int, int]] = []
+        for label, a, b in ranges:
+            while label in coarser and a < now - RESOLUTIONS[label][1]:
+                label, size = coarser[label]
+                a, b = a // size * size, -(-b // size) * size
+            widened.append((label, a, b))
+        return widened
+
+    def query(
+        self,
+        event_type: str,
+        start: Any,
+        end: Any = None,
+        metric: str = COUNT_METRIC,
+        group_by: Sequence[str] = (),
+        where: Optional[Dict[str, Any]] = None,
+        source: Optional[str] = None,
+        percentiles: Sequence[float] = (),
+    ) -> List[Dict[str, Any]]:
+        """
+        Aggregate one metric of an event type over a time range.
+
+        Args:
+            event_type: Event type
+            start: Range start (datetime or epoch seconds, inclusive)
+            end: Range end (default: now, exclusive)
+            metric: Payload metric, flag name, or '_count' for event counts
+            group_by: Dimension names (from the event type's RollupSpec)
+            where: Dimension equality filters
+            source: Optional source filter
+            percentiles: Quantiles in [0, 1] to estimate from histograms
+
+        Returns:
+            One dict per group with the group's dims, n, sum, min, max, mean
+            and p<q> entries
+        """
+        self.flush()
+
+        now = time.time()
+        start_epoch = _to_epoch(start)
+        end_epoch = _to_epoch(end) if end is not None else now
+
+        # One primary-key range scan per covered resolution range
+        selects = []
+        params: List[Any] = []
+        for label, a, b in self._cover(start_epoch, end_epoch, now):
+            select = (
+                "SELECT source, dims, n, sum, min, max, hist FROM event_rollups "
+                "WHERE event_type = ? AND resolution = ? AND bucket >= ? AND bucket < ? AND metric = ?"
+            )
+            params.extend([event_type, label, a, b, metric])
+            if source is not None:
+                select += " AND source = ?"
+                params.append(source)
+            selects.append(select)
+        if not selects:
+            return []
+        sql = " UNION ALL ".join(selects)
+
+        conn = self._connect()
+        try:
+            rows = conn.execute(sql, params).fetchall()
+        finally:
+            conn.close()
+
+        groups: Dict[Tuple[Any, ...], _Agg] = {}
+        for _, dims_json, n, total, lo, hi, hist in rows:
+            dims = json.loads(dims_json)
+            if where and any(dims.get(k) != v for k, v in where.items()):
+                continue
+            key = tuple(dims.get(g) for g in group_by)
+            agg = _Agg(n, total, lo, hi, json.loads(hist))
+            if key in groups:
+                groups[key].merge(agg)
+            else:
+                groups[key] = agg
+
+        results = []
+        for key, agg in groups.items():
+            item: Dict[str, Any] = dict(zip(group_by, key))
+            item.update({
+                'n': agg.n,
+                'sum': agg.sum,
+                'min': agg.min if agg.n else None,
+                'max': agg.max if agg.n else None,
+                'mean': agg.sum / agg.n if agg.n else None,
+            })
+            for q in percentiles:
+                item[f"p{round(q * 100):g}"] = agg.percentile(q)
+            results.append(item)
+        return results
+
+    def total(self, event_type: str, start: Any, end: Any = None, metric: str = COUNT_METRIC, **filters: Any) -> Dict[str, Any]:
+        """Single aggregate over the range (no grouping)."""
+        rows = self.query(event_type, start, end, metric=metric, **filters)
+        if rows:
+            return rows[0]
+        return {'n': 0, 'sum': 0.0, 'min': None, 'max': None, 'mean': None}
+
+    # ==================== Backfill ====================
+
+    def backfill_events(self, events_dir: Path, since: Optional[datetime] = None) -> int:
+        """Roll up data/events/{event_type}/YYYY/MM/DD/events.jsonl files."""
+        count = 0
+        for file_path in sorted(events_dir.glob('*/*/*/*/events.jsonl')):
+            try:
+                day = datetime(int(file_path.parts[-4]), int(file_path.parts[-3]), int(file_path.parts[-2]))
+            except ValueError:
+                continue
+            if since is not None and day < since.replace(hour=0, minute=0, second=0, microsecond=0):
+                continue
+            count += self._backfill_lines(file_path, self.record_event)
+        return count
+
+    def backfill_jsonl(
+        self,
+        file_path: Path,
+        to_event: Callable[[Dict[str, Any]], Optional[Tuple[str, str, Dict[str, Any], Any]]],
+        since: Optional[datetime] = None,
+    ) -> int:
+        """Roll up an arbitrary JSONL log; ``to_event`` maps a line to (event_type, source, payload, ts).
+
+        With ``since``, lines timestamped before it (or without a timestamp) are skipped.
+        """
+        since_epoch = _to_epoch(since) if since is not None else None
+
+        def ingest(entry: Dict[str, Any]) -> None:
+            mapped = to_event(entry)
+            if mapped is None:
+                return
+            if since_epoch is not None:
+                ts = mapped[3]
+                epoch = _parse_ts(ts) if isinstance(ts, str) else (_to_epoch(ts) if ts is not None else None)
+                if epoch is None or epoch < since_epoch:
+                    return
+            self.record(*mapped)
+        return self._backfill_lines(file_path, ingest)
+
+    def _backfill_lines(self, file_path: Path, ingest: Callable[[Dict[str, Any]], None]) -> int:
+        count = 0
+        try:
+            with open(file_path, 'rb') as f:
+                for line in f:
+                    if not line.strip():
+                        continue
+                    try:
+                        ingest(json.loads(line))
+                        count += 1
+                    except Exception:
+                        continue
+        except Exception as e:
+            print(f"[event_rollups] backfill skipped {file_path}: {e}")
+        self.flush()
+        return count
+
+    def clear(self, event_types: Optional[Iterable[str]] = None, since: Optional[datetime] = None) -> None:
+        """Delete rollups before a re-backfill.
+
+        ``event_types`` limits the delete to those types; ``since`` to buckets
+        starting at or after it (pass a UTC midnight so day rows are whole).
+        """
+        types = set(event_types) if event_types is not None else None
+        since_bucket = int(_to_epoch(since)) if since is not None else None
+        with self._lock:
+            self._pending = {
+                k: v for k, v in self._pending.items()
+                if not ((types is None or k[2] in types) and (since_bucket is None or k[1] >= since_bucket))
+            }
+        clauses, params = [], []
+        if types is not None:
+            clauses.append(f"event_type IN ({', '.join('?' for _ in types)})")
+            params.extend(sorted(types))
+        if since_bucket is not None:
+            clauses.append("bucket >= ?")
+            params.append(since_bucket)
+        where = f" WHERE {' AND '.join(clauses)}" if clauses else ""
+        conn = self._connect()
+        try:
+            conn.execute(f"DELETE FROM event_rollups{where}", params)
+            conn.commit()
+        finally:
+            conn.close()
+
+
+# Global instance (built on first use)
+event_rollups = LazySingleton("event_rollups", EventRollupStore)
+
+
+@atexit.register
+def _flush_at_exit() -> None:
+    if event_rollups.initialized:
+        event_rollups.flush()
+
+
+def get_event_rollups() -> EventRollupStore:
+    return event_rollups.get()
+
+
+def _main() -> None:
+    parser = argparse.ArgumentParser(description="Event rollup maintenance")
+    sub = parser.add_subparsers(dest='command', required=True)
+    backfill = sub.add_parser('backfill', help='Rebuild rollups from existing event logs')
+    backfill.add_argument('--days', type=int, default=None, help='Only days newer than this many days')
+    backfill.add_argument('--events-dir', default=None, help='event_logger base directory')
+    backfill.add_argument('--keep', action='store_true', help='Do not clear existing rollups first')
+    backfill.add_argument('--clear-all', action='store_true',
+                          help='With --days, clear all history instead of only the backfilled window')
+    args = parser.parse_args()
+
+    from .event_logger import _BASE_DIR
+    from .picks_analytics import picks_analytics
+
+    since = None
+    if args.days:
+        since = (datetime.utcnow() - timedelta(days=args.days)).replace(hour=0, minute=0, second=0, microsecond=0)
+    events_dir = Path(args.events_dir) if args.events_dir else _BASE_DIR
+
+    if not args.keep:
+        # Only the window being refilled is cleared, unless asked otherwise
+        event_rollups.clear(since=None if args.clear_all else since)
+    t0 = time.perf_counter()
+    events = event_rollups.backfill_events(events_dir, since)
+    picks = picks_analytics.backfill_rollups(event_rollups, since=since)
+    print(f"[event_rollups] backfilled {events} event_logger events and {picks} picks analytics entries "
+          f"in {time.perf_counter() - t0:.1f}s -> {event_rollups.db_path}")
+
+
+if __name__ == '__main__':
+    _main()
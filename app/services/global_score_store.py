@@ -14,20 +14,8 @@ from pathlib import Path
 import json
 from collections import defaultdict
 
-from ..agents.coordinator import AgentCoordinator
-from ..agents.technical_agent import TechnicalAgent
-from ..agents.global_market_agent import GlobalMarketAgent
-from ..agents.policy_macro_agent import PolicyMacroAgent
-from ..agents.options_agent import OptionsAgent
-from ..agents.sentiment_agent import SentimentAgent
-from ..agents.microstructure_agent import MicrostructureAgent
-from ..agents.risk_agent import RiskAgent
-from ..agents.pattern_recognition_agent import PatternRecognitionAgent
-from ..agents.market_regime_agent import MarketRegimeAgent
-from ..agents.watchlist_intelligence_agent import WatchlistIntelligenceAgent
-from ..agents.trade_strategy_agent import TradeStrategyAgent
-from ..agents.auto_monitoring_agent import AutoMonitoringAgent
-from ..agents.personalization_agent import PersonalizationAgent
+from ..core.lazy import LazySingleton
+from ..agents.registry import build_coordinator
 
 # Import recommendation system for actionable picks
 from ..utils.recommendation_system import (
@@ -67,44 +55,8 @@ class GlobalScoreStore:
         # Load existing cache
         self._load_cache()
         
-        # Initialize 13-agent coordinator
-        self.coordinator = AgentCoordinator()
-        self._setup_agents()
-    
-    def _setup_agents(self):
-        """Setup the 13-agent system with proper weights"""
-        # 10 Core Scoring Agents (100% total)
-        self.coordinator.register_agent(TechnicalAgent(weight=0.20))
-        self.coordinator.register_agent(GlobalMarketAgent(weight=0.12))
-        self.coordinator.register_agent(PolicyMacroAgent(weight=0.08))
-        self.coordinator.register_agent(OptionsAgent(weight=0.12))
-        self.coordinator.register_agent(SentimentAgent(weight=0.12))
-        self.coordinator.register_agent(MicrostructureAgent(weight=0.08))
-        self.coordinator.register_agent(RiskAgent(weight=0.08))
-        self.coordinator.register_agent(PatternRecognitionAgent(weight=0.10))
-        self.coordinator.register_agent(MarketRegimeAgent(weight=0.05))
-        self.coordinator.register_agent(WatchlistIntelligenceAgent(weight=0.05))
-        
-        # 3 Utility Agents (0 weight - not scored)
-        self.coordinator.register_agent(TradeStrategyAgent(weight=0.00))
-        self.coordinator.register_agent(AutoMonitoringAgent(weight=0.00))
-        self.coordinator.register_agent(PersonalizationAgent(weight=0.00))
-        
-        self.coordinator.set_weights({
-            'technical': 0.2233,
-            'global': 0.12,
-            'policy': 0.08,
-            'options': 0.12,
-            'sentiment': 0.12,
-            'microstructure': 0.0893,
-            'risk': 0.08,
-            'pattern': 0.1116,
-            'regime': 0.0558,
-            'watchlist': 0.00,
-            'trade_strategy': 0.00,
-            'auto_monitoring': 0.00,
-            'personalization': 0.00
-        })
+        # Coordinator view over the shared agents (registry.py)
+        self.coordinator = build_coordinator('top_picks')
     
     def _is_cache_valid(self) -> bool:
         """Check if current cache is still valid"""
@@ -328,8 +280,8 @@ class GlobalScoreStore:
         print(f"[GlobalScoreStore] Cache invalidated")
 
 
-# Global instance
-global_score_store = GlobalScoreStore(cache_ttl_hours=6)
+# Global instance (built on first use)
+global_score_store = LazySingleton("global_score_store", lambda: GlobalScoreStore(cache_ttl_hours=6))
 
 
 # Convenience functions
@@ -0,0 +1,579 @@
+"""Instrument Master
+
+One consolidated Kite instrument list (NSE, NFO, BSE by default) shared by
+every Zerodha consumer in the process.
+
+The dump is downloaded once per trading day (again if the first download
+ran before Kite published the day's list) and persisted under
+``cache/instruments/<YYYYMMDD>/`` as one ``.npy`` array per column; later
+processes memory-map the latest snapshot instead of downloading again.
+
+Lookups:
+- (exchange, tradingsymbol) -> token and token -> (exchange, tradingsymbol)
+  dictionaries (O(1)); common index aliases (NIFTY, BANKNIFTY) resolve to
+  their NSE index instruments
+- search: exact, then prefix (bisect over sorted symbols), then substring
+  matches narrowed by a trigram index over symbol + name; the trigram
+  index covers non-derivative instruments, derivatives are searched by
+  prefix
+- derivatives: per-underlying rows sorted by (expiry, strike, type) for
+  expiry lists, option chains, single contracts and the nearest future
+
+Configuration (environment):
+- INSTRUMENT_MASTER_EXCHANGES: comma separated exchanges (default NSE,NFO,BSE)
+- INSTRUMENT_MASTER_PUBLISH_TIME: IST time Kite publishes the day's list
+  (default 08:30); snapshots fetched earlier are refreshed after it
+"""
+
+import json
+import os
+import shutil
+import threading
+import heapq
+import time
+from bisect import bisect_left
+from collections import defaultdict
+from collections.abc import Mapping
+from datetime import date, datetime, time as dt_time
+from pathlib import Path
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+
+import numpy as np
+
+from ..core.market_hours import IST_OFFSET, now_ist
+
+
+INSTRUMENT_EXCHANGES = tuple(
+    e.strip().upper()
+    for e in os.getenv("INSTRUMENT_MASTER_EXCHANGES", "NSE,NFO,BSE").split(",")
+    if e.strip()
+)
+MASTER_DIR = Path("cache/instruments")
+KEEP_SNAPSHOTS = 3
+REFRESH_RETRY_SECONDS = 600  # after a failed download, reuse the old snapshot this long
+SEARCH_LIMIT = 10
+
+
+def _publish_time() -> dt_time:
+    raw = os.getenv("INSTRUMENT_MASTER_PUBLISH_TIME", "08:30")
+    try:
+        hh, mm = (int(x) for x in raw.split(":"))
+        return dt_time(hh, mm)
+    except ValueError:
+        return dt_time(8, 30)
+
+
+# Kite publishes the day's instrument list around this time (IST); dumps
+# taken earlier still carry the previous day's contracts
+PUBLISH_TIME_IST = _publish_time()
+
+DERIVATIVE_TYPES = ("FUT", "CE", "PE")
+
+# Names callers use for indices -> Kite NSE index tradingsymbols
+INDEX_ALIASES = {
+    "NIFTY": "NIFTY 50",
+    "NIFTY50": "NIFTY 50",
+    "BANKNIFTY": "NIFTY BANK",
+    "FINNIFTY": "NIFTY FIN SERVICE",
+    "MIDCPNIFTY": "NIFTY MID SELECT",
+}
+
+_NUMERIC_COLUMNS = {
+    "instrument_token": np.int64,
+    "exchange_token": np.int64,
+    "strike": np.float64,
+    "tick_size": np.float64,
+    "lot_size": np.int32,
+}
+_STRING_COLUMNS = ("exchange", "tradingsymbol", "name", "instrument_type", "segment")
+
+
+def looks_like_derivative(symbol: Any) -> bool:
+    """Heuristic for F&O tradingsymbols (digits and a CE/PE/FUT suffix)."""
+    try:
+        s = str(symbol or "").upper().strip()
+    except Exception:
+        return False
+    if not s or not any(c.isdigit() for c in s):
+        return False
+    return s.endswith("CE") or s.endswith("PE") or s.endswith("FUT")
+
+
+def _trigrams(text: str) -> set:
+    return {text[i:i + 3] for i in range(len(text) - 2)}
+
+
+def _fetched_at(meta: Dict[str, Any], path: Path) -> Optional[datetime]:
+    """IST time a snapshot was downloaded (meta.json mtime for older snapshots)."""
+    raw = meta.get("fetched_at_ist")
+    if raw:
+        try:
+            return datetime.fromisoformat(raw)
+        except ValueError:
+            pass
+    try:
+        return datetime.utcfromtimestamp((path / "meta.json").stat().st_mtime) + IST_OFFSET
+    except OSError:
+        return None
+
+
+def _to_date(value: Any) -> Optional[date]:
+    if isinstance(value, datetime):
+        return value.date()
+    if isinstance(value, date):
+        return value
+    if value:
+        try:
+            return date.fromisoformat(str(value)[:10])
+        except ValueError:
+            return None
+    return None
+
+
+class _TokenView(Mapping):
+    """Read-only ``{tradingsymbol: token}`` view of one exchange."""
+
+    def __init__(self, master: "InstrumentMaster", exchange: str):
+        self._master = master
+        self._exchange = exchange
+
+    def __getitem__(self, symbol: str) -> int:
+        token = self._master.token_for(symbol, self._exchange)
+        if token is None:
+            raise KeyError(symbol)
+        return token
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(self._master._index.sorted.get(self._exchange, ([], []))[0])
+
+    def __len__(self) -> int:
+        return len(self._master._index.sorted.get(self._exchange, ([], []))[0])
+
+
+class _SnapshotIndex:
+    """Columns of one snapshot plus every lookup structure built from them.
+
+    Built completely before it is published (a single attribute assignment
+    on the master) and never mutated afterwards, so lock-free readers see
+    either the old snapshot or the new one, never a half-built index.
+    """
+
+    def __init__(
+        self,
+        columns: Optional[Dict[str, np.ndarray]] = None,
+        snapshot_date: Optional[str] = None,
+        fetched_at: Optional[datetime] = None,
+    ):
+        self.columns: Dict[str, np.ndarray] = columns or {}
+        self.snapshot_date = snapshot_date
+        self.fetched_at = fetched_at
+        self.symbols: List[str] = []
+        self.names: List[str] = []
+        self.exchanges: List[str] = []
+        self.types: List[str] = []
+        self.expiry_days: List[int] = []
+        self.haystack: Dict[int, Tuple[str, str]] = {}
+        self.by_symbol: Dict[Tuple[str, str], int] = {}
+        self.by_token: Dict[int, int] = {}
+        self.exchanges_for: Dict[str, List[str]] = defaultdict(list)
+        self.sorted: Dict[str, Tuple[List[str], List[int]]] = {}
+        self.trigrams: Dict[str, List[int]] = defaultdict(list)
+        self.plain_rows: List[int] = []
+        self.derivatives: Dict[Tuple[str, str], List[int]] = {}
+        if columns:
+            self._build()
+
+    def _build(self) -> None:
+        cols = self.columns
+        self.symbols = np.char.decode(cols["tradingsymbol"], "utf-8").tolist() if len(cols["tradingsymbol"]) else []
+        self.names = np.char.decode(cols["name"], "utf-8").tolist() if len(cols["name"]) else []
+        self.exchanges = np.char.decode(cols["exchange"], "utf-8").tolist() if len(cols["exchange"]) else []
+        self.types = np.char.decode(cols["instrument_type"], "utf-8").tolist() if len(cols["instrument_type"]) else []
+        tokens = cols["instrument_token"].tolist()
+        # Plain lists: per-element access on memory-mapped arrays is slow
+        self.expiry_days = expiries = cols["expiry"].astype("int64").tolist()
+        strikes = cols["strike"].tolist()
+
+        per_exchange: Dict[str, List[Tuple[str, int]]] = defaultdict(list)
+        derivatives: Dict[Tuple[str, str], List[int]] = defaultdict(list)
+        for i, (symbol, exchange, itype) in enumerate(zip(self.symbols, self.exchanges, self.types)):
+            self.by_symbol[(exchange, symbol)] = i
+            self.by_token[tokens[i]] = i
+            self.exchanges_for[symbol].append(exchange)
+            per_exchange[exchange].append((symbol, i))
+            if itype in DERIVATIVE_TYPES:
+                derivatives[(exchange, self.names[i])].append(i)
+            else:
+                self.plain_rows.append(i)
+                self.haystack[i] = (symbol.upper(), self.names[i].upper())
+                for gram in _trigrams(f"{symbol} {self.names[i]}".upper()):
+                    self.trigrams[gram].append(i)
+
+        for exchange, pairs in per_exchange.items():
+            pairs.sort()
+            self.sorted[exchange] = ([s for s, _ in pairs], [i for _, i in pairs])
+
+        type_order = {"FUT": 0, "CE": 1, "PE": 2}
+        for key, rows in derivatives.items():
+            rows.sort(key=lambda i: (expiries[i], strikes[i], type_order.get(self.types[i], 3)))
+            self.derivatives[key] = rows
+
+    def row(self, i: int) -> Dict[str, Any]:
+        cols = self.columns
+        expiry = cols["expiry"][i]
+        return {
+            "instrument_token": int(cols["instrument_token"][i]),
+            "exchange_token": int(cols["exchange_token"][i]),
+            "tradingsymbol": self.symbols[i],
+            "name": self.names[i],
+            "expiry": None if np.isnat(expiry) else expiry.astype(object),
+            "strike": float(cols["strike"][i]),
+            "tick_size": float(cols["tick_size"][i]),
+            "lot_size": int(cols["lot_size"][i]),
+            "instrument_type": self.types[i],
+            "segment": cols["segment"][i].decode("utf-8"),
+            "exchange": self.exchanges[i],
+        }
+
+
+class InstrumentMaster:
+    """Persisted, indexed Kite instrument list.
+
+    Lookups read ``self._index`` once per call without taking the lock; the
+    lock only serialises loads and refreshes.
+    """
+
+    def __init__(self, base_dir: Path = MASTER_DIR, exchanges: Tuple[str, ...] = INSTRUMENT_EXCHANGES):
+        self.base_dir = Path(base_dir)
+        self.exchanges = tuple(exchanges)
+        self.loaded = False
+        self._last_attempt = 0.0
+        self._lock = threading.RLock()
+        self._index = _SnapshotIndex()
+
+    @property
+    def snapshot_date(self) -> Optional[str]:
+        return self._index.snapshot_date
+
+    @property
+    def columns(self) -> Dict[str, np.ndarray]:
+        return self._index.columns
+
+    def __len__(self) -> int:
+        return len(self._index.symbols)
+
+    # ==================== Persistence ====================
+
+    def _snapshots(self) -> List[Path]:
+        if not self.base_dir.exists():
+            return []
+        return sorted(
+            p for p in self.base_dir.iterdir()
+            if p.is_dir() and not p.name.startswith(".") and (p / "meta.json").exists()
+        )
+
+    def load(self) -> bool:
+        """Memory-map the latest snapshot on disk and build the indexes."""
+        with self._lock:
+            snapshots = self._snapshots()
+            if not snapshots:
+                self.loaded = True
+                return False
+            path = snapshots[-1]
+            try:
+                with open(path / "meta.json", "r") as f:
+                    meta = json.load(f)
+                columns = {
+                    name: np.load(path / f"{name}.npy", mmap_mode="r")
+                    for name in list(_NUMERIC_COLUMNS) + list(_STRING_COLUMNS) + ["expiry"]
+                }
+                fetched_at = _fetched_at(meta, path)
+            except Exception as e:
+                print(f"[InstrumentMaster] Failed to load snapshot {path.name}: {e}")
+                self.loaded = True
+                return False
+            self._install(columns, meta.get("date"), fetched_at)
+            return True
+
+    def _install(self, columns: Dict[str, np.ndarray], snapshot_date: Optional[str], fetched_at: Optional[datetime]) -> None:
+        # Build off to the side, then publish with one assignment
+        self._index = _SnapshotIndex(columns, snapshot_date, fetched_at)
+        self.loaded = True
+
+    def _write_snapshot(self, instruments: List[Dict[str, Any]], day: str, fetched_at: datetime) -> Dict[str, np.ndarray]:
+        """Persist raw Kite instrument dicts as column arrays; returns the arrays."""
+        columns: Dict[str, np.ndarray] = {}
+        for name, dtype in _NUMERIC_COLUMNS.items():
+            columns[name] = np.array([inst.get(name) or 0 for inst in instruments], dtype=dtype)
+        for name in _STRING_COLUMNS:
+            columns[name] = np.array(
+                [str(inst.get(name) or "").encode("utf-8") for inst in instruments], dtype=np.bytes_
+            )
+        columns["expiry"] = np.array(
+            [np.datetime64(_to_date(inst.get("expiry")) or "NaT", "D") for inst in instruments],
+            dtype="datetime64[D]",
+        )
+
+        self.base_dir.mkdir(parents=True, exist_ok=True)
+        target = self.base_dir / day
+        tmp = self.base_dir / f".{day}.tmp"
+        shutil.rmtree(tmp, ignore_errors=True)
+        tmp.mkdir()
+        for name, values in columns.items():
+            np.save(tmp / f"{name}.npy", values)
+        with open(tmp / "meta.json", "w") as f:
+            json.dump({
+                "date": day,
+                "fetched_at_ist": fetched_at.isoformat(timespec="seconds"),
+                "count": len(instruments),
+                "exchanges": list(self.exchanges),
+            }, f)
+        shutil.rmtree(target, ignore_errors=True)
+        tmp.rename(target)
+
+        for old in self._snapshots()[:-KEEP_SNAPSHOTS]:
+            shutil.rmtree(old, ignore_errors=True)
+        return columns
+
+    def refresh(self, kite: Any) -> int:
+        """Download the instrument dump for the configured exchanges and persist it."""
+        instruments: List[Dict[str, Any]] = []
+        for exchange in self.exchanges:
+            rows = kite.instruments(exchange)
+            for row in rows:
+                row.setdefault("exchange", exchange)
+            instruments.extend(rows)
+        if not instruments:
+            raise RuntimeError("Empty instrument dump")
+
+        fetched_at = now_ist()
+        day = fetched_at.strftime("%Y%m%d")
+        with self._lock:
+            columns = self._write_snapshot(instruments, day, fetched_at)
+            self._install(columns, day, fetched_at)
+        print(f"[InstrumentMaster] Loaded {len(instruments)} instruments ({', '.join(self.exchanges)}) for {day}")
+        return len(instruments)
+
+    def is_stale(self) -> bool:
+        """True if the snapshot is not today's, or was fetched before today's list was published."""
+        index = self._index
+        now = now_ist()
+        if index.snapshot_date != now.strftime("%Y%m%d"):
+            return True
+        publish = datetime.combine(now.date(), PUBLISH_TIME_IST)
+        # A dump taken before publication still holds the previous day's contracts
+        return now >= publish and (index.fetched_at is None or index.fetched_at < publish)
+
+    def ensure_fresh(self, kite: Any = None) -> bool:
+        """Load from disk once, then download if the snapshot is not from today.
+
+        Returns True when instruments are available (possibly from an older
+        snapshot if the download fails).
+        """
+        with self._lock:
+            if not self.loaded:
+                self.load()
+            if (
+                self.is_stale()
+                and kite is not None
+                and time.time() - self._last_attempt >= REFRESH_RETRY_SECONDS
+            ):
+                self._last_attempt = time.time()
+                try:
+                    self.refresh(kite)
+                except Exception as e:
+                    print(f"[InstrumentMaster] Refresh failed, using snapshot {self.snapshot_date}: {e}")
+            return len(self) > 0
+
+    # ==================== Lookups ====================
+
+    @staticmethod
+    def _find(index: _SnapshotIndex, symbol: str, exchange: Optional[str] = None) -> Optional[int]:
+        key = str(symbol or "").upper().strip()
+        if ":" in key and exchange is None:
+            exchange, key = key.split(":", 1)
+        key = INDEX_ALIASES.get(key, key) if (exchange or "NSE") == "NSE" else key
+        if exchange:
+            return index.by_symbol.get((exchange.upper(), key))
+        for ex in ("NSE", "NFO", "BSE"):
+            i = index.by_symbol.get((ex, key))
+            if i is not None:
+                return i
+        for ex in index.exchanges_for.get(key, ()):
+            return index.by_symbol.get((ex, key))
+        return None
+
+    def token_for(self, symbol: str, exchange: Optional[str] = None) -> Optional[int]:
+        """Instrument token for ``symbol`` (``EXCHANGE:SYMBOL`` also accepted)."""
+        index = self._index
+        i = self._find(index, symbol, exchange)
+        return None if i is None else int(index.columns["instrument_token"][i])
+
+    def symbol_for(self, token: Any) -> Optional[Tuple[str, str]]:
+        """(exchange, tradingsymbol) for an instrument token."""
+        index = self._index
+        try:
+            i = index.by_token.get(int(token))
+        except (TypeError, ValueError):
+            return None
+        return None if i is None else (index.exchanges[i], index.symbols[i])
+
+    def get(self, symbol: str, exchange: Optional[str] = None) -> Optional[Dict[str, Any]]:
+        index = self._index
+        i = self._find(index, symbol, exchange)
+        return None if i is None else index.row(i)
+
+    def exchange_for(self, symbol: str) -> str:
+        """Exchange to quote/subscribe ``symbol`` on (NFO for derivatives, else NSE)."""
+        key = str(symbol or "").upper().strip()
+        exchanges = self._index.exchanges_for.get(key)
+        if exchanges:
+            if "NSE" in exchanges:
+                return "NSE"
+            return exchanges[0]
+        return "NFO" if looks_like_derivative(key) else "NSE"
+
+    def is_derivative(self, symbol: str) -> bool:
+        return self.exchange_for(symbol) in ("NFO", "BFO")
+
+    def tokens(self, exchange: str = "NSE") -> Mapping:
+        """``{tradingsymbol: token}`` mapping backed by the master."""
+        return _TokenView(self, exchange.upper())
+
+    def equities(self, exchange: str = "NSE") -> List[Tuple[str, str]]:
+        """(tradingsymbol, name) of every cash equity on ``exchange`` (no indices)."""
+        exchange = exchange.upper()
+        index = self._index
+        segments = index.columns.get("segment")
+        if segments is None:
+            return []
+        return [
+            (index.symbols[i], index.names[i])
+            for i in index.plain_rows
+            if index.exchanges[i] == exchange and index.types[i] == "EQ" and segments[i] != b"INDICES"
+        ]
+
+    # ==================== Search ====================
+
+    def search(self, query: str, exchange: Optional[str] = None, limit: int = SEARCH_LIMIT) -> List[Dict[str, Any]]:
+        """Exact, prefix, then substring matches on tradingsymbol or name."""
+        q = str(query or "").upper().strip()
+        if not q:
+            return []
+        index = self._index
+        exchange = exchange.upper() if exchange else None
+        results: List[int] = []
+        seen = set()
+
+        def add(i: int) -> bool:
+            if i not in seen and (exchange is None or index.exchanges[i] == exchange):
+                seen.add(i)
+                results.append(i)
+            return len(results) >= limit
+
+        exact = self._find(index, q, exchange)
+        if exact is not None and add(exact):
+            return [index.row(i) for i in results]
+
+        for ex in ([exchange] if exchange else sorted(index.sorted)):
+            symbols, rows = index.sorted.get(ex, ([], []))
+            pos = bisect_left(symbols, q)
+            while pos < len(symbols) and symbols[pos].startswith(q):
+                if add(rows[pos]):
+                    return [index.row(i) for i in results]
+                pos += 1
+
+        if len(q) >= 3:
+            grams = sorted(_trigrams(q), key=lambda g: len(index.trigrams.get(g, ())))
+            candidates = set(index.trigrams.get(grams[0], ()))
+            for gram in grams[1:]:
+                candidates.intersection_update(index.trigrams.get(gram, ()))
+                if not candidates:
+                    break
+        else:
+            # 1-2 character queries: scan the (much smaller) non-derivative set
+            candidates = index.plain_rows
+        haystack = index.haystack
+        matches = [
+            i for i in candidates
+            if (exchange is None or index.exchanges[i] == exchange)
+            and (q in haystack[i][0] or q in haystack[i][1])
+        ]
+        # Shortest symbols first; earlier results may reappear, so over-select by that many
+        best = heapq.nsmallest(limit + len(results), matches, key=lambda i: (len(index.symbols[i]), index.symbols[i]))
+        for i in best:
+            if add(i):
+                break
+        return [index.row(i) for i in results]
+
+    # ==================== Derivatives ====================
+
+    def expiries(self, underlying: str, exchange: str = "NFO", instrument_type: Optional[str] = None) -> List[date]:
+        index = self._index
+        rows = index.derivatives.get((exchange.upper(), str(underlying).upper()), [])
+        days = {
+            index.expiry_days[i]
+            for i in rows
+            if instrument_type is None or index.types[i] == instrument_type
+        }
+        return [np.datetime64(d, "D").astype(object) for d in sorted(days)]
+
+    def option_chain(self, underlying: str, expiry: Any, exchange: str = "NFO") -> List[Dict[str, Any]]:
+        """CE/PE contracts for one expiry, ordered by strike."""
+        index = self._index
+        rows = index.derivatives.get((exchange.upper(), str(underlying).upper()), [])
+        target = int(np.datetime64(_to_date(expiry), "D").astype("int64"))
+        expiries = index.expiry_days
+        lo = bisect_left(rows, target, key=lambda i: expiries[i])
+        out = []
+        while lo < len(rows) and expiries[rows[lo]] == target:
+            if index.types[rows[lo]] in ("CE", "PE"):
+                out.append(index.row(rows[lo]))
+            lo += 1
+        return out
+
+    def find_option(
+        self, underlying: str, expiry: Any, strike: float, option_type: str, exchange: str = "NFO"
+    ) -> Optional[Dict[str, Any]]:
+        option_type = option_type.upper()
+        for row in self.option_chain(underlying, expiry, exchange):
+            if row["instrument_type"] == option_type and abs(row["strike"] - float(strike)) < 1e-6:
+                return row
+        return None
+
+    def nearest_future(self, underlying: str, on: Optional[date] = None, exchange: str = "NFO") -> Optional[Dict[str, Any]]:
+        """Front-month future expiring on or after ``on`` (default: today IST)."""
+        index = self._index
+        rows = index.derivatives.get((exchange.upper(), str(underlying).upper()), [])
+        cutoff = int(np.datetime64(on or now_ist().date(), "D").astype("int64"))
+        for i in rows:
+            if index.types[i] == "FUT" and index.expiry_days[i] >= cutoff:
+                return index.row(i)
+        return None
+
+    def get_stats(self) -> Dict[str, Any]:
+        index = self._index
+        counts: Dict[str, int] = defaultdict(int)
+        for ex in index.exchanges:
+            counts[ex] += 1
+        return {
+            "snapshot_date": index.snapshot_date,
+            "fetched_at_ist": index.fetched_at.isoformat(timespec="seconds") if index.fetched_at else None,
+            "instruments": len(index.symbols),
+            "by_exchange": dict(counts),
+            "underlyings": len(index.derivatives),
+            "trigram_keys": len(index.trigrams),
+        }
+
+
+# Global instance
+instrument_master = InstrumentMaster()
+
+
+def get_instrument_master() -> InstrumentMaster:
+    """Shared master; the latest on-disk snapshot is loaded on first use."""
+    if not instrument_master.loaded:
+        with instrument_master._lock:
+            if not instrument_master.loaded:
+                instrument_master.load()
+    return instrument_master
@@ -142,6 +142,7 @@ STRATEGY_RATIONALE: [your UNIQUE rationale for {symbol} here]"""
         print(f"  🤖 Generating AI insights for {symbol}...")
         # Call OpenAI with specified configuration
         response = await llm_manager.chat_completion(
+            purpose="insights",
             messages=[
                 {
                     "role": "system",
@@ -0,0 +1,532 @@
+"""
+Live Candles
+Intraday OHLCV bars built from Zerodha ticks.
+
+Intraday consumers (1D charts, the microstructure agent, scalping context,
+the S1/S2 monitoring advisories) used to re-download 1/5/15-minute history
+from Zerodha every cycle, while the ticker already streamed every trade for
+the always-on universe. ``LiveCandleBuilder`` aggregates those ticks into
+1m/3m/5m/15m bars per symbol, held in fixed-size NumPy ring buffers (about
+seven sessions per timeframe). Each symbol is seeded once from 1-minute
+history when its first tick arrives (the always-on symbols at startup);
+higher timeframes are resampled from it. After that,
+MarketDataProvider.fetch_ohlcv and ChartDataService serve intraday windows
+from memory.
+
+Bars use the archive/ZerodhaService convention: ``time`` is the bar open in
+UTC epoch seconds. Buckets are aligned to the 09:15 IST session open. Only
+ticks inside the cash session (09:15-15:30 IST) are aggregated. Volume is the
+change in the tick's cumulative day volume; it restarts with each session.
+
+A window is served only when the symbol's buffer is known to be complete:
+- it has been seeded, and the seed reaches back far enough for the window;
+- no ticker disconnect has happened since the seed (the next tick reseeds);
+- it is current. During the session that means a tick in the last
+  LIVE_CANDLE_STALE_SEC. After the close, it must have been updated after
+  the last session ended.
+Otherwise callers fall back to their upstream sources.
+
+``register_bar_close_callback(cb)`` calls ``cb(symbol, interval, bar)`` for
+every bar that closes. Callbacks run on the ticker thread or the sweep task
+and must be quick; hand real work to the event loop.
+
+Configuration (environment):
+- LIVE_CANDLES: set to 0/off to disable (default on)
+- LIVE_CANDLE_SEED_DAYS: calendar days of 1m history loaded per symbol (default 7)
+- LIVE_CANDLE_SESSIONS: sessions kept per timeframe (default 7)
+- LIVE_CANDLE_STALE_SEC: max tick silence during the session (default 120)
+"""
+
+import asyncio
+import logging
+import os
+import threading
+import time
+from datetime import datetime, timedelta
+from typing import Any, Callable, Dict, Iterable, List, Optional
+
+import numpy as np
+import pandas as pd
+
+from ..core.market_hours import IST_OFFSET, is_cash_market_open_ist, now_ist
+from .candle_archive import SESSION_CLOSE_MINUTES, ist_to_epoch, is_replay_active
+
+logger = logging.getLogger(__name__)
+
+LIVE_CANDLES_ENABLED = os.getenv("LIVE_CANDLES", "1").strip().lower() not in ("0", "off", "false", "no")
+SEED_DAYS = int(os.getenv("LIVE_CANDLE_SEED_DAYS", "7"))
+SESSIONS_KEPT = int(os.getenv("LIVE_CANDLE_SESSIONS", "7"))
+STALE_AFTER = float(os.getenv("LIVE_CANDLE_STALE_SEC", "120"))
+SWEEP_INTERVAL = 1.0
+SEED_RETRY_AFTER = 300.0
+
+SESSION_OPEN_MINUTES = 9 * 60 + 15
+
+# Interval (MarketDataProvider naming) -> bar length in seconds
+INTERVALS: Dict[str, int] = {"1m": 60, "3m": 3 * 60, "5m": 5 * 60, "15m": 15 * 60}
+
+_COLUMNS = ["time", "open", "high", "low", "close", "volume"]
+T, O, H, L, C, V = range(6)
+
+
+def _tick_time(tick: Dict[str, Any]) -> datetime:
+    """Naive IST time of a tick (Kite sends naive IST datetimes)."""
+    for key in ("exchange_timestamp", "last_trade_time", "timestamp"):
+        value = tick.get(key)
+        if isinstance(value, datetime):
+            return value
+        if isinstance(value, str) and value:
+            try:
+                return datetime.fromisoformat(value)
+            except ValueError:
+                continue
+    return now_ist()
+
+
+def _in_session(dt_ist: datetime) -> bool:
+    minutes = dt_ist.hour * 60 + dt_ist.minute
+    return dt_ist.weekday() < 5 and SESSION_OPEN_MINUTES <= minutes < SESSION_CLOSE_MINUTES
+
+
+def _last_session_close(dt_ist: datetime) -> int:
+    """Epoch of the most recent 15:30 IST close at or before ``dt_ist`` (weekends skipped)."""
+    close = dt_ist.replace(hour=15, minute=30, second=0, microsecond=0)
+    if dt_ist < close:
+        close -= timedelta(days=1)
+    while close.weekday() >= 5:
+        close -= timedelta(days=1)
+    return ist_to_epoch(close)
+
+
+def resample(bars: np.ndarray, seconds: int) -> np.ndarray:
+    """Aggregate time-ordered bars (rows of time, o, h, l, c, v) into ``seconds`` buckets."""
+    if len(bars) == 0:
+        return bars
+    buckets = bars[:, T] - bars[:, T] % seconds
+    starts = np.flatnonzero(np.r_[True, buckets[1:] != buckets[:-1]])
+    ends = np.r_[starts[1:], len(bars)] - 1
+    out = np.empty((len(starts), 6))
+    out[:, T] = buckets[starts]
+    out[:, O] = bars[starts, O]
+    out[:, H] = np.maximum.reduceat(bars[:, H], starts)
+    out[:, L] = np.minimum.reduceat(bars[:, L], starts)
+    out[:, C] = bars[ends, C]
+    out[:, V] = np.add.reduceat(bars[:, V], starts)
+    return out
+
+
+class _Series:
+    """Closed bars of one (symbol, interval) in a ring buffer, plus the forming bar."""
+
+    __slots__ = ("seconds", "buf", "start", "count", "forming")
+
+    def __init__(self, seconds: int, capacity: int):
+        self.seconds = seconds
+        self.buf = np.zeros((capacity, 6))
+        self.start = 0
+        self.count = 0
+        self.forming: Optional[List[float]] = None
+
+    def append(self, bar) -> bool:
+        """Add a closed bar; returns True when the oldest bar was evicted."""
+        cap = len(self.buf)
+        if self.count < cap:
+            self.buf[(self.start + self.count) % cap] = bar
+            self.count += 1
+            return False
+        self.buf[self.start] = bar
+        self.start = (self.start + 1) % cap
+        return True
+
+    def oldest(self) -> Optional[float]:
+        return float(self.buf[self.start, T]) if self.count else None
+
+    def closed(self) -> np.ndarray:
+        end = self.start + self.count
+        if end <= len(self.buf):
+            return self.buf[self.start:end].copy()
+        return np.vstack([self.buf[self.start:], self.buf[:end - len(self.buf)]])
+
+    def rows(self) -> np.ndarray:
+        closed = self.closed()
+        if self.forming is None:
+            return closed
+        return np.vstack([closed, np.array([self.forming])])
+
+    def reset(self, rows: np.ndarray, now_ts: float) -> None:
+        """Replace the contents with ``rows``; a last row still open becomes the forming bar."""
+        self.start, self.count, self.forming = 0, 0, None
+        if len(rows) and rows[-1, T] + self.seconds > now_ts:
+            self.forming = [float(x) for x in rows[-1]]
+            rows = rows[:-1]
+        rows = rows[-len(self.buf):]
+        self.buf[:len(rows)] = rows
+        self.count = len(rows)
+
+    def update(self, bucket: float, price: float, volume: float) -> Optional[List[float]]:
+        """Apply one trade; returns the bar it closed, if any."""
+        bar = self.forming
+        if bar is not None and bucket == bar[T]:
+            if price > bar[H]:
+                bar[H] = price
+            if price < bar[L]:
+                bar[L] = price
+            bar[C] = price
+            bar[V] += volume
+            return None
+        if bar is not None and bucket < bar[T]:
+            return None  # late tick for a bar that already closed
+        self.forming = [bucket, price, price, price, price, volume]
+        return bar
+
+    def close_due(self, now_ts: float) -> Optional[List[float]]:
+        bar = self.forming
+        if bar is not None and bar[T] + self.seconds <= now_ts:
+            self.forming = None
+            return bar
+        return None
+
+
+class _SymbolState:
+    __slots__ = ("series", "covers_from", "seeded", "last_update", "day_volume", "volume_day")
+
+    def __init__(self):
+        self.series = {
+            name: _Series(seconds, SESSIONS_KEPT * (SESSION_CLOSE_MINUTES - SESSION_OPEN_MINUTES) * 60 // seconds)
+            for name, seconds in INTERVALS.items()
+        }
+        self.covers_from: Optional[float] = None  # earliest epoch the buffers are complete from
+        self.seeded = False
+        self.last_update = 0.0
+        self.day_volume: Optional[float] = None  # last cumulative day volume seen
+        self.volume_day = None
+
+
+class LiveCandleBuilder:
+    """Tick-to-candle aggregator for the symbols the ticker streams."""
+
+    def __init__(self):
+        self.enabled = LIVE_CANDLES_ENABLED
+        self._symbols: Dict[str, _SymbolState] = {}
+        self._lock = threading.Lock()
+        self._callbacks: List[Callable[[str, str, Dict[str, Any]], None]] = []
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._sweep_task: Optional[asyncio.Task] = None
+        self._seed_task: Optional[asyncio.Task] = None
+        self._pending_seeds: set = set()
+        self._seed_failed_at: Dict[str, float] = {}
+        self._registered = False
+        self._running = False
+        self.stats = {
+            'ticks': 0,
+            'ticks_outside_session': 0,
+            'bars_closed': 0,
+            'seed_failures': 0,
+            'served': 0,
+            'fallbacks': 0,
+            'invalidations': 0,
+        }
+
+    # ------------------------------------------------------------------ ticks
+
+    def on_ticks(self, ticks: Iterable[Dict[str, Any]], token_to_symbol: Dict[Any, str]) -> None:
+        """Ticker callback: fold a batch of ticks into the forming bars."""
+        closed = []
+        unseeded = set()
+        with self._lock:
+            for tick in ticks:
+                price = tick.get('last_price')
+                token = tick.get('instrument_token')
+                symbol = token_to_symbol.get(token) or token_to_symbol.get(str(token))
+                if not price or not symbol:
+                    continue
+                dt_ist = _tick_time(tick)
+                if not _in_session(dt_ist):
+                    self.stats['ticks_outside_session'] += 1
+                    continue
+                self.stats['ticks'] += 1
+                state = self._symbols.get(symbol)
+                if state is None:
+                    state = self._symbols[symbol] = _SymbolState()
+                if not state.seeded:
+                    unseeded.add(symbol)
+                ts = ist_to_epoch(dt_ist)
+                volume = self._volume_delta(state, tick, dt_ist.date())
+                state.last_update = time.time()
+                for name, series in state.series.items():
+                    bar = series.update(ts - ts % series.seconds, float(price), volume)
+                    if bar is not None:
+                        closed.append((symbol, name, bar, self._store(state, series, bar)))
+        self._emit(closed)
+        if unseeded:
+            self.request_seed(unseeded)
+
+    @staticmethod
+    def _volume_delta(state: _SymbolState, tick: Dict[str, Any], day) -> float:
+        cumulative = tick.get('volume_traded', tick.get('volume'))
+        if cumulative is None:
+            return 0.0
+        cumulative = float(cumulative)
+        if state.day_volume is None:
+            delta = 0.0  # first tick seen: the seeded bars already hold the day's volume so far
+        elif day != state.volume_day or cumulative < state.day_volume:
+            delta = cumulative  # new session
+        else:
+            delta = cumulative - state.day_volume
+        state.day_volume, state.volume_day = cumulative, day
+        return delta
+
+    @staticmethod
+    def _store(state: _SymbolState, series: _Series, bar: List[float]) -> List[float]:
+        if series.append(bar) and state.covers_from is not None:
+            state.covers_from = max(state.covers_from, series.oldest())
+        return bar
+
+    def close_due(self, now_ts: Optional[float] = None) -> int:
+        """Close forming bars whose interval has ended (no tick needed)."""
+        now_ts = time.time() if now_ts is None else now_ts
+        closed = []
+        with self._lock:
+            for symbol, state in self._symbols.items():
+                for name, series in state.series.items():
+                    bar = series.close_due(now_ts)
+                    if bar is not None:
+                        closed.append((symbol, name, bar, self._store(state, series, bar)))
+        self._emit(closed)
+        return len(closed)
+
+    def _emit(self, closed) -> None:
+        if not closed:
+            return
+        self.stats['bars_closed'] += len(closed)
+        if not self._callbacks:
+            return
+        for symbol, name, bar, _ in closed:
+            payload = dict(zip(_COLUMNS, bar))
+            payload['time'] = int(payload['time'])
+            for callback in self._callbacks:
+                try:
+                    callback(symbol, name, payload)
+                except Exception as e:
+                    logger.error("[LiveCandles] Bar-close callback failed: %s", e)
+
+    def register_bar_close_callback(self, callback: Callable[[str, str, Dict[str, Any]], None]) -> None:
+        """Call ``callback(symbol, interval, bar)`` whenever a bar closes."""
+        self._callbacks.append(callback)
+
+    # ---------------------------------------------------------------- seeding
+
+    def seed(self, symbol: str, minute_bars: pd.DataFrame, start_ts: float, now_ts: Optional[float] = None) -> None:
+        """Load 1m history fetched from ``start_ts`` and merge it with tick-built bars.
+
+        History wins for every bar it covers except the newest, which is
+        still forming when fetched; that one keeps the history's open and
+        takes the tick-built close, extremes and the larger volume.
+        """
+        now_ts = time.time() if now_ts is None else now_ts
+        symbol = symbol.upper()
+        base = minute_bars[_COLUMNS].to_numpy(dtype=float) if minute_bars is not None and len(minute_bars) else np.empty((0, 6))
+        base = base[np.argsort(base[:, T], kind="stable")]
+        with self._lock:
+            state = self._symbols.get(symbol)
+            if state is None:
+                state = self._symbols[symbol] = _SymbolState()
+            had_older = False
+            for name, series in state.series.items():
+                history = resample(base, series.seconds) if len(base) else base
+                existing = series.rows()
+                if len(history):
+                    first, last = history[0, T], history[-1, T]
+                    older = existing[existing[:, T] < first]
+                    newer = existing[existing[:, T] > last]
+                    same = existing[existing[:, T] == last]
+                    if len(same):
+                        row = history[-1]
+                        row[H], row[L] = max(row[H], same[0, H]), min(row[L], same[0, L])
+                        row[C], row[V] = same[0, C], max(row[V], same[0, V])
+                    had_older = had_older or bool(len(older))
+                    merged = np.vstack([older, history, newer])
+                else:
+                    merged = existing
+                series.reset(merged, now_ts)
+            if not (had_older and state.seeded and state.covers_from is not None):
+                state.covers_from = start_ts
+            for series in state.series.values():
+                if series.count == len(series.buf):
+                    state.covers_from = max(state.covers_from, series.oldest())
+            state.seeded = True
+            state.last_update = max(state.last_update, now_ts)
+
+    async def seed_symbols(self, symbols: Iterable[str], days: int = SEED_DAYS) -> int:
+        """Seed symbols from Zerodha 1m history (never from fallback/demo sources)."""
+        from .market_data_provider import market_data_provider
+
+        provider = market_data_provider.get()
+        seeded = 0
+        for symbol in symbols:
+            start_ts = time.time() - days * 86400
+            try:
+                df = await provider._fetch_from_zerodha(symbol, "1m", days)
+            except Exception as e:
+                df = None
+                logger.warning("[LiveCandles] Seed fetch failed for %s: %s", symbol, e)
+            if df is None or len(df) == 0:
+                self.stats['seed_failures'] += 1
+                self._seed_failed_at[symbol] = time.time()
+                continue
+            self.seed(symbol, df, start_ts)
+            self._seed_failed_at.pop(symbol, None)
+            seeded += 1
+        if seeded:
+            logger.info("[LiveCandles] Seeded %d symbols from 1m history", seeded)
+        return seeded
+
+    def request_seed(self, symbols: Iterable[str]) -> None:
+        """Queue symbols for seeding on the event loop (safe from the ticker thread)."""
+        if self._loop is None or not self._running:
+            return
+        now = time.time()
+        with self._lock:
+            new = [
+                s for s in symbols
+                if s not in self._pending_seeds and now - self._seed_failed_at.get(s, 0.0) >= SEED_RETRY_AFTER
+            ]
+            self._pending_seeds.update(new)
+        if new:
+            self._loop.call_soon_threadsafe(self._ensure_seeder)
+
+    def _ensure_seeder(self) -> None:
+        if self._seed_task is None or self._seed_task.done():
+            self._seed_task = asyncio.create_task(self._drain_seeds())
+
+    async def _drain_seeds(self) -> None:
+        # One symbol at a time: the provider already spaces Zerodha requests
+        while self._running:
+            with self._lock:
+                if not self._pending_seeds:
+                    return
+                symbol = min(self._pending_seeds)
+            try:
+                await self.seed_symbols([symbol])
+            except Exception as e:
+                logger.error("[LiveCandles] Seeding %s failed: %s", symbol, e)
+            finally:
+                with self._lock:
+                    self._pending_seeds.discard(symbol)
+
+    def invalidate(self, *args) -> None:
+        """Ticks were (or may have been) missed: stop serving until reseeded."""
+        with self._lock:
+            for state in self._symbols.values():
+                state.seeded = False
+                state.day_volume = None
+        self.stats['invalidations'] += 1
+
+    # ---------------------------------------------------------------- serving
+
+    def _servable(self, state: Optional[_SymbolState], days: float, now_ts: float) -> bool:
+        if state is None or not state.seeded or state.covers_from is None:
+            return False
+        if state.covers_from > now_ts - days * 86400:
+            return False
+        dt_ist = datetime.utcfromtimestamp(now_ts) + IST_OFFSET
+        if is_cash_market_open_ist(dt_ist):
+            return now_ts - state.last_update <= STALE_AFTER
+        # The last tick lands just before 15:30; a later seed also counts
+        return state.last_update >= _last_session_close(dt_ist) - STALE_AFTER
+
+    def window(self, symbol: str, interval: str, days: float, now_ts: Optional[float] = None) -> Optional[pd.DataFrame]:
+        """Bars of the last ``days`` calendar days (forming bar included), or None to fall back."""
+        if not self.enabled or interval not in INTERVALS or is_replay_active():
+            return None
+        now_ts = time.time() if now_ts is None else now_ts
+        with self._lock:
+            state = self._symbols.get(symbol.upper())
+            if not self._servable(state, days, now_ts):
+                if state is not None:
+                    self.stats['fallbacks'] += 1
+                return None
+            series = state.series[interval]
+            rows = series.rows()
+        rows = rows[rows[:, T] >= now_ts - days * 86400]
+        if len(rows) == 0:
+            return None
+        self.stats['served'] += 1
+        df = pd.DataFrame(rows, columns=_COLUMNS)
+        df['time'] = df['time'].astype('int64')
+        df['volume'] = df['volume'].astype('int64')
+        return df
+
+    def recent(self, symbol: str, interval: str, bars: int) -> List[Dict[str, Any]]:
+        """Last ``bars`` closed candles as dicts (for agents that take candle context), or []."""
+        seconds = INTERVALS.get(interval, 60)
+        now_ts = time.time()
+        # Calendar span that holds ``bars`` session bars even across a weekend
+        df = self.window(symbol, interval, 3 + bars * seconds / 22500.0, now_ts=now_ts)
+        if df is None:
+            return []
+        df = df[df['time'] + seconds <= now_ts]
+        return df.tail(bars).to_dict('records')
+
+    # -------------------------------------------------------------- lifecycle
+
+    async def _sweep_loop(self) -> None:
+        while self._running:
+            try:
+                await asyncio.sleep(SWEEP_INTERVAL)
+                self.close_due()
+            except asyncio.CancelledError:
+                break
+            except Exception as e:
+                logger.error("[LiveCandles] Sweep error: %s", e, exc_info=True)
+
+    async def start(self) -> None:
+        if self._running or not self.enabled:
+            return
+        from ..config.index_universe import ALWAYS_ON_WS_SYMBOLS
+        from .zerodha_websocket import get_zerodha_websocket
+
+        self._loop = asyncio.get_running_loop()
+        self._running = True
+        ws = get_zerodha_websocket()
+        if not self._registered:
+            ws.register_tick_callback(lambda ticks: self.on_ticks(ticks, ws.token_to_symbol))
+            ws.register_close_callback(self.invalidate)
+            self._registered = True
+        self._sweep_task = asyncio.create_task(self._sweep_loop())
+        self.request_seed(ALWAYS_ON_WS_SYMBOLS)
+        logger.info("[LiveCandles] Started (%s)", ", ".join(INTERVALS))
+
+    def stop(self) -> None:
+        if not self._running:
+            return
+        self._running = False
+        for task in (self._sweep_task, self._seed_task):
+            if task and not task.done():
+                task.cancel()
+        logger.info("[LiveCandles] Stopped")
+
+    def get_stats(self) -> Dict[str, Any]:
+        with self._lock:
+            symbols = len(self._symbols)
+            seeded = sum(1 for s in self._symbols.values() if s.seeded)
+        return {**self.stats, 'symbols': symbols, 'servable_symbols': seeded,
+                'enabled': self.enabled, 'running': self._running}
+
+
+# Global instance
+live_candles = LiveCandleBuilder()
+
+
+def get_live_candles() -> LiveCandleBuilder:
+    return live_candles
+
+
+async def start_live_candles() -> None:
+    """Start building candles from ticks (called on app startup)."""
+    await live_candles.start()
+
+
+def stop_live_candles() -> None:
+    """Stop the bar-close sweep (called on app shutdown)."""
+    live_candles.stop()
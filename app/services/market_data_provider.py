@@ -12,7 +12,11 @@ from datetime import datetime, timedelta
 import pandas as pd
 from pathlib import Path
 from .cache_redis import get_cached
+from .candle_archive import get_replay_session
+from .live_candles import live_candles
 from .zerodha_service import ZerodhaService
+from ..core.lazy import LazySingleton
+from ..core.tracing import span
 
 # Load .env file
 try:
@@ -81,16 +85,23 @@ class MarketDataProvider:
             self.zerodha = None
     
     async def _rate_limit_wait(self, source: str):
-        """Implement rate limiting per source"""
+        """Implement rate limiting per source
+        
+        The next slot is reserved before sleeping, so concurrent callers
+        (e.g. batched quote chunks) are spaced out instead of all waking
+        up together after the same delay.
+        """
         now = datetime.utcnow()
+        slot = now
         
         if source in self.last_request_time:
-            elapsed = (now - self.last_request_time[source]).total_seconds()
-            if elapsed < RATE_LIMIT_DELAY:
-                wait_time = RATE_LIMIT_DELAY - elapsed
-                await asyncio.sleep(wait_time)
+            earliest = self.last_request_time[source] + timedelta(seconds=RATE_LIMIT_DELAY)
+            if earliest > now:
+                slot = earliest
         
-        self.last_request_time[source] = datetime.utcnow()
+        self.last_request_time[source] = slot
+        if slot > now:
+            await asyncio.sleep((slot - now).total_seconds())
         
         # Track request count
         self.request_counts[source] = self.request_counts.get(source, 0) + 1
@@ -106,12 +117,23 @@ class MarketDataProvider:
         
         Args:
             symbol: Stock symbol (e.g., 'RELIANCE', 'TCS')
-            interval: Time interval ('1d', '60m', '15m', '1m')
+            interval: Time interval ('1d', '60m', '15m', '5m', '3m', '1m')
             days: Number of days of history
             
         Returns:
             DataFrame with OHLCV data or None
         """
+        # Point-in-time replay: serve from the local candle archive and
+        # bypass the shared cache so no live bars leak into a backtest.
+        replay = get_replay_session()
+        if replay is not None:
+            return replay.fetch_ohlcv(symbol, interval=interval, days=days)
+
+        # Intraday bars built from live ticks need no upstream call
+        live = live_candles.window(symbol, interval, days)
+        if live is not None:
+            return live
+
         # Try cache first (aggressive caching)
         cache_key = f"ohlcv:{symbol}:{interval}:{days}"
         
@@ -126,13 +148,16 @@ class MarketDataProvider:
             ]
             
             for fetch_func in sources:
+                source = fetch_func.__name__.replace('_fetch_from_', '')
                 try:
-                    df = await fetch_func(symbol, interval, days)
+                    with span("fetch", f"ohlcv:{source}", symbol=symbol, interval=interval) as s:
+                        df = await fetch_func(symbol, interval, days)
+                        s.set("bars", len(df) if df is not None else 0)
                     if df is not None and len(df) > 0:
-                        print(f"  ✓ Data from {fetch_func.__name__.replace('_fetch_from_', '')}: {len(df)} bars")
+                        print(f"  ✓ Data from {source}: {len(df)} bars")
                         return df
                 except Exception as e:
-                    print(f"  ⚠️  {fetch_func.__name__.replace('_fetch_from_', '')} failed: {str(e)[:50]}")
+                    print(f"  ⚠️  {source} failed: {str(e)[:50]}")
                     continue
             
             # All sources failed - return demo data
@@ -173,6 +198,7 @@ class MarketDataProvider:
                 '60m': '60minute',
                 '15m': '15minute',
                 '5m': '5minute',
+                '3m': '3minute',
                 '1m': 'minute'
             }
             zerodha_interval = interval_map.get(interval, 'day')
@@ -551,5 +577,5 @@ class MarketDataProvider:
         }
 
 
-# Global instance
-market_data_provider = MarketDataProvider()
+# Global instance (built on first use)
+market_data_provider = LazySingleton("market_data_provider", MarketDataProvider)
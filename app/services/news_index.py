@@ -0,0 +1,482 @@
+"""
+News Index
+Entity-tagged news articles plus a persistent per-headline sentiment cache.
+
+SentimentAgent used to re-merge the aggregated feed for every symbol,
+substring-scan each headline against a handful of hardcoded aliases and
+send the matching headlines to the LLM, so the same headline was matched
+once per symbol and scored again on every cycle.
+
+Now:
+- ``EntityMatcher`` is an Aho-Corasick automaton over NSE tickers and
+  company names from the instrument master (plus ``SYMBOL_ALIASES``); one
+  pass over an article tags every symbol it mentions. Names and aliases
+  match case-insensitively on word boundaries; tickers that are not also
+  the company's name (ITC, SBIN, ...) must appear in upper case, so short
+  tickers do not fire on ordinary words.
+- ``NewsIndex`` is rebuilt only when the aggregated feed changes (the feed
+  itself is cached for 5 minutes) and answers ``articles_for(symbol)``
+  with a dict lookup. Symbol-specific feeds are merged in as they arrive.
+- ``HeadlineSentimentCache`` keeps LLM scores keyed by headline hash in
+  SQLite (cache/news_sentiment.db); only headlines not seen before are
+  sent to the LLM, in batches.
+"""
+
+import asyncio
+import hashlib
+import re
+import sqlite3
+import threading
+import time
+import weakref
+from collections import defaultdict
+from pathlib import Path
+from typing import Any, Dict, Iterable, List, Optional, Set, Tuple
+
+from ..llm import llm_manager
+
+
+# Media names that neither the ticker nor the Kite company name cover
+SYMBOL_ALIASES: Dict[str, List[str]] = {
+    "INDIGO": ["interglobe aviation", "interglobe", "indigo"],
+    "RELIANCE": ["reliance industries"],
+    "HDFCBANK": ["hdfc bank"],
+    "SBIN": ["state bank of india"],
+}
+
+_NAME_SUFFIXES = ("limited", "ltd.", "ltd")
+MIN_NAME_LENGTH = 4
+
+SCORE_BATCH_SIZE = 20
+SENTIMENT_RETENTION_DAYS = 30
+
+
+def _normalize(text: str) -> str:
+    return " ".join(str(text or "").lower().split())
+
+
+def headline_hash(title: str) -> str:
+    """Stable key for a headline (case/whitespace-insensitive)."""
+    return hashlib.sha1(_normalize(title).encode("utf-8")).hexdigest()[:20]
+
+
+def article_key(article: Dict[str, Any]) -> Tuple[str, str]:
+    """Dedup key used across the merged feeds: (source, title)."""
+    return (str(article.get("source", "")).lower(), str(article.get("title", "")).strip().lower())
+
+
+def sentiment_label(score: float) -> str:
+    if score >= 60:
+        return "Bullish"
+    if score <= 40:
+        return "Bearish"
+    return "Neutral"
+
+
+# ==================== Entity matching ====================
+
+class EntityMatcher:
+    """Aho-Corasick multi-pattern matcher mapping phrases to symbols."""
+
+    def __init__(self, patterns: Iterable[Tuple[str, str, bool]]):
+        """``patterns``: (symbol, phrase, case_sensitive) triples."""
+        self._goto: List[Dict[str, int]] = [{}]
+        self._fail: List[int] = [0]
+        # per node: (phrase length, symbol, phrase as written when case-sensitive)
+        self._out: List[List[Tuple[int, str, Optional[str]]]] = [[]]
+        self.symbols: Set[str] = set()
+        count = 0
+        for symbol, phrase, case_sensitive in patterns:
+            key = phrase.lower()
+            if not key:
+                continue
+            node = 0
+            for ch in key:
+                nxt = self._goto[node].get(ch)
+                if nxt is None:
+                    nxt = len(self._goto)
+                    self._goto[node][ch] = nxt
+                    self._goto.append({})
+                    self._fail.append(0)
+                    self._out.append([])
+                node = nxt
+            self._out[node].append((len(key), symbol, phrase if case_sensitive else None))
+            self.symbols.add(symbol)
+            count += 1
+        self.pattern_count = count
+        self._build_failure_links()
+
+    def _build_failure_links(self) -> None:
+        queue = list(self._goto[0].values())
+        head = 0
+        while head < len(queue):
+            node = queue[head]
+            head += 1
+            for ch, child in self._goto[node].items():
+                queue.append(child)
+                if node:
+                    fail = self._fail[node]
+                    while fail and ch not in self._goto[fail]:
+                        fail = self._fail[fail]
+                    self._fail[child] = self._goto[fail].get(ch, 0)
+                self._out[child] = self._out[child] + self._out[self._fail[child]]
+
+    def find(self, text: str) -> Set[str]:
+        """Symbols whose phrases occur in ``text`` on word boundaries."""
+        found: Set[str] = set()
+        if not text:
+            return found
+        lowered = text.lower()
+        exact = len(lowered) == len(text)  # case checks need aligned offsets
+        goto, fail, out = self._goto, self._fail, self._out
+        node = 0
+        n = len(lowered)
+        for i, ch in enumerate(lowered):
+            while node and ch not in goto[node]:
+                node = fail[node]
+            node = goto[node].get(ch, 0)
+            if not out[node]:
+                continue
+            after_ok = i + 1 >= n or not lowered[i + 1].isalnum()
+            if not after_ok:
+                continue
+            for length, symbol, phrase in out[node]:
+                start = i - length + 1
+                if start > 0 and lowered[start - 1].isalnum():
+                    continue
+                if phrase is not None and exact and text[start:i + 1] != phrase:
+                    continue
+                found.add(symbol)
+        return found
+
+
+def _company_name(name: str) -> str:
+    words = _normalize(name).split()
+    while words and words[-1] in _NAME_SUFFIXES:
+        words.pop()
+    return " ".join(words)
+
+
+def build_patterns(equities: Iterable[Tuple[str, str]]) -> List[Tuple[str, str, bool]]:
+    """Matcher patterns for (tradingsymbol, company name) pairs plus aliases."""
+    patterns: List[Tuple[str, str, bool]] = []
+    for symbol, name in equities:
+        symbol = symbol.upper()
+        company = _company_name(name)
+        # RELIANCE / "Reliance Industries": the ticker is also how media write the name
+        ticker_is_word = bool(company) and company.split()[0] == symbol.lower()
+        patterns.append((symbol, symbol, not ticker_is_word))
+        if len(company) >= MIN_NAME_LENGTH and company != symbol.lower():
+            patterns.append((symbol, company, False))
+    for symbol, aliases in SYMBOL_ALIASES.items():
+        patterns.extend((symbol, alias, False) for alias in aliases)
+    return patterns
+
+
+# ==================== Sentiment cache ====================
+
+class HeadlineSentimentCache:
+    """headline hash -> {score, sentiment, themes}, persisted in SQLite."""
+
+    def __init__(self, db_path: str = "cache/news_sentiment.db"):
+        self.db_path = db_path
+        self._scores: Dict[str, Dict[str, Any]] = {}
+        self._loaded = False
+        self._lock = threading.Lock()
+
+    def _connect(self) -> sqlite3.Connection:
+        Path(self.db_path).parent.mkdir(parents=True, exist_ok=True)
+        conn = sqlite3.connect(self.db_path, timeout=10)
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.execute(
+            """
+            CREATE TABLE IF NOT EXISTS headline_sentiment (
+                headline_hash TEXT PRIMARY KEY,
+                title TEXT,
+                score REAL NOT NULL,
+                sentiment TEXT,
+                themes TEXT,
+                scored_at REAL NOT NULL
+            )
+            """
+        )
+        return conn
+
+    def _load(self) -> None:
+        with self._lock:
+            if self._loaded:
+                return
+            try:
+                conn = self._connect()
+                try:
+                    conn.execute(
+                        "DELETE FROM headline_sentiment WHERE scored_at < ?",
+                        (time.time() - SENTIMENT_RETENTION_DAYS * 86400,),
+                    )
+                    conn.commit()
+                    rows = conn.execute(
+                        "SELECT headline_hash, score, sentiment, themes FROM headline_sentiment"
+                    ).fetchall()
+                finally:
+                    conn.close()
+                for h, score, sentiment, themes in rows:
+                    self._scores[h] = {"score": score, "sentiment": sentiment, "themes": themes}
+            except Exception as e:
+                print(f"[NewsIndex] Failed to load sentiment cache: {e}")
+            self._loaded = True
+
+    def get(self, h: str) -> Optional[Dict[str, Any]]:
+        if not self._loaded:
+            self._load()
+        return self._scores.get(h)
+
+    def put_many(self, rows: List[Tuple[str, str, Dict[str, Any]]]) -> None:
+        """Store (hash, title, entry) rows."""
+        if not rows:
+            return
+        if not self._loaded:
+            self._load()
+        now = time.time()
+        for h, _, entry in rows:
+            self._scores[h] = entry
+        try:
+            conn = self._connect()
+            try:
+                conn.executemany(
+                    "INSERT OR REPLACE INTO headline_sentiment VALUES (?, ?, ?, ?, ?, ?)",
+                    [(h, title[:300], e["score"], e.get("sentiment"), e.get("themes"), now) for h, title, e in rows],
+                )
+                conn.commit()
+            finally:
+                conn.close()
+        except Exception as e:
+            print(f"[NewsIndex] Failed to persist sentiment scores: {e}")
+
+    def __len__(self) -> int:
+        if not self._loaded:
+            self._load()
+        return len(self._scores)
+
+
+# ==================== Index ====================
+
+_LINE = re.compile(r"^\s*(\d+)\s*[.):]?\s*\|\s*([A-Za-z]+)\s*\|\s*([\d.]+)\s*(?:\|\s*(.*))?$")
+
+
+class NewsIndex:
+    """Articles of the current news refresh, tagged with the symbols they mention."""
+
+    def __init__(self, sentiment_cache: Optional[HeadlineSentimentCache] = None):
+        self.sentiment_cache = sentiment_cache if sentiment_cache is not None else HeadlineSentimentCache()
+        self._matcher: Optional[EntityMatcher] = None
+        self._matcher_key: Any = None
+        self._known: Set[str] = set()
+        self._fingerprint: Optional[Tuple[Tuple[str, str], ...]] = None
+        self._general: List[Dict[str, Any]] = []
+        self._articles: Dict[Tuple[str, str], Dict[str, Any]] = {}
+        self._by_symbol: Dict[str, List[Dict[str, Any]]] = defaultdict(list)
+        self._scanned: Set[str] = set()
+        self._lock = threading.RLock()
+        self._score_locks: "weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, asyncio.Lock]" = weakref.WeakKeyDictionary()
+        # headlines waiting for the LLM, coalesced across concurrent symbols
+        self._pending: Dict[str, str] = {}
+        self.stats = {"rebuilds": 0, "tagged_articles": 0, "headlines_scored": 0, "llm_batches": 0, "score_hits": 0, "last_build_ms": 0.0}
+
+    # ---------- matcher ----------
+
+    def matcher(self) -> EntityMatcher:
+        """Matcher over the current instrument master snapshot (built once per snapshot)."""
+        from .instrument_master import get_instrument_master
+
+        master = get_instrument_master()
+        key = (master.snapshot_date, len(master))
+        if self._matcher is None or key != self._matcher_key:
+            with self._lock:
+                if self._matcher is None or key != self._matcher_key:
+                    started = time.perf_counter()
+                    equities = master.equities("NSE")
+                    self._matcher = EntityMatcher(build_patterns(equities))
+                    self._known = {symbol.upper() for symbol, _ in equities}
+                    self._matcher_key = key
+                    # Existing tags came from the previous snapshot: re-tag on the next update()
+                    self._fingerprint = None
+                    print(f"[NewsIndex] Entity matcher: {self._matcher.pattern_count} patterns, "
+                          f"{len(self._matcher.symbols)} symbols ({(time.perf_counter() - started) * 1000:.0f}ms)")
+        return self._matcher
+
+    # ---------- articles ----------
+
+    def _tag(self, article: Dict[str, Any], matcher: EntityMatcher) -> Set[str]:
+        text = f"{article.get('title', '')}\n{article.get('description', '')}"
+        symbols = matcher.find(text)
+        explicit = str(article.get("symbol", "") or "").upper()
+        if explicit:
+            symbols.add(explicit)
+        return symbols
+
+    def _add(self, article: Dict[str, Any], matcher: EntityMatcher, extra: Optional[str] = None) -> None:
+        key = article_key(article)
+        existing = self._articles.get(key)
+        if existing is not None:
+            # already indexed from another feed; make sure ``extra`` sees it
+            if extra and all(a is not existing for a in self._by_symbol[extra]):
+                self._by_symbol[extra].append(existing)
+            return
+        self._articles[key] = article
+        symbols = self._tag(article, matcher)
+        if extra:
+            symbols.add(extra)
+        if symbols:
+            self.stats["tagged_articles"] += 1
+        for symbol in symbols:
+            self._by_symbol[symbol].append(article)
+
+    def update(self, articles: List[Dict[str, Any]]) -> bool:
+        """Re-index the aggregated feed if it changed. Returns True on rebuild."""
+        fingerprint = tuple(article_key(a) for a in articles)
+        # May invalidate the fingerprint when a new instrument snapshot arrived
+        matcher = self.matcher()
+        if fingerprint == self._fingerprint:
+            return False
+        with self._lock:
+            if fingerprint == self._fingerprint:
+                return False
+            started = time.perf_counter()
+            self._general = list(articles)
+            self._articles = {}
+            self._by_symbol = defaultdict(list)
+            self._scanned = set()
+            for article in self._general:
+                self._add(article, matcher)
+            self._fingerprint = fingerprint
+            self.stats["rebuilds"] += 1
+            self.stats["last_build_ms"] = round((time.perf_counter() - started) * 1000.0, 2)
+        return True
+
+    def add_symbol_news(self, symbol: str, articles: List[Dict[str, Any]]) -> None:
+        """Merge a symbol-specific feed (tagged with ``symbol`` plus whatever it mentions)."""
+        if not articles:
+            return
+        matcher = self.matcher()
+        with self._lock:
+            for article in articles:
+                self._add(article, matcher, extra=symbol.upper())
+
+    def articles_for(self, symbol: str) -> List[Dict[str, Any]]:
+        """Articles mentioning ``symbol``: general feed first, then symbol feeds."""
+        symbol = symbol.upper()
+        self.matcher()  # refreshes _known for the current snapshot
+        if symbol not in self._known and symbol not in self._scanned:
+            # Not in the instrument master (e.g. no snapshot yet): scan once per refresh
+            single = EntityMatcher([(symbol, symbol, False)] + [
+                (symbol, alias, False) for alias in SYMBOL_ALIASES.get(symbol, [])
+            ])
+            with self._lock:
+                tagged = {id(a) for a in self._by_symbol.get(symbol, [])}
+                for article in self._articles.values():
+                    if id(article) not in tagged and symbol in self._tag(article, single):
+                        self._by_symbol[symbol].append(article)
+                self._scanned.add(symbol)
+        return list(self._by_symbol.get(symbol, []))
+
+    def general_news(self) -> List[Dict[str, Any]]:
+        return list(self._general)
+
+    # ---------- sentiment ----------
+
+    def _score_lock(self) -> asyncio.Lock:
+        loop = asyncio.get_running_loop()
+        lock = self._score_locks.get(loop)
+        if lock is None:
+            lock = self._score_locks[loop] = asyncio.Lock()
+        return lock
+
+    async def headline_sentiment(self, articles: List[Dict[str, Any]]) -> List[Optional[Dict[str, Any]]]:
+        """Cached LLM sentiment per article; unseen headlines are scored in batches.
+
+        Entries are None where no score is available (no LLM client or the
+        LLM did not return a parsable line).
+        """
+        titles = [str(a.get("title", "") or "") for a in articles]
+        hashes = [headline_hash(t) for t in titles]
+        cache = self.sentiment_cache
+        missing = {h: t for h, t in zip(hashes, titles) if t and cache.get(h) is None}
+        self.stats["score_hits"] += len(hashes) - len(missing)
+        if missing and llm_manager.client:
+            # One scorer at a time per loop. Symbols analysed concurrently queue
+            # their unseen headlines while a batch is in flight; the next scorer
+            # sends everything queued, so headlines shared by several symbols
+            # go out once and batches fill up across symbols.
+            self._pending.update(missing)
+            async with self._score_lock():
+                if any(cache.get(h) is None for h in missing):
+                    items = [(h, t) for h, t in self._pending.items() if cache.get(h) is None]
+                    self._pending.clear()
+                    await asyncio.gather(*(
+                        self._score_batch(items[start:start + SCORE_BATCH_SIZE])
+                        for start in range(0, len(items), SCORE_BATCH_SIZE)
+                    ))
+        return [cache.get(h) for h in hashes]
+
+    async def _score_batch(self, items: List[Tuple[str, str]]) -> None:
+        prompt = (
+            "Score the sentiment of each news headline for the stock it is about.\n\n"
+            + "\n".join(f"{i + 1}. {title}" for i, (_, title) in enumerate(items))
+            + "\n\nReply with one line per headline, in order:\n"
+            "number|sentiment|score|themes\n"
+            "sentiment is Bullish, Bearish or Neutral; score is 0-100 "
+            "(0=very bearish, 50=neutral, 100=very bullish); themes is a few words."
+        )
+        try:
+            result = await llm_manager.chat_completion(
+                purpose="sentiment",
+                messages=[
+                    {"role": "system", "content": "You are a financial news analyst."},
+                    {"role": "user", "content": prompt},
+                ],
+                complexity="simple",
+                max_tokens=min(1500, 40 * len(items) + 50),
+            )
+        except Exception as e:
+            print(f"  ⚠️  News sentiment batch failed: {e}")
+            return
+        self.stats["llm_batches"] += 1
+
+        rows: List[Tuple[str, str, Dict[str, Any]]] = []
+        for line in str(result.get("content", "") or "").splitlines():
+            m = _LINE.match(line)
+            if not m:
+                continue
+            idx = int(m.group(1)) - 1
+            if not 0 <= idx < len(items):
+                continue
+            try:
+                score = max(0.0, min(100.0, float(m.group(3))))
+            except ValueError:
+                continue
+            h, title = items[idx]
+            rows.append((h, title, {
+                "score": score,
+                "sentiment": m.group(2).capitalize(),
+                "themes": (m.group(4) or "").strip() or "General news",
+            }))
+        self.sentiment_cache.put_many(rows)
+        self.stats["headlines_scored"] += len(rows)
+
+    def get_stats(self) -> Dict[str, Any]:
+        matcher = self._matcher
+        return {
+            "articles": len(self._general),
+            "symbols_tagged": len(self._by_symbol),
+            "matcher_patterns": matcher.pattern_count if matcher else 0,
+            "cached_sentiments": len(self.sentiment_cache),
+            **self.stats,
+        }
+
+
+# Global instance
+news_index = NewsIndex()
+
+
+def get_news_index() -> NewsIndex:
+    return news_index
@@ -0,0 +1,368 @@
+"""
+Order Updates
+Push-based broker order state for trade intents.
+
+Kite sends an order-update message on the ticker connection whenever an
+order changes state. Updates are queued from the ticker thread, coalesced
+per order id and applied to BrokerOrder/TradeIntent rows in one
+transaction per flush; the changes are then pushed to the account's
+WebSocket clients. A periodic reconciler makes one orders() call per
+account with open intents to catch anything the stream missed (the shared
+ticker only carries the platform user's orders, so other accounts rely on
+it entirely).
+"""
+
+import asyncio
+import json
+import logging
+import os
+import threading
+import time
+from collections import deque
+from datetime import datetime, timedelta
+from typing import Any, Deque, Dict, Iterable, List, Optional
+
+from sqlalchemy.orm import Session
+
+from ..db import SessionLocal
+from ..db_models.trading import BrokerOrder, TradeIntent, TradeIntentState
+from . import broker_adapters
+from .brokers_zerodha import ZerodhaBroker
+
+logger = logging.getLogger(__name__)
+
+FLUSH_INTERVAL = float(os.getenv("ORDER_UPDATE_FLUSH_SEC", "0.25"))
+RECONCILE_INTERVAL = float(os.getenv("ORDER_RECONCILE_INTERVAL_SEC", "60"))
+# Kite's orders() only lists the current trading day
+RECONCILE_LOOKBACK = timedelta(days=1)
+
+TERMINAL_STATES = {
+    TradeIntentState.FILLED.value,
+    TradeIntentState.REJECTED.value,
+    TradeIntentState.CANCELLED.value,
+}
+OPEN_STATES = (
+    TradeIntentState.SUBMITTED_TO_BROKER.value,
+    TradeIntentState.ACCEPTED.value,
+)
+
+
+def _normalize(update: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+    """Reduce a Kite order payload (postback, ticker or orders() row) to the fields we store."""
+    if not isinstance(update, dict):
+        return None
+    order_id = update.get("order_id")
+    if not order_id:
+        return None
+    try:
+        fq = update.get("filled_quantity")
+        filled_qty = int(fq) if fq is not None else None
+    except Exception:
+        filled_qty = None
+    try:
+        ap = update.get("average_price")
+        average_price = float(ap) if ap is not None else None
+    except Exception:
+        average_price = None
+    return {
+        "order_id": str(order_id),
+        "status": update.get("status"),
+        "filled_qty": filled_qty,
+        "average_price": average_price,
+    }
+
+
+def apply_order_updates(db: Session, updates: Iterable[Dict[str, Any]]) -> List[Dict[str, Any]]:
+    """Apply Kite order updates to matching Zerodha orders in a single transaction.
+
+    Updates are coalesced per order id (latest wins). A terminal intent is
+    never moved back to an open state, and a non-terminal update never
+    lowers the filled quantity, so a stale reconcile snapshot cannot undo
+    a newer streamed update. Returns one change dict per row that changed.
+    """
+    latest: Dict[str, Dict[str, Any]] = {}
+    for update in updates:
+        n = _normalize(update)
+        if n is not None:
+            latest[n["order_id"]] = n
+    if not latest:
+        return []
+
+    orders = (
+        db.query(BrokerOrder)
+        .filter(BrokerOrder.broker == "ZERODHA", BrokerOrder.broker_order_id.in_(list(latest)))
+        .all()
+    )
+    if not orders:
+        return []
+    intents = {
+        i.id: i
+        for i in db.query(TradeIntent).filter(TradeIntent.id.in_({o.trade_intent_id for o in orders})).all()
+    }
+
+    changes: List[Dict[str, Any]] = []
+    for order in orders:
+        u = latest[order.broker_order_id]
+        intent = intents.get(order.trade_intent_id)
+        next_state = broker_adapters._map_zerodha_status_to_intent_state(u["status"])
+        current_state = intent.state if intent is not None else None
+
+        if current_state in TERMINAL_STATES and next_state not in TERMINAL_STATES:
+            continue
+        if (
+            next_state not in TERMINAL_STATES
+            and u["filled_qty"] is not None
+            and order.filled_qty is not None
+            and u["filled_qty"] < order.filled_qty
+        ):
+            continue
+
+        status = u["status"] or order.status
+        filled_qty = u["filled_qty"] if u["filled_qty"] is not None else order.filled_qty
+        average_price = u["average_price"] if u["average_price"] is not None else order.average_price
+        if (
+            status == order.status
+            and filled_qty == order.filled_qty
+            and average_price == order.average_price
+            and (intent is None or current_state == next_state)
+        ):
+            continue
+
+        order.status = status
+        order.filled_qty = filled_qty
+        order.average_price = average_price
+        order.raw_response_redacted = json.dumps(
+            {
+                "broker_order_id": order.broker_order_id,
+                "status": status,
+                "filled_qty": filled_qty,
+                "average_price": average_price,
+            }
+        )
+        if intent is not None:
+            intent.state = next_state
+
+        changes.append(
+            {
+                "account_id": intent.account_id if intent is not None else None,
+                "trade_intent_id": order.trade_intent_id,
+                "intent_state": intent.state if intent is not None else None,
+                "symbol": intent.symbol if intent is not None else None,
+                "order": {
+                    "broker": order.broker,
+                    "broker_order_id": order.broker_order_id,
+                    "status": status,
+                    "filled_qty": filled_qty,
+                    "average_price": average_price,
+                },
+            }
+        )
+
+    if changes:
+        db.commit()
+    return changes
+
+
+class OrderUpdatePipeline:
+    """Queues streamed order updates and applies them in batched transactions."""
+
+    def __init__(self):
+        self._queue: Deque[Dict[str, Any]] = deque()
+        self._lock = threading.Lock()
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._wake: Optional[asyncio.Event] = None
+        self._flush_task: Optional[asyncio.Task] = None
+        self._reconcile_task: Optional[asyncio.Task] = None
+        self._running = False
+        self._registered = False
+
+        self.stats = {
+            "received": 0,
+            "flushes": 0,
+            "applied": 0,
+            "changes_pushed": 0,
+            "reconcile_runs": 0,
+            "reconcile_api_calls": 0,
+            "reconcile_changes": 0,
+            "errors": 0,
+            "last_flush_ms": None,
+            "last_reconcile_at": None,
+        }
+
+    def submit(self, update: Dict[str, Any]) -> None:
+        """Queue one order update. Safe to call from the ticker thread."""
+        with self._lock:
+            self._queue.append(update)
+            self.stats["received"] += 1
+        loop, wake = self._loop, self._wake
+        if loop is not None and wake is not None and loop.is_running():
+            loop.call_soon_threadsafe(wake.set)
+
+    def _drain(self) -> List[Dict[str, Any]]:
+        with self._lock:
+            batch = list(self._queue)
+            self._queue.clear()
+        return batch
+
+    def _apply_batch(self, batch: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        db = SessionLocal()
+        try:
+            return apply_order_updates(db, batch)
+        except Exception as e:
+            db.rollback()
+            self.stats["errors"] += 1
+            logger.error("[OrderUpdates] Failed to apply %d updates: %s", len(batch), e, exc_info=True)
+            return []
+        finally:
+            db.close()
+
+    async def _push(self, changes: List[Dict[str, Any]]) -> None:
+        if not changes:
+            return
+        try:
+            from .websocket_manager import get_websocket_manager
+            manager = get_websocket_manager()
+        except Exception as e:
+            logger.warning("[OrderUpdates] WebSocket manager unavailable: %s", e)
+            return
+        for change in changes:
+            if not change.get("account_id"):
+                continue
+            await manager.send_to_account(change["account_id"], {"type": "order_update", **change})
+            self.stats["changes_pushed"] += 1
+
+    async def flush(self) -> List[Dict[str, Any]]:
+        """Apply everything queued so far and push the resulting changes."""
+        batch = self._drain()
+        if not batch:
+            return []
+        t0 = time.perf_counter()
+        changes = await asyncio.to_thread(self._apply_batch, batch)
+        self.stats["flushes"] += 1
+        self.stats["applied"] += len(changes)
+        self.stats["last_flush_ms"] = round((time.perf_counter() - t0) * 1000, 2)
+        await self._push(changes)
+        return changes
+
+    def _open_orders_by_account(self, account_id: Optional[str]) -> Dict[str, set]:
+        db = SessionLocal()
+        try:
+            q = (
+                db.query(TradeIntent.account_id, BrokerOrder.broker_order_id)
+                .join(BrokerOrder, BrokerOrder.trade_intent_id == TradeIntent.id)
+                .filter(
+                    TradeIntent.broker == "ZERODHA",
+                    TradeIntent.state.in_(OPEN_STATES),
+                    TradeIntent.created_at >= datetime.utcnow() - RECONCILE_LOOKBACK,
+                    BrokerOrder.broker_order_id.isnot(None),
+                )
+            )
+            if account_id:
+                q = q.filter(TradeIntent.account_id == account_id)
+            out: Dict[str, set] = {}
+            for acct, order_id in q.all():
+                out.setdefault(acct, set()).add(str(order_id))
+            return out
+        finally:
+            db.close()
+
+    def _fetch_orders(self, account_id: str) -> List[Dict[str, Any]]:
+        db = SessionLocal()
+        try:
+            access_token = broker_adapters._get_latest_access_token(db, account_id=account_id, broker="ZERODHA")
+        finally:
+            db.close()
+        self.stats["reconcile_api_calls"] += 1
+        return ZerodhaBroker().orders(access_token) or []
+
+    async def reconcile(self, account_id: Optional[str] = None) -> Dict[str, Any]:
+        """Bring open intents in line with the broker: one orders() call per account."""
+        open_orders = await asyncio.to_thread(self._open_orders_by_account, account_id)
+        summary: Dict[str, Any] = {"accounts": len(open_orders), "open_orders": 0, "changes": [], "errors": {}}
+        for acct, order_ids in open_orders.items():
+            summary["open_orders"] += len(order_ids)
+            try:
+                rows = await asyncio.to_thread(self._fetch_orders, acct)
+            except Exception as e:
+                self.stats["errors"] += 1
+                summary["errors"][acct] = getattr(e, "detail", None) or str(e)
+                continue
+            updates = [r for r in rows if isinstance(r, dict) and str(r.get("order_id")) in order_ids]
+            changes = await asyncio.to_thread(self._apply_batch, updates)
+            self.stats["reconcile_changes"] += len(changes)
+            await self._push(changes)
+            summary["changes"].extend(changes)
+        self.stats["reconcile_runs"] += 1
+        self.stats["last_reconcile_at"] = datetime.utcnow().isoformat() + "Z"
+        return summary
+
+    async def _flush_loop(self) -> None:
+        while self._running:
+            try:
+                await self._wake.wait()
+                self._wake.clear()
+                # Short window so a burst (fill after fill on one order) lands in one transaction
+                await asyncio.sleep(FLUSH_INTERVAL)
+                await self.flush()
+            except asyncio.CancelledError:
+                break
+            except Exception as e:
+                self.stats["errors"] += 1
+                logger.error("[OrderUpdates] Flush loop error: %s", e, exc_info=True)
+
+    async def _reconcile_loop(self) -> None:
+        while self._running:
+            try:
+                await asyncio.sleep(RECONCILE_INTERVAL)
+                await self.reconcile()
+            except asyncio.CancelledError:
+                break
+            except Exception as e:
+                self.stats["errors"] += 1
+                logger.error("[OrderUpdates] Reconcile loop error: %s", e, exc_info=True)
+
+    async def start(self) -> None:
+        if self._running:
+            return
+        self._loop = asyncio.get_running_loop()
+        self._wake = asyncio.Event()
+        self._running = True
+        if not self._registered:
+            from .zerodha_websocket import get_zerodha_websocket
+            get_zerodha_websocket().register_order_update_callback(self.submit)
+            self._registered = True
+        self._flush_task = asyncio.create_task(self._flush_loop())
+        self._reconcile_task = asyncio.create_task(self._reconcile_loop())
+        if self._queue:
+            self._wake.set()
+        logger.info("[OrderUpdates] Started - reconciling every %.0fs", RECONCILE_INTERVAL)
+
+    def stop(self) -> None:
+        if not self._running:
+            return
+        self._running = False
+        for task in (self._flush_task, self._reconcile_task):
+            if task and not task.done():
+                task.cancel()
+        logger.info("[OrderUpdates] Stopped")
+
+    def get_stats(self) -> Dict[str, Any]:
+        return {**self.stats, "queued": len(self._queue), "running": self._running}
+
+
+# Global instance
+order_update_pipeline = OrderUpdatePipeline()
+
+
+def get_order_update_pipeline() -> OrderUpdatePipeline:
+    return order_update_pipeline
+
+
+async def start_order_updates() -> None:
+    """Start order-update flushing and reconciliation (called on app startup)."""
+    await order_update_pipeline.start()
+
+
+def stop_order_updates() -> None:
+    """Stop order-update flushing and reconciliation (called on app shutdown)."""
+    order_update_pipeline.stop()
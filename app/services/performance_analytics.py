@@ -11,6 +11,7 @@ from typing import List, Dict, Any, Optional, Tuple
 import pandas as pd
 import numpy as np
 from ..services.chart_data_service import chart_data_service
+from ..core.candles import candle_frame
 from ..services.top_picks_store import get_top_picks_store
 from ..services.policy_store import get_policy_store
 from ..core.market_hours import is_cash_market_open_ist, IST_OFFSET
@@ -579,7 +580,7 @@ class PerformanceAnalytics:
                     )
                     continue
 
-                candles = pd.DataFrame(chart_data['candles'])
+                candles = candle_frame(chart_data['candles'])
                 current_price = chart_data.get('current', {}).get('price', 0)
 
                 # Find entry price using the full recommendation timestamp when available.
@@ -1746,7 +1747,7 @@ class PerformanceAnalytics:
             if not candles:
                 return {}
 
-            df = pd.DataFrame(candles)
+            df = candle_frame(candles)
             if df.empty or "time" not in df or "open" not in df or "close" not in df:
                 return {}
 
@@ -2130,7 +2131,7 @@ class PerformanceAnalytics:
                 if not chart_data or "candles" not in chart_data:
                     continue
 
-                candles = pd.DataFrame(chart_data["candles"])
+                candles = candle_frame(chart_data["candles"])
                 if candles.empty or "time" not in candles or "close" not in candles:
                     continue
 
@@ -2185,7 +2186,7 @@ class PerformanceAnalytics:
                 if not chart_data or "candles" not in chart_data:
                     continue
 
-                candles = pd.DataFrame(chart_data["candles"])
+                candles = candle_frame(chart_data["candles"])
                 if candles.empty or "time" not in candles or "close" not in candles:
                     continue
 
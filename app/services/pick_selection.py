@@ -0,0 +1,224 @@
+"""
+Pick Selection
+Post-analysis selection steps for TopPicksEngine.generate_daily_picks.
+
+- ``filter_by_confidence`` / ``attach_recommendations``: confidence filter,
+  blend-score ordering and get_recommendation fields per result.
+- ``directional_thresholds`` resolves the per-mode score/RR cutoffs and the
+  Scalping long/short caps (entry-bandit action, then policy thresholds,
+  then mode defaults, with regime multipliers on the caps) from one
+  defaults table instead of a per-mode if/elif block.
+- ``split_directional`` buckets recommended results into bullish and
+  bearish picks with those cutoffs, including the relaxed bear pass for
+  modes that end up without shorts.
+
+All steps work on the result dicts in order, as generate_daily_picks did
+inline; scripts/selection_fixtures.py keeps that inline code for the
+parity test.
+"""
+
+from dataclasses import dataclass
+from typing import Any, Dict, List, Optional, Tuple
+
+from ..utils.recommendation_system import get_recommendation
+
+CONFIDENCE_LEVELS = {'low': 1, 'medium': 2, 'high': 3}
+
+
+def filter_by_confidence(results: List[Dict[str, Any]], min_confidence: str) -> List[Dict[str, Any]]:
+    """Results at or above ``min_confidence``, highest blend score first."""
+    min_level = CONFIDENCE_LEVELS.get(min_confidence.lower(), 2)
+
+    filtered_results = []
+    for result in results:
+        confidence = result.get('confidence', 'Low').lower()
+        result_level = CONFIDENCE_LEVELS.get(confidence, 1)
+
+        if result_level >= min_level:
+            filtered_results.append(result)
+
+    filtered_results.sort(key=lambda x: x.get('blend_score', 0), reverse=True)
+    return filtered_results
+
+
+def attach_recommendations(results: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+    """Write get_recommendation fields onto each result; returns the same dicts."""
+    for result in results:
+        risk_score = None
+        for agent in result.get('agents', []):
+            if agent.get('agent') == 'risk':
+                risk_score = agent.get('score')
+                break
+
+        rec_result = get_recommendation(
+            score=result.get('blend_score', 0),
+            confidence=result.get('confidence', 'Medium'),
+            risk_agent_score=risk_score,
+            agent_signals=result.get('key_signals', [])
+        )
+
+        result['recommendation'] = rec_result.recommendation.value
+        result['is_actionable'] = rec_result.is_actionable
+        result['recommendation_note'] = rec_result.note
+        result['risk_reward_ratio'] = rec_result.risk_reward_ratio
+        result['color_scheme'] = rec_result.color_scheme
+
+    return list(results)
+
+
+# Default (bull_min_score, bull_min_rr, bear_max_score, bear_min_rr) per mode
+MODE_THRESHOLD_DEFAULTS: Dict[str, tuple] = {
+    "Scalping": (55, 1.2, 44, 1.2),
+    "Intraday": (60, 1.5, 44, 1.5),
+    "Swing": (60, 1.8, 45, 1.8),
+    "Options": (65, 1.8, 40, 1.8),
+    "Futures": (60, 1.7, 44, 1.7),
+}
+
+# Modes that fall back to a relaxed bear threshold when no short qualifies
+RELAXED_BEAR_MODES = ("Scalping", "Intraday", "Futures")
+RELAXED_BEAR_MAX_SCORE = 48.0
+
+
+@dataclass
+class DirectionalThresholds:
+    """Score/RR cutoffs for long and short picks (0 disables a cutoff)."""
+    bull_min_score: float = 0.0
+    bull_min_rr: float = 0.0
+    bear_max_score: float = 0.0
+    bear_min_rr: float = 0.0
+    max_long_picks: Optional[int] = None
+    max_short_picks: Optional[int] = None
+
+
+def directional_thresholds(
+    mode: str,
+    thresholds: Dict[str, Any],
+    entry_action_cfg: Optional[Dict[str, Any]],
+    entry_regime_bias: Dict[str, Any],
+    top_n: int,
+) -> DirectionalThresholds:
+    """Per-mode thresholds: entry-bandit action, then policy thresholds, then defaults.
+
+    Long/short caps apply to Scalping only; the bandit action may set them
+    and the regime bias scales them (clamped to ``top_n``).
+    """
+    defaults = MODE_THRESHOLD_DEFAULTS.get(mode)
+    if defaults is None:
+        return DirectionalThresholds(
+            bull_min_score=float(thresholds.get("min_blend_score", 0) or 0),
+            bull_min_rr=float(thresholds.get("min_risk_reward", 0) or 0),
+        )
+
+    action = entry_action_cfg or {}
+    keys = ("bull_min_score", "bull_min_rr", "bear_max_score", "bear_min_rr")
+    values = [float(action.get(k) or thresholds.get(k, d) or d) for k, d in zip(keys, defaults)]
+    out = DirectionalThresholds(*values)
+    if mode != "Scalping":
+        return out
+
+    caps = []
+    for key, bias_key in (("max_long_picks", "long_mult"), ("max_short_picks", "short_mult")):
+        try:
+            cap = int(action.get(key) or top_n)
+        except Exception:
+            cap = top_n
+        try:
+            mult = float(entry_regime_bias.get(bias_key, 1.0) or 1.0)
+        except Exception:
+            mult = 1.0
+        caps.append(max(0, min(top_n, int(round(cap * mult)))))
+    out.max_long_picks, out.max_short_picks = caps
+    return out
+
+
+def pick_score(val: Any) -> float:
+    """Blend score of a result (``score_blend`` first), 0.0 when unusable."""
+    try:
+        v = val.get('score_blend', val.get('blend_score', 0.0))
+    except AttributeError:
+        try:
+            return float(val or 0.0)
+        except Exception:
+            return 0.0
+    try:
+        return float(v or 0.0)
+    except Exception:
+        return 0.0
+
+
+def pick_risk_reward(val: Dict[str, Any]) -> Optional[float]:
+    rr_val = val.get('risk_reward_ratio')
+    if rr_val is None:
+        return None
+    try:
+        return float(rr_val)
+    except Exception:
+        return None
+
+
+def split_directional(
+    picks: List[Dict[str, Any]],
+    mode: str,
+    t: DirectionalThresholds,
+) -> Tuple[List[Dict[str, Any]], List[Dict[str, Any]]]:
+    """Bullish and bearish picks (in input order) that pass ``t``.
+
+    ``picks`` carry recommendation fields from get_recommendation.
+    """
+    bullish_results: List[Dict[str, Any]] = []
+    bearish_results: List[Dict[str, Any]] = []
+    scalping = mode == "Scalping"
+
+    long_count = 0
+    short_count = 0
+
+    for r in picks:
+        if not r.get('is_actionable', True):
+            continue
+
+        score_f = pick_score(r)
+        rr_f = pick_risk_reward(r)
+        rec_text = str(r.get('recommendation') or "")
+
+        if rec_text in ("Strong Buy", "Buy"):
+            if t.bull_min_score > 0 and score_f < t.bull_min_score:
+                continue
+            if t.bull_min_rr > 0 and (rr_f is None or rr_f < t.bull_min_rr):
+                continue
+            if scalping and t.max_long_picks is not None and long_count >= t.max_long_picks:
+                continue
+            bullish_results.append(r)
+            if scalping and t.max_long_picks is not None:
+                long_count += 1
+        elif rec_text in ("Sell", "Strong Sell"):
+            if t.bear_max_score > 0 and score_f > t.bear_max_score:
+                continue
+            if t.bear_min_rr > 0 and (rr_f is None or rr_f < t.bear_min_rr):
+                continue
+            bearish_results.append(r)
+            if scalping and t.max_short_picks is not None:
+                short_count += 1
+
+    # Optional relaxed bear threshold when too few shorts are available
+    if mode in RELAXED_BEAR_MODES and not bearish_results:
+        relaxed_max = t.bear_max_score if t.bear_max_score > 0 else RELAXED_BEAR_MAX_SCORE
+        relaxed_max = max(relaxed_max, RELAXED_BEAR_MAX_SCORE)
+        for r in picks:
+            if not r.get('is_actionable', True):
+                continue
+            rec_text = str(r.get('recommendation') or "")
+            if rec_text not in ("Sell", "Strong Sell"):
+                continue
+            score_f = pick_score(r)
+            rr_f = pick_risk_reward(r)
+            if score_f <= relaxed_max and (
+                t.bear_min_rr <= 0 or (rr_f is not None and rr_f >= t.bear_min_rr)
+            ):
+                if scalping and t.max_short_picks is not None and short_count >= t.max_short_picks:
+                    continue
+                bearish_results.append(r)
+                if scalping and t.max_short_picks is not None:
+                    short_count += 1
+
+    return bullish_results, bearish_results
@@ -7,6 +7,10 @@ Tracks and monitors actionable picks system performance:
 - User interactions with picks
 - Conversion rates (picks viewed → trades executed)
 - Feedback collection
+
+Range queries (conversion rate, fewer-picks frequency) are answered from
+event rollups fed as entries are logged; the JSONL files remain the raw
+audit trail and the source for `python -m app.services.event_rollups backfill`.
 """
 
 from datetime import datetime, timedelta
@@ -15,13 +19,17 @@ from typing import Dict, List, Optional, Any
 import json
 from collections import defaultdict
 
+from .event_rollups import EventRollupStore, event_rollups
+
+ROLLUP_SOURCE = "picks_analytics"
+
 
 class PicksAnalytics:
     """
     Analytics service for monitoring picks system
     """
     
-    def __init__(self, data_dir: Optional[Path] = None):
+    def __init__(self, data_dir: Optional[Path] = None, rollups: Optional[EventRollupStore] = None):
         """Initialize analytics with data directory"""
         if data_dir is None:
             data_dir = Path(__file__).parent.parent.parent / "data" / "analytics"
@@ -34,6 +42,8 @@ class PicksAnalytics:
         self.interactions_log_file = self.data_dir / "interactions_log.jsonl"
         self.feedback_file = self.data_dir / "feedback.jsonl"
         self.daily_stats_file = self.data_dir / "daily_stats.json"
+        
+        self.rollups = rollups or event_rollups
     
     def log_picks_generation(
         self,
@@ -182,7 +192,7 @@ class PicksAnalytics:
         Returns:
             Dictionary with conversion metrics
         """
-        cutoff = datetime.now() - timedelta(days=days)
+        cutoff = datetime.utcnow() - timedelta(days=days)
         
         picks_shown = 0
         chart_views = 0
@@ -190,56 +200,25 @@ class PicksAnalytics:
         feedback_count = 0
         trade_signals = 0
         
-        # Count picks shown
-        try:
-            if self.picks_log_file.exists():
-                with open(self.picks_log_file, 'r') as f:
-                    for line in f:
-                        try:
-                            entry = json.loads(line)
-                            ts = datetime.fromisoformat(entry['timestamp'].replace('Z', '+00:00'))
-                            if ts >= cutoff:
-                                picks_shown += entry.get('returned', 0)
-                        except:
-                            continue
-        except Exception as e:
-            print(f"[PicksAnalytics] Error reading picks log: {e}")
-        
-        # Count interactions
-        try:
-            if self.interactions_log_file.exists():
-                with open(self.interactions_log_file, 'r') as f:
-                    for line in f:
-                        try:
-                            entry = json.loads(line)
-                            ts = datetime.fromisoformat(entry['timestamp'].replace('Z', '+00:00'))
-                            if ts >= cutoff:
-                                action = entry.get('action', '')
-                                if action == 'view_chart':
-                                    chart_views += 1
-                                elif action == 'analyze':
-                                    analyze_requests += 1
-                        except:
-                            continue
-        except Exception as e:
-            print(f"[PicksAnalytics] Error reading interactions log: {e}")
-        
-        # Count feedback
         try:
-            if self.feedback_file.exists():
-                with open(self.feedback_file, 'r') as f:
-                    for line in f:
-                        try:
-                            entry = json.loads(line)
-                            ts = datetime.fromisoformat(entry['timestamp'].replace('Z', '+00:00'))
-                            if ts >= cutoff:
-                                feedback_count += 1
-                                if entry.get('feedback_type') == 'trade_executed':
-                                    trade_signals += 1
-                        except:
-                            continue
+            # Count picks shown
+            shown = self.rollups.total('picks_generated', cutoff, metric='returned', source=ROLLUP_SOURCE)
+            picks_shown = int(shown['sum'])
+            
+            # Count interactions
+            for row in self.rollups.query('pick_interaction', cutoff, group_by=('action',), source=ROLLUP_SOURCE):
+                if row['action'] == 'view_chart':
+                    chart_views += row['n']
+                elif row['action'] == 'analyze':
+                    analyze_requests += row['n']
+            
+            # Count feedback
+            for row in self.rollups.query('user_feedback', cutoff, group_by=('feedback_type',), source=ROLLUP_SOURCE):
+                feedback_count += row['n']
+                if row['feedback_type'] == 'trade_executed':
+                    trade_signals += row['n']
         except Exception as e:
-            print(f"[PicksAnalytics] Error reading feedback log: {e}")
+            print(f"[PicksAnalytics] Error reading rollups: {e}")
         
         # Calculate rates
         chart_view_rate = (chart_views / picks_shown * 100) if picks_shown > 0 else 0
@@ -270,7 +249,7 @@ class PicksAnalytics:
         Returns:
             Statistics about fewer-than-requested picks
         """
-        cutoff = datetime.now() - timedelta(days=days)
+        cutoff = datetime.utcnow() - timedelta(days=days)
         
         total_generations = 0
         fewer_than_5_count = 0
@@ -278,26 +257,20 @@ class PicksAnalytics:
         by_universe = defaultdict(lambda: {"total": 0, "fewer": 0})
         
         try:
-            if self.picks_log_file.exists():
-                with open(self.picks_log_file, 'r') as f:
-                    for line in f:
-                        try:
-                            entry = json.loads(line)
-                            ts = datetime.fromisoformat(entry['timestamp'].replace('Z', '+00:00'))
-                            if ts >= cutoff:
-                                total_generations += 1
-                                returned = entry.get('returned', 0)
-                                requested = entry.get('requested', 5)
-                                universe = entry.get('universe', 'unknown')
-                                
-                                pick_counts[returned] += 1
-                                by_universe[universe]["total"] += 1
-                                
-                                if returned < requested:
-                                    fewer_than_5_count += 1
-                                    by_universe[universe]["fewer"] += 1
-                        except:
-                            continue
+            for row in self.rollups.query(
+                'picks_generated', cutoff, group_by=('universe', 'returned'), source=ROLLUP_SOURCE
+            ):
+                universe = row['universe'] or 'unknown'
+                total_generations += row['n']
+                pick_counts[row['returned'] or 0] += row['n']
+                by_universe[universe]["total"] += row['n']
+            
+            for row in self.rollups.query(
+                'picks_generated', cutoff, metric='fewer_than_requested', group_by=('universe',), source=ROLLUP_SOURCE
+            ):
+                fewer = int(row['sum'])
+                fewer_than_5_count += fewer
+                by_universe[row['universe'] or 'unknown']["fewer"] += fewer
         except Exception as e:
             print(f"[PicksAnalytics] Error analyzing fewer picks: {e}")
         
@@ -323,12 +296,33 @@ class PicksAnalytics:
         }
     
     def _append_to_log(self, file_path: Path, entry: Dict):
-        """Append entry to JSONL log file"""
+        """Append entry to JSONL log file and roll it up"""
         try:
             with open(file_path, 'a') as f:
                 f.write(json.dumps(entry) + '\n')
         except Exception as e:
             print(f"[PicksAnalytics] Error appending to log: {e}")
+        
+        try:
+            event_type, source, payload, _ = self._to_rollup_event(entry)
+            self.rollups.record(event_type, source, payload)
+        except Exception as e:
+            print(f"[PicksAnalytics] Error updating rollups: {e}")
+    
+    @staticmethod
+    def _to_rollup_event(entry: Dict):
+        """Map a log entry to (event_type, source, payload, ts) for rollups"""
+        payload = {k: v for k, v in entry.items() if k not in ('event', 'timestamp')}
+        return entry.get('event', 'unknown'), ROLLUP_SOURCE, payload, entry.get('timestamp')
+    
+    def backfill_rollups(self, rollups: Optional[EventRollupStore] = None, since: Optional[datetime] = None) -> int:
+        """Roll up existing picks/interactions/feedback logs (entries at or after ``since``)"""
+        rollups = rollups or self.rollups
+        count = 0
+        for file_path in (self.picks_log_file, self.interactions_log_file, self.feedback_file):
+            if file_path.exists():
+                count += rollups.backfill_jsonl(file_path, self._to_rollup_event, since=since)
+        return count
     
     def _update_daily_stats(self, log_entry: Dict):
         """Update daily statistics file"""
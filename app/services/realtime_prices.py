@@ -11,6 +11,68 @@ from ..utils.json_encoder import convert_numpy_types
 logger = logging.getLogger(__name__)
 
 
+# Pick fields written by realtime_fields()
+REALTIME_FIELDS = (
+    'last_price', 'current_price', 'prev_close', 'intraday_change_pct',
+    'open', 'high', 'low', 'volume', 'price_data_source',
+)
+
+
+def realtime_fields(quote: Dict, provider=None) -> Dict:
+    """
+    Map a provider quote to the realtime fields shown on a pick
+    
+    Args:
+        quote: Quote dict from get_quote_async
+        provider: Provider used as the source label when the quote has none
+        
+    Returns:
+        Dict with the REALTIME_FIELDS keys (native Python types)
+    """
+    # Extract data
+    last_price = quote.get('price', 0)
+    prev_close = quote.get('close', 0)
+    open_price = quote.get('open', 0)
+    high_price = quote.get('high', 0)
+    low_price = quote.get('low', 0)
+    volume = quote.get('volume', 0)
+
+    # Calculate intraday change.
+    # Prefer provider's own change_percent (which is already
+    # correctly computed for both Zerodha and Yahoo), and only
+    # fall back to last_price vs prev_close when that is
+    # unavailable. This avoids the Yahoo-specific bug where
+    # price == close and we were always returning 0.0%.
+    change_pct = quote.get('change_percent')
+    intraday_change_pct = 0.0
+    try:
+        if isinstance(change_pct, (int, float)):
+            intraday_change_pct = float(change_pct)
+        elif prev_close and prev_close > 0 and last_price:
+            intraday_change_pct = ((last_price - prev_close) / prev_close) * 100
+    except Exception:
+        intraday_change_pct = 0.0
+
+    # Normalise data source label (Zerodha vs Yahoo Finance)
+    try:
+        src = str(quote.get('source') or (provider.get_data_source() if provider else '')).lower()
+    except Exception:
+        src = ''
+
+    # Convert to native Python types to avoid numpy serialization issues
+    return {
+        'last_price': float(round(last_price, 2)),
+        'current_price': float(round(last_price, 2)),
+        'prev_close': float(round(prev_close, 2)),
+        'intraday_change_pct': float(round(intraday_change_pct, 2)),
+        'open': float(round(open_price, 2)),
+        'high': float(round(high_price, 2)),
+        'low': float(round(low_price, 2)),
+        'volume': int(volume) if volume else 0,
+        'price_data_source': 'Zerodha' if 'zerodha' in src else 'Yahoo Finance',
+    }
+
+
 async def enrich_picks_with_realtime_data(picks: List[Dict]) -> List[Dict]:
     """
     Enrich picks with real-time price data from Zerodha
@@ -44,8 +106,8 @@ async def enrich_picks_with_realtime_data(picks: List[Dict]) -> List[Dict]:
         # Get unified provider (Zerodha first, Yahoo fallback)
         provider = get_data_provider()
         
-        # Fetch quotes
-        quotes = provider.get_quote(symbols)
+        # Fetch quotes (batched, off the event loop, short-TTL cached)
+        quotes = await provider.get_quote_async(symbols)
         
         logger.info(f"✅ Fetched real-time data for {len(quotes)} symbols")
         
@@ -54,52 +116,10 @@ async def enrich_picks_with_realtime_data(picks: List[Dict]) -> List[Dict]:
         for pick in picks:
             symbol = pick.get('symbol')
             if symbol and symbol in quotes:
-                quote = quotes[symbol]
-                
-                # Extract data
-                last_price = quote.get('price', 0)
-                prev_close = quote.get('close', 0)
-                open_price = quote.get('open', 0)
-                high_price = quote.get('high', 0)
-                low_price = quote.get('low', 0)
-                volume = quote.get('volume', 0)
-
-                # Calculate intraday change.
-                # Prefer provider's own change_percent (which is already
-                # correctly computed for both Zerodha and Yahoo), and only
-                # fall back to last_price vs prev_close when that is
-                # unavailable. This avoids the Yahoo-specific bug where
-                # price == close and we were always returning 0.0%.
-                change_pct = quote.get('change_percent')
-                intraday_change_pct = 0.0
-                try:
-                    if isinstance(change_pct, (int, float)):
-                        intraday_change_pct = float(change_pct)
-                    elif prev_close and prev_close > 0 and last_price:
-                        intraday_change_pct = ((last_price - prev_close) / prev_close) * 100
-                except Exception:
-                    intraday_change_pct = 0.0
-                
-                # Add to pick - convert to native Python types to avoid numpy serialization issues
-                pick['last_price'] = float(round(last_price, 2))
-                pick['current_price'] = float(round(last_price, 2))
-                pick['prev_close'] = float(round(prev_close, 2))
-                pick['intraday_change_pct'] = float(round(intraday_change_pct, 2))
-                pick['open'] = float(round(open_price, 2))
-                pick['high'] = float(round(high_price, 2))
-                pick['low'] = float(round(low_price, 2))
-                pick['volume'] = int(volume) if volume else 0
-
-                # Normalise data source label (Zerodha vs Yahoo Finance)
-                try:
-                    src = str(provider.get_data_source()).lower()
-                except Exception:
-                    src = ''
-                pick['price_data_source'] = 'Zerodha' if 'zerodha' in src else 'Yahoo Finance'
-                
+                pick.update(realtime_fields(quotes[symbol], provider))
                 enriched_count += 1
                 
-                logger.debug(f"  {symbol}: ₹{last_price} ({intraday_change_pct:+.2f}%)")
+                logger.debug(f"  {symbol}: ₹{pick['last_price']} ({pick['intraday_change_pct']:+.2f}%)")
         
         logger.info(f"✅ Enriched {enriched_count}/{len(picks)} picks with real-time data")
         
@@ -8,7 +8,7 @@ from typing import Any, Optional, List, Dict
 from datetime import datetime, timedelta
 import redis
 from app.config.redis_config import get_redis_client
-from app.utils.json_encoder import safe_json_dumps, convert_numpy_types
+from app.utils.json_encoder import safe_json_dumps, convert_numpy_types, fast_json_dumps
 
 
 class RedisCache:
@@ -51,9 +51,7 @@ class RedisCache:
         """
         try:
             namespaced_key = self._make_key(key)
-            # Convert numpy/pandas types before serialization
-            safe_value = convert_numpy_types(value)
-            serialized = safe_json_dumps(safe_value)
+            serialized = fast_json_dumps(value)
             
             if ttl:
                 return self.redis.setex(namespaced_key, ttl, serialized)
@@ -128,9 +126,7 @@ class RedisCache:
         """Set hash field"""
         try:
             namespaced_key = self._make_key(key)
-            # Convert numpy/pandas types before serialization
-            safe_value = convert_numpy_types(value)
-            serialized = safe_json_dumps(safe_value)
+            serialized = fast_json_dumps(value)
             return self.redis.hset(namespaced_key, field, serialized) >= 0
         except Exception as e:
             print(f"Redis hset error: {e}")
@@ -202,7 +198,8 @@ class RedisCache:
         """
         try:
             namespaced_key = self._make_key(key)
-            # Serialize members with safe encoder
+            # Members are compared by their serialized form (zrem), so keep
+            # the stdlib encoding that existing sorted sets were written with
             serialized_mapping = {safe_json_dumps(convert_numpy_types(k)): v for k, v in mapping.items()}
             return self.redis.zadd(namespaced_key, serialized_mapping, nx=nx)
         except Exception as e:
@@ -267,8 +264,7 @@ class RedisCache:
         """Push values to list head"""
         try:
             namespaced_key = self._make_key(key)
-            # Convert numpy/pandas types before serialization
-            serialized = [safe_json_dumps(convert_numpy_types(v)) for v in values]
+            serialized = [fast_json_dumps(v) for v in values]
             return self.redis.lpush(namespaced_key, *serialized)
         except Exception as e:
             print(f"Redis lpush error: {e}")
@@ -278,8 +274,7 @@ class RedisCache:
         """Push values to list tail"""
         try:
             namespaced_key = self._make_key(key)
-            # Convert numpy/pandas types before serialization
-            serialized = [safe_json_dumps(convert_numpy_types(v)) for v in values]
+            serialized = [fast_json_dumps(v) for v in values]
             return self.redis.rpush(namespaced_key, *serialized)
         except Exception as e:
             print(f"Redis rpush error: {e}")
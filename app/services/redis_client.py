@@ -3,7 +3,7 @@ import json
 import logging
 from typing import Any, Optional
 import uuid
-from app.utils.json_encoder import safe_json_dumps, convert_numpy_types
+from app.utils.json_encoder import fast_json_dumps
 
 logger = logging.getLogger(__name__)
 
@@ -59,9 +59,7 @@ def set_json(key: str, value: Any, ex: Optional[int] = None) -> None:
     if not client:
         return
     try:
-        # Convert numpy/pandas types before serialization
-        safe_value = convert_numpy_types(value)
-        payload = safe_json_dumps(safe_value)
+        payload = fast_json_dumps(value)
         client.set(key, payload, ex=ex)
     except Exception as e:
         logger.warning("Redis set_json failed for %s: %s", key, e)
@@ -0,0 +1,314 @@
+"""
+Scalping Dirty Set
+Incremental re-ranking for the 10-minute scalping cycle.
+
+The scalping cycle used to re-run every Scalping agent for every nifty50 and
+banknifty constituent every 10 minutes, although most symbols barely move
+between two cycles. ``ScalpingDirtySet`` remembers, per universe, the
+aggregated coordinator result of each symbol together with the inputs it was
+computed from (last price, ATR, typical 1m volume, tagged news). A symbol is
+re-run only when it is dirty:
+
+- ``new``: no previous result (new constituent, or its last analysis failed
+  or was partial);
+- ``price``: a closed 1m bar is more than SCALPING_DIRTY_ATR_FRACTION x ATR
+  (14 x 15m bars) away from the price it was last ranked at;
+- ``volume``: a closed 1m bar traded SCALPING_DIRTY_VOLUME_SPIKE x its
+  typical 1m volume;
+- ``news``: the news index tags an article to it that it was not ranked with;
+- ``bar``: a bar of SCALPING_DIRTY_BAR_INTERVAL closed (off by default; bars
+  close for the whole universe at once, so this degrades to a full refresh);
+- ``no_ticks``: live candles cannot vouch for it (not seeded, feed stale).
+
+Price and volume marks come from LiveCandleBuilder's bar-close callback, so
+moves that revert before the next cycle still count; the latest closed bar
+is checked again when the cycle is planned. Clean symbols reuse their
+previous result and the engine ranks the merged set as before.
+
+Every SCALPING_FULL_REFRESH_EVERY-th cycle re-runs everything, as does the
+first cycle of a session and any cycle whose agent set or weights changed,
+so reused results never drift far (universe-wide inputs such as the index
+regime are only refreshed that way).
+
+Each cycle's recomputed fraction and analysis time are logged, exported as
+``fyntrix_scalping_recompute_fraction`` / ``fyntrix_scalping_analysis_seconds``
+and returned in the engine metadata (``incremental``).
+
+Configuration (environment):
+- SCALPING_INCREMENTAL: set to 0/off to re-run every symbol every cycle (default on)
+- SCALPING_FULL_REFRESH_EVERY: every Nth cycle is a full refresh (default 3)
+- SCALPING_DIRTY_ATR_FRACTION: price move, in ATRs, that dirties a symbol (default 0.5)
+- SCALPING_DIRTY_VOLUME_SPIKE: 1m volume multiple that dirties a symbol (default 3.0)
+- SCALPING_DIRTY_BAR_INTERVAL: also dirty a symbol on every close of this interval (default off)
+"""
+
+import copy
+import os
+import threading
+from collections import Counter
+from datetime import date
+from typing import Any, Dict, FrozenSet, List, Optional, Tuple
+
+import numpy as np
+
+from ..core.market_hours import now_ist
+from ..core.metrics import metrics
+from .live_candles import get_live_candles
+from .news_index import article_key, get_news_index
+
+INCREMENTAL_ENABLED = os.getenv("SCALPING_INCREMENTAL", "1").strip().lower() not in ("0", "off", "false", "no")
+FULL_REFRESH_EVERY = int(os.getenv("SCALPING_FULL_REFRESH_EVERY", "3"))
+ATR_FRACTION = float(os.getenv("SCALPING_DIRTY_ATR_FRACTION", "0.5"))
+VOLUME_SPIKE = float(os.getenv("SCALPING_DIRTY_VOLUME_SPIKE", "3.0"))
+BAR_INTERVAL = os.getenv("SCALPING_DIRTY_BAR_INTERVAL", "").strip()
+
+ATR_INTERVAL = "15m"
+ATR_BARS = 14
+VOLUME_BARS = 30
+
+RECOMPUTE_FRACTION = metrics.histogram(
+    "fyntrix_scalping_recompute_fraction", "Share of symbols re-analyzed per scalping cycle",
+    ("universe",), buckets=(0.05, 0.1, 0.2, 0.3, 0.5, 0.75, 1.0))
+ANALYSIS_SECONDS = metrics.histogram(
+    "fyntrix_scalping_analysis_seconds", "Agent analysis time per scalping cycle", ("universe", "refresh"))
+
+
+def _atr(bars: List[Dict[str, Any]]) -> Optional[float]:
+    if len(bars) < 2:
+        return None
+    high = np.array([b["high"] for b in bars], dtype=np.float64)
+    low = np.array([b["low"] for b in bars], dtype=np.float64)
+    close = np.array([b["close"] for b in bars], dtype=np.float64)
+    true_range = np.maximum(high[1:], close[:-1]) - np.minimum(low[1:], close[:-1])
+    atr = float(true_range.mean())
+    return atr if atr > 0 else None
+
+
+class _Reference:
+    """Inputs a symbol's stored result was computed from."""
+
+    __slots__ = ("price", "atr", "avg_volume", "news")
+
+    def __init__(self, price: float, atr: float, avg_volume: float, news: FrozenSet[Tuple[str, str]]):
+        self.price = price
+        self.atr = atr
+        self.avg_volume = avg_volume
+        self.news = news
+
+    def check(self, interval: str, bar: Dict[str, Any]) -> Optional[str]:
+        """Dirty reason for a closed bar, or None."""
+        if interval == BAR_INTERVAL:
+            return "bar"
+        if interval != "1m":
+            return None
+        if abs(float(bar["close"]) - self.price) >= ATR_FRACTION * self.atr:
+            return "price"
+        if self.avg_volume > 0 and float(bar["volume"]) >= VOLUME_SPIKE * self.avg_volume:
+            return "volume"
+        return None
+
+
+class CyclePlan:
+    """Which symbols one cycle re-runs and which previous results it reuses."""
+
+    def __init__(self, universe: str, symbols: List[str], fingerprint: Any):
+        self.universe = universe
+        self.symbols = symbols
+        self.fingerprint = fingerprint
+        self.dirty: List[str] = list(symbols)
+        self.reused: Dict[str, Dict[str, Any]] = {}
+        self.full_reason: Optional[str] = None
+        self.reasons: Counter = Counter()
+
+    @property
+    def full(self) -> bool:
+        return self.full_reason is not None
+
+    def summary(self, elapsed: Optional[float] = None) -> Dict[str, Any]:
+        total = len(self.symbols)
+        return {
+            "refresh": f"full:{self.full_reason}" if self.full else "incremental",
+            "recomputed": len(self.dirty),
+            "reused": len(self.reused),
+            "recomputed_fraction": round(len(self.dirty) / total, 3) if total else 0.0,
+            "dirty_reasons": dict(self.reasons),
+            "analysis_seconds": round(elapsed, 3) if elapsed is not None else None,
+        }
+
+
+class ScalpingDirtySet:
+    """Per-universe previous results and the symbols whose inputs changed since."""
+
+    def __init__(self):
+        self.enabled = INCREMENTAL_ENABLED
+        self._lock = threading.Lock()
+        self._results: Dict[str, Dict[str, Dict[str, Any]]] = {}
+        self._refs: Dict[str, Dict[str, _Reference]] = {}
+        self._marks: Dict[str, Dict[str, str]] = {}
+        self._fingerprints: Dict[str, Any] = {}
+        self._days: Dict[str, date] = {}
+        self._since_full: Dict[str, int] = {}
+        self._subscribed = False
+        self.last_cycle: Dict[str, Dict[str, Any]] = {}
+        self.stats = {"cycles": 0, "full_refreshes": 0, "recomputed": 0, "reused": 0, "marks": 0}
+
+    # ------------------------------------------------------------- tick marks
+
+    def _ensure_subscribed(self) -> None:
+        if not self._subscribed:
+            get_live_candles().register_bar_close_callback(self.on_bar_close)
+            self._subscribed = True
+
+    def on_bar_close(self, symbol: str, interval: str, bar: Dict[str, Any]) -> None:
+        """LiveCandleBuilder callback: mark ``symbol`` dirty in every universe it is ranked in."""
+        if interval != "1m" and interval != BAR_INTERVAL:
+            return
+        with self._lock:
+            for universe, refs in self._refs.items():
+                ref = refs.get(symbol)
+                marks = self._marks[universe]
+                if ref is None or symbol in marks:
+                    continue
+                reason = ref.check(interval, bar)
+                if reason:
+                    marks[symbol] = reason
+                    self.stats["marks"] += 1
+
+    # ------------------------------------------------------------------ cycle
+
+    @staticmethod
+    def _news_keys(symbol: str) -> FrozenSet[Tuple[str, str]]:
+        try:
+            return frozenset(article_key(a) for a in get_news_index().articles_for(symbol))
+        except Exception:
+            return frozenset()
+
+    def _reference(self, symbol: str) -> Optional[_Reference]:
+        candles = get_live_candles()
+        minute = candles.recent(symbol, "1m", VOLUME_BARS)
+        atr = _atr(candles.recent(symbol, ATR_INTERVAL, ATR_BARS + 1))
+        if not minute or atr is None:
+            return None
+        avg_volume = float(np.mean([b["volume"] for b in minute]))
+        return _Reference(float(minute[-1]["close"]), atr, avg_volume, self._news_keys(symbol))
+
+    def _dirty_reason(self, universe: str, symbol: str, previous: Optional[Dict[str, Any]]) -> Optional[str]:
+        if previous is None or previous.get("partial"):
+            return "new"
+        reason = self._marks.get(universe, {}).get(symbol)
+        if reason:
+            return reason
+        ref = self._refs.get(universe, {}).get(symbol)
+        latest = get_live_candles().recent(symbol, "1m", 1)
+        if ref is None or not latest:
+            return "no_ticks"
+        reason = ref.check("1m", latest[-1])
+        if reason:
+            return reason
+        if not self._news_keys(symbol) <= ref.news:
+            return "news"
+        return None
+
+    def plan(self, universe: str, symbols: List[str], fingerprint: Any = None) -> CyclePlan:
+        """Split ``symbols`` into the ones to re-run and the previous results to reuse."""
+        self._ensure_subscribed()
+        plan = CyclePlan(universe, list(symbols), fingerprint)
+        previous = self._results.get(universe)
+
+        if not self.enabled:
+            plan.full_reason = "disabled"
+        elif not previous:
+            plan.full_reason = "cold"
+        elif self._days.get(universe) != now_ist().date():
+            plan.full_reason = "new_session"
+        elif fingerprint != self._fingerprints.get(universe):
+            plan.full_reason = "weights"
+        elif self._since_full.get(universe, 0) + 1 >= FULL_REFRESH_EVERY:
+            plan.full_reason = "periodic"
+        if plan.full:
+            return plan
+
+        dirty = []
+        for symbol in plan.symbols:
+            reason = self._dirty_reason(universe, symbol, previous.get(symbol))
+            if reason:
+                dirty.append(symbol)
+                plan.reasons[reason] += 1
+            else:
+                plan.reused[symbol] = copy.deepcopy(previous[symbol])
+        plan.dirty = dirty
+        return plan
+
+    def commit(self, plan: CyclePlan, results: List[Dict[str, Any]], elapsed: float) -> List[Dict[str, Any]]:
+        """Store this cycle's fresh results and return them merged with the reused ones.
+
+        Must be called with the coordinator's output before the engine
+        annotates it; the stored copies stay untouched.
+        """
+        universe = plan.universe
+        fresh = {r.get("symbol"): r for r in results}
+        refs = {symbol: self._reference(symbol) for symbol in plan.dirty}
+
+        with self._lock:
+            stored = {} if plan.full else self._results.setdefault(universe, {})
+            universe_refs = {} if plan.full else self._refs.setdefault(universe, {})
+            marks = self._marks.setdefault(universe, {})
+            for symbol in plan.dirty:
+                marks.pop(symbol, None)
+                result, ref = fresh.get(symbol), refs[symbol]
+                if result is None:
+                    stored.pop(symbol, None)
+                else:
+                    stored[symbol] = copy.deepcopy(result)
+                if ref is None:
+                    universe_refs.pop(symbol, None)
+                else:
+                    universe_refs[symbol] = ref
+            if plan.full:
+                marks.clear()
+                self._results[universe] = stored
+                self._refs[universe] = universe_refs
+                self._since_full[universe] = 0
+                self.stats["full_refreshes"] += 1
+            else:
+                self._since_full[universe] = self._since_full.get(universe, 0) + 1
+            self._fingerprints[universe] = plan.fingerprint
+            self._days[universe] = now_ist().date()
+            self.stats["cycles"] += 1
+            self.stats["recomputed"] += len(plan.dirty)
+            self.stats["reused"] += len(plan.reused)
+
+        summary = plan.summary(elapsed)
+        self.last_cycle[universe] = summary
+        RECOMPUTE_FRACTION.observe(summary["recomputed_fraction"], universe)
+        ANALYSIS_SECONDS.observe(elapsed, universe, "full" if plan.full else "incremental")
+        print(
+            f"[ScalpingDirtySet] {universe}: re-ran {summary['recomputed']}/{len(plan.symbols)} symbols "
+            f"({summary['recomputed_fraction']:.0%}, {summary['refresh']}) in {elapsed:.1f}s"
+            + (f", dirty: {summary['dirty_reasons']}" if summary["dirty_reasons"] else "")
+        )
+
+        merged = []
+        for symbol in plan.symbols:
+            result = fresh.get(symbol) or plan.reused.get(symbol)
+            if result is not None:
+                merged.append(result)
+        return merged
+
+    def get_stats(self) -> Dict[str, Any]:
+        return {
+            **self.stats,
+            "enabled": self.enabled,
+            "full_refresh_every": FULL_REFRESH_EVERY,
+            "tracked": {u: len(r) for u, r in self._results.items()},
+            "pending_marks": {u: len(m) for u, m in self._marks.items()},
+            "last_cycle": dict(self.last_cycle),
+        }
+
+
+# Global instance
+scalping_dirty_set = ScalpingDirtySet()
+
+
+def get_scalping_dirty_set() -> ScalpingDirtySet:
+    return scalping_dirty_set
@@ -9,15 +9,26 @@ Features:
 - Position tracking
 - Audit trail maintenance
 - Exit data retrieval
+
+Storage:
+Exits are appended to a daily journal (data/scalping_exits/exits_YYYYMMDD.jsonl,
+one JSON object per line) and never rewritten. An in-memory index keyed by
+(symbol, day, entry_time) is rebuilt from the journals on startup, and each
+day keeps running aggregates so summaries do not rescan its exits. Legacy
+exits_YYYYMMDD.json files are still read into the index.
 """
 
 import json
 import logging
+import threading
+from dataclasses import dataclass, field
 from pathlib import Path
 from datetime import datetime, timedelta, timezone
-from typing import Dict, List, Any, Optional
+from typing import Dict, List, Any, Optional, Tuple
 
 from ..core.market_hours import IST_OFFSET
+from ..utils.json_encoder import fast_json_dumps
+from ..core.lazy import LazySingleton
 
 from .ai_recommendation_store import get_ai_recommendation_store
 from .pick_logger import log_scalping_exit_outcome
@@ -25,14 +36,122 @@ from .pick_logger import log_scalping_exit_outcome
 logger = logging.getLogger(__name__)
 
 
+def _parse_utc(value: Any) -> Optional[datetime]:
+    """Parse an ISO timestamp into an aware UTC datetime (naive = UTC)."""
+    if not isinstance(value, str) or not value:
+        return None
+    try:
+        dt = datetime.fromisoformat(value.replace('Z', '+00:00'))
+    except Exception:
+        return None
+    if dt.tzinfo is None:
+        return dt.replace(tzinfo=timezone.utc)
+    return dt.astimezone(timezone.utc)
+
+
+@dataclass
+class _ExitDay:
+    """Index and running aggregates for one journal day."""
+
+    exits: List[Dict[str, Any]] = field(default_factory=list)
+    # symbol -> [(parsed entry_time, exit)], in journal order
+    by_symbol: Dict[str, List[Tuple[Optional[datetime], Dict[str, Any]]]] = field(default_factory=dict)
+    keys: set = field(default_factory=set)
+    wins: int = 0
+    sum_return: float = 0.0
+    sum_hold: float = 0.0
+    exit_reasons: Dict[str, int] = field(default_factory=dict)
+    # Bytes of the journal already indexed
+    offset: int = 0
+
+    def add(self, exit_data: Dict[str, Any]) -> bool:
+        key = (exit_data.get('symbol'), exit_data.get('entry_time'))
+        if key in self.keys:
+            return False
+        self.keys.add(key)
+        self.exits.append(exit_data)
+        self.by_symbol.setdefault(exit_data.get('symbol'), []).append(
+            (_parse_utc(exit_data.get('entry_time')), exit_data)
+        )
+
+        return_pct = exit_data.get('return_pct') or 0
+        if return_pct > 0:
+            self.wins += 1
+        self.sum_return += return_pct
+        self.sum_hold += exit_data.get('hold_duration_mins') or 0
+        reason = exit_data.get('exit_reason', 'UNKNOWN')
+        self.exit_reasons[reason] = self.exit_reasons.get(reason, 0) + 1
+        return True
+
+
 class ScalpingExitTracker:
     """Track and store scalping trade exit signals."""
 
-    def __init__(self):
+    def __init__(self, exits_dir: Optional[Path] = None):
         """Initialize exit tracker with storage directory."""
-        self.exits_dir = Path(__file__).parent.parent.parent / "data" / "scalping_exits"
+        self.exits_dir = exits_dir or Path(__file__).parent.parent.parent / "data" / "scalping_exits"
         self.exits_dir.mkdir(parents=True, exist_ok=True)
-        logger.info(f"ScalpingExitTracker initialized: storage={self.exits_dir}")
+        self._lock = threading.RLock()
+        self._days: Dict[str, _ExitDay] = {}
+        self._rebuild_index()
+        logger.info(f"ScalpingExitTracker initialized: storage={self.exits_dir}, days_indexed={len(self._days)}")
+
+    def _journal_path(self, date_str: str) -> Path:
+        return self.exits_dir / f"exits_{date_str}.jsonl"
+
+    def _rebuild_index(self) -> None:
+        """Load legacy day files and replay all journals into the index."""
+        with self._lock:
+            self._days = {}
+            for file_path in sorted(self.exits_dir.glob('exits_*.json')):
+                date_str = file_path.stem.replace('exits_', '')
+                try:
+                    with open(file_path, 'r') as f:
+                        data = json.load(f)
+                except Exception as e:
+                    logger.warning(f"Skipping unreadable exit log {file_path.name}: {e}")
+                    continue
+                day = self._days.setdefault(date_str, _ExitDay())
+                for exit_data in data.get('exits', []):
+                    day.add(exit_data)
+
+            for file_path in sorted(self.exits_dir.glob('exits_*.jsonl')):
+                self._sync_day(file_path.stem.replace('exits_', ''))
+
+    def _sync_day(self, date_str: str) -> Optional[_ExitDay]:
+        """Index journal lines appended since the last sync (caller may hold the lock).
+
+        Normally a single stat() call; new lines only appear here when another
+        process appended to the journal.
+        """
+        with self._lock:
+            day = self._days.get(date_str)
+            path = self._journal_path(date_str)
+            try:
+                size = path.stat().st_size
+            except FileNotFoundError:
+                return day
+
+            if day is None:
+                day = self._days[date_str] = _ExitDay()
+            if size <= day.offset:
+                return day
+
+            with open(path, 'rb') as f:
+                f.seek(day.offset)
+                chunk = f.read(size - day.offset)
+
+            # Leave a partially written last line for the next sync
+            end = chunk.rfind(b'\n') + 1
+            for line in chunk[:end].splitlines():
+                if not line.strip():
+                    continue
+                try:
+                    day.add(json.loads(line))
+                except Exception as e:
+                    logger.warning(f"Skipping corrupt exit journal line in {path.name}: {e}")
+            day.offset += end
+            return day
 
     def log_exit(self, exit_data: Dict[str, Any]) -> None:
         """
@@ -55,37 +174,20 @@ class ScalpingExitTracker:
             exit_time = datetime.fromisoformat(exit_data['exit_time'].replace('Z', '+00:00'))
             date_str = exit_time.strftime('%Y%m%d')
 
-            # File path for this date
-            file_path = self.exits_dir / f"exits_{date_str}.json"
+            with self._lock:
+                day = self._sync_day(date_str) or self._days.setdefault(date_str, _ExitDay())
 
-            # Load existing data or create new
-            if file_path.exists():
-                with open(file_path, 'r') as f:
-                    data = json.load(f)
-            else:
-                data = {
-                    'date': exit_time.strftime('%Y-%m-%d'),
-                    'exits': []
-                }
-
-            # Check if exit already logged (prevent duplicates)
-            existing = next(
-                (e for e in data['exits'] 
-                 if e['symbol'] == exit_data['symbol'] 
-                 and e['entry_time'] == exit_data['entry_time']),
-                None
-            )
+                # Check if exit already logged (prevent duplicates)
+                if (exit_data['symbol'], exit_data['entry_time']) in day.keys:
+                    logger.warning(f"Exit already logged for {exit_data['symbol']} at {exit_data['entry_time']}")
+                    return
 
-            if existing:
-                logger.warning(f"Exit already logged for {exit_data['symbol']} at {exit_data['entry_time']}")
-                return
-
-            # Add new exit
-            data['exits'].append(exit_data)
-
-            # Save to file
-            with open(file_path, 'w') as f:
-                json.dump(data, f, indent=2)
+                # Append one line to the day's journal, then index it
+                line = fast_json_dumps(exit_data) + b'\n'
+                with open(self._journal_path(date_str), 'ab') as f:
+                    f.write(line)
+                day.add(exit_data)
+                day.offset += len(line)
 
             logger.info(f"[EXIT LOGGED] {exit_data['symbol']}: {exit_data['exit_reason']} @ {exit_data['exit_price']}, return: {exit_data['return_pct']:.2f}%")
 
@@ -129,91 +231,46 @@ class ScalpingExitTracker:
             Exit data dict if found, None otherwise
         """
         try:
-            # Convert entry_date to file date format
+            # Convert entry_date to journal date format
             entry_dt = datetime.fromisoformat(entry_date)
             date_str = entry_dt.strftime('%Y%m%d')
 
-            # Check file for this date
-            file_path = self.exits_dir / f"exits_{date_str}.json"
-
-            if not file_path.exists():
+            day = self._sync_day(date_str)
+            if day is None:
                 return None
 
-            # Load data
-            with open(file_path, 'r') as f:
-                data = json.load(f)
+            candidates = day.by_symbol.get(symbol)
+            if not candidates:
+                return None
 
             # Normalise the requested entry_time (if any) into a UTC datetime so
             # that we can robustly compare even if one side uses "Z" and the
             # other uses "+00:00" or has different precision.
-            target_dt: Optional[datetime] = None
-            if entry_time:
-                try:
-                    dt = datetime.fromisoformat(str(entry_time).replace('Z', '+00:00'))
-                    if dt.tzinfo is None:
-                        dt = dt.replace(tzinfo=timezone.utc)
-                    else:
-                        dt = dt.astimezone(timezone.utc)
-                    target_dt = dt
-                except Exception:
-                    target_dt = None
+            target_dt = _parse_utc(str(entry_time)) if entry_time else None
+
+            if target_dt is None:
+                # No precise entry_time provided or parsing failed: return the
+                # first exit for this symbol/date (prior behaviour).
+                return candidates[0][1]
 
             best_match: Optional[Dict[str, Any]] = None
             best_delta: Optional[float] = None
-            fallback_match: Optional[Dict[str, Any]] = None
 
-            # Find matching exit
-            for exit_data in data.get('exits', []):
-                try:
-                    if exit_data.get('symbol') != symbol:
-                        continue
-
-                    # Record the first exit for this symbol/date as a
-                    # best-effort fallback when we cannot match by time.
-                    if fallback_match is None:
-                        fallback_match = exit_data
-
-                    if target_dt is None:
-                        # No precise entry_time provided or parsing failed -
-                        # rely on the fallback behaviour.
-                        continue
-
-                    raw_et = exit_data.get('entry_time')
-                    if not isinstance(raw_et, str) or not raw_et:
-                        continue
-
-                    try:
-                        et_dt = datetime.fromisoformat(raw_et.replace('Z', '+00:00'))
-                    except Exception:
-                        continue
-
-                    if et_dt.tzinfo is None:
-                        et_dt = et_dt.replace(tzinfo=timezone.utc)
-                    else:
-                        et_dt = et_dt.astimezone(timezone.utc)
-
-                    # Use a small tolerance window so that tiny formatting or
-                    # rounding differences do not prevent a match. A window of
-                    # 2 minutes is more than enough to disambiguate distinct
-                    # scalping entries on the same symbol.
-                    delta_sec = abs((et_dt - target_dt).total_seconds())
-                    if delta_sec <= 120:
-                        if best_delta is None or delta_sec < best_delta:
-                            best_delta = delta_sec
-                            best_match = exit_data
-                except Exception:
-                    # Per-record failures should not break the entire lookup.
+            for et_dt, exit_data in candidates:
+                if et_dt is None:
                     continue
 
-            if best_match is not None:
-                return best_match
+                # Use a small tolerance window so that tiny formatting or
+                # rounding differences do not prevent a match. A window of
+                # 2 minutes is more than enough to disambiguate distinct
+                # scalping entries on the same symbol.
+                delta_sec = abs((et_dt - target_dt).total_seconds())
+                if delta_sec <= 120:
+                    if best_delta is None or delta_sec < best_delta:
+                        best_delta = delta_sec
+                        best_match = exit_data
 
-            if target_dt is None:
-                # Fallback: return the first exit we saw for this symbol/date,
-                # preserving prior behaviour when we cannot use entry_time.
-                return fallback_match
-
-            return None
+            return best_match
 
         except Exception as e:
             logger.error(f"Error retrieving exit for {symbol} on {entry_date}: {e}", exc_info=True)
@@ -353,9 +410,9 @@ class ScalpingExitTracker:
                 date = datetime.utcnow().strftime('%Y-%m-%d')
 
             date_str = datetime.fromisoformat(date).strftime('%Y%m%d')
-            file_path = self.exits_dir / f"exits_{date_str}.json"
+            day = self._sync_day(date_str)
 
-            if not file_path.exists():
+            if day is None or not day.exits:
                 return {
                     'date': date,
                     'total_exits': 0,
@@ -366,25 +423,16 @@ class ScalpingExitTracker:
                     'exits': []
                 }
 
-            with open(file_path, 'r') as f:
-                data = json.load(f)
-
-            exits = data.get('exits', [])
-            total = len(exits)
-            winning = sum(1 for e in exits if e.get('return_pct', 0) > 0)
-            losing = total - winning
-
-            avg_return = sum(e.get('return_pct', 0) for e in exits) / total if total > 0 else 0
-            avg_hold = sum(e.get('hold_duration_mins', 0) for e in exits) / total if total > 0 else 0
+            total = len(day.exits)
 
             return {
                 'date': date,
                 'total_exits': total,
-                'winning_exits': winning,
-                'losing_exits': losing,
-                'avg_return': round(avg_return, 2),
-                'avg_hold_time_mins': round(avg_hold, 1),
-                'exits': exits
+                'winning_exits': day.wins,
+                'losing_exits': total - day.wins,
+                'avg_return': round(day.sum_return / total, 2),
+                'avg_hold_time_mins': round(day.sum_hold / total, 1),
+                'exits': list(day.exits)
             }
 
         except Exception as e:
@@ -395,6 +443,45 @@ class ScalpingExitTracker:
                 'exits': []
             }
 
+    def get_period_stats(self, days: int = 7) -> Dict[str, Any]:
+        """
+        Aggregate exit statistics over the last N days from the daily aggregates.
+
+        Args:
+            days: Number of days (including today, UTC)
+
+        Returns:
+            Totals, win rate, average return and exit reason breakdown
+        """
+        total_exits = 0
+        total_wins = 0
+        total_return = 0.0
+        exit_reasons: Dict[str, int] = {}
+
+        today = datetime.utcnow()
+        for i in range(days):
+            day = self._sync_day((today - timedelta(days=i)).strftime('%Y%m%d'))
+            if day is None:
+                continue
+            total_exits += len(day.exits)
+            total_wins += day.wins
+            total_return += day.sum_return
+            for reason, count in day.exit_reasons.items():
+                exit_reasons[reason] = exit_reasons.get(reason, 0) + count
+
+        win_rate = (total_wins / total_exits * 100) if total_exits > 0 else 0
+        avg_return = (total_return / total_exits) if total_exits > 0 else 0
+
+        return {
+            'period_days': days,
+            'total_exits': total_exits,
+            'winning_exits': total_wins,
+            'losing_exits': total_exits - total_wins,
+            'win_rate': round(win_rate, 2),
+            'avg_return': round(avg_return, 2),
+            'exit_reason_breakdown': exit_reasons
+        }
+
     def cleanup_old_exits(self, days_to_keep: int = 90):
         """
         Clean up exit logs older than specified days.
@@ -407,14 +494,16 @@ class ScalpingExitTracker:
             cutoff_str = cutoff_date.strftime('%Y%m%d')
 
             deleted = 0
-            for file_path in self.exits_dir.glob('exits_*.json'):
-                # Extract date from filename
-                date_str = file_path.stem.replace('exits_', '')
+            with self._lock:
+                for file_path in list(self.exits_dir.glob('exits_*.json')) + list(self.exits_dir.glob('exits_*.jsonl')):
+                    # Extract date from filename
+                    date_str = file_path.stem.replace('exits_', '')
 
-                if date_str < cutoff_str:
-                    file_path.unlink()
-                    deleted += 1
-                    logger.info(f"Deleted old exit log: {file_path.name}")
+                    if date_str < cutoff_str:
+                        file_path.unlink()
+                        self._days.pop(date_str, None)
+                        deleted += 1
+                        logger.info(f"Deleted old exit log: {file_path.name}")
 
             logger.info(f"Cleanup complete: removed {deleted} old exit logs (older than {days_to_keep} days)")
 
@@ -423,4 +512,4 @@ class ScalpingExitTracker:
 
 
 # Singleton instance
-scalping_exit_tracker = ScalpingExitTracker()
+scalping_exit_tracker = LazySingleton("scalping_exit_tracker", ScalpingExitTracker)
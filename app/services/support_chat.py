@@ -181,6 +181,7 @@ class SupportChatService:
         messages: List[Dict[str, str]] = [{"role": "system", "content": system_prompt}] + history[-10:]
 
         resp = await llm_manager.chat_completion(
+            purpose="chat",
             messages=messages,
             complexity="simple",
             max_tokens=350,
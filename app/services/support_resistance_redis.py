@@ -11,23 +11,126 @@ Timeframes:
 
 All timestamps are stored in IST (Asia/Kolkata) to align with Indian
 market hours and avoid unnecessary UTC/IST conversions in consumers.
+
+Levels for every scope are derived from a single daily-candle fetch per
+symbol. ``refresh_universe`` precomputes a whole universe in one vectorized
+pass at session boundaries and stores one Redis hash per universe+scope
+(``sr:levels:u:{universe}:{scope}``, field = symbol); ``get_levels_many``
+serves batched lookups from those hashes and the per-symbol keys.
 """
 
 from __future__ import annotations
 
+import asyncio
+import json
 from dataclasses import dataclass
 from datetime import datetime, timedelta
-from typing import Any, Dict, Optional
+from typing import Any, Dict, Iterable, List, Optional, Tuple
 
 import numpy as np
 import pandas as pd
 from pytz import timezone as pytz_timezone
 
+from ..core.candles import candle_frame
+from ..utils.json_encoder import fast_json_dumps
 from .chart_data_service import chart_data_service
-from .redis_client import get_json, set_json
+from .redis_client import get_redis_client
 
 IST = pytz_timezone("Asia/Kolkata")
 
+SCOPES = ("Y", "M", "W", "D")
+
+# Trading days per scope (taken from the tail of the daily candles)
+SCOPE_DAYS = {
+    "Y": 252,  # ~1 year
+    "M": 22,   # ~1 month
+    "W": 5,    # ~1 week
+    "D": 1,    # 1 day
+}
+
+# Per-symbol key TTLs
+SCOPE_TTL = {
+    "Y": 7 * 24 * 3600,   # 7 days
+    "M": 24 * 3600,       # 1 day
+    "W": 6 * 3600,        # 6 hours
+    "D": 3600,            # 1 hour
+}
+
+# Universe hashes are rebuilt at these IST times (pre-open and post-close,
+# weekdays) by TopPicksScheduler; entries older than the latest boundary
+# are treated as stale.
+SESSION_BOUNDARIES_IST = ((7, 50), (15, 40))
+UNIVERSE_HASH_TTL = 24 * 3600
+
+LEVEL_COLUMNS = ["p", "r1", "r2", "r3", "s1", "s2", "s3"]
+
+MAX_CONCURRENT_FETCHES = 8
+
+
+def compute_levels_table(frames: Dict[str, pd.DataFrame], scopes: Iterable[str] = SCOPES) -> pd.DataFrame:
+    """Compute floor pivots for many symbols and scopes in one pass.
+
+    Args:
+        frames: symbol -> daily candles (high/low/close) sorted by time
+        scopes: Timeframe scopes to compute
+
+    Returns:
+        DataFrame indexed by (symbol, scope) with LEVEL_COLUMNS
+    """
+    parts = [
+        df[["high", "low", "close"]].assign(symbol=sym)
+        for sym, df in frames.items()
+        if df is not None and len(df) > 0
+    ]
+    if not parts:
+        return pd.DataFrame(columns=LEVEL_COLUMNS, index=pd.MultiIndex.from_tuples([], names=["symbol", "scope"]))
+
+    bars = pd.concat(parts, ignore_index=True)
+    bars[["high", "low", "close"]] = bars[["high", "low", "close"]].astype(float)
+    # 0 = most recent bar of each symbol
+    bars["age"] = bars.groupby("symbol").cumcount(ascending=False)
+    last_close = bars.loc[bars["age"] == 0].set_index("symbol")["close"]
+
+    windows = []
+    for scope in scopes:
+        win = (
+            bars[bars["age"] < SCOPE_DAYS[scope]]
+            .groupby("symbol")
+            .agg(high=("high", "max"), low=("low", "min"))
+        )
+        win["close"] = last_close.reindex(win.index)
+        win["scope"] = scope
+        windows.append(win)
+
+    table = pd.concat(windows)
+    high, low, close = table["high"], table["low"], table["close"]
+
+    # Standard floor pivots
+    p = (high + low + close) / 3.0
+    table["p"] = p
+    table["r1"] = 2 * p - low
+    table["s1"] = 2 * p - high
+    table["r2"] = p + (high - low)
+    table["s2"] = p - (high - low)
+    table["r3"] = high + 2 * (p - low)
+    table["s3"] = low - 2 * (high - p)
+
+    table = table[np.isfinite(table[["high", "low", "close"]]).all(axis=1)]
+    return table.reset_index().set_index(["symbol", "scope"])[LEVEL_COLUMNS]
+
+
+def _latest_session_boundary(now_ist: datetime) -> datetime:
+    """Most recent SESSION_BOUNDARIES_IST time at or before now (weekdays)."""
+    day = now_ist
+    for _ in range(8):
+        if day.weekday() < 5:
+            for hour, minute in sorted(SESSION_BOUNDARIES_IST, reverse=True):
+                boundary = day.replace(hour=hour, minute=minute, second=0, microsecond=0)
+                if boundary <= now_ist:
+                    return boundary
+        day = (day - timedelta(days=1)).replace(hour=23, minute=59)
+    return now_ist - timedelta(days=1)
+
 
 @dataclass
 class SRLevels:
@@ -83,11 +186,17 @@ class SupportResistanceService:
     def __init__(self) -> None:
         # Redis key prefix for S/R levels
         self.key_prefix = "sr:levels"
+        # In-process fallback when Redis is unavailable: (symbol, scope) -> SRLevels
+        self._memory: Dict[Tuple[str, str], SRLevels] = {}
 
     def _make_redis_key(self, symbol: str, scope: str) -> str:
         """Generate Redis key for S/R levels"""
         return f"{self.key_prefix}:{symbol}:{scope}"
 
+    def _make_universe_key(self, universe: str, scope: str) -> str:
+        """Generate Redis hash key for a universe+scope"""
+        return f"{self.key_prefix}:u:{universe.lower()}:{scope}"
+
     def _should_recompute(self, levels: Optional[SRLevels], scope: str) -> bool:
         """Check if cached levels are stale and need recomputation"""
         if levels is None:
@@ -119,94 +228,165 @@ class SupportResistanceService:
         Returns:
             SRLevels object or None if computation fails
         """
-        # Try to get from Redis
-        redis_key = self._make_redis_key(symbol, scope)
-        cached_data = get_json(redis_key)
-        
-        if cached_data:
+        levels = await self.get_levels_many([symbol], [scope])
+        return levels.get(str(symbol).upper().strip(), {}).get(scope)
+
+    async def get_levels_many(
+        self,
+        symbols: Iterable[str],
+        scopes: Iterable[str] = SCOPES,
+        universe: Optional[str] = None,
+    ) -> Dict[str, Dict[str, SRLevels]]:
+        """Batched S/R lookup for many symbols and scopes.
+
+        Lookup order: precomputed universe hashes (when ``universe`` is
+        given), per-symbol Redis keys / in-process cache, then a bulk
+        compute from one daily-candle fetch per remaining symbol.
+
+        Returns:
+            symbol -> scope -> SRLevels (missing entries are omitted)
+        """
+        syms = list(dict.fromkeys(str(s).upper().strip() for s in symbols if s))
+        scope_list = [s for s in dict.fromkeys(str(x).upper().strip() for x in scopes) if s in SCOPE_DAYS]
+        result: Dict[str, Dict[str, SRLevels]] = {s: {} for s in syms}
+        if not syms or not scope_list:
+            return {}
+
+        client = get_redis_client()
+        now_ist = datetime.now(IST)
+
+        # 1) Universe hashes (fresh if computed after the latest session boundary)
+        if universe and client is not None:
+            boundary = _latest_session_boundary(now_ist)
             try:
-                levels = SRLevels.from_payload(cached_data)
-                
-                # Check if still fresh
-                if not self._should_recompute(levels, scope):
-                    return levels
-            except Exception:
-                pass  # Cache corrupted, recompute
-
-        # Compute new levels
-        levels = await self._compute_levels(symbol, scope)
-        
-        if levels:
-            # Cache in Redis with appropriate TTL
-            ttl_map = {
-                "Y": 7 * 24 * 3600,   # 7 days
-                "M": 24 * 3600,       # 1 day
-                "W": 6 * 3600,        # 6 hours
-                "D": 3600,            # 1 hour
-            }
-            ttl = ttl_map.get(scope, 3600)
-            
-            set_json(redis_key, levels.to_payload(), ex=ttl)
-        
-        return levels
-
-    async def _compute_levels(self, symbol: str, scope: str) -> Optional[SRLevels]:
-        """Compute S/R levels from historical data"""
-        # Map scope to number of days
-        scope_days = {
-            "Y": 252,  # ~1 year
-            "M": 22,   # ~1 month
-            "W": 5,    # ~1 week
-            "D": 1,    # 1 day
-        }
-        days = scope_days.get(scope, 1)
+                pipe = client.pipeline()
+                for scope in scope_list:
+                    pipe.hmget(self._make_universe_key(universe, scope), syms)
+                for scope, raw_values in zip(scope_list, pipe.execute()):
+                    for sym, raw in zip(syms, raw_values):
+                        levels = self._decode(raw)
+                        if levels is not None and levels.computed_at_ist >= boundary:
+                            result[sym][scope] = levels
+            except Exception as e:
+                print(f"[SR] Universe hash read failed for {universe}: {e}")
+
+        # 2) Per-symbol keys / in-process cache
+        wanted = [(sym, scope) for sym in syms for scope in scope_list if scope not in result[sym]]
+        if wanted:
+            raw_values: List[Any] = [None] * len(wanted)
+            if client is not None:
+                try:
+                    raw_values = client.mget([self._make_redis_key(sym, scope) for sym, scope in wanted])
+                except Exception as e:
+                    print(f"[SR] Redis mget failed: {e}")
+            for (sym, scope), raw in zip(wanted, raw_values):
+                levels = self._decode(raw) or self._memory.get((sym, scope))
+                if levels is not None and not self._should_recompute(levels, scope):
+                    result[sym][scope] = levels
+
+        # 3) Bulk compute for whatever is still missing
+        missing = sorted({sym for sym in syms for scope in scope_list if scope not in result[sym]})
+        if missing:
+            computed = await self._compute_many(missing, scope_list)
+            self._store_levels(computed, client, universe=universe)
+            for sym, by_scope in computed.items():
+                for scope, levels in by_scope.items():
+                    result[sym].setdefault(scope, levels)
+
+        return {sym: by_scope for sym, by_scope in result.items() if by_scope}
+
+    async def refresh_universe(self, universe: str, symbols: Iterable[str]) -> int:
+        """Precompute all scopes for a universe and rebuild its Redis hashes.
+
+        Returns the number of symbols with levels.
+        """
+        syms = list(dict.fromkeys(str(s).upper().strip() for s in symbols if s))
+        computed = await self._compute_many(syms, SCOPES)
+        self._store_levels(computed, get_redis_client(), universe=universe)
+        print(f"[SR] Refreshed {universe}: {len(computed)}/{len(syms)} symbols")
+        return len(computed)
+
+    def _decode(self, raw: Any) -> Optional[SRLevels]:
+        if not raw:
+            return None
+        try:
+            return SRLevels.from_payload(json.loads(raw))
+        except Exception:
+            return None  # Cache corrupted, recompute
+
+    def _store_levels(
+        self,
+        computed: Dict[str, Dict[str, SRLevels]],
+        client: Any,
+        universe: Optional[str] = None,
+    ) -> None:
+        for sym, by_scope in computed.items():
+            for scope, levels in by_scope.items():
+                self._memory[(sym, scope)] = levels
+
+        if client is None or not computed:
+            return
 
         try:
-            # Fetch historical data
-            df = await chart_data_service.get_ohlc(
-                symbol=symbol,
-                interval="1d",
-                days=days + 5  # Extra buffer
-            )
+            pipe = client.pipeline()
+            by_scope_mapping: Dict[str, Dict[str, bytes]] = {}
+            for sym, by_scope in computed.items():
+                for scope, levels in by_scope.items():
+                    payload = fast_json_dumps(levels.to_payload())
+                    pipe.set(self._make_redis_key(sym, scope), payload, ex=SCOPE_TTL.get(scope, 3600))
+                    by_scope_mapping.setdefault(scope, {})[sym] = payload
+            if universe:
+                for scope, mapping in by_scope_mapping.items():
+                    key = self._make_universe_key(universe, scope)
+                    pipe.hset(key, mapping=mapping)
+                    pipe.expire(key, UNIVERSE_HASH_TTL)
+            pipe.execute()
+        except Exception as e:
+            print(f"[SR] Failed to store levels: {e}")
 
-            if df is None or df.empty or len(df) < days:
-                return None
+    async def _fetch_daily_frame(self, symbol: str) -> Optional[pd.DataFrame]:
+        """Daily candles (1Y chart) for one symbol, sorted by time."""
+        try:
+            chart = await chart_data_service.fetch_chart_data(symbol, "1Y")
+        except Exception as e:
+            print(f"[SR] Failed to fetch candles for {symbol}: {e}")
+            return None
 
-            # Use last N days
-            df = df.tail(days)
+        candles = (chart or {}).get("candles") or []
+        if not candles:
+            return None
+        df = candle_frame(candles)
+        if not {"time", "high", "low", "close"}.issubset(df.columns):
+            return None
+        return df.sort_values("time").reset_index(drop=True)
 
-            # Calculate pivot point and S/R levels
-            high = df["high"].max()
-            low = df["low"].min()
-            close = df["close"].iloc[-1]
+    async def _compute_many(self, symbols: List[str], scopes: Iterable[str]) -> Dict[str, Dict[str, SRLevels]]:
+        """Compute levels for many symbols from one candle fetch each."""
+        semaphore = asyncio.Semaphore(MAX_CONCURRENT_FETCHES)
 
-            # Standard pivot calculation
-            p = (high + low + close) / 3
-            r1 = 2 * p - low
-            s1 = 2 * p - high
-            r2 = p + (high - low)
-            s2 = p - (high - low)
-            r3 = high + 2 * (p - low)
-            s3 = low - 2 * (high - p)
+        async def _fetch(sym: str) -> Tuple[str, Optional[pd.DataFrame]]:
+            async with semaphore:
+                return sym, await self._fetch_daily_frame(sym)
 
-            now_ist = datetime.now(IST)
+        frames = dict(await asyncio.gather(*[_fetch(s) for s in symbols]))
+        table = compute_levels_table(frames, scopes)
 
-            return SRLevels(
-                symbol=symbol,
+        now_ist = datetime.now(IST)
+        out: Dict[str, Dict[str, SRLevels]] = {}
+        for (sym, scope), row in zip(table.index, table.itertuples(index=False)):
+            out.setdefault(sym, {})[scope] = SRLevels(
+                symbol=sym,
                 timeframe_scope=scope,
-                p=float(p),
-                r1=float(r1),
-                r2=float(r2),
-                r3=float(r3),
-                s1=float(s1),
-                s2=float(s2),
-                s3=float(s3),
+                p=float(row.p),
+                r1=float(row.r1),
+                r2=float(row.r2),
+                r3=float(row.r3),
+                s1=float(row.s1),
+                s2=float(row.s2),
+                s3=float(row.s3),
                 computed_at_ist=now_ist,
             )
-
-        except Exception as e:
-            print(f"[SR] Failed to compute levels for {symbol}/{scope}: {e}")
-            return None
+        return out
 
     async def get_score(
         self,
@@ -23,9 +23,9 @@ from pathlib import Path
 from typing import Any, Dict, Optional, Tuple
 
 import numpy as np
-import pandas as pd
 from pytz import timezone as pytz_timezone
 
+from ..core.candles import candle_frame
 from .chart_data_service import chart_data_service
 
 IST = pytz_timezone("Asia/Kolkata")
@@ -264,7 +264,7 @@ class SupportResistanceService:
         if not candles:
             return None
 
-        df = pd.DataFrame(candles)
+        df = candle_frame(candles)
         required = {"time", "open", "high", "low", "close"}
         if not required.issubset(df.columns):
             return None
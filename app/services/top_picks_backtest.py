@@ -107,6 +107,170 @@ class BacktestStore:
             """
         )
 
+        # Point-in-time replays (see top_picks_replay) are kept in their own
+        # tables so that simulated picks never mix with the KPIs computed
+        # from picks_backtest for real runs.
+        cursor.execute(
+            """
+            CREATE TABLE IF NOT EXISTS replay_runs (
+                replay_id TEXT PRIMARY KEY,
+                universe TEXT NOT NULL,
+                mode TEXT NOT NULL,
+                start_date TEXT NOT NULL,
+                end_date TEXT NOT NULL,
+                days_requested INTEGER,
+                days_completed INTEGER,
+                workers INTEGER,
+                elapsed_seconds REAL,
+                days_per_minute REAL,
+                config TEXT,
+                created_at_utc TEXT NOT NULL
+            )
+            """
+        )
+
+        cursor.execute(
+            """
+            CREATE TABLE IF NOT EXISTS replay_days (
+                replay_id TEXT NOT NULL,
+                trade_date TEXT NOT NULL,
+                as_of_ist TEXT,
+                total_analyzed INTEGER,
+                passed_filter INTEGER,
+                picks_count INTEGER,
+                elapsed_seconds REAL,
+                payload TEXT,
+                PRIMARY KEY (replay_id, trade_date)
+            )
+            """
+        )
+
+        cursor.execute(
+            """
+            CREATE TABLE IF NOT EXISTS replay_picks (
+                id INTEGER PRIMARY KEY AUTOINCREMENT,
+                replay_id TEXT NOT NULL,
+                trade_date TEXT NOT NULL,
+                rank INTEGER,
+                symbol TEXT NOT NULL,
+                recommendation TEXT,
+                direction TEXT,
+                score_blend REAL,
+                entry_price REAL,
+                stop_loss_price REAL,
+                target_price REAL,
+                horizon_days INTEGER,
+                potential_return_tp1 REAL,
+                potential_return_mfe REAL,
+                potential_return_ladder REAL
+            )
+            """
+        )
+
+        cursor.execute(
+            """
+            CREATE INDEX IF NOT EXISTS idx_replay_picks_run
+            ON replay_picks (replay_id, trade_date)
+            """
+        )
+
+        conn.commit()
+        conn.close()
+
+    def insert_replay_day(self, replay_id: str, day: Dict[str, Any]) -> None:
+        """Persist one simulated trading day and its scored picks."""
+        import json
+
+        conn = sqlite3.connect(self.db_path)
+        cursor = conn.cursor()
+
+        cursor.execute(
+            """
+            INSERT OR REPLACE INTO replay_days (
+                replay_id, trade_date, as_of_ist, total_analyzed,
+                passed_filter, picks_count, elapsed_seconds, payload
+            ) VALUES (?, ?, ?, ?, ?, ?, ?, ?)
+            """,
+            (
+                replay_id,
+                day.get("trade_date"),
+                day.get("as_of_ist"),
+                day.get("total_analyzed"),
+                day.get("passed_filter"),
+                len(day.get("picks") or []),
+                day.get("elapsed_seconds"),
+                json.dumps(day.get("payload") or {}),
+            ),
+        )
+
+        cursor.execute(
+            "DELETE FROM replay_picks WHERE replay_id = ? AND trade_date = ?",
+            (replay_id, day.get("trade_date")),
+        )
+        cursor.executemany(
+            """
+            INSERT INTO replay_picks (
+                replay_id, trade_date, rank, symbol, recommendation, direction,
+                score_blend, entry_price, stop_loss_price, target_price,
+                horizon_days, potential_return_tp1, potential_return_mfe,
+                potential_return_ladder
+            ) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+            """,
+            [
+                (
+                    replay_id,
+                    day.get("trade_date"),
+                    p.get("rank"),
+                    p.get("symbol"),
+                    p.get("recommendation"),
+                    p.get("direction"),
+                    p.get("score_blend"),
+                    p.get("entry_price"),
+                    p.get("stop_loss_price"),
+                    p.get("target_price"),
+                    p.get("horizon_days"),
+                    p.get("potential_return_tp1"),
+                    p.get("potential_return_mfe"),
+                    p.get("potential_return_ladder"),
+                )
+                for p in day.get("picks") or []
+            ],
+        )
+
+        conn.commit()
+        conn.close()
+
+    def insert_replay_run(self, summary: Dict[str, Any]) -> None:
+        """Persist the summary row (including throughput) for a replay."""
+        import json
+
+        conn = sqlite3.connect(self.db_path)
+        cursor = conn.cursor()
+
+        cursor.execute(
+            """
+            INSERT OR REPLACE INTO replay_runs (
+                replay_id, universe, mode, start_date, end_date,
+                days_requested, days_completed, workers, elapsed_seconds,
+                days_per_minute, config, created_at_utc
+            ) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+            """,
+            (
+                summary.get("replay_id"),
+                summary.get("universe"),
+                summary.get("mode"),
+                summary.get("start_date"),
+                summary.get("end_date"),
+                summary.get("days_requested"),
+                summary.get("days_completed"),
+                summary.get("workers"),
+                summary.get("elapsed_seconds"),
+                summary.get("days_per_minute"),
+                json.dumps(summary.get("config") or {}),
+                datetime.utcnow().isoformat() + "Z",
+            ),
+        )
+
         conn.commit()
         conn.close()
 
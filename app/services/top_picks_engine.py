@@ -13,34 +13,32 @@ import random
 import numpy as np
 import pandas as pd
 
-from ..agents.coordinator import AgentCoordinator
-from ..agents.technical_agent import TechnicalAgent
-from ..agents.global_market_agent import GlobalMarketAgent
-from ..agents.policy_macro_agent import PolicyMacroAgent
-from ..agents.options_agent import OptionsAgent
-from ..agents.sentiment_agent import SentimentAgent
-from ..agents.microstructure_agent import MicrostructureAgent
-from ..agents.risk_agent import RiskAgent
-from ..agents.pattern_recognition_agent import PatternRecognitionAgent
-from ..agents.market_regime_agent import MarketRegimeAgent
-from ..agents.watchlist_intelligence_agent import WatchlistIntelligenceAgent
-from ..agents.trade_strategy_agent import TradeStrategyAgent
-from ..agents.auto_monitoring_agent import AutoMonitoringAgent
-from ..agents.personalization_agent import PersonalizationAgent
 from .intelligent_insights import generate_batch_insights
 from .realtime_prices import enrich_picks_with_realtime_data
 from .event_logger import log_event
 from .chart_data_service import chart_data_service
 from .policy_store import get_policy_store
 from .support_resistance_redis import support_resistance_service
+from .candle_archive import get_replay_session
+from .universe_matrix import get_universe_matrix
+from .scalping_dirty_set import get_scalping_dirty_set
+from .pick_selection import (
+    attach_recommendations,
+    directional_thresholds,
+    filter_by_confidence,
+    pick_score,
+    split_directional,
+)
 from .pick_logger import get_active_rl_policy
 from ..providers import get_data_provider
 from ..utils.trading_modes import normalize_mode, TradingMode, get_strategy_parameters
 from ..core.market_hours import now_ist
+from ..core.lazy import LazySingleton
+from ..core.tracing import span, trace_run
+from ..agents.registry import build_coordinator
 
 # Import recommendation system for actionable picks
 from ..utils.recommendation_system import (
-    get_recommendation,
     filter_actionable_picks,
     get_recommendation_display_text
 )
@@ -145,41 +143,9 @@ class TopPicksEngine:
         
         self.storage_path.mkdir(parents=True, exist_ok=True)
         
-        # Initialize 13-agent coordinator
-        # 10 Core Scoring Agents
-        self.coordinator = AgentCoordinator()
-        self.coordinator.register_agent(TechnicalAgent(weight=0.20))
-        self.coordinator.register_agent(GlobalMarketAgent(weight=0.12))
-        self.coordinator.register_agent(PolicyMacroAgent(weight=0.08))
-        self.coordinator.register_agent(OptionsAgent(weight=0.12))
-        self.coordinator.register_agent(SentimentAgent(weight=0.12))
-        self.coordinator.register_agent(MicrostructureAgent(weight=0.08))
-        self.coordinator.register_agent(RiskAgent(weight=0.08))
-        self.coordinator.register_agent(PatternRecognitionAgent(weight=0.10))
-        self.coordinator.register_agent(MarketRegimeAgent(weight=0.05))
-        self.coordinator.register_agent(WatchlistIntelligenceAgent(weight=0.05))
-        
-        # 3 Utility Agents (0 weight - not scored)
-        self.coordinator.register_agent(TradeStrategyAgent(weight=0.00))  # Supra agent
-        self.coordinator.register_agent(AutoMonitoringAgent(weight=0.00))
-        self.coordinator.register_agent(PersonalizationAgent(weight=0.00))
-        
-        # Default weights (will be overridden by mode-specific weights)
-        self.coordinator.set_weights({
-            'technical': 0.2233,
-            'global': 0.12,
-            'policy': 0.08,
-            'options': 0.12,
-            'sentiment': 0.12,
-            'microstructure': 0.0893,
-            'risk': 0.08,
-            'pattern': 0.1116,
-            'regime': 0.0558,
-            'watchlist': 0.00,
-            'trade_strategy': 0.00,
-            'auto_monitoring': 0.00,
-            'personalization': 0.00
-        })
+        # Coordinator view over the shared agents (registry.py); the
+        # default weights are overridden by mode-specific weights per run
+        self.coordinator = build_coordinator('top_picks')
     
     async def generate_daily_picks(
         self,
@@ -188,23 +154,41 @@ class TopPicksEngine:
         min_confidence: str = "medium",
         max_concurrent: int = 10,
         agent_names: Optional[List[str]] = None,
-        mode: str = "Swing"
+        mode: str = "Swing",
+        symbols: Optional[List[str]] = None,
+        weights: Optional[Dict[str, float]] = None,
+        incremental: bool = False,
     ) -> Dict[str, Any]:
-        """Generate top N stock picks from a universe."""
+        """Generate top N stock picks from a universe.
+
+        ``symbols`` overrides the universe constituents and ``weights``
+        overrides the PolicyStore weight profile for this run; both are used
+        by the replay backtester. When a candle-archive replay session is
+        active, steps that depend on live quotes, LLM calls or production
+        storage are skipped.
+
+        ``incremental`` (the scalping cycle) re-runs agents only for symbols
+        whose inputs changed since the previous run of this universe and
+        reuses the previous results for the rest (see scalping_dirty_set.py).
+        """
 
         mode = normalize_mode(mode)
+        replay = get_replay_session()
 
         # Consistent IST timestamp for this run (used for metadata and
         # intraday session segmentation). We compute once so all picks in the
         # batch share the same "generated_at" value.
-        ist_now = now_ist()
+        ist_now = replay.as_of_ist if replay is not None else now_ist()
 
         agent_desc = f"{len(agent_names)} selected agents" if agent_names else "all agents"
         
         # Apply mode-specific agent weights from PolicyStore
         policy_store = get_policy_store()
         mode_policy = policy_store.get_mode_policy(mode)
-        if mode_policy.weights:
+        if weights:
+            self.coordinator.set_weights(weights)
+            print(f"\n[MODE] Applied caller-supplied weight profile for {mode}")
+        elif mode_policy.weights:
             self.coordinator.set_weights(mode_policy.weights)
             print(f"\n[MODE] Applied {mode_policy.mode} weight profile:")
             sorted_weights = sorted(mode_policy.weights.items(), key=lambda x: x[1], reverse=True)
@@ -235,95 +219,56 @@ class TopPicksEngine:
         # analyze the full index (e.g. all 50 NIFTY names) and then surface the
         # best opportunities. Any performance optimizations should be handled
         # by scheduling/caching, not by trimming the search space.
-        symbols = self._get_universe_symbols(universe)
+        if symbols:
+            symbols = [str(s).upper() for s in symbols]
+        else:
+            symbols = self._get_universe_symbols(universe)
         print(f"Total stocks to analyze: {len(symbols)}")
         
         # Batch analyze all stocks
         print(f"Running analysis ({agent_desc}, max {max_concurrent} concurrent)...")
         start_time = datetime.now()
+
+        # Cross-sectional matrix (betas, volatility ranks, breadth and one
+        # index-level regime), built once and sliced per symbol for agents.
+        universe_matrix = None
+        if agent_names is None or {"risk", "market_regime"} & set(agent_names):
+            try:
+                universe_matrix = await get_universe_matrix(universe, symbols)
+            except Exception as e:
+                print(f"[TopPicksEngine] Universe matrix unavailable: {e}")
         
+        # Incremental cycle: only symbols whose inputs changed are re-run
+        dirty_plan = None
+        if incremental and replay is None:
+            dirty_plan = get_scalping_dirty_set().plan(
+                universe,
+                symbols,
+                fingerprint=(tuple(agent_names or ()), tuple(sorted(self.coordinator.weights.items()))),
+            )
+
         results = await self.coordinator.batch_analyze(
-            symbols,
+            dirty_plan.dirty if dirty_plan is not None else symbols,
             agent_names=agent_names,
-            max_concurrent=max_concurrent
+            max_concurrent=max_concurrent,
+            context_for=universe_matrix.context_for if universe_matrix is not None else None,
         )
         
         elapsed = (datetime.now() - start_time).total_seconds()
         print(f"Analysis complete in {elapsed:.1f} seconds")
+
+        if dirty_plan is not None:
+            results = get_scalping_dirty_set().commit(dirty_plan, results, elapsed)
         
-        # Filter by confidence
-        confidence_levels = {'low': 1, 'medium': 2, 'high': 3}
-        min_level = confidence_levels.get(min_confidence.lower(), 2)
-        
-        filtered_results = []
-        for result in results:
-            confidence = result.get('confidence', 'Low').lower()
-            result_level = confidence_levels.get(confidence, 1)
-            
-            if result_level >= min_level:
-                filtered_results.append(result)
+        # Filter by confidence, highest blend score first
+        filtered_results = filter_by_confidence(results, min_confidence)
         
         print(f"Filtered to {len(filtered_results)} stocks meeting confidence threshold")
         
-        # Sort by blend score
-        filtered_results.sort(key=lambda x: x.get('blend_score', 0), reverse=True)
-        
-        # Apply recommendations and build bullish / bearish buckets for
-        # directional selection.
-        all_picks_with_recs: List[Dict[str, Any]] = []
-        for result in filtered_results:
-            risk_score = None
-            for agent in result.get('agents', []):
-                if agent.get('agent') == 'risk':
-                    risk_score = agent.get('score')
-                    break
-
-            rec_result = get_recommendation(
-                score=result.get('blend_score', 0),
-                confidence=result.get('confidence', 'Medium'),
-                risk_agent_score=risk_score,
-                agent_signals=result.get('key_signals', [])
-            )
-
-            result['recommendation'] = rec_result.recommendation.value
-            result['is_actionable'] = rec_result.is_actionable
-            result['recommendation_note'] = rec_result.note
-            result['risk_reward_ratio'] = rec_result.risk_reward_ratio
-            result['color_scheme'] = rec_result.color_scheme
-
-            all_picks_with_recs.append(result)
-
-        bullish_results: List[Dict[str, Any]] = []
-        bearish_results: List[Dict[str, Any]] = []
-
-        def _get_score(val: Any) -> float:
-            try:
-                v = val.get('score_blend', val.get('blend_score', 0.0))
-            except AttributeError:
-                try:
-                    return float(val or 0.0)
-                except Exception:
-                    return 0.0
-            try:
-                return float(v or 0.0)
-            except Exception:
-                return 0.0
-
-        def _get_rr(val: Any) -> Optional[float]:
-            rr_val = val.get('risk_reward_ratio')
-            if rr_val is None:
-                return None
-            try:
-                return float(rr_val)
-            except Exception:
-                return None
+        # Apply recommendations (score band, risk/reward, signal agreement)
+        all_picks_with_recs = attach_recommendations(filtered_results)
 
-        # Per-mode directional thresholds (defaults when not provided by policy)
         mode_key = mode
-        bull_min_score = 0.0
-        bull_min_rr = 0.0
-        bear_max_score = 0.0
-        bear_min_rr = 0.0
 
         # Entry bandit (initially added for Scalping): chooses an
         # entry_action_id that defines directional thresholds and max
@@ -387,34 +332,39 @@ class TopPicksEngine:
                     if not isinstance(contexts_state, dict):
                         contexts_state = {}
 
-                    # Derive a market context from the first analyzed result's
-                    # market_regime agent. This should be common across
-                    # symbols.
-                    rep = filtered_results[0] if filtered_results else None
-                    if isinstance(rep, dict):
-                        for agent in rep.get("agents", []) or []:
-                            if agent.get("agent") == "market_regime":
-                                meta = agent.get("metadata") or {}
-                                regime_raw = str(meta.get("regime") or "UNKNOWN").upper()
-                                vol_level_raw = (
-                                    str(meta.get("volatility") or "").upper() or None
-                                )
-                                if regime_raw in ("BULL", "WEAK_BULL"):
-                                    regime_bucket_for_entry = "Bull"
-                                elif regime_raw in ("BEAR", "WEAK_BEAR"):
-                                    regime_bucket_for_entry = "Bear"
-                                else:
-                                    regime_bucket_for_entry = "Range"
-
-                                if vol_level_raw == "LOW":
-                                    vol_bucket_for_entry = "LowVol"
-                                elif vol_level_raw == "MEDIUM":
-                                    vol_bucket_for_entry = "MediumVol"
-                                elif vol_level_raw == "HIGH":
-                                    vol_bucket_for_entry = "HighVol"
-                                else:
-                                    vol_bucket_for_entry = "Unknown"
-                                break
+                    # Derive the market context from the universe matrix's
+                    # index-level regime; without a matrix, fall back to the
+                    # first analyzed result's market_regime agent.
+                    meta = None
+                    if universe_matrix is not None and universe_matrix.regime:
+                        meta = universe_matrix.regime.get("metadata") or {}
+                    else:
+                        rep = filtered_results[0] if filtered_results else None
+                        if isinstance(rep, dict):
+                            for agent in rep.get("agents", []) or []:
+                                if agent.get("agent") == "market_regime":
+                                    meta = agent.get("metadata") or {}
+                                    break
+                    if meta is not None:
+                        regime_raw = str(meta.get("regime") or "UNKNOWN").upper()
+                        vol_level_raw = (
+                            str(meta.get("volatility") or "").upper() or None
+                        )
+                        if regime_raw in ("BULL", "WEAK_BULL"):
+                            regime_bucket_for_entry = "Bull"
+                        elif regime_raw in ("BEAR", "WEAK_BEAR"):
+                            regime_bucket_for_entry = "Bear"
+                        else:
+                            regime_bucket_for_entry = "Range"
+
+                        if vol_level_raw == "LOW":
+                            vol_bucket_for_entry = "LowVol"
+                        elif vol_level_raw == "MEDIUM":
+                            vol_bucket_for_entry = "MediumVol"
+                        elif vol_level_raw == "HIGH":
+                            vol_bucket_for_entry = "HighVol"
+                        else:
+                            vol_bucket_for_entry = "Unknown"
 
                     ctx_key = (
                         f"{mode_key}|{regime_bucket_for_entry}|"
@@ -504,242 +454,16 @@ class TopPicksEngine:
                 except Exception:
                     pass
 
-        max_long_picks: Optional[int] = None
-        max_short_picks: Optional[int] = None
-
-        if mode_key == "Scalping":
-            if entry_action_cfg:
-                bull_min_score = float(
-                    entry_action_cfg.get("bull_min_score")
-                    or thresholds.get("bull_min_score", 55)
-                    or 55
-                )
-                bull_min_rr = float(
-                    entry_action_cfg.get("bull_min_rr")
-                    or thresholds.get("bull_min_rr", 1.2)
-                    or 1.2
-                )
-                bear_max_score = float(
-                    entry_action_cfg.get("bear_max_score")
-                    or thresholds.get("bear_max_score", 44)
-                    or 44
-                )
-                bear_min_rr = float(
-                    entry_action_cfg.get("bear_min_rr")
-                    or thresholds.get("bear_min_rr", 1.2)
-                    or 1.2
-                )
-
-                try:
-                    max_long_picks = int(
-                        entry_action_cfg.get("max_long_picks") or top_n
-                    )
-                except Exception:
-                    max_long_picks = top_n
-                try:
-                    max_short_picks = int(
-                        entry_action_cfg.get("max_short_picks") or top_n
-                    )
-                except Exception:
-                    max_short_picks = top_n
-            else:
-                bull_min_score = float(thresholds.get("bull_min_score", 55) or 55)
-                bull_min_rr = float(thresholds.get("bull_min_rr", 1.2) or 1.2)
-                bear_max_score = float(thresholds.get("bear_max_score", 44) or 44)
-                bear_min_rr = float(thresholds.get("bear_min_rr", 1.2) or 1.2)
-                max_long_picks = top_n
-                max_short_picks = top_n
-
-            # Apply regime-aware multipliers for long/short caps.
-            try:
-                long_mult = float(entry_regime_bias.get("long_mult", 1.0) or 1.0)
-            except Exception:
-                long_mult = 1.0
-            try:
-                short_mult = float(entry_regime_bias.get("short_mult", 1.0) or 1.0)
-            except Exception:
-                short_mult = 1.0
-
-            if max_long_picks is not None:
-                max_long_picks = max(
-                    0, min(top_n, int(round(max_long_picks * long_mult)))
-                )
-            if max_short_picks is not None:
-                max_short_picks = max(
-                    0, min(top_n, int(round(max_short_picks * short_mult)))
-                )
-        elif mode_key == "Intraday":
-            if entry_action_cfg:
-                bull_min_score = float(
-                    entry_action_cfg.get("bull_min_score")
-                    or thresholds.get("bull_min_score", 60)
-                    or 60
-                )
-                bull_min_rr = float(
-                    entry_action_cfg.get("bull_min_rr")
-                    or thresholds.get("bull_min_rr", 1.5)
-                    or 1.5
-                )
-                bear_max_score = float(
-                    entry_action_cfg.get("bear_max_score")
-                    or thresholds.get("bear_max_score", 44)
-                    or 44
-                )
-                bear_min_rr = float(
-                    entry_action_cfg.get("bear_min_rr")
-                    or thresholds.get("bear_min_rr", 1.5)
-                    or 1.5
-                )
-            else:
-                bull_min_score = float(thresholds.get("bull_min_score", 60) or 60)
-                bull_min_rr = float(thresholds.get("bull_min_rr", 1.5) or 1.5)
-                bear_max_score = float(thresholds.get("bear_max_score", 44) or 44)
-                bear_min_rr = float(thresholds.get("bear_min_rr", 1.5) or 1.5)
-        elif mode_key == "Swing":
-            if entry_action_cfg:
-                bull_min_score = float(
-                    entry_action_cfg.get("bull_min_score")
-                    or thresholds.get("bull_min_score", 60)
-                    or 60
-                )
-                bull_min_rr = float(
-                    entry_action_cfg.get("bull_min_rr")
-                    or thresholds.get("bull_min_rr", 1.8)
-                    or 1.8
-                )
-                bear_max_score = float(
-                    entry_action_cfg.get("bear_max_score")
-                    or thresholds.get("bear_max_score", 45)
-                    or 45
-                )
-                bear_min_rr = float(
-                    entry_action_cfg.get("bear_min_rr")
-                    or thresholds.get("bear_min_rr", 1.8)
-                    or 1.8
-                )
-            else:
-                bull_min_score = float(thresholds.get("bull_min_score", 60) or 60)
-                bull_min_rr = float(thresholds.get("bull_min_rr", 1.8) or 1.8)
-                bear_max_score = float(thresholds.get("bear_max_score", 45) or 45)
-                bear_min_rr = float(thresholds.get("bear_min_rr", 1.8) or 1.8)
-        elif mode_key == "Options":
-            if entry_action_cfg:
-                bull_min_score = float(
-                    entry_action_cfg.get("bull_min_score")
-                    or thresholds.get("bull_min_score", 65)
-                    or 65
-                )
-                bull_min_rr = float(
-                    entry_action_cfg.get("bull_min_rr")
-                    or thresholds.get("bull_min_rr", 1.8)
-                    or 1.8
-                )
-                bear_max_score = float(
-                    entry_action_cfg.get("bear_max_score")
-                    or thresholds.get("bear_max_score", 40)
-                    or 40
-                )
-                bear_min_rr = float(
-                    entry_action_cfg.get("bear_min_rr")
-                    or thresholds.get("bear_min_rr", 1.8)
-                    or 1.8
-                )
-            else:
-                bull_min_score = float(thresholds.get("bull_min_score", 65) or 65)
-                bull_min_rr = float(thresholds.get("bull_min_rr", 1.8) or 1.8)
-                bear_max_score = float(thresholds.get("bear_max_score", 40) or 40)
-                bear_min_rr = float(thresholds.get("bear_min_rr", 1.8) or 1.8)
-        elif mode_key == "Futures":
-            if entry_action_cfg:
-                bull_min_score = float(
-                    entry_action_cfg.get("bull_min_score")
-                    or thresholds.get("bull_min_score", 60)
-                    or 60
-                )
-                bull_min_rr = float(
-                    entry_action_cfg.get("bull_min_rr")
-                    or thresholds.get("bull_min_rr", 1.7)
-                    or 1.7
-                )
-                bear_max_score = float(
-                    entry_action_cfg.get("bear_max_score")
-                    or thresholds.get("bear_max_score", 44)
-                    or 44
-                )
-                bear_min_rr = float(
-                    entry_action_cfg.get("bear_min_rr")
-                    or thresholds.get("bear_min_rr", 1.7)
-                    or 1.7
-                )
-            else:
-                bull_min_score = float(thresholds.get("bull_min_score", 60) or 60)
-                bull_min_rr = float(thresholds.get("bull_min_rr", 1.7) or 1.7)
-                bear_max_score = float(thresholds.get("bear_max_score", 44) or 44)
-                bear_min_rr = float(thresholds.get("bear_min_rr", 1.7) or 1.7)
-        else:
-            bull_min_score = float(thresholds.get("min_blend_score", 0) or 0)
-            bull_min_rr = float(thresholds.get("min_risk_reward", 0) or 0)
-
-        long_count = 0
-        short_count = 0
-
-        for r in all_picks_with_recs:
-            if not r.get('is_actionable', True):
-                continue
-
-            score_f = _get_score(r)
-            rr_f = _get_rr(r)
-            rec_text = str(r.get('recommendation') or "")
-
-            if rec_text in ("Strong Buy", "Buy"):
-                if bull_min_score > 0 and score_f < bull_min_score:
-                    continue
-                if bull_min_rr > 0 and (rr_f is None or rr_f < bull_min_rr):
-                    continue
-                if (
-                    mode_key == "Scalping"
-                    and max_long_picks is not None
-                    and long_count >= max_long_picks
-                ):
-                    continue
-                bullish_results.append(r)
-                if mode_key == "Scalping" and max_long_picks is not None:
-                    long_count += 1
-            elif rec_text in ("Sell", "Strong Sell"):
-                if bear_max_score > 0 and score_f > bear_max_score:
-                    continue
-                if bear_min_rr > 0 and (rr_f is None or rr_f < bear_min_rr):
-                    continue
-                bearish_results.append(r)
-                if mode_key == "Scalping" and max_short_picks is not None:
-                    short_count += 1
-
-        # Optional relaxed bear threshold when too few shorts are available
-        if mode_key in ("Scalping", "Intraday", "Futures") and not bearish_results:
-            relaxed_max = bear_max_score if bear_max_score > 0 else 48.0
-            relaxed_max = max(relaxed_max, 48.0)
-            for r in all_picks_with_recs:
-                if not r.get('is_actionable', True):
-                    continue
-                rec_text = str(r.get('recommendation') or "")
-                if rec_text not in ("Sell", "Strong Sell"):
-                    continue
-                score_f = _get_score(r)
-                rr_f = _get_rr(r)
-                if score_f <= relaxed_max and (
-                    bear_min_rr <= 0 or (rr_f is not None and rr_f >= bear_min_rr)
-                ):
-                    if (
-                        mode_key == "Scalping"
-                        and max_short_picks is not None
-                        and short_count >= max_short_picks
-                    ):
-                        continue
-                    bearish_results.append(r)
-                    if mode_key == "Scalping" and max_short_picks is not None:
-                        short_count += 1
+        # Per-mode directional thresholds (entry bandit action, policy
+        # thresholds, mode defaults) and Scalping long/short caps
+        directional = directional_thresholds(
+            mode_key, thresholds, entry_action_cfg, entry_regime_bias, top_n
+        )
+        bullish_results, bearish_results = split_directional(
+            all_picks_with_recs, mode_key, directional
+        )
 
-        if mode_key in ("Scalping", "Intraday", "Futures"):
+        if mode_key in ("Scalping", "Intraday", "Futures") and replay is None:
             try:
                 bullish_results, bearish_results = await self._apply_index_relative_filters(
                     mode_key,
@@ -749,8 +473,8 @@ class TopPicksEngine:
             except Exception as e:
                 print(f"[TopPicksEngine] Index/relative-strength filter failed: {e}")
 
-        bullish_results.sort(key=lambda x: _get_score(x), reverse=True)
-        bearish_results.sort(key=lambda x: _get_score(x))
+        bullish_results.sort(key=lambda x: pick_score(x), reverse=True)
+        bearish_results.sort(key=lambda x: pick_score(x))
 
         actionable_results = bullish_results + bearish_results
 
@@ -770,7 +494,7 @@ class TopPicksEngine:
                         f"[TopPicksEngine] No picks passed directional thresholds in {mode_key}; "
                         f"falling back to {ac_count}/{total_count} actionable picks by recommendation."
                     )
-                    fallback_actionable.sort(key=lambda x: _get_score(x), reverse=True)
+                    fallback_actionable.sort(key=lambda x: pick_score(x), reverse=True)
                     actionable_results = fallback_actionable
             except Exception as e:
                 print(f"[TopPicksEngine] Fallback actionable filter failed: {e}")
@@ -783,7 +507,7 @@ class TopPicksEngine:
         # For Intraday mode, gently tilt ordering using multi-timeframe
         # support/resistance context so that entries near favorable
         # supports (and away from heavy resistance) are preferred.
-        if mode == "Intraday" and actionable_results:
+        if mode == "Intraday" and actionable_results and replay is None:
             try:
                 actionable_results = await self._apply_sr_scoring(universe, actionable_results)
             except Exception as e:
@@ -807,19 +531,20 @@ class TopPicksEngine:
         # Scalping exits, and price summaries). This only hits quotes for the
         # top N picks, not the entire universe, so overhead is small compared
         # to the agent analysis above.
-        try:
-            picks = await enrich_picks_with_realtime_data(picks)
-        except Exception as e:
-            print(f"[TopPicksEngine] Failed to enrich picks with realtime data: {e}")
+        if replay is None:
+            try:
+                picks = await enrich_picks_with_realtime_data(picks)
+            except Exception as e:
+                print(f"[TopPicksEngine] Failed to enrich picks with realtime data: {e}")
 
-        # Generate intelligent insights using OpenAI
-        print(f"Generating AI-powered insights for {len(picks)} picks...")
-        try:
-            picks = await generate_batch_insights(picks, trading_mode=mode)
-            print(f"✓ AI insights generated successfully")
-        except Exception as e:
-            print(f"⚠️  Failed to generate AI insights: {e}")
-            # Continue without AI insights - picks will have fallback text
+            # Generate intelligent insights using OpenAI
+            print(f"Generating AI-powered insights for {len(picks)} picks...")
+            try:
+                picks = await generate_batch_insights(picks, trading_mode=mode)
+                print(f"✓ AI insights generated successfully")
+            except Exception as e:
+                print(f"⚠️  Failed to generate AI insights: {e}")
+                # Continue without AI insights - picks will have fallback text
         
         # For Scalping mode: Add entry_price and exit_strategy
         if mode == "Scalping":
@@ -843,8 +568,7 @@ class TopPicksEngine:
                         chart = await chart_data_service.fetch_chart_data(pick["symbol"], "1M")
                         if (
                             isinstance(chart, dict)
-                            and isinstance(chart.get("candles"), list)
-                            and chart["candles"]
+                            and chart.get("candles")
                         ):
                             context = {"candles": chart["candles"]}
                     except Exception as e:
@@ -1014,8 +738,16 @@ class TopPicksEngine:
                 'agent_weights': self.coordinator.weights,
                 'version': '1.0',  # Engine version
                 'policy_version': policy_store.get_policy_version(),
+                'market_context': universe_matrix.summary() if universe_matrix is not None else None,
             }
         }
+        if dirty_plan is not None:
+            picks_data['metadata']['incremental'] = dirty_plan.summary(elapsed)
+
+        if replay is not None:
+            # Replays never touch production logs or the picks directory.
+            return self._sanitize_for_json(picks_data)
+
         try:
             log_event(
                 event_type="top_picks_generated",
@@ -2143,6 +1875,16 @@ class TopPicksEngine:
 
         scored: List[Dict[str, Any]] = []
 
+        # One batched lookup for all symbols/scopes instead of per-pick calls.
+        try:
+            sr_levels = await support_resistance_service.get_levels_many(
+                [r.get("symbol") for r in actionable_results if r.get("symbol")],
+                universe=universe,
+            )
+        except Exception as e:
+            print(f"[TopPicksEngine] Batched SR levels fetch failed: {e}")
+            sr_levels = None
+
         for r in actionable_results:
             symbol = r.get("symbol")
             if not symbol:
@@ -2173,6 +1915,9 @@ class TopPicksEngine:
                         current_price=price_f,
                         mode="Intraday",
                         direction=direction,
+                        levels_by_scope=(
+                            sr_levels.get(str(symbol).upper(), {}) if sr_levels is not None else None
+                        ),
                     )
                     if sr_context is not None:
                         r["sr_context"] = sr_context
@@ -2209,8 +1954,14 @@ class TopPicksEngine:
         current_price: float,
         mode: str,
         direction: str,
+        levels_by_scope: Optional[Dict[str, Any]] = None,
     ) -> Tuple[Optional[Dict[str, Any]], Optional[float]]:
-        """Compute multi-timeframe S/R context and composite score for a pick."""
+        """Compute multi-timeframe S/R context and composite score for a pick.
+
+        ``levels_by_scope`` (scope -> SRLevels) can be passed in from a
+        batched ``get_levels_many`` call; otherwise levels are looked up
+        per scope.
+        """
 
         mode_norm = normalize_mode(mode)
 
@@ -2231,11 +1982,14 @@ class TopPicksEngine:
             if w <= 0.0:
                 continue
 
-            try:
-                levels = await support_resistance_service.get_levels(symbol, scope)
-            except Exception as e:
-                print(f"[TopPicksEngine] SR levels fetch failed for {symbol}/{scope}: {e}")
-                continue
+            if levels_by_scope is not None:
+                levels = levels_by_scope.get(scope)
+            else:
+                try:
+                    levels = await support_resistance_service.get_levels(symbol, scope)
+                except Exception as e:
+                    print(f"[TopPicksEngine] SR levels fetch failed for {symbol}/{scope}: {e}")
+                    continue
 
             if levels is None:
                 continue
@@ -2376,7 +2130,7 @@ class TopPicksEngine:
 
         try:
             provider = get_data_provider()
-            indices = provider.get_indices_quote()
+            indices = await provider.get_indices_quote_async()
         except Exception as e:
             print(f"[TopPicksEngine] Index data unavailable: {e}")
             return bullish_results, bearish_results
@@ -2422,7 +2176,7 @@ class TopPicksEngine:
             return bullish_results, bearish_results
 
         try:
-            quotes = provider.get_quote(symbols)
+            quotes = await provider.get_quote_async(symbols)
         except Exception as e:
             print(f"[TopPicksEngine] Quote fetch failed for index filter: {e}")
             return bullish_results, bearish_results
@@ -2674,7 +2428,7 @@ class TopPicksEngine:
             date_str = picks_data['date']
             file_path = self.storage_path / f"picks_{date_str}.json"
             
-            with open(file_path, 'w') as f:
+            with span("persist", "picks_json", mode=picks_data.get('mode')), open(file_path, 'w') as f:
                 json.dump(picks_data, f, indent=2)
             
             print(f"✅ Picks stored to: {file_path}")
@@ -2757,8 +2511,8 @@ class TopPicksEngine:
         print(f"{'='*60}\n")
 
 
-# Global instance
-top_picks_engine = TopPicksEngine()
+# Global instance (built on first use)
+top_picks_engine = LazySingleton("top_picks_engine", TopPicksEngine)
 
 
 # Convenience functions
@@ -2766,7 +2520,8 @@ async def generate_top_picks(
     universe: str = "nifty50",
     top_n: int = 5,
     min_confidence: str = "medium",
-    mode: str = "Swing"
+    mode: str = "Swing",
+    incremental: bool = False,
 ) -> Dict[str, Any]:
     """
     Generate top picks (convenience function).
@@ -2777,6 +2532,7 @@ async def generate_top_picks(
         top_n: Number of picks to return
         min_confidence: Minimum confidence filter
         mode: Trading mode for agent selection optimization
+        incremental: Re-run agents only for symbols whose inputs changed
     """
     # Import mode-specific agent selector
     from ..utils.mode_agent_selector import get_agents_for_mode, get_agent_weights_for_mode
@@ -2787,13 +2543,21 @@ async def generate_top_picks(
     
     print(f"📊 Mode: {mode} | Using {len(selected_agents)} agents: {', '.join(selected_agents)}")
     
-    return await top_picks_engine.generate_daily_picks(
-        universe=universe,
-        top_n=top_n,
-        min_confidence=min_confidence,
-        agent_names=selected_agents,
-        mode=mode  # Pass mode for storage and tracking
-    )
+    with trace_run("top_picks", universe=universe, mode=mode, top_n=top_n) as run:
+        data = await top_picks_engine.generate_daily_picks(
+            universe=universe,
+            top_n=top_n,
+            min_confidence=min_confidence,
+            agent_names=selected_agents,
+            mode=mode,  # Pass mode for storage and tracking
+            incremental=incremental,
+        )
+        run.set("picks", len(data.get("picks") or []))
+        incremental_summary = (data.get("metadata") or {}).get("incremental")
+        if incremental_summary:
+            run.set("refresh", incremental_summary["refresh"])
+            run.set("recomputed_fraction", incremental_summary["recomputed_fraction"])
+        return data
 
 
 def get_latest_picks() -> Optional[Dict[str, Any]]:
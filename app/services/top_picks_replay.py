@@ -0,0 +1,328 @@
+"""Point-in-time replay backtester for the full Top Picks pipeline.
+
+Unlike ``top_picks_backtest`` (which only re-scores picks that were stored
+by live runs), this job answers "what would TopPicksEngine have picked on
+date D with these weights?" by re-running the engine for every trading day
+in a range against the local candle archive (``candle_archive``).
+
+Data flow:
+- Trading days come from the archived daily bars of a calendar symbol
+- Days are spread across a process pool; each worker runs
+  ``TopPicksEngine.generate_daily_picks`` inside a ``replay_session`` so
+  MarketDataProvider / ChartDataService only see bars closed at the
+  decision time (no look-ahead)
+- Each pick is scored with the TP1/MFE/Ladder simulators from
+  ``top_picks_backtest`` using archived candles *after* the decision time
+- Per-day results and a run summary (with simulated days per minute) are
+  written to the replay tables in cache/top_picks_backtest.db
+
+Only candle-driven agents are replayed by default. Agents backed by news,
+options chains or global feeds have no point-in-time archive and would
+leak present-day information, so they must be opted into explicitly.
+
+Like ``top_picks_backtest`` this is not wired into any router or scheduler.
+"""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+import multiprocessing
+import os
+import time
+import uuid
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from dataclasses import asdict, dataclass
+from datetime import date, datetime, timedelta
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+
+from ..utils.mode_agent_selector import get_agents_for_mode
+from ..utils.trading_modes import normalize_mode
+from .candle_archive import DB_PATH as ARCHIVE_DB_PATH
+from .candle_archive import CandleArchive, ReplaySession, ist_to_epoch, replay_session
+from .top_picks_backtest import (
+    BacktestStore,
+    _direction_from_pick,
+    _entry_stop_target_from_pick,
+    _mode_horizon_days,
+    _simulate_ladder,
+    _simulate_mfe,
+    _simulate_tp1,
+)
+
+
+# Agents whose only market input is OHLCV candles, and can therefore be
+# replayed faithfully from the archive.
+CANDLE_DRIVEN_AGENTS = (
+    "technical",
+    "pattern_recognition",
+    "market_regime",
+    "risk",
+    "microstructure",
+    "trade_strategy",
+)
+
+# Intraday-style modes decide shortly after the open and are scored on
+# same-session intraday bars; others decide at the close and are scored
+# on subsequent daily bars.
+_INTRADAY_MODES = ("Scalping", "Intraday")
+
+
+@dataclass
+class ReplayConfig:
+    universe: str = "nifty50"
+    mode: str = "Swing"
+    start_date: str = ""
+    end_date: str = ""
+    top_n: int = 5
+    min_confidence: str = "medium"
+    max_concurrent: int = 10
+    symbols: Optional[List[str]] = None
+    agent_names: Optional[List[str]] = None
+    weights: Optional[Dict[str, float]] = None
+    decision_time: Optional[str] = None  # "HH:MM" IST
+    outcome_interval: Optional[str] = None  # archive interval for scoring
+    calendar_symbol: Optional[str] = None
+    archive_path: str = str(ARCHIVE_DB_PATH)
+
+    def resolved_mode(self) -> str:
+        return normalize_mode(self.mode)
+
+    def resolved_decision_time(self) -> str:
+        if self.decision_time:
+            return self.decision_time
+        return "09:30" if self.resolved_mode() in _INTRADAY_MODES else "15:30"
+
+    def resolved_outcome_interval(self) -> str:
+        if self.outcome_interval:
+            return self.outcome_interval
+        return "5m" if self.resolved_mode() in _INTRADAY_MODES else "1d"
+
+    def resolved_agent_names(self) -> List[str]:
+        if self.agent_names:
+            return list(self.agent_names)
+        return [a for a in get_agents_for_mode(self.resolved_mode()) if a in CANDLE_DRIVEN_AGENTS]
+
+
+def _score_pick(
+    session: ReplaySession,
+    pick: Dict[str, Any],
+    mode: str,
+    outcome_interval: str,
+) -> Dict[str, Any]:
+    """Score one replayed pick against archived bars after the decision time."""
+    symbol = str(pick.get("symbol") or "").upper()
+    direction = _direction_from_pick(pick)
+    entry, sl, target = _entry_stop_target_from_pick(pick)
+    horizon_days = _mode_horizon_days(mode)
+
+    row: Dict[str, Any] = {
+        "rank": pick.get("rank"),
+        "symbol": symbol,
+        "recommendation": pick.get("recommendation"),
+        "direction": direction,
+        "score_blend": pick.get("score_blend"),
+        "entry_price": entry,
+        "stop_loss_price": sl,
+        "target_price": target,
+        "horizon_days": horizon_days,
+        "potential_return_tp1": None,
+        "potential_return_mfe": None,
+        "potential_return_ladder": None,
+    }
+
+    if not symbol or entry is None or entry <= 0:
+        return row
+
+    if mode in _INTRADAY_MODES:
+        # Same-session exit: stop at that day's close.
+        horizon_end = session.as_of_ist.replace(hour=15, minute=30, second=0, microsecond=0)
+    else:
+        horizon_end = session.as_of_ist + timedelta(days=horizon_days)
+
+    candles = session.forward_candles(symbol, outcome_interval, ist_to_epoch(horizon_end))
+    if not candles:
+        return row
+
+    row["potential_return_tp1"] = _simulate_tp1(direction, entry, sl, target, candles)
+    row["potential_return_mfe"] = _simulate_mfe(direction, entry, sl, candles)
+    row["potential_return_ladder"] = _simulate_ladder(direction, entry, sl, target, candles)
+    return row
+
+
+async def _replay_day(config: ReplayConfig, day: date) -> Dict[str, Any]:
+    """Run the engine for a single trading day under a replay session."""
+    from ..agents.registry import agent_registry
+    from .top_picks_engine import top_picks_engine
+
+    archive = CandleArchive(Path(config.archive_path))
+    mode = config.resolved_mode()
+    hh, mm = (int(x) for x in config.resolved_decision_time().split(":"))
+    as_of_ts = ist_to_epoch(datetime(day.year, day.month, day.day, hh, mm))
+
+    # Agent caches are keyed by symbol only and shared process-wide: results
+    # from the previous simulated day (or live runs) must not be reused, and
+    # replayed results must not leak into live callers afterwards.
+    agent_registry.clear_caches()
+
+    started = time.perf_counter()
+    with replay_session(archive, as_of_ts) as session:
+        try:
+            picks_data = await top_picks_engine.generate_daily_picks(
+                universe=config.universe,
+                top_n=config.top_n,
+                min_confidence=config.min_confidence,
+                max_concurrent=config.max_concurrent,
+                agent_names=config.resolved_agent_names(),
+                mode=mode,
+                symbols=config.symbols,
+                weights=config.weights,
+            )
+        finally:
+            agent_registry.clear_caches()
+        scored = [
+            _score_pick(session, pick, mode, config.resolved_outcome_interval())
+            for pick in picks_data.get("picks") or []
+        ]
+
+    return {
+        "trade_date": day.isoformat(),
+        "as_of_ist": session.as_of_ist.isoformat(),
+        "total_analyzed": picks_data.get("total_analyzed"),
+        "passed_filter": picks_data.get("passed_filter"),
+        "elapsed_seconds": round(time.perf_counter() - started, 3),
+        "picks": scored,
+        "payload": picks_data,
+    }
+
+
+def _replay_day_worker(config: Dict[str, Any], day_iso: str) -> Dict[str, Any]:
+    """Process-pool entry point (must be a picklable top-level function)."""
+    return asyncio.run(_replay_day(ReplayConfig(**config), date.fromisoformat(day_iso)))
+
+
+def _resolve_trading_days(config: ReplayConfig, archive: CandleArchive) -> List[date]:
+    start = datetime.fromisoformat(config.start_date)
+    end = datetime.fromisoformat(config.end_date) if config.end_date else start
+
+    calendar_symbol = config.calendar_symbol
+    if not calendar_symbol:
+        if config.symbols:
+            calendar_symbol = config.symbols[0]
+        else:
+            from .top_picks_engine import get_universe_symbols
+
+            calendar_symbol = get_universe_symbols(config.universe)[0]
+
+    days = [d.date() for d in archive.trading_days(calendar_symbol, start, end)]
+    if not days:
+        # No archived calendar: fall back to weekdays in range.
+        cursor = start.date()
+        while cursor <= end.date():
+            if cursor.weekday() < 5:
+                days.append(cursor)
+            cursor += timedelta(days=1)
+    return days
+
+
+def run_replay_backtest(config: ReplayConfig, workers: Optional[int] = None) -> Dict[str, Any]:
+    """Replay the Top Picks pipeline over a date range and persist results.
+
+    Returns a summary dict including ``days_per_minute`` throughput.
+    """
+    archive = CandleArchive(Path(config.archive_path))
+    days = _resolve_trading_days(config, archive)
+    if not days:
+        print("[replay] No trading days in range")
+        return {"days_requested": 0, "days_completed": 0}
+
+    workers = max(1, min(workers or os.cpu_count() or 1, len(days)))
+    replay_id = uuid.uuid4().hex[:12]
+    store = BacktestStore()
+
+    print(
+        f"[replay] {replay_id}: {config.universe}/{config.resolved_mode()} "
+        f"{days[0]} -> {days[-1]} ({len(days)} days, {workers} workers, "
+        f"agents={config.resolved_agent_names()})"
+    )
+
+    completed = 0
+    started = time.perf_counter()
+
+    # spawn: workers must not inherit the parent's Redis/event-logger threads.
+    ctx = multiprocessing.get_context("spawn")
+    config_dict = asdict(config)
+    with ProcessPoolExecutor(max_workers=workers, mp_context=ctx) as pool:
+        futures = {
+            pool.submit(_replay_day_worker, config_dict, d.isoformat()): d for d in days
+        }
+        for fut in as_completed(futures):
+            day = futures[fut]
+            try:
+                day_result = fut.result()
+            except Exception as e:
+                print(f"[replay] {day}: FAILED - {e}")
+                continue
+            store.insert_replay_day(replay_id, day_result)
+            completed += 1
+            print(
+                f"[replay] {day}: {len(day_result['picks'])} picks "
+                f"in {day_result['elapsed_seconds']:.1f}s ({completed}/{len(days)})"
+            )
+
+    elapsed = time.perf_counter() - started
+    days_per_minute = completed / (elapsed / 60.0) if elapsed > 0 else 0.0
+
+    summary = {
+        "replay_id": replay_id,
+        "universe": config.universe,
+        "mode": config.resolved_mode(),
+        "start_date": days[0].isoformat(),
+        "end_date": days[-1].isoformat(),
+        "days_requested": len(days),
+        "days_completed": completed,
+        "workers": workers,
+        "elapsed_seconds": round(elapsed, 2),
+        "days_per_minute": round(days_per_minute, 2),
+        "config": config_dict,
+    }
+    store.insert_replay_run(summary)
+
+    print(
+        f"[replay] {replay_id}: {completed}/{len(days)} days in {elapsed:.1f}s "
+        f"-> {days_per_minute:.2f} simulated days/min"
+    )
+    return summary
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Point-in-time replay of the Top Picks engine.")
+    parser.add_argument("--start", required=True, help="First trading date (YYYY-MM-DD)")
+    parser.add_argument("--end", default="", help="Last trading date (YYYY-MM-DD), default = start")
+    parser.add_argument("--universe", default="nifty50")
+    parser.add_argument("--mode", default="Swing")
+    parser.add_argument("--top-n", type=int, default=5)
+    parser.add_argument("--min-confidence", default="medium")
+    parser.add_argument("--symbols", default="", help="Comma-separated override of universe symbols")
+    parser.add_argument("--agents", default="", help="Comma-separated agent names to run")
+    parser.add_argument("--workers", type=int, default=None)
+    parser.add_argument("--archive", default=str(ARCHIVE_DB_PATH))
+    args = parser.parse_args()
+
+    config = ReplayConfig(
+        universe=args.universe,
+        mode=args.mode,
+        start_date=args.start,
+        end_date=args.end,
+        top_n=args.top_n,
+        min_confidence=args.min_confidence,
+        symbols=[s.strip().upper() for s in args.symbols.split(",") if s.strip()] or None,
+        agent_names=[a.strip() for a in args.agents.split(",") if a.strip()] or None,
+        archive_path=args.archive,
+    )
+    run_replay_backtest(config, workers=args.workers)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,375 @@
+"""
+Top Picks Responses
+Pre-serialized, ETag-validated bodies for /v1/top-picks and /v1/agents/picks.
+
+Both routes used to rebuild and re-serialize their whole payload on every
+request, although the picks only change once per scheduler cycle. Now:
+
+- The scheduler calls ``publish(universe, mode, payload)`` after each cycle.
+  This drops the bodies of the previous snapshot and pre-builds the default
+  variants (see PREWARM_LIMITS). Other variants are built on first use. A
+  snapshot is identified by the payload object and its as_of/run_id, so
+  Redis/SQLite rehydration is picked up as well.
+- /top-picks bodies are fully prepared: JSON bytes, gzip bytes and an
+  ETag. The envelope's age fields (cache_age_seconds, last_updated,
+  cache_status) are refreshed once a minute rather than per request.
+- /agents/picks changes per request: it carries live quotes and the
+  session's risk profile and auxiliary modes. Each pick is serialized once
+  per snapshot, without its realtime price fields. Per request, only the
+  small overlay (quote fields and envelope) is serialized and spliced in.
+- /top-picks ETags are weak validators of the picks content (the age
+  fields may differ); /agents/picks ETags hash the exact body. A matching
+  ``If-None-Match`` gets 304 without a body.
+
+Configuration (environment):
+- TOP_PICKS_PREPARED: set to 0/off to serve the old per-request dicts
+- TOP_PICKS_GZIP_MIN_BYTES: smallest body worth compressing (default 1024)
+"""
+
+import gzip
+import hashlib
+import os
+import threading
+from collections import OrderedDict
+from datetime import datetime
+from typing import Any, Dict, List, Optional, Tuple
+
+from starlette.responses import Response
+
+from ..utils.json_encoder import fast_json_dumps
+from .realtime_prices import REALTIME_FIELDS, realtime_fields
+
+PREPARED_ENABLED = os.getenv("TOP_PICKS_PREPARED", "1").strip().lower() not in ("0", "off", "false", "no")
+GZIP_MIN_BYTES = int(os.getenv("TOP_PICKS_GZIP_MIN_BYTES", "1024"))
+GZIP_LEVEL = 6
+
+# (route, limit) variants built when a snapshot is published
+PREWARM_LIMITS = (("top_picks", 5), ("agents_picks", 5), ("agents_picks", 10))
+
+# Compressed /agents/picks bodies kept by ETag (same quotes + same session)
+GZIP_CACHE_SIZE = 256
+
+
+def _etag(*parts: bytes, weak: bool = True) -> str:
+    digest = hashlib.blake2b(digest_size=12)
+    for part in parts:
+        digest.update(part)
+        digest.update(b"\x00")
+    return f'{"W/" if weak else ""}"{digest.hexdigest()}"'
+
+
+def _splice(envelope: Dict[str, Any], key: str, raw: bytes) -> bytes:
+    """Serialize ``envelope`` with ``raw`` (already-encoded JSON) as the value of ``key``."""
+    head = fast_json_dumps(envelope)
+    sep = b"," if len(head) > 2 else b""
+    return head[:-1] + sep + fast_json_dumps(key) + b":" + raw + b"}"
+
+
+def _merge_object(base: bytes, overlay: Dict[str, Any]) -> bytes:
+    """Append ``overlay``'s keys to the encoded JSON object ``base``."""
+    if not overlay:
+        return base
+    extra = fast_json_dumps(overlay)
+    if base == b"{}":
+        return extra
+    return base[:-1] + b"," + extra[1:]
+
+
+def _etag_matches(if_none_match: Optional[str], etag: str) -> bool:
+    if not if_none_match:
+        return False
+    if if_none_match.strip() == "*":
+        return True
+    # Weak comparison: W/ prefixes are ignored
+    tag = etag[2:] if etag.startswith("W/") else etag
+    for candidate in if_none_match.split(","):
+        candidate = candidate.strip()
+        if candidate.startswith("W/"):
+            candidate = candidate[2:]
+        if candidate == tag:
+            return True
+    return False
+
+
+def _accepts_gzip(accept_encoding: Optional[str]) -> bool:
+    for part in (accept_encoding or "").lower().split(","):
+        coding, _, params = part.strip().partition(";")
+        if coding.strip() in ("gzip", "*"):
+            return params.replace(" ", "") not in ("q=0", "q=0.0")
+    return False
+
+
+class PreparedBody:
+    """Encoded JSON body with its ETag; the gzip form is built once, on demand."""
+
+    __slots__ = ("body", "etag", "_gzip")
+
+    def __init__(self, body: bytes, etag: Optional[str] = None):
+        self.body = body
+        # Without an explicit (weak) tag the body hash is a strong validator
+        self.etag = etag or _etag(body, weak=False)
+        self._gzip: Optional[bytes] = None
+
+    @property
+    def gzip(self) -> bytes:
+        if self._gzip is None:
+            self._gzip = gzip.compress(self.body, compresslevel=GZIP_LEVEL, mtime=0)
+        return self._gzip
+
+
+class _Snapshot:
+    """Per-snapshot serialized pieces, keyed by variant."""
+
+    __slots__ = ("token", "content", "top_picks", "items")
+
+    def __init__(self, token: Tuple):
+        self.token = token
+        self.content = b""  # digest of the published items, the ETag base
+        self.top_picks: Dict[Tuple[int, int], PreparedBody] = {}  # (limit, minute) -> body
+        self.items: Dict[int, List[Tuple[Optional[str], bytes, Dict[str, Any]]]] = {}
+
+
+class TopPicksResponseCache:
+    """Snapshot-scoped cache of encoded top-picks responses."""
+
+    def __init__(self):
+        self.enabled = PREPARED_ENABLED
+        self._snapshots: Dict[Tuple[str, str], _Snapshot] = {}
+        self._gzip_cache: "OrderedDict[str, bytes]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.stats = {
+            'published': 0,
+            'bodies_built': 0,
+            'items_built': 0,
+            'served': 0,
+            'not_modified': 0,
+            'gzip_served': 0,
+        }
+
+    # --------------------------------------------------------- snapshots
+
+    @staticmethod
+    def _token(payload: Dict[str, Any]) -> Tuple:
+        items = payload.get("items") or []
+        return (id(payload), payload.get("as_of") or payload.get("generated_at"), payload.get("run_id"), len(items))
+
+    def _snapshot(self, universe: str, mode: str, payload: Dict[str, Any]) -> _Snapshot:
+        key = (universe.upper(), mode)
+        token = self._token(payload)
+        with self._lock:
+            snap = self._snapshots.get(key)
+            if snap is not None and snap.token == token:
+                return snap
+        snap = _Snapshot(token)
+        snap.content = hashlib.blake2b(
+            fast_json_dumps(payload.get("items") or []), digest_size=16
+        ).digest()
+        with self._lock:
+            self._snapshots[key] = snap
+        return snap
+
+    def publish(self, universe: str, mode: str, payload: Dict[str, Any]) -> None:
+        """Replace the (universe, mode) snapshot and pre-build its default variants."""
+        if not self.enabled or not isinstance(payload, dict):
+            return
+        try:
+            with self._lock:
+                self._snapshots.pop((universe.upper(), mode), None)
+            for route, limit in PREWARM_LIMITS:
+                if route == "top_picks":
+                    self.top_picks_body(universe, mode, limit, payload).gzip
+                else:
+                    self._agent_items(universe, mode, limit, payload)
+            self.stats['published'] += 1
+        except Exception as e:
+            print(f"[TopPicksResponses] Failed to prepare {universe}/{mode}: {e}")
+
+    # --------------------------------------------------------- /top-picks
+
+    def top_picks_body(
+        self,
+        universe: str,
+        mode: str,
+        limit: int,
+        payload: Dict[str, Any],
+        now: Optional[datetime] = None,
+    ) -> PreparedBody:
+        """Encoded /top-picks response for a cached snapshot (rebuilt once a minute)."""
+        now = now or datetime.now()
+        snap = self._snapshot(universe, mode, payload)
+        minute = int(now.timestamp() // 60)
+        body = snap.top_picks.get((limit, minute))
+        if body is not None:
+            return body
+
+        items = payload['items'][:limit]
+        envelope = top_picks_envelope(payload, universe, mode, len(items), now)
+        body = PreparedBody(
+            _splice(envelope, 'picks', fast_json_dumps(items)),
+            etag=_etag(snap.content, b"top_picks", str(limit).encode()),
+        )
+        with self._lock:
+            # Keep only the current minute per limit
+            for key in [k for k in snap.top_picks if k[0] == limit]:
+                del snap.top_picks[key]
+            snap.top_picks[(limit, minute)] = body
+        self.stats['bodies_built'] += 1
+        return body
+
+    # ------------------------------------------------------ /agents/picks
+
+    def _agent_items(self, universe: str, mode: str, limit: int, payload: Dict[str, Any]):
+        snap = self._snapshot(universe, mode, payload)
+        prepared = snap.items.get(limit)
+        if prepared is not None:
+            return prepared
+
+        items = payload['items'][:limit]
+        # Validate cached picks have required fields
+        valid_items = [item for item in items if item.get('key_findings') and item.get('strategy_rationale')]
+        if len(valid_items) < len(items):
+            print(f"[agents_picks] Filtered cached picks: {len(valid_items)} valid out of {len(items)} (removed {len(items) - len(valid_items)} without key_findings/strategy)")
+        # If all cached picks were filtered out, fall back to raw items
+        if not valid_items:
+            print(f"[agents_picks] WARNING: All cached picks filtered out for {universe} / {mode}. Falling back to raw cached items.")
+            valid_items = items
+
+        prepared = []
+        for item in valid_items:
+            static = {k: v for k, v in item.items() if k not in REALTIME_FIELDS}
+            realtime = {k: item[k] for k in REALTIME_FIELDS if k in item}
+            prepared.append((item.get('symbol'), fast_json_dumps(static), realtime))
+        snap.items[limit] = prepared
+        self.stats['items_built'] += 1
+        return prepared
+
+    async def agents_picks_body(
+        self,
+        universe: str,
+        mode: str,
+        limit: int,
+        payload: Dict[str, Any],
+        envelope: Dict[str, Any],
+    ) -> Optional[PreparedBody]:
+        """Encoded /agents/picks response: prepared picks + live quotes + ``envelope``.
+
+        Returns None when the snapshot yields no picks (the route then uses
+        its deterministic fallback).
+        """
+        prepared = self._agent_items(universe, mode, limit, payload)
+        if not prepared:
+            return None
+
+        # Refresh realtime price fields so that intraday_change_pct and
+        # last_price are up to date for the Heat Map and other UIs
+        quotes: Dict[str, Any] = {}
+        provider = None
+        symbols = [symbol for symbol, _, _ in prepared if symbol]
+        try:
+            from ..providers import get_data_provider
+
+            provider = get_data_provider()
+            quotes = await provider.get_quote_async(symbols)
+        except Exception as e:
+            print(f"[agents_picks] Warning: realtime enrichment failed for cached picks: {e}")
+
+        fragments = []
+        for symbol, static, realtime in prepared:
+            overlay = dict(realtime)
+            quote = quotes.get(symbol) if symbol else None
+            if quote:
+                try:
+                    overlay.update(realtime_fields(quote, provider))
+                except Exception:
+                    pass
+            fragments.append(_merge_object(static, overlay))
+
+        items_raw = b"[" + b",".join(fragments) + b"]"
+        body = _splice(envelope, 'items', items_raw)
+        self.stats['bodies_built'] += 1
+        return PreparedBody(body)
+
+    # -------------------------------------------------------------- HTTP
+
+    def respond(self, prepared: PreparedBody, if_none_match: Optional[str], accept_encoding: Optional[str]) -> Response:
+        """304 when the client's ETag matches, otherwise the (gzipped when accepted) body."""
+        headers = {
+            "ETag": prepared.etag,
+            "Cache-Control": "no-cache",
+            "Vary": "Accept-Encoding",
+        }
+        if _etag_matches(if_none_match, prepared.etag):
+            self.stats['not_modified'] += 1
+            return Response(status_code=304, headers=headers)
+
+        self.stats['served'] += 1
+        body = prepared.body
+        if len(body) >= GZIP_MIN_BYTES and _accepts_gzip(accept_encoding):
+            body = self._gzip_for(prepared)
+            headers["Content-Encoding"] = "gzip"
+            self.stats['gzip_served'] += 1
+        return Response(content=body, media_type="application/json", headers=headers)
+
+    def _gzip_for(self, prepared: PreparedBody) -> bytes:
+        if prepared.etag.startswith("W/"):
+            return prepared.gzip  # long-lived body, compressed once
+        # Per-request bodies repeat while quotes are cached; reuse their gzip
+        with self._lock:
+            cached = self._gzip_cache.get(prepared.etag)
+            if cached is not None:
+                self._gzip_cache.move_to_end(prepared.etag)
+                return cached
+        data = prepared.gzip
+        with self._lock:
+            self._gzip_cache[prepared.etag] = data
+            while len(self._gzip_cache) > GZIP_CACHE_SIZE:
+                self._gzip_cache.popitem(last=False)
+        return data
+
+    def get_stats(self) -> Dict[str, Any]:
+        return {**self.stats, 'snapshots': len(self._snapshots), 'enabled': self.enabled}
+
+
+def top_picks_envelope(cached_data: Dict[str, Any], universe: str, mode: str, picks_count: int, now: datetime) -> Dict[str, Any]:
+    """The /top-picks response fields around the picks, as of ``now``."""
+    # Calculate cache age
+    cache_age_seconds = 0
+    last_updated = "Just now"
+    if 'as_of' in cached_data:
+        try:
+            cache_age_seconds = (now - datetime.fromisoformat(cached_data['as_of'].replace('Z', ''))).total_seconds()
+            if cache_age_seconds < 60:
+                last_updated = "Just now"
+            elif cache_age_seconds < 3600:
+                mins = int(cache_age_seconds / 60)
+                last_updated = f"{mins} min{'s' if mins > 1 else ''} ago"
+            else:
+                hours = int(cache_age_seconds / 3600)
+                last_updated = f"{hours} hour{'s' if hours > 1 else ''} ago"
+        except Exception:
+            pass
+
+    # Format to match expected response structure
+    return {
+        'date': now.strftime('%Y-%m-%d'),
+        'generated_at': cached_data.get('as_of', now.isoformat() + 'Z'),
+        'universe': cached_data.get('universe', universe),
+        'mode': cached_data.get('mode', mode),
+        'picks_count': picks_count,
+        'cached': True,
+        'cache_age_seconds': cache_age_seconds,
+        'last_updated': last_updated,
+        'next_refresh': "Next refresh in ~1 hour during market hours",
+        'metadata': {
+            'analysis_time_seconds': cached_data.get('elapsed_seconds', 0),
+            'cache_status': 'fresh' if cache_age_seconds < 3600 else 'stale'
+        }
+    }
+
+
+# Global instance
+top_picks_responses = TopPicksResponseCache()
+
+
+def get_top_picks_responses() -> TopPicksResponseCache:
+    return top_picks_responses
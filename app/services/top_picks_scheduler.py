@@ -1,33 +1,25 @@
 import json
 import asyncio
+import time
 from datetime import datetime, timedelta, date
 from pathlib import Path
 from typing import Any, Dict, List
 from zoneinfo import ZoneInfo
 
 from ..core.market_hours import now_ist, is_cash_market_open_ist, is_scalping_cycle_window_ist
+from ..core.tracing import current_trace_id, span, trace_run
 from apscheduler.schedulers.asyncio import AsyncIOScheduler
 from apscheduler.triggers.cron import CronTrigger
 
-from ..agents.coordinator import AgentCoordinator
-from ..agents.technical_agent import TechnicalAgent
-from ..agents.global_market_agent import GlobalMarketAgent
-from ..agents.policy_macro_agent import PolicyMacroAgent
-from ..agents.options_agent import OptionsAgent
-from ..agents.sentiment_agent import SentimentAgent
-from ..agents.microstructure_agent import MicrostructureAgent
-from ..agents.risk_agent import RiskAgent
-from ..agents.pattern_recognition_agent import PatternRecognitionAgent
-from ..agents.market_regime_agent import MarketRegimeAgent
-from ..agents.trade_strategy_agent import TradeStrategyAgent
-from ..agents.watchlist_intelligence_agent import WatchlistIntelligenceAgent
-from ..agents.auto_monitoring_agent import AutoMonitoringAgent
-from ..agents.personalization_agent import PersonalizationAgent
 from .intelligent_insights import generate_batch_insights
 from .top_picks_engine import get_universe_symbols
 from .realtime_prices import enrich_picks_with_realtime_data
+from .top_picks_responses import top_picks_responses
+from .scalping_dirty_set import get_scalping_dirty_set
 from .redis_client import set_json, get_json, acquire_lock, release_lock, LOCK_DISABLED_SENTINEL
+from ..agents.registry import build_coordinator
 from .top_picks_store import get_top_picks_store
+from .support_resistance_redis import support_resistance_service, SESSION_BOUNDARIES_IST
 from .event_logger import log_event
 from .ai_recommendation_store import get_ai_recommendation_store
 from .pick_logger import (
@@ -115,53 +107,26 @@ class TopPicksScheduler:
 
     def __init__(self) -> None:
         self.scheduler = AsyncIOScheduler(timezone=IST_TZ)
-        # Coordinator mirroring the 13-agent system in routers/agents.py
-        self.coordinator = AgentCoordinator()
-        self._init_agents()
+        # Coordinator view over the shared agents (registry.py)
+        self.coordinator = build_coordinator('scheduler')
         self.log_dir = Path(__file__).parent.parent.parent / "data" / "top_picks_intraday"
         self.log_dir.mkdir(parents=True, exist_ok=True)
 
-    def _init_agents(self) -> None:
-        # 10 scoring agents
-        self.coordinator.register_agent(TechnicalAgent(weight=0.20))
-        self.coordinator.register_agent(PatternRecognitionAgent(weight=0.18))
-        self.coordinator.register_agent(MarketRegimeAgent(weight=0.15))
-        self.coordinator.register_agent(GlobalMarketAgent(weight=0.12))
-        self.coordinator.register_agent(OptionsAgent(weight=0.12))
-        self.coordinator.register_agent(SentimentAgent(weight=0.10))
-        self.coordinator.register_agent(PolicyMacroAgent(weight=0.08))
-        self.coordinator.register_agent(WatchlistIntelligenceAgent(weight=0.03))
-        self.coordinator.register_agent(MicrostructureAgent(weight=0.01))
-        self.coordinator.register_agent(RiskAgent(weight=0.01))
-
-        # Super + utility agents
-        self.coordinator.register_agent(TradeStrategyAgent(weight=0.00))
-        self.coordinator.register_agent(AutoMonitoringAgent(weight=0.00))
-        self.coordinator.register_agent(PersonalizationAgent(weight=0.00))
-
-        self.coordinator.set_weights({
-            'technical': 0.2111,
-            'pattern_recognition': 0.19,
-            'market_regime': 0.1583,
-            'global': 0.12,
-            'options': 0.12,
-            'sentiment': 0.10,
-            'policy': 0.08,
-            'watchlist_intelligence': 0.00,
-            'microstructure': 0.0106,
-            'risk': 0.01,
-            'trade_strategy': 0.00,
-            'auto_monitoring': 0.00,
-            'personalization': 0.00,
-        })
-
     async def _compute_for_universe(self, universe: str, mode: str = "Intraday", top_n: int = 20, trigger: str = "scheduler", use_lock: bool = True) -> Dict[str, Any]:
         """Compute picks for a given (universe, mode) pair using TopPicksEngine.
 
         This delegates to generate_top_picks so that all mode-specific logic
         (agent selection, weighting, recommendations, AI insights, scalping
-        exits, etc.) stays in one place.
+        exits, etc.) stays in one place. Each call is traced as one cycle
+        (see core/tracing.py), persistence included.
         """
+        with trace_run("top_picks_cycle", universe=universe, mode=mode, trigger=trigger) as run:
+            payload = await self._compute_and_publish(universe, mode, top_n, trigger, use_lock)
+            run.set("picks", len((payload or {}).get("items") or []))
+            return payload
+
+    async def _compute_and_publish(self, universe: str, mode: str, top_n: int, trigger: str, use_lock: bool) -> Dict[str, Any]:
+        """Run the engine, then persist, cache and broadcast the payload."""
 
         # Hard cutoff: do not generate fresh intraday-style picks after 15:15 IST.
         # This applies to Scalping, Intraday, Options, Futures. Swing remains
@@ -201,11 +166,13 @@ class TopPicksScheduler:
             start = datetime.utcnow()
 
             # Use the shared engine which already filters to actionable picks and
-            # adds AI insights and (for Scalping) exit strategies.
+            # adds AI insights and (for Scalping) exit strategies. The periodic
+            # scalping cycle only re-runs symbols whose inputs changed.
             data = await generate_top_picks(
                 universe=universe,
                 top_n=top_n,
                 mode=mode,
+                incremental=(trigger == "scalping_cycle"),
             )
 
             items = data.get("picks") or []
@@ -387,7 +354,8 @@ class TopPicksScheduler:
             run_id = None
             try:
                 store = get_top_picks_store()
-                run_id = store.store_run(data, trigger=trigger)
+                with span("persist", "top_picks_store", universe=universe, mode=mode):
+                    run_id = await asyncio.to_thread(store.store_run, data, trigger)
             except Exception as e:
                 print(f"[TopPicksScheduler] Failed to persist top picks run: {e}")
 
@@ -397,7 +365,8 @@ class TopPicksScheduler:
             # Best-effort: persist per-pick AI recommendations for analytics/RL.
             try:
                 rec_store = get_ai_recommendation_store()
-                inserted = rec_store.log_from_top_picks_payload(payload, source=trigger)
+                with span("persist", "ai_recommendations", universe=universe, mode=mode):
+                    inserted = rec_store.log_from_top_picks_payload(payload, source=trigger)
                 if inserted:
                     print(f"[TopPicksScheduler] Logged {inserted} AI recommendations for {universe}/{mode} ({trigger})")
             except Exception as e:
@@ -415,6 +384,7 @@ class TopPicksScheduler:
                         "items_count": len(payload["items"]),
                         "as_of": payload["as_of"],
                         "run_id": payload.get("run_id"),
+                        "trace_id": current_trace_id(),
                     },
                 )
             except Exception:
@@ -424,6 +394,10 @@ class TopPicksScheduler:
             key = _cache_key(universe, mode)
             TOP_PICKS_CACHE[key] = payload
 
+            # Pre-serialize the API responses for this snapshot
+            with span("persist", "prepared_responses", universe=universe, mode=mode):
+                top_picks_responses.publish(universe, mode, payload)
+
             # Write to Redis cache (optional)
             try:
                 set_json(f"top_picks:{universe.lower()}:{mode.lower()}", payload, ex=3600)
@@ -478,6 +452,27 @@ class TopPicksScheduler:
         except Exception as e:
             print(f"[TopPicksScheduler] EOD outcomes job failed: {e}")
 
+    async def _sr_refresh_job(self) -> None:
+        """Rebuild precomputed S/R level hashes for all universes.
+
+        Runs at session boundaries (pre-open and post-close) so pick
+        generation and monitors read levels from Redis instead of
+        fetching candles per symbol and scope.
+        """
+        for u in ["nifty50", "banknifty"]:
+            try:
+                await support_resistance_service.refresh_universe(u, get_universe_symbols(u))
+            except Exception as e:
+                print(f"[TopPicksScheduler] S/R refresh failed for {u}: {e}")
+
+    async def _store_maintenance_job(self) -> None:
+        """Prune, compact and retrain the top picks run archive (daily, off-hours)."""
+        try:
+            result = await asyncio.to_thread(get_top_picks_store().run_maintenance)
+            print(f"[TopPicksScheduler] Top picks store maintenance: {result}")
+        except Exception as e:
+            print(f"[TopPicksScheduler] Top picks store maintenance failed: {e}")
+
     async def _scalping_cycle_job(self) -> None:
         """Periodic scalping cycle during market hours (IST)."""
         universes = ["nifty50", "banknifty"]
@@ -492,9 +487,18 @@ class TopPicksScheduler:
             )
             return
 
+        dirty_set = get_scalping_dirty_set()
         for u in universes:
             try:
+                dirty_set.last_cycle.pop(u, None)
+                started = time.perf_counter()
                 await self._compute_for_universe(u, mode="Scalping", trigger="scalping_cycle")
+                summary = dirty_set.last_cycle.get(u)
+                if summary:
+                    print(
+                        f"[TopPicksScheduler] Scalping cycle for {u} took {time.perf_counter() - started:.1f}s "
+                        f"(re-ran {summary['recomputed_fraction']:.0%} of symbols, {summary['refresh']})"
+                    )
             except Exception as e:
                 print(f"[TopPicksScheduler] Failed scalping cycle for {u}: {e}")
 
@@ -564,6 +568,15 @@ class TopPicksScheduler:
                         kwargs={"universe": u, "mode": mode, "trigger": "hourly"},
                     )
 
+            # S/R level precompute at session boundaries (weekdays)
+            for hour, minute in SESSION_BOUNDARIES_IST:
+                self.scheduler.add_job(
+                    self._sr_refresh_job,
+                    CronTrigger(day_of_week="mon-fri", hour=str(hour), minute=str(minute), timezone=IST_TZ),
+                    id=f"top_picks_sr_refresh_{hour:02d}{minute:02d}",
+                    replace_existing=True,
+                )
+
             # End-of-day outcomes computation (16:00 IST, weekdays)
             self.scheduler.add_job(
                 self._eod_outcomes_job,
@@ -572,6 +585,14 @@ class TopPicksScheduler:
                 replace_existing=True,
             )
 
+            # Run archive retention/compaction (18:30 IST daily)
+            self.scheduler.add_job(
+                self._store_maintenance_job,
+                CronTrigger(hour="18", minute="30", timezone=IST_TZ),
+                id="top_picks_store_maintenance",
+                replace_existing=True,
+            )
+
             self.scheduler.start()
             print("[TopPicksScheduler] Started scheduler for intraday top picks with mode-staggered jobs")
         except Exception as e:
@@ -5,14 +5,163 @@ SQLite-backed persistent storage for Top Picks engine runs.
 Each run corresponds to a (universe, mode) evaluation by the TopPicksEngine
 and is stored append-only for analytics, performance tracking, and
 compliance/audit use cases.
+
+Payload encoding:
+- Key columns (universe, mode, time, trigger, counts) live outside the blob
+  and are indexed; the payload is stored compressed in ``payload_blob``.
+- Most runs are stored as a structural delta against the previous run of the
+  same (universe, mode) (``base_id``); every KEYFRAME_INTERVAL-th run is a
+  full keyframe, so a read decodes at most that many blobs.
+- Blobs are compressed with zstd and a trained dictionary when the
+  ``zstandard`` package is installed, otherwise with zlib and a preset
+  dictionary built from recent payloads. zstd rows cannot be read without
+  the package; reads raise CodecUnavailableError instead of dropping them.
+- Rows written before this format keep their plain JSON ``payload`` and are
+  re-encoded by ``run_maintenance``.
+
+Retention runs from ``run_maintenance`` (scheduled by TopPicksScheduler),
+not on every insert.
 """
 
+import json
 import os
 import sqlite3
-import json
+import threading
+import zlib
 from datetime import datetime, timedelta
 from pathlib import Path
-from typing import Any, Dict, Optional
+from typing import Any, Dict, List, Optional, Tuple
+
+from ..core.lazy import LazySingleton
+
+try:
+    import zstandard
+except ImportError:  # optional dependency
+    zstandard = None
+
+
+# Full payload every N runs per (universe, mode); deltas in between
+KEYFRAME_INTERVAL = 12
+
+# Dictionary training: samples taken from the most recent keyframes
+DICT_SAMPLE_RUNS = 64
+DICT_MIN_SAMPLES = 8
+ZSTD_DICT_SIZE = 64 * 1024
+ZSTD_LEVEL = 9
+# zlib only uses the last 32KB of a preset dictionary
+ZLIB_DICT_SIZE = 32 * 1024
+ZLIB_LEVEL = 9
+
+_RUN_COLUMNS = (
+    "id, run_id, universe, mode, generated_at_utc, trigger, total_analyzed, "
+    "filtered_count, picks_count, elapsed_sec, payload, payload_blob, codec, dict_id, base_id"
+)
+
+
+# ==================== Structural delta ====================
+
+_PATCH = "~"      # {"~": {key: node}, "-": [removed keys]} for dicts
+_LIST_PATCH = "~l"  # {"~l": {index: node}} for equal-length lists
+_REPLACE = "="    # {"=": value} replaces the value
+
+
+def _diff(prev: Any, cur: Any) -> Dict[str, Any]:
+    """Return a patch node turning ``prev`` into ``cur``."""
+    if isinstance(prev, dict) and isinstance(cur, dict):
+        changes = {
+            k: (_diff(prev[k], v) if k in prev else {_REPLACE: v})
+            for k, v in cur.items()
+            if k not in prev or prev[k] != v
+        }
+        node: Dict[str, Any] = {_PATCH: changes}
+        removed = [k for k in prev if k not in cur]
+        if removed:
+            node["-"] = removed
+        return node
+    if isinstance(prev, list) and isinstance(cur, list) and len(prev) == len(cur):
+        return {_LIST_PATCH: {str(i): _diff(a, b) for i, (a, b) in enumerate(zip(prev, cur)) if a != b}}
+    return {_REPLACE: cur}
+
+
+def _apply(base: Any, node: Dict[str, Any]) -> Any:
+    """Apply a patch node produced by ``_diff`` (``base`` is not modified)."""
+    if _REPLACE in node:
+        return node[_REPLACE]
+    if _PATCH in node:
+        out = {k: v for k, v in base.items() if k not in node.get("-", ())}
+        for k, child in node[_PATCH].items():
+            out[k] = _apply(out.get(k), child)
+        return out
+    out_list = list(base)
+    for i, child in node[_LIST_PATCH].items():
+        out_list[int(i)] = _apply(out_list[int(i)], child)
+    return out_list
+
+
+# ==================== Codecs ====================
+
+class _Codec:
+    """Compress/decompress blobs with an optional shared dictionary."""
+
+    name = "zlib"
+
+    def __init__(self, dictionary: Optional[bytes] = None):
+        self.dictionary = dictionary
+
+    def compress(self, data: bytes) -> bytes:
+        if self.dictionary:
+            comp = zlib.compressobj(ZLIB_LEVEL, zdict=self.dictionary)
+        else:
+            comp = zlib.compressobj(ZLIB_LEVEL)
+        return comp.compress(data) + comp.flush()
+
+    def decompress(self, blob: bytes) -> bytes:
+        if self.dictionary:
+            decomp = zlib.decompressobj(zdict=self.dictionary)
+        else:
+            decomp = zlib.decompressobj()
+        return decomp.decompress(blob) + decomp.flush()
+
+    @staticmethod
+    def build_dictionary(samples: List[bytes]) -> bytes:
+        # Preset dictionary: most recent content last (closest to the window)
+        return b"".join(reversed(samples))[-ZLIB_DICT_SIZE:]
+
+
+class _ZstdCodec(_Codec):
+    name = "zstd"
+
+    def __init__(self, dictionary: Optional[bytes] = None):
+        super().__init__(dictionary)
+        dict_data = zstandard.ZstdCompressionDict(dictionary) if dictionary else None
+        self._compressor = zstandard.ZstdCompressor(level=ZSTD_LEVEL, dict_data=dict_data)
+        self._decompressor = zstandard.ZstdDecompressor(dict_data=dict_data)
+
+    def compress(self, data: bytes) -> bytes:
+        return self._compressor.compress(data)
+
+    def decompress(self, blob: bytes) -> bytes:
+        return self._decompressor.decompress(blob)
+
+    @staticmethod
+    def build_dictionary(samples: List[bytes]) -> bytes:
+        try:
+            return zstandard.train_dictionary(ZSTD_DICT_SIZE, samples).as_bytes()
+        except zstandard.ZstdError:
+            # Too little sample data to train; use recent content as a raw dictionary
+            return _Codec.build_dictionary(samples)
+
+
+_CODECS = {"zlib": _Codec, "zstd": _ZstdCodec}
+DEFAULT_CODEC = "zstd" if zstandard is not None else "zlib"
+
+
+class CodecUnavailableError(RuntimeError):
+    """A stored row uses a codec whose package is not installed here."""
+
+
+def _codec_available(name: str) -> bool:
+    return name in _CODECS and (name != "zstd" or zstandard is not None)
 
 
 class TopPicksStore:
@@ -22,7 +171,13 @@ class TopPicksStore:
     other context/cost tracking DBs.
     """
 
-    def __init__(self, db_path: str = "cache/top_picks_runs.db", retention_days: Optional[int] = None) -> None:
+    def __init__(
+        self,
+        db_path: str = "cache/top_picks_runs.db",
+        retention_days: Optional[int] = None,
+        codec: Optional[str] = None,
+        keyframe_interval: int = KEYFRAME_INTERVAL,
+    ) -> None:
         self.db_path = Path(db_path)
         self.db_path.parent.mkdir(parents=True, exist_ok=True)
 
@@ -38,11 +193,24 @@ class TopPicksStore:
         else:
             self.retention_days = 90
 
+        self.codec_name = codec or DEFAULT_CODEC
+        self.keyframe_interval = max(1, keyframe_interval)
+
+        self._lock = threading.RLock()
+        # dict_id -> codec instance (0 = no dictionary)
+        self._codecs: Dict[Tuple[str, int], _Codec] = {}
+        self._dict_id = 0
+        # (universe, mode) -> (row id, chain length, payload) of the last stored run
+        self._last: Dict[Tuple[str, str], Tuple[int, int, Dict[str, Any]]] = {}
+
         self._init_db()
 
+    def _connect(self) -> sqlite3.Connection:
+        return sqlite3.connect(self.db_path)
+
     def _init_db(self) -> None:
         """Initialize database schema."""
-        conn = sqlite3.connect(self.db_path)
+        conn = self._connect()
         cursor = conn.cursor()
 
         cursor.execute(
@@ -63,6 +231,30 @@ class TopPicksStore:
             """
         )
 
+        # Columns added for compressed/delta payloads (older DBs are migrated in place)
+        existing = {row[1] for row in cursor.execute("PRAGMA table_info(top_picks_runs)")}
+        for column, ddl in (
+            ("payload_blob", "BLOB"),
+            ("codec", "TEXT"),
+            ("dict_id", "INTEGER"),
+            ("base_id", "INTEGER"),
+            ("chain_len", "INTEGER"),
+            ("raw_size", "INTEGER"),
+        ):
+            if column not in existing:
+                cursor.execute(f"ALTER TABLE top_picks_runs ADD COLUMN {column} {ddl}")
+
+        cursor.execute(
+            """
+            CREATE TABLE IF NOT EXISTS top_picks_dicts (
+                id INTEGER PRIMARY KEY AUTOINCREMENT,
+                codec TEXT NOT NULL,
+                created_at_utc TEXT NOT NULL,
+                data BLOB NOT NULL
+            )
+            """
+        )
+
         cursor.execute(
             """
             CREATE INDEX IF NOT EXISTS idx_tpr_universe_mode_time
@@ -77,9 +269,131 @@ class TopPicksStore:
             """
         )
 
+        cursor.execute(
+            """
+            CREATE INDEX IF NOT EXISTS idx_tpr_time
+            ON top_picks_runs (generated_at_utc)
+            """
+        )
+
+        cursor.execute(
+            """
+            CREATE INDEX IF NOT EXISTS idx_tpr_trigger_time
+            ON top_picks_runs (trigger, generated_at_utc)
+            """
+        )
+
+        row = cursor.execute(
+            "SELECT MAX(id) FROM top_picks_dicts WHERE codec = ?", (self.codec_name,)
+        ).fetchone()
+        self._dict_id = int(row[0] or 0)
+
         conn.commit()
         conn.close()
 
+    # ==================== Encoding ====================
+
+    def _get_codec(self, name: str, dict_id: int, conn: Optional[sqlite3.Connection] = None) -> _Codec:
+        key = (name, dict_id or 0)
+        codec = self._codecs.get(key)
+        if codec is not None:
+            return codec
+        if not _codec_available(name):
+            raise CodecUnavailableError(
+                f"Top picks rows are encoded with '{name}', which is not available "
+                f"(install the 'zstandard' package to read them)"
+            )
+
+        dictionary = None
+        if dict_id:
+            own = conn is None
+            conn = conn or self._connect()
+            try:
+                row = conn.execute("SELECT data FROM top_picks_dicts WHERE id = ?", (dict_id,)).fetchone()
+            finally:
+                if own:
+                    conn.close()
+            if row is None:
+                raise ValueError(f"Missing compression dictionary {dict_id}")
+            dictionary = bytes(row[0])
+
+        codec = self._codecs[key] = _CODECS[name](dictionary)
+        return codec
+
+    def _encode(self, obj: Any, conn: sqlite3.Connection) -> Tuple[bytes, int, int]:
+        raw = json.dumps(obj, separators=(",", ":")).encode("utf-8")
+        codec = self._get_codec(self.codec_name, self._dict_id, conn)
+        return codec.compress(raw), self._dict_id, len(raw)
+
+    def _decode_row(self, conn: sqlite3.Connection, row: tuple, bases: Dict[int, Dict[str, Any]]) -> Optional[Dict[str, Any]]:
+        """Rebuild a row's payload, following its delta chain back to a keyframe.
+
+        ``bases`` memoises decoded payloads by row id so consecutive rows of a
+        query share their chain.
+        """
+        row_id, payload_text, blob, codec_name, dict_id, base_id = (
+            row[0], row[10], row[11], row[12], row[13], row[14]
+        )
+        if row_id in bases:
+            return bases[row_id]
+
+        if codec_name is None or codec_name == "json":
+            data = json.loads(payload_text)
+        else:
+            decoded = json.loads(self._get_codec(codec_name, dict_id, conn).decompress(blob))
+            if base_id is None:
+                data = decoded
+            else:
+                base = bases.get(base_id)
+                if base is None:
+                    base_row = conn.execute(
+                        f"SELECT {_RUN_COLUMNS} FROM top_picks_runs WHERE id = ?", (base_id,)
+                    ).fetchone()
+                    if base_row is None:
+                        return None
+                    base = self._decode_row(conn, base_row, bases)
+                    if base is None:
+                        return None
+                data = _apply(base, decoded)
+
+        bases[row_id] = data
+        return data
+
+    def _safe_decode(self, conn: sqlite3.Connection, row: tuple, bases: Dict[int, Dict[str, Any]]) -> Optional[Dict[str, Any]]:
+        try:
+            data = self._decode_row(conn, row, bases)
+        except CodecUnavailableError as e:
+            # Not a corrupt row: every row with this codec is unreadable here
+            print(f"[TopPicksStore] ERROR decoding run {row[0]}: {e}")
+            raise
+        except Exception:
+            return None
+        return data if isinstance(data, dict) else None
+
+    def _last_for(self, conn: sqlite3.Connection, universe: str, mode: str) -> Optional[Tuple[int, int, Dict[str, Any]]]:
+        key = (universe, mode)
+        if key in self._last:
+            return self._last[key]
+
+        row = conn.execute(
+            f"""
+            SELECT {_RUN_COLUMNS}, chain_len FROM top_picks_runs
+            WHERE universe = ? AND mode = ?
+            ORDER BY id DESC LIMIT 1
+            """,
+            (universe, mode),
+        ).fetchone()
+        if row is None or row[12] in (None, "json"):
+            # No runs yet, or the latest is a legacy plain-JSON row: start a keyframe
+            return None
+        data = self._safe_decode(conn, row, {})
+        if data is None:
+            return None
+        self._last[key] = (row[0], int(row[15] or 0), data)
+        return self._last[key]
+
+    # ==================== Writes ====================
+
     def store_run(self, picks_data: Dict[str, Any], trigger: str) -> str:
         """Store a single Top Picks run.
 
@@ -111,52 +425,69 @@ class TopPicksStore:
         except Exception:
             elapsed_sec = None
 
-        payload_json = json.dumps(picks_data)
-
-        conn = sqlite3.connect(self.db_path)
-        cursor = conn.cursor()
+        # Round-trip through JSON so the cached copy matches what a read returns
+        payload = json.loads(json.dumps(picks_data))
 
-        cursor.execute(
-            """
-            INSERT INTO top_picks_runs (
-                run_id,
-                universe,
-                mode,
-                generated_at_utc,
-                trigger,
-                total_analyzed,
-                filtered_count,
-                picks_count,
-                elapsed_sec,
-                payload
-            ) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
-            """,
-            (
-                run_id,
-                universe,
-                mode,
-                generated_at_utc,
-                trigger,
-                total_analyzed,
-                filtered_count,
-                picks_count,
-                elapsed_sec,
-                payload_json,
-            ),
-        )
-
-        conn.commit()
-        conn.close()
-
-        # Best-effort cleanup based on retention policy
-        try:
-            self.cleanup_old_runs()
-        except Exception:
-            # Soft-fail: do not break primary flow if cleanup fails
-            pass
+        with self._lock:
+            conn = self._connect()
+            try:
+                last = self._last_for(conn, universe, mode)
+                if last is not None and last[1] + 1 < self.keyframe_interval:
+                    base_id, chain_len = last[0], last[1] + 1
+                    blob, dict_id, _ = self._encode(_diff(last[2], payload), conn)
+                else:
+                    base_id, chain_len = None, 0
+                    blob, dict_id, _ = self._encode(payload, conn)
+                raw_size = len(json.dumps(payload, separators=(",", ":")))
+
+                cursor = conn.execute(
+                    """
+                    INSERT INTO top_picks_runs (
+                        run_id,
+                        universe,
+                        mode,
+                        generated_at_utc,
+                        trigger,
+                        total_analyzed,
+                        filtered_count,
+                        picks_count,
+                        elapsed_sec,
+                        payload,
+                        payload_blob,
+                        codec,
+                        dict_id,
+                        base_id,
+                        chain_len,
+                        raw_size
+                    ) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, '', ?, ?, ?, ?, ?, ?)
+                    """,
+                    (
+                        run_id,
+                        universe,
+                        mode,
+                        generated_at_utc,
+                        trigger,
+                        total_analyzed,
+                        filtered_count,
+                        picks_count,
+                        elapsed_sec,
+                        blob,
+                        self.codec_name,
+                        dict_id,
+                        base_id,
+                        chain_len,
+                        raw_size,
+                    ),
+                )
+                conn.commit()
+                self._last[(universe, mode)] = (cursor.lastrowid, chain_len, payload)
+            finally:
+                conn.close()
 
         return run_id
 
+    # ==================== Reads ====================
+
     def get_latest_run_for(self, universe: str, mode: str) -> Optional[Dict[str, Any]]:
         """Return the most recent Top Picks run for a (universe, mode) pair.
 
@@ -168,34 +499,30 @@ class TopPicksStore:
         universe_key = str(universe or "").lower()
         mode_key = str(mode or "").title()
 
-        conn = sqlite3.connect(self.db_path)
-        cursor = conn.cursor()
-
-        cursor.execute(
-            """
-            SELECT payload
-            FROM top_picks_runs
-            WHERE universe = ?
-              AND mode = ?
-              AND picks_count IS NOT NULL
-              AND picks_count > 0
-            ORDER BY generated_at_utc DESC
-            LIMIT 1
-            """,
-            (universe_key, mode_key),
-        )
-        row = cursor.fetchone()
-        conn.close()
+        conn = self._connect()
+        try:
+            row = conn.execute(
+                f"""
+                SELECT {_RUN_COLUMNS}
+                FROM top_picks_runs
+                WHERE universe = ?
+                  AND mode = ?
+                  AND picks_count IS NOT NULL
+                  AND picks_count > 0
+                ORDER BY generated_at_utc DESC
+                LIMIT 1
+                """,
+                (universe_key, mode_key),
+            ).fetchone()
 
-        if not row:
-            return None
+            if not row:
+                return None
 
-        try:
-            data = json.loads(row[0])
-        except Exception:
-            return None
+            data = self._safe_decode(conn, row, {})
+        finally:
+            conn.close()
 
-        if not isinstance(data, dict):
+        if data is None:
             return None
 
         items = data.get("picks") or []
@@ -234,32 +561,24 @@ class TopPicksStore:
         if not run_id:
             return None
 
-        conn = sqlite3.connect(self.db_path)
-        cursor = conn.cursor()
-
+        conn = self._connect()
         try:
-            cursor.execute(
-                """
-                SELECT payload
+            row = conn.execute(
+                f"""
+                SELECT {_RUN_COLUMNS}
                 FROM top_picks_runs
                 WHERE run_id = ?
                 LIMIT 1
                 """,
                 (run_id,),
-            )
-            row = cursor.fetchone()
-        finally:
-            conn.close()
+            ).fetchone()
 
-        if not row:
-            return None
+            if not row:
+                return None
 
-        try:
-            data = json.loads(row[0])
-        except Exception:
-            return None
-
-        return data if isinstance(data, dict) else None
+            return self._safe_decode(conn, row, {})
+        finally:
+            conn.close()
 
     def query_runs(
         self,
@@ -321,40 +640,37 @@ class TopPicksStore:
         safe_limit = max(1, min(int(limit or 1), 5000))
 
         sql = (
-            "SELECT run_id, universe, mode, generated_at_utc, trigger, "
-            "total_analyzed, filtered_count, picks_count, elapsed_sec, payload "
+            f"SELECT {_RUN_COLUMNS} "
             "FROM top_picks_runs" + where_sql + " ORDER BY generated_at_utc DESC LIMIT ?"
         )
 
         params.append(safe_limit)
 
-        conn = sqlite3.connect(self.db_path)
-        cursor = conn.cursor()
-
+        conn = self._connect()
         try:
-            cursor.execute(sql, tuple(params))
-            rows = cursor.fetchall()
+            rows = conn.execute(sql, tuple(params)).fetchall()
+
+            # Decode oldest first so each delta finds its base already decoded
+            bases: Dict[int, Dict[str, Any]] = {}
+            payloads = {row[0]: self._safe_decode(conn, row, bases) for row in sorted(rows, key=lambda r: r[0])}
         finally:
             conn.close()
 
         results: list[Dict[str, Any]] = []
 
-        for (
-            run_id_val,
-            universe_val,
-            mode_val,
-            generated_at,
-            trigger_val,
-            total_analyzed,
-            filtered_count,
-            picks_count,
-            elapsed_sec,
-            payload_json,
-        ) in rows:
-            try:
-                payload = json.loads(payload_json)
-            except Exception:
-                payload = None
+        for row in rows:
+            (
+                row_id,
+                run_id_val,
+                universe_val,
+                mode_val,
+                generated_at,
+                trigger_val,
+                total_analyzed,
+                filtered_count,
+                picks_count,
+                elapsed_sec,
+            ) = row[:10]
 
             results.append(
                 {
@@ -367,15 +683,20 @@ class TopPicksStore:
                     "filtered_count": filtered_count,
                     "picks_count": picks_count,
                     "elapsed_sec": elapsed_sec,
-                    "payload": payload,
+                    "payload": payloads.get(row_id),
                 }
             )
 
         return results
 
+    # ==================== Maintenance ====================
+
     def cleanup_old_runs(self, retention_days: Optional[int] = None) -> int:
         """Remove runs older than the configured retention window.
 
+        The oldest retained run of each (universe, mode) is rewritten as a
+        keyframe first if it is a delta, so no retained run loses its base.
+
         Args:
             retention_days: Optional override; if None, uses instance default.
 
@@ -390,27 +711,169 @@ class TopPicksStore:
         cutoff = datetime.utcnow() - timedelta(days=days)
         cutoff_str = cutoff.isoformat()
 
-        conn = sqlite3.connect(self.db_path)
-        cursor = conn.cursor()
+        with self._lock:
+            conn = self._connect()
+            try:
+                oldest_kept = conn.execute(
+                    f"""
+                    SELECT {_RUN_COLUMNS} FROM top_picks_runs
+                    WHERE id IN (
+                        SELECT MIN(id) FROM top_picks_runs
+                        WHERE generated_at_utc >= ?
+                        GROUP BY universe, mode
+                    ) AND base_id IS NOT NULL
+                    """,
+                    (cutoff_str,),
+                ).fetchall()
+                for row in oldest_kept:
+                    self._rewrite_as_keyframe(conn, row)
+
+                cursor = conn.execute(
+                    """
+                    DELETE FROM top_picks_runs
+                    WHERE generated_at_utc < ?
+                    """,
+                    (cutoff_str,),
+                )
+                deleted = cursor.rowcount
+                conn.commit()
+                if deleted:
+                    # A group's cached last run may have been deleted
+                    self._last.clear()
+            finally:
+                conn.close()
 
-        cursor.execute(
+        return deleted
+
+    def _rewrite_as_keyframe(self, conn: sqlite3.Connection, row: tuple) -> None:
+        data = self._decode_row(conn, row, {})
+        blob, dict_id, raw_size = self._encode(data, conn)
+        conn.execute(
             """
-            DELETE FROM top_picks_runs
-            WHERE generated_at_utc < ?
+            UPDATE top_picks_runs
+            SET payload = '', payload_blob = ?, codec = ?, dict_id = ?, base_id = NULL,
+                chain_len = 0, raw_size = ?
+            WHERE id = ?
             """,
-            (cutoff_str,),
+            (blob, self.codec_name, dict_id, raw_size, row[0]),
         )
 
-        deleted = cursor.rowcount
-        conn.commit()
-        conn.close()
+    def train_dictionary(self) -> int:
+        """Build a new compression dictionary from recent keyframe payloads.
 
-        return deleted
+        New writes use it; existing blobs keep referencing the dictionary
+        they were written with. Returns the new dictionary id (0 if there
+        were not enough samples).
+        """
+        with self._lock:
+            conn = self._connect()
+            try:
+                rows = conn.execute(
+                    f"""
+                    SELECT {_RUN_COLUMNS} FROM top_picks_runs
+                    WHERE base_id IS NULL
+                    ORDER BY id DESC LIMIT ?
+                    """,
+                    (DICT_SAMPLE_RUNS,),
+                ).fetchall()
+                samples = []
+                for row in rows:
+                    data = self._safe_decode(conn, row, {})
+                    if data is not None:
+                        samples.append(json.dumps(data, separators=(",", ":")).encode("utf-8"))
+                if len(samples) < DICT_MIN_SAMPLES:
+                    return 0
+
+                dictionary = _CODECS[self.codec_name].build_dictionary(samples)
+                cursor = conn.execute(
+                    "INSERT INTO top_picks_dicts (codec, created_at_utc, data) VALUES (?, ?, ?)",
+                    (self.codec_name, datetime.utcnow().isoformat(), dictionary),
+                )
+                conn.commit()
+                self._dict_id = cursor.lastrowid
+                return self._dict_id
+            finally:
+                conn.close()
+
+    def compact_legacy_runs(self, batch_size: int = 200) -> int:
+        """Re-encode rows stored as plain JSON text into compressed keyframes."""
+        converted = 0
+        with self._lock:
+            conn = self._connect()
+            try:
+                while True:
+                    rows = conn.execute(
+                        f"SELECT {_RUN_COLUMNS} FROM top_picks_runs WHERE codec IS NULL LIMIT ?",
+                        (batch_size,),
+                    ).fetchall()
+                    if not rows:
+                        break
+                    for row in rows:
+                        try:
+                            self._rewrite_as_keyframe(conn, row)
+                        except Exception:
+                            # Unreadable legacy payload: keep its text, mark as opaque JSON
+                            conn.execute("UPDATE top_picks_runs SET codec = 'json' WHERE id = ?", (row[0],))
+                        converted += 1
+                    conn.commit()
+            finally:
+                conn.close()
+        return converted
+
+    def run_maintenance(self) -> Dict[str, int]:
+        """Retention cleanup, legacy row compaction and dictionary refresh."""
+        result = {"deleted": 0, "compacted": 0, "dict_id": self._dict_id}
+        for key, fn in (
+            ("deleted", self.cleanup_old_runs),
+            ("compacted", self.compact_legacy_runs),
+            ("dict_id", self.train_dictionary),
+        ):
+            try:
+                value = fn()
+                if key != "dict_id" or value:
+                    result[key] = value
+            except Exception as e:
+                print(f"[TopPicksStore] maintenance step {key} failed: {e}")
+        return result
+
+    def get_storage_stats(self) -> Dict[str, Any]:
+        """Bytes per run and compression ratio for encoded rows."""
+        conn = self._connect()
+        try:
+            row = conn.execute(
+                """
+                SELECT COUNT(*),
+                       SUM(base_id IS NULL),
+                       SUM(LENGTH(payload_blob)),
+                       SUM(raw_size)
+                FROM top_picks_runs
+                WHERE payload_blob IS NOT NULL
+                """
+            ).fetchone()
+            legacy = conn.execute(
+                "SELECT COUNT(*), SUM(LENGTH(payload)) FROM top_picks_runs WHERE codec IS NULL OR codec = 'json'"
+            ).fetchone()
+        finally:
+            conn.close()
+
+        runs, keyframes, stored, raw = (row[0] or 0, row[1] or 0, row[2] or 0, row[3] or 0)
+        return {
+            "codec": self.codec_name,
+            "dict_id": self._dict_id,
+            "encoded_runs": runs,
+            "keyframes": keyframes,
+            "stored_bytes": stored,
+            "raw_bytes": raw,
+            "bytes_per_run": round(stored / runs, 1) if runs else 0,
+            "compression_ratio": round(raw / stored, 2) if stored else None,
+            "legacy_runs": legacy[0] or 0,
+            "legacy_bytes": legacy[1] or 0,
+        }
 
 
 # Global store instance
-_top_picks_store = TopPicksStore()
+_top_picks_store = LazySingleton("top_picks_store", TopPicksStore)
 
 
 def get_top_picks_store() -> TopPicksStore:
-    return _top_picks_store
+    return _top_picks_store.get()
@@ -0,0 +1,363 @@
+"""Universe Matrix
+
+Cross-sectional daily close/return matrix for a pick universe plus the
+NIFTY and BANKNIFTY indices, built once per top-picks refresh.
+
+From the aligned arrays the matrix computes, in vectorized form:
+- beta and correlation of every symbol against each index
+- rolling (20 session) annualized volatility and its cross-sectional rank
+- market breadth (advancers/decliners, share above 50/200 session SMAs,
+  52-week highs/lows)
+- one index-level market regime (MarketRegimeAgent on the benchmark)
+
+Agents read their per-symbol slice from the coordinator context
+(``context['universe_matrix']`` and ``context['market_regime']``) instead of
+fetching index data or classifying the regime from each symbol's chart.
+Only these small slices cross into the agent compute pool; the arrays stay
+in the process that built them.
+
+Matrices are cached per (benchmark, symbols) for UNIVERSE_MATRIX_TTL_SECONDS
+so the staggered per-mode refreshes of one slot share a single build.
+"""
+
+import asyncio
+import os
+import time
+import warnings
+from dataclasses import dataclass, field
+from typing import Any, Dict, List, Optional, Tuple
+
+import numpy as np
+import pandas as pd
+
+from ..core.candles import candle_frame
+from .candle_archive import get_replay_session
+from .chart_data_service import chart_data_service
+
+
+INDEX_SYMBOLS = ("NIFTY", "BANKNIFTY")
+MATRIX_TIMEFRAME = "1Y"
+
+BETA_WINDOW = 120      # sessions of daily returns used for beta/correlation
+VOL_WINDOW = 20        # sessions for rolling volatility
+MIN_OBSERVATIONS = 20  # below this beta/correlation are left undefined
+TRADING_DAYS = 252
+
+FETCH_CONCURRENCY = 8
+
+try:
+    MATRIX_TTL_SECONDS = float(os.getenv("UNIVERSE_MATRIX_TTL_SECONDS", "600"))
+except ValueError:
+    MATRIX_TTL_SECONDS = 600.0
+
+
+def benchmark_for(universe: str) -> str:
+    return "BANKNIFTY" if str(universe or "").lower() == "banknifty" else "NIFTY"
+
+
+def _round(value: float, digits: int = 4) -> Optional[float]:
+    return None if value is None or not np.isfinite(value) else round(float(value), digits)
+
+
+def _session_frame(candles) -> Optional[pd.DataFrame]:
+    """OHLC frame indexed by IST session date (one row per session)."""
+    if not candles:
+        return None
+    df = candle_frame(candles)
+    if "time" not in df or "close" not in df:
+        return None
+    sessions = (pd.to_datetime(df["time"], unit="s") + pd.Timedelta(hours=5, minutes=30)).dt.normalize()
+    df = df.assign(session=sessions).drop_duplicates("session", keep="last").set_index("session").sort_index()
+    return df
+
+
+def masked_beta(returns: np.ndarray, market: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+    """Beta and correlation of each column of ``returns`` (T x N) to ``market`` (T).
+
+    NaNs in either input are excluded pairwise; columns with fewer than
+    MIN_OBSERVATIONS overlapping sessions get NaN.
+    """
+    valid = np.isfinite(returns) & np.isfinite(market)[:, None]
+    n = valid.sum(axis=0).astype(float)
+    x = np.where(valid, market[:, None], 0.0)
+    y = np.where(valid, returns, 0.0)
+    with np.errstate(invalid="ignore", divide="ignore"):
+        mx = x.sum(axis=0) / n
+        my = y.sum(axis=0) / n
+        cov = (x * y).sum(axis=0) / n - mx * my
+        var_x = (x * x).sum(axis=0) / n - mx * mx
+        var_y = (y * y).sum(axis=0) / n - my * my
+        beta = cov / var_x
+        corr = cov / np.sqrt(var_x * var_y)
+    beta[n < MIN_OBSERVATIONS] = np.nan
+    corr[n < MIN_OBSERVATIONS] = np.nan
+    return beta, corr
+
+
+@dataclass
+class UniverseMatrix:
+    """Aligned closes for a universe and derived cross-sectional metrics."""
+
+    universe: str
+    benchmark: str
+    symbols: List[str]
+    sessions: pd.DatetimeIndex
+    closes: np.ndarray                      # (T, N), NaN where a symbol has no bar
+    index_closes: Dict[str, np.ndarray]     # index symbol -> (T,)
+    built_at: float = field(default_factory=time.time)
+
+    beta: Dict[str, np.ndarray] = field(default_factory=dict)         # index -> (N,)
+    correlation: Dict[str, np.ndarray] = field(default_factory=dict)  # index -> (N,)
+    volatility_pct: Optional[np.ndarray] = None    # (N,) annualized %
+    volatility_rank: Optional[np.ndarray] = None   # (N,) 0..100 across the universe
+    breadth: Dict[str, Any] = field(default_factory=dict)
+    regime: Dict[str, Any] = field(default_factory=dict)
+
+    def __post_init__(self) -> None:
+        self._column = {s: i for i, s in enumerate(self.symbols)}
+
+    @property
+    def returns(self) -> np.ndarray:
+        with np.errstate(invalid="ignore", divide="ignore"):
+            return self.closes[1:] / self.closes[:-1] - 1.0
+
+    def compute(self) -> None:
+        """Fill beta/correlation, volatility ranks and breadth from the closes."""
+        returns = self.returns
+        window = returns[-BETA_WINDOW:]
+        for index_symbol, closes in self.index_closes.items():
+            with np.errstate(invalid="ignore", divide="ignore"):
+                market = (closes[1:] / closes[:-1] - 1.0)[-BETA_WINDOW:]
+            self.beta[index_symbol], self.correlation[index_symbol] = masked_beta(window, market)
+
+        recent = returns[-VOL_WINDOW:]
+        counts = np.isfinite(recent).sum(axis=0)
+        vol = np.full(len(self.symbols), np.nan)
+        enough = counts >= VOL_WINDOW // 2
+        if enough.any():
+            vol[enough] = np.nanstd(recent[:, enough], axis=0, ddof=1) * np.sqrt(TRADING_DAYS) * 100.0
+        self.volatility_pct = vol
+
+        # Percentile rank (0 = calmest, 100 = most volatile) among defined values
+        rank = np.full(len(self.symbols), np.nan)
+        defined = np.flatnonzero(np.isfinite(vol))
+        if len(defined) > 1:
+            order = vol[defined].argsort().argsort()
+            rank[defined] = order / (len(defined) - 1) * 100.0
+        elif len(defined) == 1:
+            rank[defined] = 50.0
+        self.volatility_rank = rank
+
+        self.breadth = self._compute_breadth(returns)
+
+    def _compute_breadth(self, returns: np.ndarray) -> Dict[str, Any]:
+        if len(self.closes) == 0:
+            return {}
+        last = self.closes[-1]
+        last_ret = returns[-1] if len(returns) else np.full(len(self.symbols), np.nan)
+        live = np.isfinite(last)
+        # All-NaN columns (symbols without bars) just compare False below
+        with warnings.catch_warnings(), np.errstate(invalid="ignore"):
+            warnings.simplefilter("ignore", category=RuntimeWarning)
+            sma50 = np.nanmean(self.closes[-50:], axis=0)
+            sma200 = np.nanmean(self.closes[-200:], axis=0)
+            high_52w = np.nanmax(self.closes[-TRADING_DAYS:], axis=0)
+            low_52w = np.nanmin(self.closes[-TRADING_DAYS:], axis=0)
+            advancers = int(np.sum(last_ret > 0))
+            decliners = int(np.sum(last_ret < 0))
+            above_50 = int(np.sum(last > sma50))
+            above_200 = int(np.sum(last > sma200))
+            new_highs = int(np.sum(live & (last >= high_52w)))
+            new_lows = int(np.sum(live & (last <= low_52w)))
+        total = int(live.sum())
+        return {
+            "as_of": self.sessions[-1].date().isoformat(),
+            "symbols": total,
+            "advancers": advancers,
+            "decliners": decliners,
+            "advance_decline_ratio": round(advancers / decliners, 2) if decliners else None,
+            "pct_above_sma50": round(above_50 / total * 100.0, 1) if total else None,
+            "pct_above_sma200": round(above_200 / total * 100.0, 1) if total else None,
+            "new_52w_highs": new_highs,
+            "new_52w_lows": new_lows,
+        }
+
+    def slice_for(self, symbol: str) -> Optional[Dict[str, Any]]:
+        """Per-symbol view of the matrix (None if the symbol is not in it)."""
+        i = self._column.get(str(symbol).upper())
+        if i is None:
+            return None
+        return {
+            "benchmark": self.benchmark,
+            "beta": _round(self.beta.get(self.benchmark, np.full(len(self.symbols), np.nan))[i], 3),
+            "correlation": _round(self.correlation.get(self.benchmark, np.full(len(self.symbols), np.nan))[i], 3),
+            "beta_by_index": {k: _round(v[i], 3) for k, v in self.beta.items()},
+            "volatility_pct": _round(self.volatility_pct[i], 2),
+            "volatility_rank": _round(self.volatility_rank[i], 1),
+            "as_of": self.sessions[-1].date().isoformat() if len(self.sessions) else None,
+        }
+
+    def context_for(self, symbol: str) -> Dict[str, Any]:
+        """Coordinator base context for ``symbol``."""
+        context: Dict[str, Any] = {}
+        view = self.slice_for(symbol)
+        if view is not None:
+            context["universe_matrix"] = view
+        if self.regime:
+            context["market_regime"] = self.regime
+        return context
+
+    def summary(self) -> Dict[str, Any]:
+        """Compact market context for run metadata."""
+        meta = self.regime.get("metadata") or {}
+        return {
+            "benchmark": self.benchmark,
+            "regime": meta.get("regime"),
+            "regime_score": self.regime.get("score"),
+            "volatility": meta.get("volatility"),
+            "breadth": self.breadth,
+            "symbols": len(self.symbols),
+            "sessions": len(self.sessions),
+        }
+
+
+def _index_regime(benchmark: str, frame: Optional[pd.DataFrame]) -> Dict[str, Any]:
+    """Run MarketRegimeAgent once on the benchmark's daily candles."""
+    if frame is None or len(frame) < 50:
+        return {}
+    from ..agents.market_regime_agent import market_regime_agent
+
+    candles = frame[["open", "high", "low", "close"]].reset_index(drop=True)
+    result = market_regime_agent.compute(benchmark, {"candles": candles})
+    regime = result.model_dump(include={"score", "confidence", "signals", "reasoning", "metadata"})
+    regime["metadata"] = {**regime["metadata"], "scope": "index", "index_symbol": benchmark}
+    return regime
+
+
+def build_matrix(
+    universe: str,
+    frames: Dict[str, Optional[pd.DataFrame]],
+    symbols: List[str],
+) -> Optional[UniverseMatrix]:
+    """Align per-symbol session frames on the benchmark's sessions and compute metrics."""
+    benchmark = benchmark_for(universe)
+    bench = frames.get(benchmark)
+    if bench is None or len(bench) < MIN_OBSERVATIONS + 1:
+        return None
+
+    sessions = bench.index
+    symbols = [s for s in symbols if s not in INDEX_SYMBOLS]
+    columns = {
+        s: frames[s]["close"] if frames.get(s) is not None else pd.Series(dtype=float)
+        for s in symbols
+    }
+    closes = (
+        pd.DataFrame(columns).reindex(sessions).to_numpy(dtype=float)
+        if columns else np.empty((len(sessions), 0))
+    )
+    index_closes = {
+        s: frames[s]["close"].reindex(sessions).to_numpy(dtype=float)
+        for s in INDEX_SYMBOLS
+        if frames.get(s) is not None
+    }
+
+    matrix = UniverseMatrix(
+        universe=str(universe or "").lower(),
+        benchmark=benchmark,
+        symbols=symbols,
+        sessions=sessions,
+        closes=closes,
+        index_closes=index_closes,
+    )
+    matrix.compute()
+    try:
+        matrix.regime = _index_regime(benchmark, bench)
+    except Exception as e:
+        print(f"[UniverseMatrix] Index regime failed for {benchmark}: {e}")
+    return matrix
+
+
+async def _fetch_frames(symbols: List[str]) -> Dict[str, Optional[pd.DataFrame]]:
+    semaphore = asyncio.Semaphore(FETCH_CONCURRENCY)
+
+    async def one(symbol: str) -> Optional[pd.DataFrame]:
+        async with semaphore:
+            try:
+                data = await chart_data_service.fetch_chart_data(symbol, MATRIX_TIMEFRAME)
+                return _session_frame((data or {}).get("candles") or [])
+            except Exception as e:
+                print(f"[UniverseMatrix] Candles unavailable for {symbol}: {e}")
+                return None
+
+    frames = await asyncio.gather(*[one(s) for s in symbols])
+    return dict(zip(symbols, frames))
+
+
+_matrix_cache: Dict[Tuple[str, Tuple[str, ...]], UniverseMatrix] = {}
+_build_locks: Dict[Tuple[str, Tuple[str, ...]], asyncio.Lock] = {}
+
+
+async def get_universe_matrix(universe: str, symbols: List[str]) -> Optional[UniverseMatrix]:
+    """Return the (cached) matrix for ``symbols``, building it at most once per TTL.
+
+    Concurrent callers for the same universe wait on a single build. Replay
+    sessions always build fresh so no live bars leak into a backtest.
+    """
+    symbols = [str(s).upper() for s in symbols]
+    all_symbols = list(dict.fromkeys(list(INDEX_SYMBOLS) + symbols))
+
+    if get_replay_session() is not None:
+        frames = await _fetch_frames(all_symbols)
+        return await asyncio.to_thread(build_matrix, universe, frames, symbols)
+
+    key = (benchmark_for(universe), tuple(sorted(symbols)))
+    lock = _build_locks.setdefault(key, asyncio.Lock())
+    async with lock:
+        cached = _matrix_cache.get(key)
+        if cached is not None and time.time() - cached.built_at < MATRIX_TTL_SECONDS:
+            return cached
+
+        t0 = time.perf_counter()
+        frames = await _fetch_frames(all_symbols)
+        matrix = await asyncio.to_thread(build_matrix, universe, frames, symbols)
+        if matrix is not None:
+            _matrix_cache[key] = matrix
+            print(
+                f"[UniverseMatrix] Built {matrix.benchmark} matrix: {len(matrix.symbols)} symbols x "
+                f"{len(matrix.sessions)} sessions in {time.perf_counter() - t0:.1f}s"
+            )
+        return matrix
+
+
+_index_returns_cache: Dict[str, Tuple[float, pd.Series]] = {}
+
+
+async def estimate_beta(closes: pd.Series, index_symbol: str = "NIFTY") -> Optional[float]:
+    """Beta of a single daily close series against an index (outside a matrix build).
+
+    Aligns on session date when ``closes`` has a DatetimeIndex, otherwise on
+    the most recent bars.
+    """
+    cached = _index_returns_cache.get(index_symbol)
+    if cached is None or time.time() - cached[0] >= MATRIX_TTL_SECONDS or get_replay_session() is not None:
+        frames = await _fetch_frames([index_symbol])
+        frame = frames.get(index_symbol)
+        if frame is None:
+            return None
+        cached = (time.time(), frame["close"].pct_change().dropna())
+        if get_replay_session() is None:
+            _index_returns_cache[index_symbol] = cached
+    market = cached[1]
+
+    stock = closes.astype(float).pct_change().dropna()
+    if isinstance(stock.index, pd.DatetimeIndex):
+        index = stock.index.tz_localize(None) if stock.index.tz is not None else stock.index
+        stock.index = index.normalize()
+        aligned = pd.concat([stock, market], axis=1, join="inner").dropna()
+        stock_ret, market_ret = aligned.iloc[:, 0].to_numpy(), aligned.iloc[:, 1].to_numpy()
+    else:
+        n = min(len(stock), len(market))
+        stock_ret, market_ret = stock.to_numpy()[-n:], market.to_numpy()[-n:]
+
+    beta, _ = masked_beta(stock_ret[-BETA_WINDOW:, None], market_ret[-BETA_WINDOW:])
+    return _round(beta[0], 3)
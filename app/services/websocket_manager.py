@@ -8,12 +8,12 @@ import asyncio
 import json
 from typing import Set, Dict, Any, List
 from fastapi import WebSocket
-from fastapi.encoders import jsonable_encoder
 from datetime import datetime
 
 from .zerodha_websocket import get_zerodha_websocket
 from .event_logger import log_event
 from ..config.index_universe import ALWAYS_ON_WS_SYMBOLS
+from ..utils.json_encoder import fast_json_dumps
 
 logger = logging.getLogger(__name__)
 
@@ -33,6 +33,9 @@ class WebSocketManager:
         # Global subscriptions (symbol -> set of websockets)
         self.symbol_subscriptions: Dict[str, Set[WebSocket]] = {}
         
+        # Order update subscriptions (account_id -> set of websockets)
+        self.account_subscriptions: Dict[str, Set[WebSocket]] = {}
+        
         # Zerodha WebSocket service
         self.zerodha_ws = get_zerodha_websocket()
         # Always-on universe symbols (e.g., NIFTY50, BANKNIFTY)
@@ -121,23 +124,22 @@ class WebSocketManager:
                     }
                 }
 
-                safe_message = jsonable_encoder(message)
                 try:
                     log_event(
                         event_type="ui_tick",
                         source="websocket_manager",
-                        payload=safe_message,
+                        payload=message,
                     )
                 except Exception:
                     pass
                 
                 if self._loop is not None and self._loop.is_running():
                     asyncio.run_coroutine_threadsafe(
-                        self._broadcast_to_connections(connections, safe_message),
+                        self._broadcast_to_connections(connections, message),
                         self._loop,
                     )
                 else:
-                    asyncio.create_task(self._broadcast_to_connections(connections, safe_message))
+                    asyncio.create_task(self._broadcast_to_connections(connections, message))
                 
         except Exception as e:
             logger.error(f"Error handling ticks: {e}")
@@ -146,10 +148,12 @@ class WebSocketManager:
     async def _broadcast_to_connections(self, connections: Set[WebSocket], message: Dict[str, Any]):
         """Broadcast message to specific connections"""
         disconnected = set()
+        # Encode once for all recipients (send_json re-encodes per socket)
+        text = fast_json_dumps(message).decode("utf-8")
         
         for websocket in connections:
             try:
-                await websocket.send_json(message)
+                await websocket.send_text(text)
                 self.stats['messages_sent'] += 1
             except Exception as e:
                 logger.error(f"Error sending to client: {e}")
@@ -235,6 +239,12 @@ class WebSocketManager:
                         self.zerodha_ws.unsubscribe([symbol])
                         del self.symbol_subscriptions[symbol]
             
+            # Remove order update subscriptions
+            for account_id in list(self.account_subscriptions):
+                self.account_subscriptions[account_id].discard(websocket)
+                if not self.account_subscriptions[account_id]:
+                    del self.account_subscriptions[account_id]
+            
             # Remove connection subscriptions
             if websocket in self.connection_subscriptions:
                 del self.connection_subscriptions[websocket]
@@ -353,9 +363,10 @@ class WebSocketManager:
         except Exception:
             pass
 
+        text = fast_json_dumps(message).decode("utf-8")
         for websocket in self.active_connections:
             try:
-                await websocket.send_json(message)
+                await websocket.send_text(text)
                 self.stats['messages_sent'] += 1
             except Exception as e:
                 logger.error(f"Error broadcasting to client: {e}")
@@ -365,12 +376,34 @@ class WebSocketManager:
         for ws in disconnected:
             await self.disconnect(ws)
     
+    async def subscribe_orders(self, websocket: WebSocket, account_id: str):
+        """
+        Subscribe a connection to order updates for one account
+        
+        Args:
+            websocket: FastAPI WebSocket instance
+            account_id: Resolved account id (from the JWT in production)
+        """
+        self.account_subscriptions.setdefault(account_id, set()).add(websocket)
+        await websocket.send_json({
+            'type': 'orders_subscribed',
+            'account_id': account_id,
+            'timestamp': datetime.now().isoformat()
+        })
+    
+    async def send_to_account(self, account_id: str, message: Dict[str, Any]):
+        """Send a message only to connections subscribed to an account's orders"""
+        connections = self.account_subscriptions.get(account_id)
+        if connections:
+            await self._broadcast_to_connections(set(connections), message)
+    
     def get_stats(self) -> Dict[str, Any]:
         """Get WebSocket manager statistics"""
         return {
             **self.stats,
             'zerodha_stats': self.zerodha_ws.get_stats(),
-            'subscribed_symbols': list(self.symbol_subscriptions.keys())
+            'subscribed_symbols': list(self.symbol_subscriptions.keys()),
+            'order_subscriptions': sum(len(c) for c in self.account_subscriptions.values())
         }
 
 
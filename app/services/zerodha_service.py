@@ -3,19 +3,22 @@ Zerodha Kite Connect Integration
 Live broker connection for ARISE trading platform
 """
 
+import importlib.util
 import os
 from typing import Dict, Any, Optional, List
 from datetime import datetime, timedelta, time
 from dotenv import load_dotenv
 
+from .instrument_master import get_instrument_master
+from ..core.lazy import LazySingleton
+
 # Load environment variables
 load_dotenv()
 
-try:
-    from kiteconnect import KiteConnect
-    KITE_AVAILABLE = True
-except ImportError:
-    KITE_AVAILABLE = False
+# kiteconnect (and twisted/autobahn behind it) is imported when a client is
+# actually built, not when this module is imported.
+KITE_AVAILABLE = importlib.util.find_spec("kiteconnect") is not None
+if not KITE_AVAILABLE:
     print("WARNING: kiteconnect not installed. Run: pip install kiteconnect")
 
 
@@ -50,6 +53,7 @@ class ZerodhaService:
             self.access_token = None
             return
         
+        from kiteconnect import KiteConnect
         self.kite = KiteConnect(api_key=self.api_key)
         self.access_token = None
         self.instruments_cache = {}  # Cache for instrument tokens
@@ -193,26 +197,22 @@ class ZerodhaService:
     
     def _load_instruments(self):
         """
-        Load all NSE instruments dynamically from Zerodha.
-        This replaces the hardcoded INSTRUMENT_TOKENS mapping.
+        Attach the shared instrument master (NSE symbol -> token view).
+        The dump is downloaded at most once per day across processes; see
+        instrument_master.
         """
         if not self.kite or not self.access_token:
             print("  Zerodha: Cannot load instruments - not authenticated")
             return
         
         try:
-            import asyncio
-            
-            # Fetch all NSE instruments
-            instruments = self.kite.instruments("NSE")
+            master = get_instrument_master()
+            if not master.ensure_fresh(self.kite):
+                raise RuntimeError("instrument master is empty")
             
-            # Build symbol -> instrument_token mapping
-            self.instruments_cache = {}
-            for inst in instruments:
-                symbol = inst['tradingsymbol']
-                self.instruments_cache[symbol] = inst['instrument_token']
+            self.instruments_cache = master.tokens("NSE")
             
-            print(f"  [OK] Loaded {len(self.instruments_cache)} NSE instruments")
+            print(f"  [OK] Loaded {len(self.instruments_cache)} NSE instruments (snapshot {master.snapshot_date})")
             print(f"  [OK] Zerodha ready for all NSE stocks")
             
         except Exception as e:
@@ -507,26 +507,23 @@ class ZerodhaService:
             List of matching instruments
         """
         try:
-            instruments = self.get_instruments(exchange)
+            master = get_instrument_master()
+            if not master.ensure_fresh(self.kite if self.access_token else None):
+                raise RuntimeError("Instrument master not loaded - authenticate first")
             
-            # Filter by query
-            query_upper = query.upper()
-            results = [
-                inst for inst in instruments
-                if query_upper in inst.get('tradingsymbol', '').upper()
-                or query_upper in inst.get('name', '').upper()
-            ]
+            # Exact, prefix, then substring matches from the indexed master
+            results = master.search(query, exchange=exchange, limit=10)
             
             print(f"✅ Found {len(results)} instruments matching '{query}'")
-            return results[:10]  # Return top 10
+            return results  # Top 10
             
         except Exception as e:
             print(f"❌ Instrument search failed: {e}")
             raise
 
 
-# Global instance
-zerodha_service = ZerodhaService()
+# Global instance (built on first use)
+zerodha_service = LazySingleton("zerodha_service", ZerodhaService)
 
 
 # Convenience functions
@@ -8,7 +8,6 @@ import logging
 import asyncio
 from typing import Dict, Set, Callable, Optional, Any, List
 from datetime import datetime
-from kiteconnect import KiteTicker
 import json
 from .event_logger import log_event
 
@@ -40,6 +39,7 @@ class ZerodhaWebSocketService:
         self.on_connect_callbacks: List[Callable] = []
         self.on_close_callbacks: List[Callable] = []
         self.on_error_callbacks: List[Callable] = []
+        self.on_order_update_callbacks: List[Callable] = []
         
         # Latest ticks cache
         self.latest_ticks: Dict[int, Dict[str, Any]] = {}
@@ -47,6 +47,7 @@ class ZerodhaWebSocketService:
         # Statistics
         self.stats = {
             'ticks_received': 0,
+            'order_updates_received': 0,
             'reconnections': 0,
             'errors': 0,
             'last_tick_time': None,
@@ -92,7 +93,7 @@ class ZerodhaWebSocketService:
     def get_instrument_tokens(self, symbols: List[str]) -> Dict[str, int]:
         """
         Get instrument tokens for symbols
-        Uses Zerodha provider's instrument lookup
+        Uses the shared instrument master (NSE/NFO/BSE)
         
         Args:
             symbols: List of trading symbols (e.g., ['RELIANCE', 'TCS'])
@@ -103,24 +104,13 @@ class ZerodhaWebSocketService:
         try:
             tokens = {}
 
-            def _looks_like_nfo_symbol(sym: Any) -> bool:
-                try:
-                    s = str(sym or "").upper().strip()
-                except Exception:
-                    return False
-                if not s:
-                    return False
-                if not any(c.isdigit() for c in s):
-                    return False
-                return s.endswith("CE") or s.endswith("PE") or s.endswith("FUT")
-
             try:
-                from .zerodha_service import zerodha_service
+                from .instrument_master import get_instrument_master
 
-                instruments_cache = getattr(zerodha_service, "instruments_cache", None) or {}
-                if instruments_cache:
+                master = get_instrument_master()
+                if len(master):
                     for symbol in symbols:
-                        token_raw = instruments_cache.get(str(symbol).upper())
+                        token_raw = master.token_for(symbol, master.exchange_for(symbol))
                         if token_raw:
                             try:
                                 token = int(token_raw)
@@ -136,17 +126,18 @@ class ZerodhaWebSocketService:
                             except Exception:
                                 pass
             except Exception:
-                instruments_cache = {}
+                pass
 
-            # Fallback to provider (may require fetching instruments). Only do this
-            # for symbols we couldn't resolve from the cached instrument map.
+            # Fallback to provider (loads the instrument master if this process
+            # has not yet). Only for symbols we couldn't resolve above.
             missing = [s for s in symbols if s not in tokens]
             if missing:
                 from ..providers.zerodha_provider import get_zerodha_provider
 
                 zerodha = get_zerodha_provider()
+                zerodha._load_instruments()
                 for symbol in missing:
-                    exchange = "NFO" if _looks_like_nfo_symbol(symbol) else "NSE"
+                    exchange = get_instrument_master().exchange_for(symbol)
                     token_raw = zerodha.get_instrument_token(symbol, exchange=exchange)
                     if token_raw:
                         try:
@@ -181,6 +172,7 @@ class ZerodhaWebSocketService:
                 return False
             
             # Create KiteTicker instance
+            from kiteconnect import KiteTicker
             self.ticker = KiteTicker(self.api_key, self.access_token)
 
             # Configure reconnect behavior (KiteTicker defaults can be noisy).
@@ -206,6 +198,7 @@ class ZerodhaWebSocketService:
             self.ticker.on_error = self._on_error
             self.ticker.on_reconnect = self._on_reconnect
             self.ticker.on_noreconnect = self._on_noreconnect
+            self.ticker.on_order_update = self._on_order_update
             
             logger.info("✓ KiteTicker initialized")
             return True
@@ -360,6 +353,15 @@ class ZerodhaWebSocketService:
         self.stats['reconnections'] += 1
         logger.info(f"Reconnecting... (attempt {attempts_count})")
     
+    def _on_order_update(self, ws, data):
+        """Callback when Kite pushes an order update for the connected user"""
+        self.stats['order_updates_received'] += 1
+        for callback in self.on_order_update_callbacks:
+            try:
+                callback(data)
+            except Exception as e:
+                logger.error(f"Error in order update callback: {e}")
+    
     def _on_noreconnect(self, ws):
         """Callback when reconnection fails"""
         logger.error("Reconnection failed - no more attempts")
@@ -492,6 +494,10 @@ class ZerodhaWebSocketService:
         """Register callback for error events"""
         self.on_error_callbacks.append(callback)
     
+    def register_order_update_callback(self, callback: Callable):
+        """Register callback for order update events"""
+        self.on_order_update_callbacks.append(callback)
+    
     def get_stats(self) -> Dict[str, Any]:
         """Get WebSocket statistics"""
         return {
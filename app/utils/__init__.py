@@ -4,7 +4,9 @@ Utility modules for Fyntrix backend
 from .json_encoder import (
     NumpyPandasEncoder,
     safe_json_dumps,
-    convert_numpy_types
+    convert_numpy_types,
+    fast_json_dumps,
+    FastJSONResponse,
 )
 from .trading_modes import TradingMode, normalize_mode
 
@@ -12,6 +14,8 @@ __all__ = [
     "NumpyPandasEncoder",
     "safe_json_dumps",
     "convert_numpy_types",
+    "fast_json_dumps",
+    "FastJSONResponse",
     "TradingMode",
     "normalize_mode",
 ]
@@ -7,6 +7,9 @@ from typing import Any
 from datetime import datetime, date
 import numpy as np
 import pandas as pd
+from starlette.responses import JSONResponse
+
+from ..core.candles import Candles
 
 
 class NumpyPandasEncoder(json.JSONEncoder):
@@ -38,6 +41,10 @@ class NumpyPandasEncoder(json.JSONEncoder):
         if isinstance(obj, pd.Series):
             return obj.to_dict()
         
+        # Handle columnar candles
+        if isinstance(obj, Candles):
+            return obj.to_records()
+        
         # Handle datetime objects
         if isinstance(obj, (datetime, date)):
             return obj.isoformat()
@@ -91,6 +98,9 @@ def convert_numpy_types(obj: Any) -> Any:
     if isinstance(obj, pd.Series):
         return obj.to_dict()
     
+    if isinstance(obj, Candles):
+        return obj.to_records()
+    
     if isinstance(obj, pd.Timestamp):
         return obj.isoformat()
     
@@ -108,3 +118,75 @@ def convert_numpy_types(obj: Any) -> Any:
     
     # Return as-is for other types
     return obj
+
+
+# ==================== Fast single-pass encoding ====================
+#
+# orjson encodes dicts/lists/str/int/float/datetime and (with
+# OPT_SERIALIZE_NUMPY) NumPy scalars and arrays natively, calling
+# _fast_default only for the few types it does not know. This avoids the
+# convert_numpy_types() copy and the per-object Python default() calls of
+# NumpyPandasEncoder, and produces bytes directly. Without orjson the
+# stdlib path is used so callers never need to care which one is active.
+
+try:
+    import orjson  # type: ignore
+
+    _ORJSON_OPTIONS = orjson.OPT_SERIALIZE_NUMPY | orjson.OPT_NON_STR_KEYS
+except ImportError:  # pragma: no cover - orjson is in requirements.txt
+    orjson = None  # type: ignore
+
+
+def _fast_default(obj: Any) -> Any:
+    """Fallback for types orjson does not serialize natively."""
+    if obj is pd.NaT:
+        return None
+    if isinstance(obj, pd.Timestamp):
+        return obj.isoformat()
+    if isinstance(obj, np.generic):
+        return obj.item()
+    if isinstance(obj, np.ndarray):
+        # Object/string/non-contiguous arrays are not handled natively
+        return obj.tolist()
+    if isinstance(obj, pd.DataFrame):
+        return obj.to_dict(orient='records')
+    if isinstance(obj, pd.Series):
+        return obj.to_dict()
+    if isinstance(obj, Candles):
+        return obj.to_records()
+    if isinstance(obj, (set, frozenset)):
+        return list(obj)
+    if hasattr(obj, "model_dump"):
+        return obj.model_dump()
+    raise TypeError(f"Object of type {type(obj).__name__} is not JSON serializable")
+
+
+def fast_json_dumps(obj: Any) -> bytes:
+    """
+    Serialize object to compact JSON bytes in a single pass
+
+    Handles the same numpy/pandas/datetime types as safe_json_dumps without
+    a pre-conversion copy. NaN/Infinity are emitted as null (valid JSON).
+
+    Args:
+        obj: Object to serialize
+
+    Returns:
+        UTF-8 encoded JSON bytes
+    """
+    if orjson is not None:
+        try:
+            return orjson.dumps(obj, default=_fast_default, option=_ORJSON_OPTIONS)
+        except TypeError:
+            # e.g. dict keys of a type orjson rejects; retry on the slow path
+            pass
+    return safe_json_dumps(
+        convert_numpy_types(obj), separators=(",", ":"), ensure_ascii=False
+    ).encode("utf-8")
+
+
+class FastJSONResponse(JSONResponse):
+    """FastAPI/Starlette JSON response rendered with fast_json_dumps."""
+
+    def render(self, content: Any) -> bytes:
+        return fast_json_dumps(content)
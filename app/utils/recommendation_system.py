@@ -132,6 +132,11 @@ def calculate_risk_reward_ratio(
         return 1.0 + (risk_factor * 2.0)
 
 
+# Minimum R/R for the "highly_favorable" and "acceptable" assessments
+RR_HIGHLY_FAVORABLE = 2.5
+RR_ACCEPTABLE = 1.5
+
+
 def assess_risk_reward_favorability(risk_reward_ratio: Optional[float]) -> str:
     """
     Assess if risk/reward is favorable, acceptable, or poor
@@ -145,77 +150,70 @@ def assess_risk_reward_favorability(risk_reward_ratio: Optional[float]) -> str:
     if risk_reward_ratio is None:
         return "acceptable"  # Neutral if unknown
     
-    if risk_reward_ratio >= 2.5:
+    if risk_reward_ratio >= RR_HIGHLY_FAVORABLE:
         return "highly_favorable"  # 2.5:1 or better
-    elif risk_reward_ratio >= 1.5:
+    elif risk_reward_ratio >= RR_ACCEPTABLE:
         return "acceptable"  # 1.5:1 to 2.5:1
     else:
         return "poor"  # Less than 1.5:1
 
 
-def get_recommendation(
-    score: float,
-    confidence: str = "Medium",
-    risk_reward_ratio: Optional[float] = None,
-    entry_price: Optional[float] = None,
-    stop_loss: Optional[float] = None,
-    target_price: Optional[float] = None,
-    risk_agent_score: Optional[float] = None,
-    agent_signals: Optional[List[Dict]] = None
-) -> RecommendationResult:
+# Score bands by inclusive lower bound, strongest first; anything below the
+# last bound is "strong_sell"
+SCORE_BANDS: Tuple[Tuple[float, str], ...] = (
+    (70, "strong_buy"),
+    (60, "buy"),
+    (45, "neutral"),
+    (35, "sell"),
+)
+
+BULLISH_SIGNALS = ('Bullish', 'Buy', 'Positive')
+BEARISH_SIGNALS = ('Bearish', 'Sell', 'Negative')
+
+
+def score_band(score: float) -> str:
+    """Name of the SCORE_BANDS band a blend score falls in"""
+    for lower, band in SCORE_BANDS:
+        if score >= lower:
+            return band
+    return "strong_sell"
+
+
+def has_contradictory_signals(agent_signals: Optional[List[Dict]]) -> bool:
     """
-    Get recommendation based on score and risk/reward analysis
+    Check whether agent signals are split between bullish and bearish
     
-    Logic:
-    ------
-    1. Calculate risk/reward if not provided
-    2. Determine base recommendation from score
-    3. Adjust based on risk/reward favorability
-    4. Check for contradictory agent signals (for Neutral)
-    5. Return complete recommendation with metadata
+    Only checked with at least 3 signals; contradictory when the bullish
+    and bearish counts are within 30% of the signal count of each other.
+    """
+    if not agent_signals:
+        return False
+    bullish_count = sum(1 for s in agent_signals if s.get('signal') in BULLISH_SIGNALS)
+    bearish_count = sum(1 for s in agent_signals if s.get('signal') in BEARISH_SIGNALS)
+    total_signals = len(agent_signals)
+    return total_signals >= 3 and abs(bullish_count - bearish_count) <= total_signals * 0.3
+
+
+def classify_recommendation(
+    band: str,
+    rr_favorability: str,
+    has_contradictions: bool
+) -> Tuple[Recommendation, Optional[str]]:
+    """
+    Recommendation and note for a score band and risk/reward assessment
     
     Args:
-        score: Blend score (0-100)
-        confidence: Confidence level (High/Medium/Low)
-        risk_reward_ratio: Pre-calculated R/R ratio
-        entry_price: Entry price for R/R calculation
-        stop_loss: Stop loss for R/R calculation
-        target_price: Target for R/R calculation
-        risk_agent_score: Risk agent score
-        agent_signals: List of agent signals for contradiction check
+        band: Score band from score_band()
+        rr_favorability: Result of assess_risk_reward_favorability()
+        has_contradictions: Result of has_contradictory_signals()
     
     Returns:
-        RecommendationResult with recommendation and metadata
+        Tuple of (recommendation, note)
     """
-    # Calculate risk/reward if not provided
-    if risk_reward_ratio is None:
-        risk_reward_ratio = calculate_risk_reward_ratio(
-            entry_price=entry_price,
-            stop_loss=stop_loss,
-            target_price=target_price,
-            risk_agent_score=risk_agent_score
-        )
-    
-    # Assess risk/reward favorability
-    rr_favorability = assess_risk_reward_favorability(risk_reward_ratio)
-    
-    # Check for contradictory signals (for Neutral classification)
-    has_contradictions = False
-    if agent_signals:
-        bullish_count = sum(1 for s in agent_signals if s.get('signal') in ['Bullish', 'Buy', 'Positive'])
-        bearish_count = sum(1 for s in agent_signals if s.get('signal') in ['Bearish', 'Sell', 'Negative'])
-        total_signals = len(agent_signals)
-        
-        if total_signals >= 3:  # Only check if we have enough signals
-            # Contradictory if signals are split (within 30% of each other)
-            if abs(bullish_count - bearish_count) <= total_signals * 0.3:
-                has_contradictions = True
-    
-    # Determine recommendation based on score and risk/reward
     recommendation: Recommendation
     note: Optional[str] = None
 
-    if score >= 70:
+    if band == "strong_buy":
         # Strong Buy band
         if rr_favorability == "highly_favorable":
             recommendation = Recommendation.STRONG_BUY
@@ -226,7 +224,7 @@ def get_recommendation(
             recommendation = Recommendation.BUY
             note = "High score but poor risk/reward. Wait for better entry or reduce position size."
 
-    elif score >= 60:
+    elif band == "buy":
         # Buy band
         if rr_favorability in ["highly_favorable", "acceptable"]:
             recommendation = Recommendation.BUY
@@ -234,7 +232,7 @@ def get_recommendation(
             recommendation = Recommendation.NEUTRAL
             note = "Moderate positive score but unattractive risk/reward. Wait for better opportunity."
 
-    elif score >= 45:
+    elif band == "neutral":
         # Neutral band
         recommendation = Recommendation.NEUTRAL
         if has_contradictions:
@@ -242,7 +240,7 @@ def get_recommendation(
         else:
             note = "Score in neutral zone. Monitor for clearer bullish or bearish setup."
 
-    elif score >= 35:
+    elif band == "sell":
         # Sell band
         if rr_favorability in ["highly_favorable", "acceptable"]:
             recommendation = Recommendation.SELL
@@ -259,6 +257,61 @@ def get_recommendation(
         else:
             recommendation = Recommendation.SELL
             note = "Very weak score but either mixed signals or poor risk/reward. Treat as Sell, not Strong Sell."
+
+    return recommendation, note
+
+
+def get_recommendation(
+    score: float,
+    confidence: str = "Medium",
+    risk_reward_ratio: Optional[float] = None,
+    entry_price: Optional[float] = None,
+    stop_loss: Optional[float] = None,
+    target_price: Optional[float] = None,
+    risk_agent_score: Optional[float] = None,
+    agent_signals: Optional[List[Dict]] = None
+) -> RecommendationResult:
+    """
+    Get recommendation based on score and risk/reward analysis
+    
+    Logic:
+    ------
+    1. Calculate risk/reward if not provided
+    2. Determine base recommendation from score
+    3. Adjust based on risk/reward favorability
+    4. Check for contradictory agent signals (for Neutral)
+    5. Return complete recommendation with metadata
+    
+    Args:
+        score: Blend score (0-100)
+        confidence: Confidence level (High/Medium/Low)
+        risk_reward_ratio: Pre-calculated R/R ratio
+        entry_price: Entry price for R/R calculation
+        stop_loss: Stop loss for R/R calculation
+        target_price: Target for R/R calculation
+        risk_agent_score: Risk agent score
+        agent_signals: List of agent signals for contradiction check
+    
+    Returns:
+        RecommendationResult with recommendation and metadata
+    """
+    # Calculate risk/reward if not provided
+    if risk_reward_ratio is None:
+        risk_reward_ratio = calculate_risk_reward_ratio(
+            entry_price=entry_price,
+            stop_loss=stop_loss,
+            target_price=target_price,
+            risk_agent_score=risk_agent_score
+        )
+    
+    # Assess risk/reward favorability
+    rr_favorability = assess_risk_reward_favorability(risk_reward_ratio)
+    
+    # Check for contradictory signals (for Neutral classification)
+    has_contradictions = has_contradictory_signals(agent_signals)
+    
+    # Determine recommendation based on score and risk/reward
+    recommendation, note = classify_recommendation(score_band(score), rr_favorability, has_contradictions)
     
     # Get color scheme
     color_scheme = RECOMMENDATION_COLORS[recommendation]
@@ -397,6 +450,9 @@ __all__ = [
     'get_recommendation_display_text',
     'format_pick_for_api',
     'calculate_risk_reward_ratio',
+    'score_band',
+    'has_contradictory_signals',
+    'classify_recommendation',
     'get_agent_recommendation',
     'get_agent_color',
     'RECOMMENDATION_COLORS'
@@ -0,0 +1,136 @@
+"""
+Benchmark: event-loop latency while a Top Picks style batch is running,
+with and without the agent compute process pool.
+
+A probe coroutine wakes every PROBE_INTERVAL_MS and records how late it
+was scheduled. That lag is what every concurrent HTTP/WebSocket request on
+the same loop pays, so its p99 is a direct proxy for API p99 during a
+scheduler run.
+
+Candles come from a synthetic candle archive (no Zerodha/Yahoo access), so
+the numbers isolate CPU work from network time.
+
+Usage (from repo root):
+    python scripts/bench_agent_offload.py --symbols 50 --workers 4
+"""
+import argparse
+import asyncio
+import os
+import statistics
+import sys
+import tempfile
+import time
+from datetime import datetime
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+import numpy as np
+import pandas as pd
+
+PROBE_INTERVAL_MS = 10
+
+
+def build_archive(path: Path, symbols):
+    from app.services.candle_archive import CandleArchive, ist_to_epoch
+
+    archive = CandleArchive(path)
+    days = pd.bdate_range(end="2025-06-30", periods=400)
+    hours = pd.date_range(end="2025-06-30 15:15", periods=60 * 7, freq="h")
+    quarters = pd.date_range(end="2025-06-30 15:15", periods=30 * 25, freq="15min")
+    for i, symbol in enumerate(symbols):
+        rng = np.random.default_rng(i)
+        for interval, stamps in (("1d", days), ("60m", hours), ("15m", quarters)):
+            close = 100 * np.exp(np.cumsum(rng.normal(0, 0.01, len(stamps))))
+            archive.upsert_frame(symbol, interval, pd.DataFrame({
+                "time": [ist_to_epoch(t.to_pydatetime()) for t in stamps],
+                "open": close * (1 + rng.normal(0, 0.002, len(stamps))),
+                "high": close * 1.01,
+                "low": close * 0.99,
+                "close": close,
+                "volume": rng.integers(1_000, 100_000, len(stamps)),
+            }))
+    return archive
+
+
+async def probe(stop: asyncio.Event, lags):
+    interval = PROBE_INTERVAL_MS / 1000.0
+    while not stop.is_set():
+        t0 = time.perf_counter()
+        await asyncio.sleep(interval)
+        lags.append((time.perf_counter() - t0 - interval) * 1000.0)
+
+
+def pct(values, q):
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(q * len(ordered)))]
+
+
+async def run_once(archive, symbols, offload: bool):
+    from app.agents.compute_pool import agent_compute_pool
+    from app.agents.coordinator import AgentCoordinator
+    from app.agents.market_regime_agent import MarketRegimeAgent
+    from app.agents.pattern_recognition_agent import PatternRecognitionAgent
+    from app.agents.technical_agent import TechnicalAgent
+    from app.services.candle_archive import ist_to_epoch, replay_session
+
+    agent_compute_pool.enabled = offload
+    if offload:
+        await agent_compute_pool.warmup()
+
+    coordinator = AgentCoordinator()
+    for agent in (TechnicalAgent(), PatternRecognitionAgent(), MarketRegimeAgent()):
+        coordinator.register_agent(agent)
+
+    lags = []
+    stop = asyncio.Event()
+    with replay_session(archive, ist_to_epoch(datetime(2025, 6, 30, 15, 30))):
+        probe_task = asyncio.create_task(probe(stop, lags))
+        t0 = time.perf_counter()
+        results = await coordinator.batch_analyze(symbols, max_concurrent=10)
+        wall = time.perf_counter() - t0
+        stop.set()
+        await probe_task
+
+    return {
+        "offload": offload,
+        "symbols_ok": len(results),
+        "wall_s": round(wall, 2),
+        "lag_p50_ms": round(pct(lags, 0.50), 1),
+        "lag_p99_ms": round(pct(lags, 0.99), 1),
+        "lag_max_ms": round(max(lags) if lags else 0.0, 1),
+        "lag_mean_ms": round(statistics.fmean(lags) if lags else 0.0, 1),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Agent compute offload latency benchmark")
+    parser.add_argument("--symbols", type=int, default=30)
+    parser.add_argument("--workers", type=int, default=None)
+    args = parser.parse_args()
+
+    if args.workers:
+        os.environ["AGENT_COMPUTE_WORKERS"] = str(args.workers)
+
+    symbols = [f"SYM{i:03d}" for i in range(args.symbols)]
+    with tempfile.TemporaryDirectory() as tmp:
+        archive = build_archive(Path(tmp) / "bench_archive.db", symbols)
+        rows = [asyncio.run(run_once(archive, symbols, offload)) for offload in (False, True)]
+
+    from app.agents.compute_pool import agent_compute_pool
+    agent_compute_pool.shutdown()
+
+    print("\n" + "=" * 60)
+    print("AGENT COMPUTE OFFLOAD BENCHMARK")
+    print("=" * 60)
+    for row in rows:
+        print(
+            f"offload={str(row['offload']):<5} symbols={row['symbols_ok']:<4} wall={row['wall_s']:>6}s "
+            f"loop lag p50={row['lag_p50_ms']}ms p99={row['lag_p99_ms']}ms max={row['lag_max_ms']}ms"
+        )
+
+
+if __name__ == "__main__":
+    main()
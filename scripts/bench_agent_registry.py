@@ -0,0 +1,132 @@
+"""
+Benchmark: per-caller agent instances versus the shared agent registry.
+
+Simulates a scheduler batch over N symbols while ARIS chat asks about some
+of the same symbols at the same moment, then again a few seconds later.
+- before: each caller builds its own coordinator with fresh agents (own
+  result caches, no de-duplication)
+- after: both callers use registry.build_coordinator views, so agent
+  caches are shared and concurrent runs of an (agent, symbol) pair join
+  the run already in flight
+
+Blend scores must match between the two setups: weight profiles are still
+applied per caller. The scheduler batch carries an index-level regime in
+its context (as the universe matrix supplies it) while chat does not, so a
+market_regime result leaking between the two callers shows up as a score
+mismatch. Candles come from a synthetic candle archive (no Zerodha/Yahoo
+access); only the candle-driven agents are run.
+
+Usage (from repo root):
+    python scripts/bench_agent_registry.py --symbols 30 --chat 10
+"""
+import argparse
+import asyncio
+import contextlib
+import io
+import sys
+import tempfile
+import time
+from datetime import datetime
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from bench_agent_offload import build_archive
+
+AGENTS = ["technical", "pattern_recognition", "market_regime"]
+
+# Stand-in for UniverseMatrix.context_for: one index regime for the batch
+INDEX_REGIME = {
+    "score": 72.0,
+    "confidence": "Medium",
+    "signals": [],
+    "reasoning": "bench index regime",
+    "metadata": {"regime": "BULL", "scope": "index", "index_symbol": "NIFTY"},
+}
+
+
+async def scenario(archive, symbols, chat_symbols, shared: bool):
+    from app.agents import registry as registry_module
+    from app.agents.compute_pool import agent_compute_pool
+    from app.agents.coordinator import AgentCoordinator
+    from app.agents.registry import AgentRegistry, WEIGHT_PROFILES
+    from app.services.candle_archive import ist_to_epoch, replay_session
+
+    agent_compute_pool.enabled = False
+    runs = {"n": 0}
+    original = AgentCoordinator._run_agent
+
+    async def counting_run(self, agent, symbol, context):
+        runs["n"] += 1
+        return await original(self, agent, symbol, context)
+
+    AgentCoordinator._run_agent = counting_run
+    try:
+        if shared:
+            registry_module.agent_registry = AgentRegistry()
+            scheduler = registry_module.build_coordinator("scheduler")
+            chat = registry_module.build_coordinator("chat")
+        else:
+            scheduler, chat = AgentCoordinator(), AgentCoordinator()
+            for coordinator, profile in ((scheduler, "scheduler"), (chat, "chat")):
+                for name in WEIGHT_PROFILES[profile]["agents"]:
+                    module_name, class_name = registry_module.AGENT_CLASSES[name]
+                    module = __import__(f"app.agents{module_name}", fromlist=[class_name])
+                    coordinator.agents[name] = getattr(module, class_name)()
+                coordinator.set_weights(dict(WEIGHT_PROFILES[profile]["weights"]))
+
+        with replay_session(archive, ist_to_epoch(datetime(2025, 6, 30, 15, 30))):
+            t0 = time.perf_counter()
+            batch = asyncio.create_task(scheduler.batch_analyze(
+                symbols, agent_names=AGENTS, max_concurrent=10,
+                context_for=lambda symbol: {"market_regime": INDEX_REGIME},
+            ))
+            chat_now = await asyncio.gather(*(chat.analyze_symbol(s, AGENTS) for s in chat_symbols))
+            scheduler_results = await batch
+            chat_later = await asyncio.gather(*(chat.analyze_symbol(s, AGENTS) for s in chat_symbols))
+            wall = time.perf_counter() - t0
+    finally:
+        AgentCoordinator._run_agent = original
+
+    agent_objects = {id(a) for c in (scheduler, chat) for a in c.agents.values()}
+    return {
+        "wall_s": wall,
+        "agent_runs": runs["n"],
+        "agent_instances": len(agent_objects),
+        "scores": {
+            "scheduler": {r["symbol"]: r["blend_score"] for r in scheduler_results},
+            "chat": {r["symbol"]: r["blend_score"] for r in chat_now + chat_later},
+        },
+        "stats": registry_module.agent_registry.get_stats() if shared else None,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Shared agent registry benchmark")
+    parser.add_argument("--symbols", type=int, default=30)
+    parser.add_argument("--chat", type=int, default=10)
+    args = parser.parse_args()
+
+    symbols = [f"SYM{i:03d}" for i in range(args.symbols)]
+    chat_symbols = symbols[: args.chat]
+    with tempfile.TemporaryDirectory() as tmp:
+        archive = build_archive(Path(tmp) / "bench_archive.db", symbols)
+        with contextlib.redirect_stdout(io.StringIO()):
+            before = asyncio.run(scenario(archive, symbols, chat_symbols, shared=False))
+            after = asyncio.run(scenario(archive, symbols, chat_symbols, shared=True))
+
+    print("\n" + "=" * 60)
+    print(f"AGENT REGISTRY BENCHMARK ({args.symbols} scheduler symbols, {args.chat} chat symbols x2)")
+    print("=" * 60)
+    for label, row in (("per-caller agents", before), ("shared registry", after)):
+        print(f"{label:<18} agent runs={row['agent_runs']:<4} agent instances={row['agent_instances']:<3} wall={row['wall_s']:.2f}s")
+    print(f"registry stats: {after['stats']}")
+    same = all(
+        abs(before["scores"][who][s] - after["scores"][who][s]) < 1e-9
+        for who in ("scheduler", "chat") for s in before["scores"][who]
+    )
+    print(f"blend scores identical per caller: {same}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,222 @@
+"""
+Benchmark: sync sessions in async handlers versus async DB sessions.
+
+Serves the watchlist API to 100 concurrent clients over an in-process ASGI
+transport, against a temporary SQLite database seeded with 200 users x 20
+symbols. Each statement also sleeps --latency-ms to stand in for the network
+round trip to Postgres/RDS (local SQLite answers in microseconds, which would
+hide the effect).
+- before: the previous handlers. They are ``async def`` and call the service
+  with a sync Session, so every query runs on the event loop.
+- after: the current router. Handlers take ``get_async_db`` and await
+  ``db.run_sync(...)``. It runs twice: on a native AsyncSession (aiosqlite,
+  as asyncpg would be on Postgres) and on the threadpool fallback
+  (ASYNC_DB_DRIVER=off or no async driver installed).
+
+On the native engine the simulated round trip runs in aiosqlite's worker
+thread (a sqlite3 trace callback), where the real network wait would be.
+
+The throughput run sizes the connection pool to the client count. A second
+run keeps the default pool (5 + 10 overflow) with a 1s checkout timeout.
+With the old handlers, a checkout on an exhausted pool blocks the event
+loop, and the sessions that would free a connection can only close once
+the loop runs again. Each stall lasts the full pool timeout (30s by default).
+
+Usage (from repo root):
+    python scripts/bench_async_db.py --clients 100 --requests 20
+"""
+import argparse
+import asyncio
+import os
+import random
+import statistics
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+_tmp = tempfile.TemporaryDirectory()
+os.environ["DATABASE_URL"] = f"sqlite:///{_tmp.name}/bench.sqlite3"
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+import httpx
+from fastapi import Depends, FastAPI, Request
+from sqlalchemy import create_engine, event
+from sqlalchemy.engine import make_url
+from sqlalchemy.pool import AsyncAdaptedQueuePool
+from sqlalchemy.orm import Session
+
+from app.config.database import Base, get_database_config, get_db
+from app.deps import get_current_user
+from app.models.user import User
+from app.models.watchlist import UserWatchlist
+from app.routers import user_watchlist
+from app.services.user_watchlist_service import UserWatchlistService
+
+USERS = 200
+
+
+def seed():
+    config = get_database_config()
+    Base.metadata.create_all(config.engine, tables=[User.__table__, UserWatchlist.__table__])
+    rng = random.Random(4)
+    db = config.SessionLocal()
+    for u in range(USERS):
+        for s in rng.sample(range(500), 20):
+            db.add(UserWatchlist(user_id=f"user-{u:03d}", symbol=f"SYM{s:03d}", exchange="NSE"))
+    db.commit()
+    db.close()
+
+
+def use_engine(latency_s, **pool):
+    """Rebind the session factories to engines with the given pool and simulated round trip."""
+    config = get_database_config()
+    config.engine.dispose()
+    config.engine = create_engine(config.database_url, connect_args={"check_same_thread": False}, **pool)
+    config.SessionLocal.configure(bind=config.engine)
+    config.AsyncSessionLocal._sync_factory.configure(bind=config.engine)
+
+    @event.listens_for(config.engine, "before_cursor_execute")
+    def _round_trip(conn, cursor, statement, parameters, context, executemany):
+        time.sleep(latency_s)
+
+    factory = config.AsyncSessionLocal
+    if factory.async_url is None:
+        return
+    # aiosqlite defaults to NullPool; size it like the sync engine
+    factory._engine_kwargs = dict(pool, poolclass=AsyncAdaptedQueuePool)
+    factory._maker = factory._build()
+
+    @event.listens_for(factory._maker.kw["bind"].sync_engine, "connect")
+    def _native_round_trip(dbapi_connection, record):
+        # Sleep in aiosqlite's thread per statement, off the event loop
+        conn = dbapi_connection._connection
+        dbapi_connection.await_(conn._execute(conn._conn.set_trace_callback, lambda sql: time.sleep(latency_s)))
+
+
+def run_async(factory, native, clients, per_client):
+    """The current router on a native AsyncSession or the threadpool fallback."""
+    saved = factory.async_url
+    factory.async_url = saved if native else None
+
+    async def run():
+        try:
+            return await load(async_app(), clients, per_client)
+        finally:
+            # Pooled aiosqlite connections belong to this event loop
+            if native:
+                await factory._maker.kw["bind"].dispose()
+
+    try:
+        return asyncio.run(run())
+    finally:
+        factory.async_url = saved
+
+
+async def bench_user(request: Request):
+    user = request.headers.get("x-user", "user-000")
+    return {"sub": user, "user_id": user}
+
+
+def legacy_app():
+    app = FastAPI()
+
+    @app.get("/api/v1/watchlist")
+    async def get_watchlist(current_user: dict = Depends(get_current_user), db: Session = Depends(get_db)):
+        return [e.to_dict() for e in UserWatchlistService.get_watchlist(db, current_user["sub"])]
+
+    @app.get("/api/v1/watchlist/{symbol}/check")
+    async def check(symbol: str, current_user: dict = Depends(get_current_user), db: Session = Depends(get_db)):
+        return {"symbol": symbol, "in_watchlist": UserWatchlistService.is_in_watchlist(db, current_user["sub"], symbol)}
+
+    app.dependency_overrides[get_current_user] = bench_user
+    return app
+
+
+def async_app():
+    app = FastAPI()
+    app.include_router(user_watchlist.router)
+    app.dependency_overrides[get_current_user] = bench_user
+    return app
+
+
+async def load(app, clients, per_client):
+    latencies = []
+    sizes = []
+    failures = []
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+        async def worker(n):
+            rng = random.Random(n)
+            for _ in range(per_client):
+                user = f"user-{rng.randrange(USERS):03d}"
+                if rng.random() < 0.8:
+                    url = "/api/v1/watchlist"
+                else:
+                    url = f"/api/v1/watchlist/SYM{rng.randrange(500):03d}/check"
+                t0 = time.perf_counter()
+                try:
+                    r = await client.get(url, headers={"x-user": user})
+                    r.raise_for_status()
+                    sizes.append(len(r.content))
+                except Exception as e:
+                    failures.append(type(e).__name__)
+                latencies.append(time.perf_counter() - t0)
+
+        t0 = time.perf_counter()
+        await asyncio.gather(*(worker(n) for n in range(clients)))
+        wall = time.perf_counter() - t0
+    latencies.sort()
+    return {
+        "rps": len(latencies) / wall,
+        "p50_ms": statistics.median(latencies) * 1000,
+        "p99_ms": latencies[int(len(latencies) * 0.99)] * 1000,
+        "bytes": sum(sizes),
+        "failures": len(failures),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Async DB session benchmark")
+    parser.add_argument("--clients", type=int, default=100)
+    parser.add_argument("--requests", type=int, default=20, help="requests per client")
+    parser.add_argument("--latency-ms", type=float, default=2.0)
+    args = parser.parse_args()
+
+    seed()
+    latency = args.latency_ms / 1000.0
+    factory = get_database_config().AsyncSessionLocal
+    modes = [("threadpool", False)]
+    if factory.native:
+        modes.insert(0, (f"native ({make_url(factory.async_url).drivername})", True))
+    else:
+        print("No async driver installed (aiosqlite): native AsyncSession case skipped")
+
+    use_engine(latency, pool_size=args.clients, max_overflow=0)
+    rows = [("sync session", asyncio.run(load(legacy_app(), args.clients, args.requests)))]
+    rows += [(label, run_async(factory, native, args.clients, args.requests)) for label, native in modes]
+
+    use_engine(latency, pool_size=5, max_overflow=10, pool_timeout=1)
+    small = [("sync session", asyncio.run(load(legacy_app(), args.clients, 1)))]
+    small += [(label, run_async(factory, native, args.clients, 1)) for label, native in modes]
+
+    print("\n" + "=" * 60)
+    print(f"ASYNC DB BENCHMARK ({args.clients} clients x {args.requests} requests, "
+          f"{args.latency_ms:.1f}ms per statement)")
+    print("=" * 60)
+    for label, row in rows:
+        print(f"{label:<26} {row['rps']:7.1f} req/s  p50 {row['p50_ms']:7.1f}ms  p99 {row['p99_ms']:7.1f}ms  "
+              f"failed {row['failures']}")
+    print(f"default pool, 1s checkout timeout ({args.clients} clients x 1 request):")
+    for label, row in small:
+        print(f"{label:<26} {row['rps']:7.1f} req/s  p99 {row['p99_ms']:7.1f}ms  failed requests {row['failures']}")
+    print(f"identical response bytes: {all(row['bytes'] == rows[0][1]['bytes'] for _, row in rows)}")
+
+
+if __name__ == "__main__":
+    try:
+        main()
+    finally:
+        get_database_config().engine.dispose()
+        _tmp.cleanup()
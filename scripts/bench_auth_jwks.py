@@ -0,0 +1,185 @@
+"""
+Load test: bearer-token authentication against a local JWKS stand-in.
+
+Starts a local HTTP server that serves a JWKS document, mints RS256
+Cognito-style access tokens, and drives a minimal FastAPI app (in-process
+ASGI transport) whose route depends on ``app.deps.get_current_user``.
+
+Compared against a stand-in for the previous dependency, which made a
+blocking Cognito GetUser call (simulated with ``--roundtrip-ms``) on every
+request. Halfway through, the signing key is rotated to check that an
+unknown ``kid`` triggers exactly one JWKS refresh.
+
+Usage (from repo root):
+    python scripts/bench_auth_jwks.py --requests 2000 --users 200 --concurrency 50
+"""
+import argparse
+import asyncio
+import json
+import statistics
+import sys
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+import httpx
+import jwt
+from cryptography.hazmat.primitives.asymmetric import rsa
+from fastapi import Depends, FastAPI
+
+ISSUER = "https://cognito-idp.local.amazonaws.com/local_pool"
+CLIENT_ID = "bench-client"
+
+
+class JWKSStandIn:
+    """Serves the current key set and counts fetches."""
+
+    def __init__(self):
+        self.keys = {}
+        self.fetches = 0
+        stand_in = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_GET(self):
+                stand_in.fetches += 1
+                body = json.dumps({"keys": list(stand_in.keys.values())}).encode()
+                self.send_response(200)
+                self.send_header("Content-Type", "application/json")
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, *args):
+                pass
+
+        self.server = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+        threading.Thread(target=self.server.serve_forever, daemon=True).start()
+
+    @property
+    def url(self):
+        return f"http://127.0.0.1:{self.server.server_port}/.well-known/jwks.json"
+
+    def add_key(self, kid):
+        private_key = rsa.generate_private_key(public_exponent=65537, key_size=2048)
+        jwk = json.loads(jwt.algorithms.RSAAlgorithm.to_jwk(private_key.public_key()))
+        jwk.update({"kid": kid, "alg": "RS256", "use": "sig"})
+        self.keys[kid] = jwk
+        return private_key
+
+
+def mint(private_key, kid, user):
+    now = int(time.time())
+    claims = {
+        "sub": f"user-{user}",
+        "iss": ISSUER,
+        "client_id": CLIENT_ID,
+        "token_use": "access",
+        "username": f"user{user}@example.com",
+        "iat": now,
+        "exp": now + 3600,
+    }
+    return jwt.encode(claims, private_key, algorithm="RS256", headers={"kid": kid})
+
+
+def pct(values, q):
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(q * len(ordered)))]
+
+
+async def drive(app, tokens, total, concurrency):
+    latencies = []
+    failures = 0
+    semaphore = asyncio.Semaphore(concurrency)
+    transport = httpx.ASGITransport(app=app)
+
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+        async def one(i):
+            nonlocal failures
+            async with semaphore:
+                t0 = time.perf_counter()
+                resp = await client.get("/me", headers={"Authorization": f"Bearer {tokens[i % len(tokens)]}"})
+                latencies.append((time.perf_counter() - t0) * 1000.0)
+                if resp.status_code != 200:
+                    failures += 1
+
+        t0 = time.perf_counter()
+        await asyncio.gather(*[one(i) for i in range(total)])
+        wall = time.perf_counter() - t0
+
+    return {
+        "rps": round(total / wall, 1),
+        "p50_ms": round(pct(latencies, 0.50), 2),
+        "p99_ms": round(pct(latencies, 0.99), 2),
+        "mean_ms": round(statistics.fmean(latencies), 2),
+        "failures": failures,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="JWKS auth load test")
+    parser.add_argument("--requests", type=int, default=2000)
+    parser.add_argument("--users", type=int, default=200)
+    parser.add_argument("--concurrency", type=int, default=50)
+    parser.add_argument("--roundtrip-ms", type=float, default=40.0, help="Simulated Cognito GetUser latency")
+    args = parser.parse_args()
+
+    from app import security
+    from app.deps import get_current_user
+
+    stand_in = JWKSStandIn()
+    key_a = stand_in.add_key("kid-a")
+    security._issuers = [
+        security.TrustedIssuer(
+            name="cognito",
+            issuers=(ISSUER,),
+            jwks=security.JWKSCache(stand_in.url),
+            audience=CLIENT_ID,
+            client_id=CLIENT_ID,
+        )
+    ]
+
+    local_app = FastAPI()
+
+    @local_app.get("/me")
+    async def me(user: dict = Depends(get_current_user)):
+        return {"user_id": user["user_id"]}
+
+    async def legacy_user(authorization: str = ""):
+        # Previous behaviour: synchronous boto GetUser inside async def
+        time.sleep(args.roundtrip_ms / 1000.0)
+        return {"user_id": "user"}
+
+    legacy_app = FastAPI()
+
+    @legacy_app.get("/me")
+    async def legacy_me(user: dict = Depends(legacy_user)):
+        return user
+
+    tokens_a = [mint(key_a, "kid-a", u) for u in range(args.users)]
+    half = args.requests // 2
+
+    legacy = asyncio.run(drive(legacy_app, tokens_a, min(half, 200), args.concurrency))
+    local_first = asyncio.run(drive(local_app, tokens_a, half, args.concurrency))
+    fetches_before_rotation = stand_in.fetches
+
+    # Rotate: tokens signed with a new kid must trigger one JWKS refresh
+    security.JWKS_MIN_REFRESH_SECONDS = 0
+    key_b = stand_in.add_key("kid-b")
+    tokens_b = [mint(key_b, "kid-b", u) for u in range(args.users)]
+    local_rotated = asyncio.run(drive(local_app, tokens_b, args.requests - half, args.concurrency))
+
+    print("\n" + "=" * 60)
+    print("AUTH DEPENDENCY LOAD TEST (local JWKS stand-in)")
+    print("=" * 60)
+    print(f"legacy (blocking {args.roundtrip_ms:.0f}ms GetUser): {legacy}")
+    print(f"local JWKS verify:                  {local_first}")
+    print(f"local JWKS verify after rotation:   {local_rotated}")
+    print(f"JWKS fetches: {fetches_before_rotation} before rotation, {stand_in.fetches} total")
+    stand_in.server.shutdown()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,113 @@
+"""
+Benchmark: candle formatting and serialization, row dicts vs columnar.
+
+For a 1Y daily series and a 1D 1-minute series (synthetic random walks), it
+times each step from the source DataFrame to the bytes a client receives:
+
+- legacy: the old iterrows() loop building per-candle dicts, then JSON;
+- Candles: ChartDataService's columnar build (Candles.from_frame), then
+  rows / columnar JSON / packed binary, with and without LTTB downsampling.
+
+It also times the consumer side (candles back to a DataFrame, as the
+pattern/regime agents and PerformanceAnalytics do) and checks that every
+encoding round-trips to the same values as the legacy rows.
+
+Usage (from repo root):
+    python scripts/bench_candle_payloads.py --repeat 200 --points 300
+"""
+import argparse
+import sys
+import time
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from app.core.candles import Candles, candle_frame, candle_payload
+from app.utils.json_encoder import fast_json_dumps
+
+
+def synth(n, step, seed):
+    rng = np.random.default_rng(seed)
+    close = 1500 * np.exp(np.cumsum(rng.normal(0, 0.004, n)))
+    spread = np.abs(rng.normal(0, 0.003, n)) * close
+    open_ = np.r_[close[0], close[:-1]]
+    return pd.DataFrame({
+        "time": 1_700_000_000 + np.arange(n) * step,
+        "open": open_,
+        "high": np.maximum(open_, close) + spread,
+        "low": np.minimum(open_, close) - spread,
+        "close": close,
+        "volume": rng.integers(1_000, 1_000_000, n),
+    })
+
+
+def legacy_rows(df):
+    candles = []
+    for _, row in df.iterrows():
+        candles.append({
+            'time': int(row['time']),
+            'open': round(float(row['open']), 2),
+            'high': round(float(row['high']), 2),
+            'low': round(float(row['low']), 2),
+            'close': round(float(row['close']), 2),
+            'volume': int(row['volume'])
+        })
+    return candles
+
+
+def timed(fn, repeat):
+    t0 = time.perf_counter()
+    for _ in range(repeat):
+        out = fn()
+    return (time.perf_counter() - t0) * 1000 / repeat, out
+
+
+def run_case(label, df, repeat, points):
+    rows_ms, rows = timed(lambda: legacy_rows(df), repeat)
+    build_ms, candles = timed(lambda: Candles.from_frame(df), repeat)
+    assert candles.to_records() == rows, "columnar build differs from legacy rows"
+
+    results = [("legacy iterrows + JSON", rows_ms + timed(lambda: fast_json_dumps(rows), repeat)[0],
+                len(fast_json_dumps(rows)), len(rows))]
+    for fmt in ("rows", "columnar"):
+        ms, body = timed(lambda: fast_json_dumps(candle_payload(candles, fmt)), repeat)
+        results.append((f"Candles -> {fmt} JSON", build_ms + ms, len(body), len(candles)))
+    ms, body = timed(lambda: candles.to_bytes({"symbol": "BENCH"}), repeat)
+    assert Candles.from_bytes(body)[0] == candles, "binary round trip differs"
+    results.append(("Candles -> binary", build_ms + ms, len(body), len(candles)))
+    if points and points < len(candles):
+        ms, body = timed(lambda: fast_json_dumps(candle_payload(candles, "columnar", points)), repeat)
+        reduced = candles.downsample(points)
+        assert reduced.high.max() == candles.high.max() and reduced.low.min() == candles.low.min()
+        assert reduced.volume.sum() == candles.volume.sum()
+        results.append((f"Candles -> LTTB {points} columnar", build_ms + ms, len(body), len(reduced)))
+
+    frame_legacy = timed(lambda: pd.DataFrame(rows), repeat)[0]
+    frame_columnar = timed(lambda: candle_frame(candles), repeat)[0]
+
+    print(f"\n{label}: {len(df):,} candles")
+    print(f"  {'encoding':<30} {'ms/response':>12} {'bytes':>10} {'candles':>8}")
+    for name, ms, size, n in results:
+        print(f"  {name:<30} {ms:12.3f} {size:10,d} {n:8d}")
+    print(f"  consumer DataFrame: list of dicts {frame_legacy:.3f} ms, Candles {frame_columnar:.3f} ms")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Candle payload benchmark")
+    parser.add_argument("--repeat", type=int, default=200)
+    parser.add_argument("--points", type=int, default=300, help="LTTB target for the downsampled case")
+    args = parser.parse_args()
+
+    print("\n" + "=" * 72)
+    print(f"CANDLE PAYLOAD BENCHMARK ({args.repeat} repeats)")
+    print("=" * 72)
+    run_case("1Y daily", synth(250, 86400, 1), args.repeat, args.points)
+    run_case("1D 1-minute", synth(375, 60, 2), args.repeat, args.points)
+    run_case("1W 1-minute", synth(5 * 375, 60, 3), max(1, args.repeat // 5), args.points)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,112 @@
+"""
+Benchmark: cold start of the API process.
+
+Each sample is a fresh interpreter that imports app.main, answers GET
+/health through the ASGI test client (no lifespan, so schedulers stay off)
+and reports:
+- wall time to import app.main and to the first /health response
+- agents constructed during import (BaseAgent.__init__ calls)
+- the /health/startup report: slowest packages and lazy initializers
+
+With --baseline REV the same measurement runs against a `git archive`
+export of that revision, for a before/after comparison. Samples run with a
+temporary working directory so relative cache/ paths never touch the
+repo's own cache files.
+
+Usage (from repo root):
+    python scripts/bench_cold_start.py --runs 5 --baseline HEAD~1
+"""
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+from pathlib import Path
+
+REPO = Path(__file__).resolve().parent.parent
+
+PROBE = r"""
+import json, sys, time
+t0 = time.perf_counter()
+import app.agents.base as base
+built = []
+_init = base.BaseAgent.__init__
+def counting_init(self, *a, **kw):
+    _init(self, *a, **kw)
+    built.append(self.name)
+base.BaseAgent.__init__ = counting_init
+import app.main
+t_import = time.perf_counter() - t0
+from starlette.testclient import TestClient
+client = TestClient(app.main.app)
+assert client.get("/health").status_code == 200
+t_health = time.perf_counter() - t0
+out = {"import_s": t_import, "health_s": t_health, "agents_built": len(built), "heavy": sorted(m for m in ("openai", "kiteconnect", "yfinance", "pandas_ta") if m in sys.modules)}
+try:
+    from app.core.lazy import get_startup_report
+    out["report"] = get_startup_report(top=6)
+    t1 = time.perf_counter()
+    from app.services.aris_chat import aris_chat
+    aris_chat.coordinator
+    out["first_chat_use_s"] = time.perf_counter() - t1
+except ImportError:
+    pass
+print("@@" + json.dumps(out))
+"""
+
+
+def sample(tree: Path) -> dict:
+    with tempfile.TemporaryDirectory() as cwd:
+        env = dict(os.environ, PYTHONPATH=str(tree), PYTHONDONTWRITEBYTECODE="1")
+        proc = subprocess.run(
+            [sys.executable, "-c", PROBE], cwd=cwd, env=env, capture_output=True, text=True, timeout=300
+        )
+    for line in proc.stdout.splitlines():
+        if line.startswith("@@"):
+            return json.loads(line[2:])
+    raise RuntimeError(f"probe failed in {tree}:\n{proc.stderr[-2000:]}")
+
+
+def measure(label: str, tree: Path, runs: int) -> dict:
+    sample(tree)  # warm the OS page cache and .pyc files
+    samples = [sample(tree) for _ in range(runs)]
+    imports = [s["import_s"] * 1000 for s in samples]
+    health = [s["health_s"] * 1000 for s in samples]
+    last = samples[-1]
+    print(f"\n[{label}]")
+    print(f"  import app.main: median {statistics.median(imports):7.0f}ms  (min {min(imports):.0f}, max {max(imports):.0f})")
+    print(f"  first /health:   median {statistics.median(health):7.0f}ms")
+    print(f"  agents built during import: {last['agents_built']}   heavy SDKs imported: {last['heavy'] or 'none'}")
+    report = last.get("report")
+    if report:
+        packages = ", ".join(f"{p['package']} {p['ms']:.0f}ms" for p in report["imports"]["by_package"])
+        print(f"  slowest packages (self time): {packages}")
+        inits = ", ".join(f"{i['name']} {i['ms']:.1f}ms" for i in report["initializers"]) or "none"
+        print(f"  lazy initializers run during import: {inits}")
+        print(f"  first ARIS chat use (builds chat + coordinator): {last['first_chat_use_s'] * 1000:.1f}ms")
+    return {"import_ms": statistics.median(imports), "health_ms": statistics.median(health)}
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Cold start benchmark")
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument("--baseline", default=None, help="git revision to compare against")
+    args = parser.parse_args()
+
+    print("=" * 60)
+    print(f"COLD START BENCHMARK ({args.runs} runs each)")
+    print("=" * 60)
+    current = measure("working tree", REPO, args.runs)
+    if args.baseline:
+        with tempfile.TemporaryDirectory() as tmp:
+            archive = subprocess.run(["git", "-C", str(REPO), "archive", args.baseline, "app"], check=True, capture_output=True)
+            subprocess.run(["tar", "-x", "-C", tmp], input=archive.stdout, check=True)
+            base = measure(f"baseline {args.baseline}", Path(tmp), args.runs)
+        print(f"\nimport: {base['import_ms']:.0f}ms -> {current['import_ms']:.0f}ms   "
+              f"/health: {base['health_ms']:.0f}ms -> {current['health_ms']:.0f}ms")
+
+
+if __name__ == "__main__":
+    main()
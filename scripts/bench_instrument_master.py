@@ -0,0 +1,163 @@
+"""
+Benchmark: instrument lookups against the raw Kite dump versus the
+consolidated instrument master.
+
+Builds a synthetic dump shaped like kite.instruments() for NSE (equities and
+indices), NFO (weekly/monthly options and futures for index and stock
+underlyings) and BSE, served by a stand-in ``kite`` object. Compares:
+- search: the previous per-query linear filter over the full list (after a
+  fresh download) with InstrumentMaster.search
+- symbol -> token: dict rebuilt per construction versus master lookups,
+  including NFO contracts the old NSE-only map could not resolve
+- process start: building the master from the download versus
+  memory-mapping the persisted snapshot
+
+Runs in a temporary directory; cache/instruments is not touched.
+
+Usage (from repo root):
+    python scripts/bench_instrument_master.py
+"""
+import argparse
+import random
+import sys
+import tempfile
+import time
+from datetime import date, timedelta
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from app.services.instrument_master import InstrumentMaster
+
+MONTHS = ["JAN", "FEB", "MAR", "APR", "MAY", "JUN", "JUL", "AUG", "SEP", "OCT", "NOV", "DEC"]
+
+
+def make_dump(n_stocks, seed=9):
+    rng = random.Random(seed)
+    token = iter(range(100000, 10**9))
+    stocks = [f"STK{i:04d}" for i in range(n_stocks)] + ["RELIANCE", "TCS", "HDFCBANK", "INFY"]
+    nse = [
+        {"instrument_token": next(token), "exchange_token": 1, "tradingsymbol": s, "name": f"{s} LIMITED",
+         "expiry": "", "strike": 0.0, "tick_size": 0.05, "lot_size": 1, "instrument_type": "EQ",
+         "segment": "NSE", "exchange": "NSE"}
+        for s in stocks
+    ]
+    for sym in ("NIFTY 50", "NIFTY BANK"):
+        nse.append({"instrument_token": next(token), "exchange_token": 1, "tradingsymbol": sym, "name": sym,
+                    "expiry": "", "strike": 0.0, "tick_size": 0.0, "lot_size": 0, "instrument_type": "EQ",
+                    "segment": "INDICES", "exchange": "NSE"})
+    bse = [dict(row, instrument_token=next(token), exchange="BSE", segment="BSE") for row in nse[:n_stocks]]
+
+    nfo = []
+    today = date(2026, 10, 19)
+    underlyings = [("NIFTY", 25000, 50, 8), ("BANKNIFTY", 55000, 100, 4)] + [
+        (s, rng.randint(200, 4000), 10, 3) for s in stocks[:180]
+    ]
+    for name, spot, step, n_expiries in underlyings:
+        for k in range(n_expiries):
+            expiry = today + timedelta(days=3 + 7 * k)
+            tag = f"{expiry.year % 100}{MONTHS[expiry.month - 1]}"
+            nfo.append({"instrument_token": next(token), "exchange_token": 1, "tradingsymbol": f"{name}{tag}FUT",
+                        "name": name, "expiry": expiry, "strike": 0.0, "tick_size": 0.05, "lot_size": 50,
+                        "instrument_type": "FUT", "segment": "NFO-FUT", "exchange": "NFO"})
+            for j in range(-40, 41):
+                strike = spot // step * step + j * step
+                for opt in ("CE", "PE"):
+                    nfo.append({"instrument_token": next(token), "exchange_token": 1,
+                                "tradingsymbol": f"{name}{tag}{strike}{opt}", "name": name, "expiry": expiry,
+                                "strike": float(strike), "tick_size": 0.05, "lot_size": 50,
+                                "instrument_type": opt, "segment": "NFO-OPT", "exchange": "NFO"})
+    return {"NSE": nse, "NFO": nfo, "BSE": bse}
+
+
+class KiteStandIn:
+    def __init__(self, dump):
+        self.dump = dump
+        self.calls = 0
+
+    def instruments(self, exchange=None):
+        self.calls += 1
+        if exchange is None:
+            return [dict(r) for rows in self.dump.values() for r in rows]
+        return [dict(r) for r in self.dump[exchange]]
+
+
+def legacy_search(kite, query, exchange="NSE"):
+    instruments = kite.instruments(exchange)
+    q = query.upper()
+    return [i for i in instruments if q in i.get("tradingsymbol", "").upper() or q in i.get("name", "").upper()][:10]
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Instrument master benchmark")
+    parser.add_argument("--stocks", type=int, default=9000)
+    parser.add_argument("--queries", type=int, default=200)
+    args = parser.parse_args()
+
+    dump = make_dump(args.stocks)
+    kite = KiteStandIn(dump)
+    total = sum(len(v) for v in dump.values())
+    queries = ["REL", "TCS", "STK01", "LIMITED", "BANK", "NIFTY", "STK1234", "INF"]
+
+    with tempfile.TemporaryDirectory() as tmp:
+        master = InstrumentMaster(base_dir=Path(tmp) / "instruments")
+        t0 = time.perf_counter()
+        master.refresh(kite)
+        refresh_ms = (time.perf_counter() - t0) * 1000.0
+
+        cold = InstrumentMaster(base_dir=Path(tmp) / "instruments")
+        t0 = time.perf_counter()
+        cold.load()
+        load_ms = (time.perf_counter() - t0) * 1000.0
+        calls_before = kite.calls
+        cold.ensure_fresh(kite)
+        redownloads = kite.calls - calls_before
+
+        t0 = time.perf_counter()
+        for i in range(args.queries // 10):
+            legacy_search(kite, queries[i % len(queries)])
+        legacy_search_ms = (time.perf_counter() - t0) / (args.queries // 10) * 1000.0
+
+        t0 = time.perf_counter()
+        for i in range(args.queries):
+            cold.search(queries[i % len(queries)], exchange="NSE")
+        search_ms = (time.perf_counter() - t0) / args.queries * 1000.0
+        parity = all(
+            {r["tradingsymbol"] for r in legacy_search(kite, q)} <= {r["tradingsymbol"] for r in cold.search(q, "NSE", limit=10**6)}
+            for q in queries
+        )
+
+        symbols = [r["tradingsymbol"] for r in dump["NSE"][:500]] + [r["tradingsymbol"] for r in dump["NFO"][::200]]
+        t0 = time.perf_counter()
+        legacy_map = {inst["tradingsymbol"]: inst["instrument_token"] for inst in kite.instruments("NSE")}
+        legacy_found = sum(1 for s in symbols if s in legacy_map)
+        legacy_map_ms = (time.perf_counter() - t0) * 1000.0
+        t0 = time.perf_counter()
+        found = sum(1 for s in symbols if cold.token_for(s, cold.exchange_for(s)) is not None)
+        lookup_us = (time.perf_counter() - t0) / len(symbols) * 1e6
+
+        expiries = cold.expiries("NIFTY")
+        chain = cold.option_chain("NIFTY", expiries[0])
+        t0 = time.perf_counter()
+        for _ in range(100):
+            cold.option_chain("NIFTY", expiries[0])
+        chain_ms = (time.perf_counter() - t0) / 100 * 1000.0
+        atm = cold.find_option("NIFTY", expiries[0], 25000, "CE")
+        fut = cold.nearest_future("BANKNIFTY", on=date(2026, 10, 19))
+
+    print("\n" + "=" * 60)
+    print(f"INSTRUMENT MASTER BENCHMARK ({total} instruments, {len(dump['NFO'])} NFO)")
+    print("=" * 60)
+    print(f"download+persist+index: {refresh_ms:8.1f}ms   later process mmap load+index: {load_ms:8.1f}ms "
+          f"(re-downloads same day: {redownloads})")
+    print(f"search (NSE):  legacy download+scan {legacy_search_ms:8.2f}ms/query   master {search_ms:6.3f}ms/query   "
+          f"legacy results covered: {parity}")
+    print(f"symbol->token: legacy NSE map build {legacy_map_ms:.1f}ms, resolves {legacy_found}/{len(symbols)}; "
+          f"master {lookup_us:.2f}us/lookup, resolves {found}/{len(symbols)}")
+    print(f"NIFTY expiries {len(expiries)}, chain[0] {len(chain)} contracts in {chain_ms:.3f}ms; "
+          f"ATM CE {atm['tradingsymbol'] if atm else None}; BANKNIFTY front future {fut['tradingsymbol'] if fut else None}")
+    print(f"aliases: NIFTY -> {cold.get('NIFTY')['tradingsymbol']}, stats {cold.get_stats()}")
+
+
+if __name__ == "__main__":
+    main()
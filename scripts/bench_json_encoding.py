@@ -0,0 +1,82 @@
+"""
+Benchmark: JSON encoding of a real Top Picks payload.
+
+Compares the previous cache/event-log path (convert_numpy_types +
+safe_json_dumps), the previous response path (jsonable_encoder +
+json.dumps, what JSONResponse did) and fast_json_dumps.
+
+Payloads are read from data/top_picks_intraday. Files on disk only contain
+plain Python types, so each payload is also benchmarked with its floats
+turned back into np.float64, which is what the engine holds in memory
+after pandas/NumPy scoring.
+
+Usage (from repo root):
+    python scripts/bench_json_encoding.py [--file PATH] [--iterations 500]
+"""
+import argparse
+import json
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+import numpy as np
+from fastapi.encoders import jsonable_encoder
+
+from app.utils.json_encoder import convert_numpy_types, fast_json_dumps, safe_json_dumps
+
+DATA_DIR = Path(__file__).parent.parent / "data" / "top_picks_intraday"
+
+
+def numpyify(obj):
+    if isinstance(obj, float):
+        return np.float64(obj)
+    if isinstance(obj, dict):
+        return {k: numpyify(v) for k, v in obj.items()}
+    if isinstance(obj, list):
+        return [numpyify(v) for v in obj]
+    return obj
+
+
+def timeit(fn, payload, iterations):
+    fn(payload)
+    t0 = time.perf_counter()
+    for _ in range(iterations):
+        fn(payload)
+    return (time.perf_counter() - t0) / iterations * 1e6
+
+
+def main():
+    parser = argparse.ArgumentParser(description="JSON encoding benchmark")
+    parser.add_argument("--file", default=None, help="Top picks JSON file (default: largest in data/top_picks_intraday)")
+    parser.add_argument("--iterations", type=int, default=500)
+    args = parser.parse_args()
+
+    path = Path(args.file) if args.file else max(DATA_DIR.glob("*.json"), key=lambda p: p.stat().st_size)
+    payload = json.loads(path.read_text(encoding="utf-8"))
+
+    encoders = {
+        "convert_numpy_types+safe_json_dumps": lambda p: safe_json_dumps(convert_numpy_types(p)).encode("utf-8"),
+        "jsonable_encoder+json.dumps": lambda p: json.dumps(jsonable_encoder(p)).encode("utf-8"),
+        "fast_json_dumps": fast_json_dumps,
+    }
+
+    print("\n" + "=" * 60)
+    print(f"JSON ENCODING BENCHMARK: {path.name} ({path.stat().st_size / 1024:.1f} KB)")
+    print("=" * 60)
+    for label, data in (("plain", payload), ("numpy", numpyify(payload))):
+        baseline = None
+        for name, fn in encoders.items():
+            us = timeit(fn, data, args.iterations)
+            baseline = baseline or us
+            print(f"[{label:<5}] {name:<38} {us:>9.1f} us/op  x{baseline / us:.1f}")
+
+    # Round-trip sanity check: same data regardless of encoder
+    numpy_payload = numpyify(payload)
+    assert json.loads(fast_json_dumps(numpy_payload)) == json.loads(safe_json_dumps(convert_numpy_types(numpy_payload)))
+    print("round-trip: OK")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,156 @@
+"""
+Benchmark: tick-to-candle builder parity and cost.
+
+Generates one synthetic session of ticks per symbol (random-walk prices,
+cumulative day volume, irregular tick spacing) and checks three things:
+
+1. Parity. Bars built from ticks must match bars aggregated directly from
+   the same ticks with pandas, for every timeframe. The builder is seeded
+   mid-session with 1m history covering the ticks up to the seed time (as
+   Zerodha would return it), so the seed/tick merge is exercised as well.
+2. Ingest cost. Time per tick through ``on_ticks``, in Kite-sized batches.
+3. Serving cost. Latency of ``window()`` (what fetch_ohlcv and the 1D chart
+   call) against the upstream round trip it replaces, plus buffer memory.
+
+Usage (from repo root):
+    python scripts/bench_live_candles.py --symbols 50 --ticks-per-min 60
+"""
+import argparse
+import sys
+import time
+from datetime import date, datetime, timedelta
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from app.services.candle_archive import ist_to_epoch
+from app.services.live_candles import INTERVALS, LiveCandleBuilder, resample
+
+SESSION_OPEN = (9, 15)
+SESSION_SECONDS = 375 * 60
+
+
+def synth_ticks(symbols, day, ticks_per_min, rng):
+    """Ticks as (symbol index, naive IST datetime, price, cumulative volume), time-ordered."""
+    n = SESSION_SECONDS * ticks_per_min // 60
+    start = datetime.combine(day, datetime.min.time()).replace(hour=SESSION_OPEN[0], minute=SESSION_OPEN[1])
+    rows = []
+    for i in range(len(symbols)):
+        offsets = np.sort(rng.uniform(0, SESSION_SECONDS, n))
+        prices = np.round(1000 * np.exp(np.cumsum(rng.normal(0, 2e-4, n))), 2)
+        volumes = np.cumsum(rng.integers(1, 500, n))
+        rows.append(pd.DataFrame({"sym": i, "offset": offsets, "price": prices, "cum": volumes}))
+    df = pd.concat(rows).sort_values("offset", kind="stable").reset_index(drop=True)
+    df["dt"] = [start + timedelta(seconds=float(o)) for o in df["offset"]]
+    df["ts"] = [ist_to_epoch(d) for d in df["dt"]]
+    df["vol"] = df.groupby("sym")["cum"].diff().fillna(0)
+    return df
+
+
+def reference_bars(ticks, seconds):
+    bucket = ticks["ts"] - ticks["ts"] % seconds
+    g = ticks.assign(time=bucket).groupby(["sym", "time"])
+    out = g.agg(open=("price", "first"), high=("price", "max"), low=("price", "min"),
+                close=("price", "last"), volume=("vol", "sum")).reset_index()
+    return {s: frame.drop(columns="sym").to_numpy(dtype=float) for s, frame in out.groupby("sym")}
+
+
+def to_kite(batch, symbols):
+    return [
+        {"instrument_token": int(s), "last_price": float(p), "volume_traded": int(c), "exchange_timestamp": d}
+        for s, p, c, d in zip(batch["sym"], batch["price"], batch["cum"], batch["dt"])
+    ]
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Live candle builder benchmark")
+    parser.add_argument("--symbols", type=int, default=50)
+    parser.add_argument("--ticks-per-min", type=int, default=60)
+    parser.add_argument("--batch", type=int, default=200, help="ticks per on_ticks call")
+    parser.add_argument("--seed-at", default="11:00:30", help="IST time the history seed is taken")
+    parser.add_argument("--upstream-ms", type=float, default=350.0, help="assumed Zerodha historical round trip")
+    args = parser.parse_args()
+
+    rng = np.random.default_rng(7)
+    day = date(2026, 10, 16)  # a Friday
+    symbols = [f"SYM{i:03d}" for i in range(args.symbols)]
+    token_to_symbol = {i: s for i, s in enumerate(symbols)}
+    ticks = synth_ticks(symbols, day, args.ticks_per_min, rng)
+    session_end = ist_to_epoch(datetime.combine(day, datetime.min.time()).replace(hour=15, minute=30))
+
+    hh, mm, ss = (int(x) for x in args.seed_at.split(":"))
+    seed_ts = ist_to_epoch(datetime.combine(day, datetime.min.time()).replace(hour=hh, minute=mm, second=ss))
+    # The builder starts two minutes before the seed is fetched
+    live_from = seed_ts - 120
+    before = ticks[ticks["ts"] < live_from]
+    during = ticks[ticks["ts"] >= live_from]
+    pre_seed = during[during["ts"] < seed_ts]
+    post_seed = during[during["ts"] >= seed_ts]
+    history_start = ist_to_epoch(datetime.combine(day, datetime.min.time())) - 6 * 86400
+
+    builder = LiveCandleBuilder()
+    ingest_ns = 0
+    for part in (pre_seed, None, post_seed):
+        if part is None:
+            # 1m history up to the seed time, per symbol
+            upto = ticks[ticks["ts"] < seed_ts]
+            minute = reference_bars(upto, 60)
+            for i, s in enumerate(symbols):
+                builder.seed(s, pd.DataFrame(minute[i], columns=["time", "open", "high", "low", "close", "volume"]),
+                             history_start, now_ts=seed_ts)
+            continue
+        for start in range(0, len(part), args.batch):
+            batch = to_kite(part.iloc[start:start + args.batch], symbols)
+            t0 = time.perf_counter_ns()
+            builder.on_ticks(batch, token_to_symbol)
+            ingest_ns += time.perf_counter_ns() - t0
+    builder.close_due(session_end + 1)
+    ingested = len(during)
+
+    mismatches = {}
+    for name, seconds in INTERVALS.items():
+        expected = reference_bars(ticks, seconds)
+        bad = 0
+        for i, s in enumerate(symbols):
+            got = builder._symbols[s].series[name].rows()
+            if got.shape != expected[i].shape or not np.allclose(got, expected[i]):
+                bad += 1
+        mismatches[name] = bad
+
+    query_ts = session_end + 60
+    n_queries = 2000
+    t0 = time.perf_counter()
+    for k in range(n_queries):
+        df = builder.window(symbols[k % len(symbols)], "5m", 3, now_ts=query_ts)
+    window_ms = (time.perf_counter() - t0) * 1000 / n_queries
+    served = df is not None
+
+    buffer_mb = sum(
+        series.buf.nbytes for state in builder._symbols.values() for series in state.series.values()
+    ) / 2**20
+
+    # Cross-check the vectorised resampler against pandas on the seed history
+    upto = reference_bars(ticks, 60)[0]
+    resample_ok = np.allclose(resample(upto, 900), reference_bars(ticks, 900)[0])
+
+    print("\n" + "=" * 72)
+    print(f"LIVE CANDLE BENCHMARK ({args.symbols} symbols, {len(ticks):,} ticks, seed at {args.seed_at} IST)")
+    print("=" * 72)
+    print(f"ticks before builder start (history only): {len(before):,}")
+    for name, bad in mismatches.items():
+        status = "OK" if bad == 0 else f"{bad} symbols differ"
+        print(f"parity {name:<4} vs pandas aggregation: {status}")
+    print(f"resample(1m -> 15m) vs pandas:           {'OK' if resample_ok else 'MISMATCH'}")
+    print(f"ingest: {ingest_ns / ingested:,.0f} ns/tick ({ingested:,} ticks, batches of {args.batch})")
+    print(f"window(5m, 3 days): {window_ms:.3f} ms/call (served={served}) "
+          f"vs ~{args.upstream_ms:.0f} ms upstream + 2 s rate-limit spacing")
+    print(f"ring buffers: {buffer_mb:.1f} MiB for {args.symbols} symbols x {len(INTERVALS)} timeframes")
+    print(f"stats: {builder.get_stats()}")
+    return 0 if not any(mismatches.values()) and resample_ok and served else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
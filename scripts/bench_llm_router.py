@@ -0,0 +1,258 @@
+"""
+Load test: LLM request router against two local OpenAI-compatible stand-ins.
+
+Each stand-in serves POST /v1/chat/completions with a configurable latency
+distribution (lognormal around --*-ms, plus a slow tail) and failure rate.
+The primary plays OpenAI, the secondary plays SambaNova.
+
+Runs a burst of mixed-purpose requests through ``LLMRouter`` and reports
+end-to-end latency, hedge/fallback counts and per-purpose histograms, then
+forces the primary down to show the circuit breaker skipping it. Finally
+logs a similar number of requests through ``CostTracker`` to show that
+rows are written in batches and budget checks stay in memory.
+
+Usage (from repo root):
+    python scripts/bench_llm_router.py --requests 300 --concurrency 8
+"""
+import argparse
+import asyncio
+import json
+import random
+import statistics
+import sys
+import tempfile
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from openai import AsyncOpenAI
+
+PURPOSES = ("chat", "insights", "sentiment")
+
+
+class CompletionStandIn:
+    """Minimal OpenAI-compatible chat completions endpoint."""
+
+    def __init__(self, name, median_ms, tail_rate, tail_ms, failure_rate, seed):
+        self.name = name
+        self.median_ms = median_ms
+        self.tail_rate = tail_rate
+        self.tail_ms = tail_ms
+        self.failure_rate = failure_rate
+        self.rng = random.Random(seed)
+        self.calls = 0
+        self.in_flight = 0
+        self.peak_in_flight = 0
+        self.lock = threading.Lock()
+        stand_in = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"
+
+            def do_POST(self):
+                body = json.loads(self.rfile.read(int(self.headers.get("Content-Length", 0))) or b"{}")
+                status, payload = stand_in.respond(body)
+                data = json.dumps(payload).encode()
+                try:
+                    self.send_response(status)
+                    self.send_header("Content-Type", "application/json")
+                    self.send_header("Content-Length", str(len(data)))
+                    self.end_headers()
+                    self.wfile.write(data)
+                except (BrokenPipeError, ConnectionResetError):
+                    pass  # client cancelled (lost hedge race)
+
+            def log_message(self, *args):
+                pass
+
+        self.server = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+        self.server.daemon_threads = True
+        threading.Thread(target=self.server.serve_forever, daemon=True).start()
+
+    @property
+    def base_url(self):
+        return f"http://127.0.0.1:{self.server.server_port}/v1"
+
+    def respond(self, body):
+        with self.lock:
+            self.calls += 1
+            self.in_flight += 1
+            self.peak_in_flight = max(self.peak_in_flight, self.in_flight)
+            slow = self.rng.random() < self.tail_rate
+            fail = self.rng.random() < self.failure_rate
+            delay_ms = self.tail_ms if slow else self.median_ms * self.rng.lognormvariate(0, 0.25)
+        try:
+            time.sleep(delay_ms / 1000.0)
+            if fail:
+                return 500, {"error": {"message": f"{self.name} simulated failure", "type": "server_error"}}
+            prompt_tokens = sum(len(m.get("content", "").split()) for m in body.get("messages", []))
+            completion_tokens = min(int(body.get("max_tokens") or 200), 50 + prompt_tokens * 2)
+            return 200, {
+                "id": f"{self.name}-{self.calls}",
+                "object": "chat.completion",
+                "created": int(time.time()),
+                "model": body.get("model"),
+                "choices": [{
+                    "index": 0,
+                    "message": {"role": "assistant", "content": f"{self.name} says ok"},
+                    "finish_reason": "stop",
+                }],
+                "usage": {
+                    "prompt_tokens": prompt_tokens,
+                    "completion_tokens": completion_tokens,
+                    "total_tokens": prompt_tokens + completion_tokens,
+                },
+            }
+        finally:
+            with self.lock:
+                self.in_flight -= 1
+
+
+def pct(values, q):
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(q * len(ordered)))]
+
+
+def make_router(primary, secondary):
+    from app.llm.router import LLMProvider, LLMRouter
+
+    def client(stand_in):
+        return AsyncOpenAI(api_key="bench", base_url=stand_in.base_url, max_retries=0, timeout=60)
+
+    return LLMRouter([
+        LLMProvider(name="openai", client=client(primary)),
+        LLMProvider(name="sambanova", client=client(secondary), model="bench-llama"),
+    ])
+
+
+async def drive(router, total, concurrency):
+    latencies = []
+    failures = 0
+    winners = {}
+    semaphore = asyncio.Semaphore(concurrency)
+
+    async def one(i):
+        nonlocal failures
+        purpose = PURPOSES[i % len(PURPOSES)]
+        words = " ".join(["token"] * (20 + (i % 7) * 30))
+        async with semaphore:
+            t0 = time.perf_counter()
+            try:
+                result = await router.dispatch(
+                    [{"role": "user", "content": words}], "gpt-4-turbo", purpose=purpose, max_tokens=300
+                )
+                winners[result["provider"]] = winners.get(result["provider"], 0) + 1
+            except Exception:
+                failures += 1
+            latencies.append((time.perf_counter() - t0) * 1000.0)
+
+    t0 = time.perf_counter()
+    await asyncio.gather(*[one(i) for i in range(total)])
+    wall = time.perf_counter() - t0
+    return {
+        "rps": round(total / wall, 1),
+        "p50_ms": round(pct(latencies, 0.50), 1),
+        "p95_ms": round(pct(latencies, 0.95), 1),
+        "p99_ms": round(pct(latencies, 0.99), 1),
+        "mean_ms": round(statistics.fmean(latencies), 1),
+        "failures": failures,
+        "winners": winners,
+    }
+
+
+async def run(args):
+    primary = CompletionStandIn("openai", args.primary_ms, args.tail_rate, args.tail_ms, args.failure_rate, seed=1)
+    secondary = CompletionStandIn("sambanova", args.secondary_ms, 0.0, 0.0, 0.0, seed=2)
+
+    # Warm the latency window so hedging uses the measured percentile
+    router = make_router(primary, secondary)
+    await drive(router, 30 * len(PURPOSES), args.concurrency)
+    warm_stats = router.get_stats()
+
+    baseline_router = make_router(primary, secondary)
+    baseline_router.providers = baseline_router.providers[:1]  # no hedge, no fallback
+    baseline = await drive(baseline_router, args.requests, args.concurrency)
+    hedged = await drive(router, args.requests, args.concurrency)
+    stats = router.get_stats()
+
+    # Primary down: breaker opens after the threshold and traffic skips it
+    primary.failure_rate = 1.0
+    calls_before = primary.calls
+    outage = await drive(router, 100, args.concurrency)
+    outage_primary_calls = primary.calls - calls_before
+
+    print("\n" + "=" * 60)
+    print("LLM ROUTER LOAD TEST (local OpenAI-compatible stand-ins)")
+    print("=" * 60)
+    print(f"warm-up hedge delays (s): {warm_stats['hedge_delay_seconds']}")
+    print(f"primary only:        {baseline}")
+    print(f"routed with hedging: {hedged}")
+    print(f"router counters: requests={stats['requests']} hedged={stats['hedged']} "
+          f"hedge_wins={stats['hedge_wins']} fallbacks={stats['fallbacks']} failures={stats['failures']}")
+    print(f"peak in-flight: router {stats['peak_in_flight']} (limit {router.max_concurrency}), "
+          f"primary endpoint {primary.peak_in_flight} (includes cancelled hedge losers)")
+    for purpose, hist in stats["latency_ms"].items():
+        print(f"  latency[{purpose:<9}] n={hist['count']:<4} mean={hist['mean']}ms buckets={hist['buckets']}")
+    for purpose, hist in stats["tokens"].items():
+        print(f"  tokens [{purpose:<9}] n={hist['count']:<4} mean={hist['mean']}")
+    print(f"primary outage:      {outage}")
+    print(f"  primary calls during outage: {outage_primary_calls} of 100, breakers={router.get_stats()['breakers']}")
+
+    primary.server.shutdown()
+    secondary.server.shutdown()
+
+
+async def cost_tracking(total):
+    import sqlite3
+
+    from app.llm.cost_tracker import CostTracker
+
+    with tempfile.TemporaryDirectory() as tmp:
+        tracker = CostTracker(db_path=str(Path(tmp) / "llm_costs.db"))
+        flushes = 0
+        flush = tracker.flush
+
+        def counted_flush():
+            nonlocal flushes
+            flushes += 1
+            return flush()
+
+        tracker.flush = counted_flush
+        t0 = time.perf_counter()
+        for i in range(total):
+            await tracker.log_request("gpt-4-turbo", 400 + i, 150)
+            await tracker.check_budget_available(10.0)
+        elapsed_ms = (time.perf_counter() - t0) * 1000.0
+        unflushed = len(tracker._pending)
+        spend = await tracker.get_daily_spend()
+        tracker.flush()
+
+        conn = sqlite3.connect(tracker.db_path)
+        rows, persisted = conn.execute("SELECT COUNT(*), SUM(cost_usd) FROM llm_requests").fetchone()
+        conn.close()
+
+    print(f"cost tracker: {total} log+budget checks in {elapsed_ms:.1f}ms, "
+          f"{flushes} batch writes, {unflushed} buffered before final flush, rows={rows}, "
+          f"in-memory spend ${spend:.4f} vs persisted ${persisted:.4f}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="LLM router load test")
+    parser.add_argument("--requests", type=int, default=300)
+    parser.add_argument("--concurrency", type=int, default=8)
+    parser.add_argument("--primary-ms", type=float, default=120.0)
+    parser.add_argument("--secondary-ms", type=float, default=150.0)
+    parser.add_argument("--tail-rate", type=float, default=0.08, help="Share of primary calls that stall")
+    parser.add_argument("--tail-ms", type=float, default=1500.0)
+    parser.add_argument("--failure-rate", type=float, default=0.02)
+    args = parser.parse_args()
+
+    asyncio.run(run(args))
+    asyncio.run(cost_tracking(args.requests + 7))
+
+
+if __name__ == "__main__":
+    main()
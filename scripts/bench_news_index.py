@@ -0,0 +1,199 @@
+"""
+Benchmark: per-symbol news matching and LLM scoring versus the news index.
+
+Builds a synthetic NSE instrument master (2,000 equities) and news feeds:
+50 general headlines, plus a symbol-specific feed per analysed symbol.
+Headlines mention companies by name or by upper-case ticker. A stand-in LLM
+counts calls and headlines sent. Two analysis cycles over the same symbols
+are run with the feeds unchanged, as within one 5-minute news refresh.
+- before: the previous SentimentAgent logic. Each symbol merges and dedupes
+  the feeds, substring-scans every headline, then sends its top 10 matches
+  to the LLM in one call.
+- after: SentimentAgent on the news index. Articles are tagged once per
+  refresh, the agent looks up the symbol's articles, and each headline is
+  scored once (batched, cached in SQLite).
+
+Everything runs in a temporary directory; cache/ is not touched.
+
+Usage (from repo root):
+    python scripts/bench_news_index.py --symbols 200
+"""
+import argparse
+import asyncio
+import contextlib
+import io
+import random
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from app.agents import sentiment_agent as sentiment_module
+from app.services import instrument_master as master_module
+from app.services import news_index as index_module
+from app.services.instrument_master import InstrumentMaster
+
+REAL = [("RELIANCE", "RELIANCE INDUSTRIES"), ("HDFCBANK", "HDFC BANK"), ("SBIN", "STATE BANK OF INDIA"),
+        ("ITC", "ITC"), ("INFY", "INFOSYS"), ("INDIGO", "INTERGLOBE AVIATION")]
+WORDS = ["ALPHA", "BHARAT", "CROWN", "DELTA", "EASTERN", "FORTUNE", "GLOBAL", "HORIZON", "IMPERIAL", "JUPITER",
+         "KAVERI", "LOTUS", "METRO", "NOVA", "ORIENT", "PIONEER", "QUANTUM", "RIVER", "SUMMIT", "TITAN"]
+KINDS = ["CEMENT", "STEEL", "PHARMA", "FINANCE", "TEXTILES", "POWER", "CHEMICALS", "FOODS", "MOTORS", "INFRA"]
+TEMPLATES = ["{who} shares rise after strong Q2 results", "{who} falls as margins weaken",
+             "Brokerage upgrades {who}, raises target", "{who} wins large order, stock gains",
+             "Regulator probe into {who} weighs on stock", "{who} board approves buyback"]
+
+
+class KiteStandIn:
+    def __init__(self, equities):
+        self.rows = [{"instrument_token": 1000 + i, "exchange_token": 1, "tradingsymbol": s, "name": n,
+                      "expiry": "", "strike": 0.0, "tick_size": 0.05, "lot_size": 1, "instrument_type": "EQ",
+                      "segment": "NSE", "exchange": "NSE"} for i, (s, n) in enumerate(equities)]
+
+    def instruments(self, exchange=None):
+        return [dict(r) for r in self.rows]
+
+
+class StandInLLM:
+    client = True
+
+    def __init__(self):
+        self.calls = 0
+        self.headlines = 0
+
+    async def chat_completion(self, purpose, messages, complexity, max_tokens):
+        lines = [l for l in messages[-1]["content"].splitlines() if l[:1].isdigit() and ". " in l]
+        self.calls += 1
+        self.headlines += len(lines)
+        await asyncio.sleep(0.05)
+        if "number|sentiment|score|themes" in messages[-1]["content"]:
+            return {"content": "\n".join(f"{i + 1}|Bullish|{60 + i % 20}|results" for i in range(len(lines)))}
+        return {"content": "Bullish|65|results"}
+
+
+def make_news(equities, symbols, seed=5):
+    rng = random.Random(seed)
+
+    def headline(symbol, name, source):
+        who = symbol if rng.random() < 0.4 else name.title()
+        return {"title": rng.choice(TEMPLATES).format(who=who), "description": "", "source": source}
+
+    general = [headline(*rng.choice(equities), "MoneyControl") for _ in range(40)]
+    general += [{"title": f"Sensex ends flat; market breadth {rng.choice(['weak', 'positive'])} ({i})",
+                 "description": "", "source": "NDTV Profit"} for i in range(10)]
+    names = dict(equities)
+    per_symbol = {s: [dict(headline(s, names[s], "FMP"), symbol=s) for _ in range(2)] for s in symbols}
+    return general, per_symbol
+
+
+def legacy_matches(symbol, all_news, symbol_specific):
+    """Matching step of the previous SentimentAgent.analyze."""
+    alias_map = {"INDIGO": ["interglobe aviation", "interglobe", "indigo"], "RELIANCE": ["reliance industries"],
+                 "HDFCBANK": ["hdfc bank"], "SBIN": ["state bank of india"]}
+    aliases = [a.lower() for a in alias_map.get(symbol, [])]
+
+    def matches(news):
+        title = str(news.get("title", "")).lower()
+        desc = str(news.get("description", "")).lower()
+        sym_field = str(news.get("symbol", "")).upper()
+        if sym_field and sym_field == symbol:
+            return True
+        if symbol.lower() in title or symbol.lower() in desc:
+            return True
+        return any(a in title or a in desc for a in aliases)
+
+    seen, deduped = set(), []
+    for n in list(all_news) + list(symbol_specific):
+        key = (str(n.get("source", "")).lower(), str(n.get("title", "")).strip().lower())
+        if key not in seen:
+            seen.add(key)
+            deduped.append(n)
+    return [n for n in deduped if matches(n)]
+
+
+async def run_legacy(symbols, general, per_symbol, llm, cycles):
+    totals = {"match_s": 0.0, "tagged": 0}
+
+    async def analyze(symbol):
+        t0 = time.perf_counter()
+        found = legacy_matches(symbol, general, per_symbol[symbol])
+        totals["match_s"] += time.perf_counter() - t0
+        totals["tagged"] += len(found)
+        if found:
+            prompt = "\n".join(f"{i + 1}. {n['title']}" for i, n in enumerate(found[:10]))
+            await llm.chat_completion("sentiment", [{"role": "user", "content": prompt}], "simple", 150)
+
+    for _ in range(cycles):
+        await asyncio.gather(*(analyze(s) for s in symbols))
+    return totals["match_s"], totals["tagged"] // cycles
+
+
+async def run_index(symbols, general, per_symbol, llm, cycles, db_path):
+    async def aggregate_news(category="general", limit=20):
+        return [dict(n) for n in general]  # the Redis cache hands back fresh copies
+
+    async def get_symbol_news(symbol, limit=10):
+        return [dict(n) for n in per_symbol.get(symbol, [])]
+
+    index = index_module.NewsIndex(index_module.HeadlineSentimentCache(db_path))
+    sentiment_module.aggregate_news = aggregate_news
+    sentiment_module.get_symbol_news = get_symbol_news
+    sentiment_module.news_index = index
+    sentiment_module.llm_manager = llm
+    index_module.llm_manager = llm
+    agent = sentiment_module.SentimentAgent()
+
+    t0 = time.perf_counter()
+    for _ in range(cycles):
+        await asyncio.gather(*(agent.analyze(s) for s in symbols))
+    wall = time.perf_counter() - t0
+    tagged = sum(len(index.articles_for(s)) for s in symbols)
+    return wall, tagged, index.get_stats()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="News index benchmark")
+    parser.add_argument("--symbols", type=int, default=200)
+    parser.add_argument("--cycles", type=int, default=2)
+    args = parser.parse_args()
+
+    rng = random.Random(3)
+    equities = list(REAL)
+    while len(equities) < 2000:
+        name = f"{rng.choice(WORDS)} {rng.choice(WORDS)} {rng.choice(KINDS)}"
+        symbol = (name.split()[0][:4] + name.split()[1][:3] + name.split()[2][:2] + str(len(equities)))
+        equities.append((symbol, name + " LIMITED"))
+    symbols = [s for s, _ in REAL] + [s for s, _ in rng.sample(equities[len(REAL):], args.symbols - len(REAL))]
+    general, per_symbol = make_news(equities, symbols)
+
+    with tempfile.TemporaryDirectory() as tmp:
+        master = InstrumentMaster(base_dir=Path(tmp) / "instruments")
+        master.refresh(KiteStandIn(equities))
+        master_module.instrument_master = master
+
+        legacy_llm, index_llm = StandInLLM(), StandInLLM()
+        match_s, legacy_tagged = asyncio.run(run_legacy(symbols, general, per_symbol, legacy_llm, args.cycles))
+        with contextlib.redirect_stdout(io.StringIO()):
+            wall, tagged, stats = asyncio.run(
+                run_index(symbols, general, per_symbol, index_llm, args.cycles, str(Path(tmp) / "news_sentiment.db"))
+            )
+            # a new process reuses the persisted scores
+            _, _, restart = asyncio.run(
+                run_index(symbols, general, per_symbol, StandInLLM(), 1, str(Path(tmp) / "news_sentiment.db"))
+            )
+
+    print("\n" + "=" * 60)
+    print(f"NEWS INDEX BENCHMARK ({args.symbols} symbols x {args.cycles} cycles, 50 general headlines)")
+    print("=" * 60)
+    print(f"legacy:     LLM calls {legacy_llm.calls:4d}, headlines sent {legacy_llm.headlines:5d}, "
+          f"per-symbol matching {match_s * 1000:6.1f}ms total, symbol-article matches {legacy_tagged}")
+    print(f"news index: LLM calls {index_llm.calls:4d}, headlines sent {index_llm.headlines:5d}, "
+          f"index build {stats['last_build_ms']:6.1f}ms per refresh, symbol-article matches {tagged}, "
+          f"agent wall {wall:.2f}s")
+    print(f"index stats: {stats}")
+    print(f"after restart: LLM batches {restart['llm_batches']}, cached sentiments {restart['cached_sentiments']}")
+
+
+if __name__ == "__main__":
+    main()
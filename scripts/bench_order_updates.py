@@ -0,0 +1,225 @@
+"""
+Benchmark: per-intent order polling versus streamed, batched order updates.
+
+Seeds a temporary SQLite database with open Zerodha trade intents spread
+over several accounts. Each broker order moves through OPEN, a few partial
+fills and COMPLETE within ~6 simulated seconds. A stand-in broker replays
+that timeline; a small share of orders is rejected instead.
+- before: every open intent is synced on its own every 2s (what clients did
+  through POST /trading/orders/sync): token lookup, order_history() call and
+  a commit per intent per poll.
+- after: the ticker's order updates are queued and flushed every 250ms,
+  coalesced per order and written in one transaction per flush. One in
+  twenty messages is dropped; a single bulk reconcile (one orders() call
+  per account with open intents) then repairs the drift.
+
+Usage (from repo root):
+    python scripts/bench_order_updates.py --accounts 20 --orders 10
+"""
+import argparse
+import asyncio
+import os
+import random
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+_tmp = tempfile.TemporaryDirectory()
+os.environ["ARISE_DATABASE_URL"] = f"sqlite:///{_tmp.name}/bench.sqlite3"
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from app.db import Base, SessionLocal, engine
+from app.db_models.trading import BrokerOrder, TradeIntent
+from app.services import broker_adapters
+from app.services import order_updates as updates_module
+
+POLL_INTERVAL = 2.0
+FLUSH_WINDOW = 0.25
+
+
+def timeline(order_id, rng):
+    """(time, kite payload) events for one order."""
+    qty = rng.choice([10, 50, 100])
+    t = rng.uniform(0.0, 2.0)
+    events = [(t, {"order_id": order_id, "status": "OPEN", "filled_quantity": 0, "average_price": 0})]
+    if rng.random() < 0.1:
+        events.append((t + rng.uniform(0.3, 1.0), {"order_id": order_id, "status": "REJECTED",
+                                                   "filled_quantity": 0, "average_price": 0}))
+        return events
+    filled = 0
+    for step in range(rng.randint(1, 3)):
+        t += rng.uniform(0.5, 1.5)
+        filled = min(qty, filled + qty // 4)
+        events.append((t, {"order_id": order_id, "status": "OPEN", "filled_quantity": filled,
+                           "average_price": 100.0 + step * 0.05}))
+    t += rng.uniform(0.5, 1.5)
+    events.append((t, {"order_id": order_id, "status": "COMPLETE", "filled_quantity": qty,
+                       "average_price": 100.1}))
+    return events
+
+
+class StandInBroker:
+    """Answers order_history()/orders() from the timelines at the current simulated time."""
+
+    clock = 0.0
+    timelines = {}
+    account_orders = {}
+    calls = {"order_history": 0, "orders": 0}
+
+    def _state(self, order_id):
+        current = None
+        for t, payload in self.timelines[order_id]:
+            if t <= self.clock:
+                current = payload
+        return current
+
+    def order_history(self, access_token, order_id):
+        self.calls["order_history"] += 1
+        state = self._state(order_id)
+        return [dict(state)] if state else []
+
+    def orders(self, access_token):
+        self.calls["orders"] += 1
+        rows = (self._state(o) for o in self.account_orders[access_token])
+        return [dict(r) for r in rows if r]
+
+
+def seed(accounts, per_account, rng):
+    Base.metadata.drop_all(engine, tables=[BrokerOrder.__table__, TradeIntent.__table__])
+    Base.metadata.create_all(engine, tables=[TradeIntent.__table__, BrokerOrder.__table__])
+    StandInBroker.timelines, StandInBroker.account_orders = {}, {}
+    db = SessionLocal()
+    for a in range(accounts):
+        account = f"acct-{a:03d}"
+        StandInBroker.account_orders[account] = []
+        for i in range(per_account):
+            order_id = f"{a:03d}{i:05d}"
+            intent = TradeIntent(account_id=account, broker="ZERODHA", source="CHART", symbol="RELIANCE",
+                                 exchange="NSE", segment="CASH", product="MIS", side="BUY", qty=100,
+                                 order_type="MARKET", state="SUBMITTED_TO_BROKER")
+            db.add(intent)
+            db.flush()
+            db.add(BrokerOrder(trade_intent_id=intent.id, broker="ZERODHA", broker_order_id=order_id,
+                               status="PUT ORDER REQ RECEIVED"))
+            StandInBroker.timelines[order_id] = timeline(order_id, rng)
+            StandInBroker.account_orders[account].append(order_id)
+    db.commit()
+    db.close()
+
+
+def final_states():
+    db = SessionLocal()
+    try:
+        rows = db.query(BrokerOrder.broker_order_id, TradeIntent.state, BrokerOrder.filled_qty).join(
+            TradeIntent, TradeIntent.id == BrokerOrder.trade_intent_id).all()
+        return {r[0]: (r[1], r[2]) for r in rows}
+    finally:
+        db.close()
+
+
+def run_polling():
+    StandInBroker.calls = {"order_history": 0, "orders": 0}
+    adapter = broker_adapters.ZerodhaAdapter()
+    commits = 0
+    t0 = time.perf_counter()
+    clock = 0.0
+    while True:
+        clock += POLL_INTERVAL
+        StandInBroker.clock = clock
+        db = SessionLocal()
+        open_rows = (
+            db.query(TradeIntent, BrokerOrder)
+            .join(BrokerOrder, BrokerOrder.trade_intent_id == TradeIntent.id)
+            .filter(TradeIntent.state.in_(updates_module.OPEN_STATES))
+            .all()
+        )
+        if not open_rows:
+            db.close()
+            break
+        for intent, order in open_rows:
+            r = adapter.sync_order(db, intent.account_id, intent, order.broker_order_id)
+            order.status = r["latest_status"] or order.status
+            if r["filled_qty"] is not None:
+                order.filled_qty = r["filled_qty"]
+            if r["average_price"] is not None:
+                order.average_price = r["average_price"]
+            order.raw_response_redacted = r["raw_redacted"]
+            intent.state = r["intent_state"]
+            db.commit()
+            commits += 1
+        db.close()
+    wall = time.perf_counter() - t0
+    return {"wall_s": wall, "commits": commits, "api_calls": sum(StandInBroker.calls.values()),
+            "delay_s": POLL_INTERVAL / 2, "states": final_states()}
+
+
+async def run_streamed():
+    StandInBroker.calls = {"order_history": 0, "orders": 0}
+    pipeline = updates_module.OrderUpdatePipeline()
+    pushed = []
+
+    async def capture(changes):
+        pushed.extend(changes)
+
+    pipeline._push = capture
+    events = sorted((e for events in StandInBroker.timelines.values() for e in events), key=lambda e: e[0])
+    t0 = time.perf_counter()
+    window_end = FLUSH_WINDOW
+    for n, (t, payload) in enumerate(events):
+        while t > window_end:
+            await pipeline.flush()
+            window_end += FLUSH_WINDOW
+        if n % 20 != 7:
+            pipeline.submit(payload)
+    await pipeline.flush()
+    wall = time.perf_counter() - t0
+    stream_states = final_states()
+
+    StandInBroker.clock = max(t for t, _ in events)
+    summary = await pipeline.reconcile()
+    return {"wall_s": wall, "commits": pipeline.stats["flushes"], "api_calls": 0,
+            "delay_s": FLUSH_WINDOW / 2, "stream_states": stream_states, "states": final_states(),
+            "pushed": len(pushed), "updates": len(events), "reconcile": summary,
+            "reconcile_calls": StandInBroker.calls["orders"]}
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Order update benchmark")
+    parser.add_argument("--accounts", type=int, default=20)
+    parser.add_argument("--orders", type=int, default=10)
+    args = parser.parse_args()
+
+    broker_adapters._get_latest_access_token = lambda db, *, account_id, broker: account_id
+    broker_adapters.ZerodhaBroker = StandInBroker
+    updates_module.ZerodhaBroker = StandInBroker
+
+    seed(args.accounts, args.orders, random.Random(11))
+    before = run_polling()
+    seed(args.accounts, args.orders, random.Random(11))
+    after = asyncio.run(run_streamed())
+
+    total = args.accounts * args.orders
+    print("\n" + "=" * 60)
+    print(f"ORDER UPDATE BENCHMARK ({args.accounts} accounts x {args.orders} orders, "
+          f"{after['updates']} broker updates)")
+    print("=" * 60)
+    for label, row in (("per-intent polling", before), ("streamed batches", after)):
+        print(f"{label:<19} broker API calls {row['api_calls']:5d}  DB transactions {row['commits']:5d}  "
+              f"DB time {row['wall_s'] * 1000:7.1f}ms  mean state delay ~{row['delay_s']:.2f}s")
+    print(f"pushed to clients: {after['pushed']} order_update messages")
+    drift = sum(1 for o in before["states"] if after["stream_states"][o] != before["states"][o])
+    rec = after["reconcile"]
+    print(f"after dropping 1 in 20 messages: {drift} orders drifted; reconcile made "
+          f"{after['reconcile_calls']} orders() call(s) for {rec['accounts']} account(s), fixed {len(rec['changes'])}")
+    same = before["states"] == after["states"]
+    print(f"final intent states identical to polling: {same} ({total} orders)")
+
+
+if __name__ == "__main__":
+    try:
+        main()
+    finally:
+        engine.dispose()
+        _tmp.cleanup()
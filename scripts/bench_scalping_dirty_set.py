@@ -0,0 +1,193 @@
+"""
+Benchmark: incremental scalping cycles with the dirty-set scheduler.
+
+Simulates one trading hour for a 50-symbol universe: minute bars from a
+random walk (a few symbols get a sharp move, a volume spike or a news
+article at some point), delivered through the bar-close callback the way
+LiveCandleBuilder does. Every 10 simulated minutes a scalping cycle runs:
+
+- full: every symbol analyzed, as the scheduler did before;
+- incremental: ScalpingDirtySet plans the cycle, only dirty symbols are
+  analyzed and the rest reuse their previous result.
+
+Agent analysis is replaced by a fixed per-symbol cost (asyncio.sleep under
+the engine's concurrency limit) and a deterministic score from the current
+price, so the report shows the recomputed fraction, the cycle latency and
+how far the incremental top-N drifts from a full recompute at each cycle.
+
+Usage (from repo root):
+    python scripts/bench_scalping_dirty_set.py --symbols 50 --agent-seconds 0.2
+"""
+import argparse
+import asyncio
+import sys
+import time
+from pathlib import Path
+
+import numpy as np
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from app.services import scalping_dirty_set as dirty_module
+from app.services.scalping_dirty_set import FULL_REFRESH_EVERY, ScalpingDirtySet
+
+UNIVERSE = "bench"
+CYCLE_MINUTES = 10
+ATR_WARMUP_MINUTES = 15 * 16
+
+
+class FakeCandles:
+    """Closed-bar history per symbol plus the bar-close callback hook."""
+
+    def __init__(self):
+        self.bars = {}
+        self.callbacks = []
+
+    def register_bar_close_callback(self, callback):
+        self.callbacks.append(callback)
+
+    def close_bar(self, symbol, interval, bar):
+        self.bars.setdefault((symbol, interval), []).append(bar)
+        for callback in self.callbacks:
+            callback(symbol, interval, bar)
+
+    def recent(self, symbol, interval, bars):
+        return self.bars.get((symbol, interval), [])[-bars:]
+
+
+class FakeNews:
+    def __init__(self):
+        self.articles = {}
+
+    def articles_for(self, symbol):
+        return list(self.articles.get(symbol, []))
+
+
+class Market:
+    def __init__(self, symbols, rng):
+        self.rng = rng
+        self.symbols = symbols
+        self.price = {s: 1000.0 for s in symbols}
+        self.vol = {s: float(v) for s, v in zip(symbols, rng.uniform(3e-4, 1.2e-3, len(symbols)))}
+        self.minute = 0
+        self.candles = FakeCandles()
+        self.news = FakeNews()
+        self.fifteen = {s: [] for s in symbols}
+
+    def step(self, shocks, spikes):
+        ts = 1_760_000_000 + self.minute * 60
+        for s in self.symbols:
+            move = self.rng.normal(0, self.vol[s]) + shocks.get(s, 0.0)
+            open_ = self.price[s]
+            close = open_ * (1 + move)
+            spread = abs(self.rng.normal(0, self.vol[s])) * open_
+            volume = int(self.rng.lognormal(9, 0.3) * spikes.get(s, 1.0))
+            bar = {"time": ts, "open": open_, "high": max(open_, close) + spread,
+                   "low": min(open_, close) - spread, "close": close, "volume": volume}
+            self.price[s] = close
+            self.candles.close_bar(s, "1m", bar)
+            self.fifteen[s].append(bar)
+            if len(self.fifteen[s]) == 15:
+                group = self.fifteen[s]
+                self.candles.close_bar(s, "15m", {
+                    "time": group[0]["time"], "open": group[0]["open"],
+                    "high": max(b["high"] for b in group), "low": min(b["low"] for b in group),
+                    "close": group[-1]["close"], "volume": sum(b["volume"] for b in group)})
+                self.fifteen[s] = []
+        self.minute += 1
+
+    def score(self, symbol):
+        news_bump = 5.0 * len(self.news.articles.get(symbol, []))
+        return round(50 + 2000 * (self.price[symbol] / 1000.0 - 1) + news_bump, 4)
+
+
+async def analyze(market, symbols, agent_seconds, max_concurrent):
+    semaphore = asyncio.Semaphore(max_concurrent)
+
+    async def one(symbol):
+        async with semaphore:
+            await asyncio.sleep(agent_seconds)
+            return {"symbol": symbol, "blend_score": market.score(symbol), "confidence": "Medium",
+                    "agents": [], "partial": False}
+
+    return list(await asyncio.gather(*(one(s) for s in symbols)))
+
+
+def top(results, n):
+    return [r["symbol"] for r in sorted(results, key=lambda r: r["blend_score"], reverse=True)[:n]]
+
+
+async def run(args):
+    rng = np.random.default_rng(args.seed)
+    symbols = [f"SYM{i:02d}" for i in range(args.symbols)]
+    market = Market(symbols, rng)
+    dirty_module.get_live_candles = lambda: market.candles
+    dirty_module.get_news_index = lambda: market.news
+    tracker = ScalpingDirtySet()
+
+    # 15m ATR history before the hour starts
+    for _ in range(ATR_WARMUP_MINUTES):
+        market.step({}, {})
+
+    events = {
+        12: ({symbols[3]: 0.01, symbols[7]: -0.012}, {}),
+        25: ({}, {symbols[11]: 6.0}),
+        41: ({symbols[19]: 0.008}, {symbols[19]: 4.0}),
+    }
+    rows = []
+    for cycle in range(args.cycles):
+        if cycle:
+            for offset in range(CYCLE_MINUTES):
+                minute = (cycle - 1) * CYCLE_MINUTES + offset
+                shocks, spikes = events.get(minute, ({}, {}))
+                market.step(shocks, spikes)
+                if minute == 33:
+                    market.news.articles[symbols[23]] = [{"title": "order win", "url": "bench://1"}]
+
+        t0 = time.perf_counter()
+        full_results = await analyze(market, symbols, args.agent_seconds, args.concurrency)
+        full_s = time.perf_counter() - t0
+
+        t0 = time.perf_counter()
+        plan = tracker.plan(UNIVERSE, symbols, fingerprint="bench")
+        fresh = await analyze(market, plan.dirty, args.agent_seconds, args.concurrency)
+        merged = tracker.commit(plan, fresh, time.perf_counter() - t0)
+        inc_s = time.perf_counter() - t0
+
+        overlap = len(set(top(merged, args.top)) & set(top(full_results, args.top)))
+        summary = plan.summary()
+        rows.append((cycle, summary["refresh"], summary["recomputed"], summary["recomputed_fraction"],
+                     full_s, inc_s, overlap, summary["dirty_reasons"]))
+    return rows, tracker
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Dirty-set scalping cycle benchmark")
+    parser.add_argument("--symbols", type=int, default=50)
+    parser.add_argument("--cycles", type=int, default=7, help="10-minute cycles (7 = one hour)")
+    parser.add_argument("--agent-seconds", type=float, default=0.2, help="simulated analysis time per symbol")
+    parser.add_argument("--concurrency", type=int, default=10)
+    parser.add_argument("--top", type=int, default=10)
+    parser.add_argument("--seed", type=int, default=11)
+    args = parser.parse_args()
+
+    rows, tracker = asyncio.run(run(args))
+
+    print("\n" + "=" * 72)
+    print(f"SCALPING DIRTY-SET BENCHMARK ({args.symbols} symbols, {args.agent_seconds:.2f}s/symbol, "
+          f"full refresh every {FULL_REFRESH_EVERY} cycles)")
+    print("=" * 72)
+    print(f"{'cycle':>5} {'refresh':<18} {'re-ran':>7} {'frac':>6} {'full s':>7} {'incr s':>7} "
+          f"{'top' + str(args.top) + ' match':>10}  dirty")
+    for cycle, refresh, n, frac, full_s, inc_s, overlap, reasons in rows:
+        print(f"{cycle:5d} {refresh:<18} {n:7d} {frac:6.0%} {full_s:7.2f} {inc_s:7.2f} "
+              f"{overlap:>7d}/{args.top}  {reasons or ''}")
+    full_total = sum(r[4] for r in rows)
+    inc_total = sum(r[5] for r in rows)
+    print(f"total analysis: full {full_total:.1f}s, incremental {inc_total:.1f}s "
+          f"({inc_total / full_total:.0%}); mean re-run fraction {np.mean([r[3] for r in rows]):.0%}")
+    print(f"stats: {tracker.get_stats()}")
+
+
+if __name__ == "__main__":
+    main()
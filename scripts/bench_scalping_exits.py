@@ -0,0 +1,146 @@
+"""
+Benchmark: scalping exit logging and summaries, rewrite-per-exit JSON day
+files versus the append-only journal with in-memory index.
+
+Logs N exits for one busy day, then times get_exit lookups, the daily
+summary and the 30-day /scalping/stats aggregation. The legacy path is
+reproduced inline (read, scan, append, rewrite with indent=2). A second
+tracker instance is then built over the same directory to check that the
+index rebuilt from the journal matches, and that exits appended by another
+process are picked up.
+
+Runs in a temporary directory; nothing under data/ is touched.
+
+Usage (from repo root):
+    python scripts/bench_scalping_exits.py --exits 2000
+"""
+import argparse
+import json
+import sys
+import tempfile
+import time
+from datetime import datetime, timedelta, timezone
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from app.services import scalping_exit_tracker as tracker_module
+
+# Today, so the 30-day /scalping/stats window includes it
+DAY = datetime.now(timezone.utc).replace(hour=4, minute=0, second=0, microsecond=0)
+
+
+def make_exits(n):
+    exits = []
+    for i in range(n):
+        entry = DAY + timedelta(seconds=7 * i)
+        ret = ((i * 37) % 200 - 90) / 100.0
+        exits.append({
+            "symbol": f"SYM{i % 150:03d}",
+            "entry_time": entry.isoformat(),
+            "entry_price": 100.0 + i % 50,
+            "exit_time": (entry + timedelta(minutes=5 + i % 20)).isoformat(),
+            "exit_price": 100.0 + i % 50 + ret,
+            "exit_reason": ("TARGET_HIT", "STOP_LOSS", "TIME_EXIT")[i % 3],
+            "return_pct": ret,
+            "hold_duration_mins": 5 + i % 20,
+            "mode": "Scalping",
+        })
+    return exits
+
+
+def legacy_log_exit(exits_dir, exit_data):
+    exit_time = datetime.fromisoformat(exit_data["exit_time"].replace("Z", "+00:00"))
+    file_path = exits_dir / f"exits_{exit_time.strftime('%Y%m%d')}.json"
+    if file_path.exists():
+        with open(file_path, "r") as f:
+            data = json.load(f)
+    else:
+        data = {"date": exit_time.strftime("%Y-%m-%d"), "exits": []}
+    if any(e["symbol"] == exit_data["symbol"] and e["entry_time"] == exit_data["entry_time"] for e in data["exits"]):
+        return
+    data["exits"].append(exit_data)
+    with open(file_path, "w") as f:
+        json.dump(data, f, indent=2)
+
+
+def legacy_summary(exits_dir, date):
+    file_path = exits_dir / f"exits_{datetime.fromisoformat(date).strftime('%Y%m%d')}.json"
+    if not file_path.exists():
+        return 0
+    with open(file_path, "r") as f:
+        exits = json.load(f)["exits"]
+    return sum(e.get("return_pct", 0) for e in exits) / len(exits)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Scalping exit journal benchmark")
+    parser.add_argument("--exits", type=int, default=2000)
+    parser.add_argument("--lookups", type=int, default=2000)
+    args = parser.parse_args()
+
+    # Side effects of logging (pick dataset / ai_recommendations) are not measured
+    tracker_module.log_scalping_exit_outcome = lambda exit_data: None
+    tracker_module.get_ai_recommendation_store = lambda: type("S", (), {"apply_scalping_exit": lambda self, e: 0})()
+
+    exits = make_exits(args.exits)
+    date = DAY.strftime("%Y-%m-%d")
+
+    with tempfile.TemporaryDirectory() as tmp:
+        legacy_dir = Path(tmp) / "legacy"
+        journal_dir = Path(tmp) / "journal"
+        legacy_dir.mkdir()
+        journal_dir.mkdir()
+
+        t0 = time.perf_counter()
+        for e in exits:
+            legacy_log_exit(legacy_dir, e)
+        legacy_log_s = time.perf_counter() - t0
+
+        tracker = tracker_module.ScalpingExitTracker(journal_dir)
+        t0 = time.perf_counter()
+        for e in exits:
+            tracker.log_exit(e)
+        journal_log_s = time.perf_counter() - t0
+
+        t0 = time.perf_counter()
+        for i in range(args.lookups):
+            e = exits[(i * 13) % len(exits)]
+            assert tracker.get_exit(e["symbol"], date, e["entry_time"]) is e
+        lookup_us = (time.perf_counter() - t0) / args.lookups * 1e6
+
+        t0 = time.perf_counter()
+        for _ in range(20):
+            legacy_avg = [legacy_summary(legacy_dir, (DAY - timedelta(days=i)).strftime("%Y-%m-%d")) for i in range(30)][0]
+        legacy_stats_ms = (time.perf_counter() - t0) / 20 * 1000.0
+
+        t0 = time.perf_counter()
+        for _ in range(20):
+            stats = tracker.get_period_stats(30)
+        stats_ms = (time.perf_counter() - t0) / 20 * 1000.0
+
+        # Rebuild from disk, then simulate another process appending
+        rebuilt = tracker_module.ScalpingExitTracker(journal_dir)
+        assert rebuilt.get_daily_summary(date) == tracker.get_daily_summary(date)
+        other = tracker_module.ScalpingExitTracker(journal_dir)
+        extra = make_exits(args.exits + 5)[-5:]
+        for e in extra:
+            other.log_exit(e)
+        synced = tracker.get_daily_summary(date)["total_exits"]
+
+        # Legacy JSON day files are still readable
+        legacy_index = tracker_module.ScalpingExitTracker(legacy_dir)
+        legacy_total = legacy_index.get_daily_summary(date)["total_exits"]
+
+    print("\n" + "=" * 60)
+    print(f"SCALPING EXIT JOURNAL BENCHMARK ({args.exits} exits in one day)")
+    print("=" * 60)
+    print(f"log all exits:   legacy rewrite {legacy_log_s:8.2f}s   journal append {journal_log_s:8.3f}s")
+    print(f"get_exit lookup: {lookup_us:.1f} us/op (indexed)")
+    print(f"30-day stats:    legacy {legacy_stats_ms:8.2f}ms   aggregates {stats_ms:8.3f}ms "
+          f"(avg_return legacy {legacy_avg:.4f} vs {stats['avg_return']})")
+    print(f"rebuild: summaries match; cross-process append seen: {synced} exits; legacy files indexed: {legacy_total}")
+
+
+if __name__ == "__main__":
+    main()
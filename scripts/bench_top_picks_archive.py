@@ -0,0 +1,170 @@
+"""
+Benchmark: top picks run archive, plain JSON text rows versus compressed
+delta-encoded rows.
+
+Seeds a sequence of consecutive runs per (universe, mode) from the payloads
+in cache/top_picks_runs.db (opened read-only), jittering scores, prices and
+timestamps and occasionally re-ranking picks the way successive scheduler
+runs do. The runs are written into two temporary stores: one with the
+legacy layout (JSON text per row) and one with the current encoding. Reports
+bytes per run, write cost, read latency for get_latest_run_for /
+get_run_by_id / query_runs, and checks that every payload round-trips.
+
+Usage (from repo root):
+    python scripts/bench_top_picks_archive.py --runs 200
+"""
+import argparse
+import json
+import random
+import sqlite3
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from app.services.top_picks_store import TopPicksStore
+
+SOURCE_DB = Path(__file__).parent.parent / "cache" / "top_picks_runs.db"
+
+
+def load_templates():
+    conn = sqlite3.connect(f"file:{SOURCE_DB}?mode=ro", uri=True)
+    try:
+        rows = conn.execute(
+            "SELECT universe, mode, payload FROM top_picks_runs WHERE picks_count > 0 ORDER BY id"
+        ).fetchall()
+    finally:
+        conn.close()
+    templates = {}
+    for universe, mode, payload in rows:
+        try:
+            templates[(universe, mode)] = json.loads(payload)
+        except Exception:
+            continue
+    return templates
+
+
+def jitter(value, rng, scale):
+    if isinstance(value, bool) or not isinstance(value, (int, float)):
+        return value
+    return round(value * (1 + rng.uniform(-scale, scale)), 2)
+
+
+def next_run(prev, rng, seq):
+    run = json.loads(json.dumps(prev))
+    run["generated_at"] = f"2026-10-{1 + seq // 40:02d}T{9 + (seq // 6) % 7:02d}:{(seq * 10) % 60:02d}:00Z"
+    metadata = run.setdefault("metadata", {})
+    metadata["analysis_time_seconds"] = round(rng.uniform(8, 40), 2)
+    picks = run.get("picks") or []
+    for pick in picks:
+        for key in ("score_blend", "blend_score", "price", "target", "upside_pct"):
+            if key in pick and rng.random() < 0.6:
+                pick[key] = jitter(pick[key], rng, 0.02)
+        for agent, score in list((pick.get("scores") or {}).items()):
+            if rng.random() < 0.3:
+                pick["scores"][agent] = jitter(score, rng, 0.05)
+    if picks and rng.random() < 0.2:
+        i, j = rng.randrange(len(picks)), rng.randrange(len(picks))
+        picks[i], picks[j] = picks[j], picks[i]
+        for rank, pick in enumerate(picks, 1):
+            pick["rank"] = rank
+    return run
+
+
+def build_runs(templates, runs_per_group):
+    rng = random.Random(5)
+    sequences = {}
+    for key, template in templates.items():
+        prev, seq = template, []
+        for n in range(runs_per_group):
+            prev = next_run(prev, rng, n)
+            seq.append(prev)
+        sequences[key] = seq
+    # Interleave groups the way scheduler slots do
+    return [sequences[key][n] for n in range(runs_per_group) for key in sorted(sequences)]
+
+
+def legacy_store_run(conn, data, trigger, n):
+    conn.execute(
+        "INSERT INTO top_picks_runs (run_id, universe, mode, generated_at_utc, trigger, "
+        "total_analyzed, filtered_count, picks_count, elapsed_sec, payload) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
+        (f"legacy:{n}", data["universe"], data["mode"], f"2026-10-01T00:00:{n:06d}", trigger,
+         data.get("total_analyzed"), data.get("passed_filter"), len(data.get("picks") or []), None,
+         json.dumps(data)),
+    )
+    conn.commit()
+
+
+def timed(fn, repeat):
+    fn()
+    t0 = time.perf_counter()
+    for _ in range(repeat):
+        result = fn()
+    return result, (time.perf_counter() - t0) / repeat * 1000.0
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Top picks run archive benchmark")
+    parser.add_argument("--runs", type=int, default=200, help="Runs per (universe, mode)")
+    parser.add_argument("--repeat", type=int, default=50)
+    args = parser.parse_args()
+
+    templates = load_templates()
+    runs = build_runs(templates, args.runs)
+    raw_bytes = sum(len(json.dumps(r)) for r in runs)
+
+    with tempfile.TemporaryDirectory() as tmp:
+        legacy = TopPicksStore(str(Path(tmp) / "legacy.db"), retention_days=0)
+        conn = legacy._connect()
+        t0 = time.perf_counter()
+        for n, data in enumerate(runs):
+            legacy_store_run(conn, data, "hourly", n)
+        legacy_write_ms = (time.perf_counter() - t0) / len(runs) * 1000.0
+        conn.close()
+
+        store = TopPicksStore(str(Path(tmp) / "archive.db"), retention_days=0)
+        # Dictionary trained after the first day of runs, as the daily job would
+        first_day = len(templates) * 40
+        run_ids = []
+        t0 = time.perf_counter()
+        for n, data in enumerate(runs):
+            if n == first_day:
+                store.train_dictionary()
+            run_ids.append(store.store_run(data, trigger="hourly"))
+        write_ms = (time.perf_counter() - t0) / len(runs) * 1000.0
+
+        stats = store.get_storage_stats()
+        mismatches = sum(store.get_run_by_id(rid) != data for rid, data in zip(run_ids, runs))
+
+        # Legacy rows are compacted in place by maintenance and stay readable
+        legacy_latest = legacy.get_latest_run_for("nifty50", "Intraday")
+        compacted = legacy.compact_legacy_runs()
+        legacy_match = legacy.get_latest_run_for("nifty50", "Intraday") == legacy_latest
+
+        key = ("nifty50", "Intraday") if ("nifty50", "Intraday") in templates else sorted(templates)[0]
+        mid_id = run_ids[len(run_ids) // 2]
+        fresh = TopPicksStore(str(Path(tmp) / "archive.db"), retention_days=0)
+        _, latest_ms = timed(lambda: fresh.get_latest_run_for(*key), args.repeat)
+        _, by_id_ms = timed(lambda: fresh.get_run_by_id(mid_id), args.repeat)
+        rows, query_ms = timed(lambda: fresh.query_runs(universe=key[0], mode=key[1], limit=500), 5)
+        _, legacy_query_ms = timed(lambda: legacy.query_runs(universe=key[0], mode=key[1], limit=500), 5)
+
+        archive_file = (Path(tmp) / "archive.db").stat().st_size
+        legacy_file = (Path(tmp) / "legacy.db").stat().st_size
+
+    print("\n" + "=" * 60)
+    print(f"TOP PICKS ARCHIVE BENCHMARK ({len(runs)} runs, {len(templates)} groups, codec={stats['codec']})")
+    print("=" * 60)
+    print(f"payload bytes/run: raw json {raw_bytes / len(runs):8.0f}   encoded {stats['bytes_per_run']:8.0f}   "
+          f"ratio {stats['compression_ratio']}x ({stats['keyframes']} keyframes)")
+    print(f"db file size:      legacy {legacy_file / 1024:8.0f}KB   archive {archive_file / 1024:8.0f}KB")
+    print(f"store_run:         legacy {legacy_write_ms:6.2f}ms   archive {write_ms:6.2f}ms")
+    print(f"get_latest_run_for {latest_ms:6.2f}ms   get_run_by_id {by_id_ms:6.2f}ms (cold store instance)")
+    print(f"query_runs x{len(rows)}:   legacy {legacy_query_ms:6.2f}ms   archive {query_ms:6.2f}ms")
+    print(f"round-trip mismatches: {mismatches}; legacy rows compacted: {compacted}, latest unchanged: {legacy_match}")
+
+
+if __name__ == "__main__":
+    main()
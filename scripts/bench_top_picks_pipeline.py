@@ -0,0 +1,343 @@
+"""
+Benchmark: the full Top Picks pipeline against recorded upstream fixtures.
+
+Runs generate_top_picks (the scheduler's entry point) for every universe x
+mode case with each upstream answered by a local stand-in: OHLCV and chart
+candles, quotes, index quotes, global indices, news feeds and LLM
+completions (see pipeline_fixtures.py). Each stand-in waits a configurable
+latency per call, so the numbers reflect the pipeline's fan-out and
+batching as well as its CPU work, without Zerodha/Yahoo/OpenAI access.
+
+Every case runs in a fresh subprocess (cold agent, matrix, S/R and news
+caches; its own peak RSS). Per case it reports:
+- wall time and process CPU time of generate_top_picks
+- CPU time per agent (event-loop thread time while the agent's coroutine
+  runs; the compute process pool is disabled so it is measurable)
+- upstream calls per kind and fixture misses
+- tracemalloc peak and retained allocations (separate run, since tracing
+  slows everything down)
+- peak RSS
+- a digest of the picks, to spot result changes
+
+Results can be saved as a JSON baseline and compared against one; timing,
+CPU, allocation and RSS regressions beyond --tolerance and any increase in
+upstream calls are reported, and the exit status is 1 when there are any.
+
+Fixtures: by default a deterministic synthetic set is generated in a
+temporary directory. ``--record DIR`` runs the cases once against the live
+upstreams (credentials required) and captures their responses into DIR;
+``--fixtures DIR`` replays them.
+
+Usage (from repo root):
+    python scripts/bench_top_picks_pipeline.py --save bench_baseline.json
+    python scripts/bench_top_picks_pipeline.py --baseline bench_baseline.json
+    python scripts/bench_top_picks_pipeline.py --modes Intraday --latency llm=0 --no-alloc
+"""
+import argparse
+import asyncio
+import contextlib
+import functools
+import hashlib
+import io
+import json
+import os
+import platform
+import resource
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+import tracemalloc
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from pipeline_fixtures import LATENCY_MS, FixtureUpstreams, synthesize
+
+UNIVERSES = ["nifty50", "banknifty"]
+MODES = ["Scalping", "Intraday", "Swing", "Options", "Futures"]
+# metric -> label; compared against the baseline with --tolerance
+COMPARED = {"wall_s": "wall", "cpu_s": "cpu", "alloc_peak_mb": "alloc peak", "peak_rss_mb": "peak RSS"}
+
+
+class _Metered:
+    """Awaitable that adds the thread CPU time of each step of ``coro`` to ``sink[key]``."""
+
+    def __init__(self, coro, sink, key):
+        self.coro, self.sink, self.key = coro, sink, key
+
+    def __await__(self):
+        value, error = None, None
+        while True:
+            started = time.thread_time()
+            try:
+                if error is not None:
+                    step = self.coro.throw(error)
+                else:
+                    step = self.coro.send(value)
+            except StopIteration as stop:
+                return stop.value
+            finally:
+                self.sink[self.key] = self.sink.get(self.key, 0.0) + time.thread_time() - started
+            value, error = None, None
+            try:
+                value = yield step
+            except BaseException as e:
+                error = e
+
+
+def meter(agent, cpu, runs):
+    analyze = agent.analyze
+
+    @functools.wraps(analyze)
+    async def metered(*args, **kwargs):
+        runs[agent.name] = runs.get(agent.name, 0) + 1
+        return await _Metered(analyze(*args, **kwargs), cpu, agent.name)
+
+    agent.analyze = metered
+
+
+def picks_digest(data):
+    rows = [(p.get("symbol"), p.get("recommendation"), round(float(p.get("score_blend") or 0), 2))
+            for p in data.get("picks") or []]
+    return hashlib.sha1(json.dumps(rows).encode()).hexdigest()[:12]
+
+
+def run_worker(args):
+    """One case in this process; writes the measurements to --result."""
+    universe, mode = args.worker.split(":")
+    tmp = tempfile.TemporaryDirectory()
+    upstreams = FixtureUpstreams(Path(args.fixtures), json.loads(args.latency_json), record=args.record_mode)
+    upstreams.install(Path(tmp.name))
+
+    from app.agents.compute_pool import agent_compute_pool
+    from app.agents.latency import agent_latency
+    from app.services import event_logger, top_picks_engine as engine_module
+    from app.services.redis_client import get_redis_client
+
+    agent_compute_pool.enabled = False
+    event_logger.EVENT_LOG_ENABLED = False
+    with contextlib.redirect_stdout(io.StringIO()):
+        engine = engine_module.TopPicksEngine(storage_path=str(Path(tmp.name) / "top_picks"))
+    engine_module.top_picks_engine = engine
+    cpu, runs = {}, {}
+    for agent in engine.coordinator.agents.values():
+        meter(agent, cpu, runs)
+
+    rss_start = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024.0
+    if args.trace_alloc:
+        tracemalloc.start()
+    t0, c0 = time.perf_counter(), time.process_time()
+    with contextlib.redirect_stdout(io.StringIO()):
+        data = asyncio.run(engine_module.generate_top_picks(universe=universe, top_n=args.top_n, mode=mode))
+    wall, cpu_s = time.perf_counter() - t0, time.process_time() - c0
+    result = {
+        "wall_s": round(wall, 3),
+        "cpu_s": round(cpu_s, 3),
+        "agent_cpu_ms": {k: round(v * 1000.0, 1) for k, v in sorted(cpu.items())},
+        "agent_runs": dict(sorted(runs.items())),
+        "deadline_misses": sum(s.get("deadline_misses", 0) for s in agent_latency.get_stats()["agents"].values()),
+        "upstream_calls": {k: v for k, v in upstreams.calls.items() if v},
+        "fixture_misses": {k: v for k, v in upstreams.misses.items() if v},
+        "picks": len(data.get("picks") or []),
+        "picks_digest": picks_digest(data),
+        "peak_rss_mb": round(resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024.0, 1),
+        "start_rss_mb": round(rss_start, 1),
+        "redis": get_redis_client() is not None,
+    }
+    if args.trace_alloc:
+        # only the allocation figures are taken from a traced run
+        current, peak = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+        result = {"alloc_peak_mb": round(peak / 2**20, 2), "alloc_retained_mb": round(current / 2**20, 2)}
+    if args.record_mode:
+        upstreams.save()
+    Path(args.result).write_text(json.dumps(result))
+    tmp.cleanup()
+
+
+def spawn(case, fixtures, latency, args, trace_alloc=False, record=False):
+    with tempfile.NamedTemporaryFile(suffix=".json", delete=False) as f:
+        result_path = f.name
+    cmd = [sys.executable, __file__, "--worker", case, "--fixtures", str(fixtures), "--result", result_path,
+           "--latency-json", json.dumps(latency), "--top-n", str(args.top_n)]
+    if trace_alloc:
+        cmd.append("--trace-alloc")
+    if record:
+        cmd.append("--record-mode")
+    try:
+        proc = subprocess.run(cmd, capture_output=True, text=True, timeout=args.case_timeout)
+        if proc.returncode != 0:
+            raise RuntimeError(f"{case} failed:\n{proc.stderr[-2000:]}")
+        return json.loads(Path(result_path).read_text())
+    finally:
+        os.unlink(result_path)
+
+
+def run_case(case, fixtures, latency, args):
+    runs = [spawn(case, fixtures, latency, args) for _ in range(args.repeat)]
+    runs.sort(key=lambda r: r["wall_s"])
+    result = dict(runs[len(runs) // 2])
+    result["cpu_s"] = round(statistics.median(r["cpu_s"] for r in runs), 3)
+    if args.repeat > 1:
+        result["wall_s_min"] = runs[0]["wall_s"]
+        result["wall_s_max"] = runs[-1]["wall_s"]
+    if not args.no_alloc:
+        result.update(spawn(case, fixtures, latency, args, trace_alloc=True))
+    return result
+
+
+def compare(results, baseline, tolerance):
+    """Regression lines for ``results`` against ``baseline`` (same case names)."""
+    problems, notes = [], []
+    for case, row in results["cases"].items():
+        base = baseline.get("cases", {}).get(case)
+        if base is None:
+            notes.append(f"{case}: not in baseline")
+            continue
+        for metric, label in COMPARED.items():
+            new, old = row.get(metric), base.get(metric)
+            if new is None or not old:
+                continue
+            if new > old * (1 + tolerance):
+                problems.append(f"{case}: {label} {old} -> {new} ({(new / old - 1) * 100:+.0f}%)")
+            elif new < old * (1 - tolerance):
+                notes.append(f"{case}: {label} {old} -> {new} ({(new / old - 1) * 100:+.0f}%)")
+        for kind, n in row.get("upstream_calls", {}).items():
+            was = base.get("upstream_calls", {}).get(kind, 0)
+            # Sentiment batches coalesce whatever headlines are pending at the
+            # time, so LLM call counts move by one or two between identical runs
+            slack = max(1, int(was * tolerance)) if kind == "llm" else 0
+            if n > was + slack:
+                problems.append(f"{case}: {kind} calls {was} -> {n}")
+            elif n < was:
+                notes.append(f"{case}: {kind} calls {was} -> {n}")
+        if row.get("picks_digest") != base.get("picks_digest"):
+            notes.append(f"{case}: picks changed ({base.get('picks')} -> {row.get('picks')} picks)")
+    if results["meta"]["latency_ms"] != baseline.get("meta", {}).get("latency_ms"):
+        notes.append("latency settings differ from the baseline")
+    if results["meta"]["fixtures"] != baseline.get("meta", {}).get("fixtures"):
+        notes.append("fixtures differ from the baseline")
+    return problems, notes
+
+
+def print_report(results):
+    print("\n" + "=" * 100)
+    meta = results["meta"]
+    print(f"TOP PICKS PIPELINE BENCHMARK (fixtures: {meta['fixtures']}, top {meta['top_n']}, "
+          f"repeat {meta['repeat']}, redis {'on' if meta['redis'] else 'off'})")
+    print("=" * 100)
+    print(f"{'case':<20} {'wall s':>7} {'cpu s':>6} {'agents cpu s':>12} {'upstream':>8} {'misses':>6} "
+          f"{'alloc MB':>8} {'RSS MB':>7} {'picks':>5}  digest")
+    agent_totals = {}
+    for case, row in results["cases"].items():
+        for name, ms in row["agent_cpu_ms"].items():
+            agent_totals[name] = agent_totals.get(name, 0.0) + ms
+        alloc = row.get("alloc_peak_mb")
+        print(f"{case:<20} {row['wall_s']:7.2f} {row['cpu_s']:6.2f} {sum(row['agent_cpu_ms'].values()) / 1000:12.2f} "
+              f"{sum(row['upstream_calls'].values()):8d} {sum(row['fixture_misses'].values()):6d} "
+              f"{alloc if alloc is not None else '-':>8} {row['peak_rss_mb']:7.0f} {row['picks']:5d}  "
+              f"{row['picks_digest']}")
+    print("agent CPU, all cases: " + ", ".join(
+        f"{name} {ms / 1000:.2f}s" for name, ms in sorted(agent_totals.items(), key=lambda kv: -kv[1])))
+    calls = {}
+    for row in results["cases"].values():
+        for kind, n in row["upstream_calls"].items():
+            calls[kind] = calls.get(kind, 0) + n
+    print("upstream calls, all cases: " + ", ".join(f"{k} {v}" for k, v in calls.items()))
+
+
+def parse_latency(items, scale):
+    latency = dict(LATENCY_MS)
+    for item in items or []:
+        kind, _, ms = item.partition("=")
+        if kind not in latency:
+            raise SystemExit(f"unknown upstream '{kind}' (one of {', '.join(latency)})")
+        latency[kind] = float(ms)
+    return {k: v * scale for k, v in latency.items()}
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Top Picks pipeline benchmark")
+    parser.add_argument("--universes", nargs="+", default=UNIVERSES)
+    parser.add_argument("--modes", nargs="+", default=MODES)
+    parser.add_argument("--top-n", type=int, default=20)
+    parser.add_argument("--repeat", type=int, default=1, help="timed runs per case (median reported)")
+    parser.add_argument("--fixtures", help="recorded fixture directory (default: synthetic)")
+    parser.add_argument("--record", metavar="DIR", help="record live upstream responses into DIR")
+    parser.add_argument("--latency", action="append", metavar="KIND=MS", help="override a stand-in latency")
+    parser.add_argument("--latency-scale", type=float, default=1.0)
+    parser.add_argument("--no-alloc", action="store_true", help="skip the tracemalloc run")
+    parser.add_argument("--save", metavar="PATH", help="write results as a JSON baseline")
+    parser.add_argument("--baseline", metavar="PATH", help="compare against a saved baseline")
+    parser.add_argument("--tolerance", type=float, default=0.15)
+    parser.add_argument("--case-timeout", type=float, default=600)
+    # internal: one case per subprocess
+    parser.add_argument("--worker", help=argparse.SUPPRESS)
+    parser.add_argument("--result", help=argparse.SUPPRESS)
+    parser.add_argument("--latency-json", help=argparse.SUPPRESS)
+    parser.add_argument("--trace-alloc", action="store_true", help=argparse.SUPPRESS)
+    parser.add_argument("--record-mode", action="store_true", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.worker:
+        run_worker(args)
+        return
+
+    cases = [f"{u}:{m}" for u in args.universes for m in args.modes]
+    latency = parse_latency(args.latency, args.latency_scale)
+
+    if args.record:
+        Path(args.record).mkdir(parents=True, exist_ok=True)
+        for case in cases:
+            spawn(case, args.record, latency, args, record=True)
+            print(f"recorded {case} -> {args.record}")
+        return
+
+    with tempfile.TemporaryDirectory() as tmp:
+        if args.fixtures:
+            fixtures, label = Path(args.fixtures), str(args.fixtures)
+        else:
+            from app.services.top_picks_engine import get_universe_symbols
+
+            fixtures, label = Path(tmp) / "fixtures", "synthetic"
+            synthesize(fixtures, [s for u in args.universes for s in get_universe_symbols(u)])
+
+        results = {"meta": {}, "cases": {}}
+        started = time.perf_counter()
+        for case in cases:
+            results["cases"][case.replace(":", "/")] = run_case(case, fixtures, latency, args)
+            print(f"  {case}: {results['cases'][case.replace(':', '/')]['wall_s']:.2f}s", file=sys.stderr)
+        first = next(iter(results["cases"].values()))
+        results["meta"] = {
+            "fixtures": label,
+            "latency_ms": latency,
+            "top_n": args.top_n,
+            "repeat": args.repeat,
+            "redis": first["redis"],
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "cpus": os.cpu_count(),
+            "generated_at": time.strftime("%Y-%m-%dT%H:%M:%S"),
+            "total_s": round(time.perf_counter() - started, 1),
+        }
+
+    print_report(results)
+    if args.save:
+        Path(args.save).write_text(json.dumps(results, indent=2))
+        print(f"saved baseline: {args.save}")
+    if args.baseline:
+        problems, notes = compare(results, json.loads(Path(args.baseline).read_text()), args.tolerance)
+        print(f"\nagainst {args.baseline} (tolerance {args.tolerance:.0%}):")
+        for line in problems:
+            print(f"  REGRESSION {line}")
+        for line in notes:
+            print(f"  note       {line}")
+        if not problems:
+            print("  no regressions")
+        sys.exit(1 if problems else 0)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,136 @@
+"""
+Benchmark: requests/sec for /v1/top-picks and /v1/agents/picks on a warm snapshot.
+
+A synthetic snapshot (10 picks shaped like the engine's output) is placed in
+the scheduler's in-memory cache and published the way the scheduler does.
+The agents router is then driven in-process through httpx's ASGI transport
+in four configurations:
+
+- legacy: TOP_PICKS_PREPARED off, the per-request dict + serialization path;
+- prepared: pre-serialized bodies, plain JSON;
+- prepared gzip: pre-serialized bodies with Accept-Encoding: gzip;
+- revalidate: If-None-Match with the last ETag (304, no body).
+
+Quotes come from an in-process fake provider, so the numbers show only the
+route's own cost (no network). Bytes are per response as sent; the gzip
+case includes the client's decompression time.
+
+Usage (from repo root):
+    python scripts/bench_top_picks_responses.py --requests 2000
+"""
+import argparse
+import asyncio
+import contextlib
+import io
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+import httpx
+from fastapi import FastAPI
+
+import app.providers as providers_module
+from app.routers import agents as agents_router
+from app.services import realtime_prices
+from app.services.top_picks_responses import top_picks_responses
+from app.services.top_picks_scheduler import TOP_PICKS_CACHE, _cache_key
+from app.utils.json_encoder import FastJSONResponse
+
+UNIVERSE, MODE = "nifty50", "Swing"
+AGENTS = ["technical", "pattern_recognition", "market_regime", "global", "policy", "options",
+          "sentiment", "microstructure", "risk", "watchlist_intelligence", "trade_strategy"]
+
+
+def synth_payload(n=10):
+    items = []
+    for i in range(n):
+        symbol = f"SYM{i:02d}"
+        items.append({
+            "symbol": symbol,
+            "score_blend": 80 - i,
+            "recommendation": "Buy",
+            "confidence": "High",
+            "scores": {a: 50 + (i * 7 + j * 3) % 40 for j, a in enumerate(AGENTS)},
+            "key_findings": [f"{symbol} finding {k}: breakout above resistance with rising volume" for k in range(5)],
+            "strategy_rationale": f"{symbol} " + "trend continuation with defined risk; " * 12,
+            "entry_price": 1000.0 + i, "stop_loss": 970.0 + i, "target_price": 1080.0 + i,
+            "agents": [{"name": a, "score": 60, "reasoning": "constructive " * 8} for a in AGENTS],
+            "last_price": 1000.0 + i, "intraday_change_pct": 0.5, "volume": 100000,
+        })
+    return {"universe": UNIVERSE, "mode": MODE, "items": items, "as_of": "2026-10-16T09:45:00Z",
+            "run_id": "bench", "elapsed_seconds": 41.2}
+
+
+class FakeProvider:
+    async def get_quote_async(self, symbols, max_age=5.0):
+        return {s: {"price": 1001.5, "close": 995.0, "open": 998.0, "high": 1004.0, "low": 990.0,
+                    "volume": 123456, "change_percent": 0.65, "source": "zerodha"} for s in symbols}
+
+    def get_data_source(self):
+        return "zerodha"
+
+
+async def drive(client, path, n, headers):
+    t0 = time.perf_counter()
+    size = status = 0
+    etag = None
+    for _ in range(n):
+        r = await client.get(path, headers=headers)
+        # Bytes on the wire (httpx decompresses r.content)
+        status, size, etag = r.status_code, int(r.headers.get("content-length", 0)), r.headers.get("etag")
+    return n / (time.perf_counter() - t0), status, size, etag
+
+
+async def run(n):
+    fake = FakeProvider()
+    providers_module.get_data_provider = lambda: fake
+    realtime_prices.get_data_provider = lambda: fake
+
+    payload = synth_payload()
+    TOP_PICKS_CACHE[_cache_key(UNIVERSE, MODE)] = payload
+    top_picks_responses.publish(UNIVERSE, MODE, payload)
+
+    api = FastAPI(default_response_class=FastJSONResponse)
+    api.include_router(agents_router.router, prefix="/v1")
+    transport = httpx.ASGITransport(app=api)
+    paths = {
+        "/v1/top-picks": f"/v1/top-picks?universe={UNIVERSE}&mode={MODE}&limit=5",
+        "/v1/agents/picks": f"/v1/agents/picks?universe={UNIVERSE}&primary_mode={MODE}&limit=10",
+    }
+    results = []
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+        for label, path in paths.items():
+            top_picks_responses.enabled = False
+            await drive(client, path, 20, {})
+            results.append((label, "legacy", *(await drive(client, path, n, {}))[:3]))
+            top_picks_responses.enabled = True
+            await drive(client, path, 20, {})
+            rps, status, size, etag = await drive(client, path, n, {"accept-encoding": "identity"})
+            results.append((label, "prepared", rps, status, size))
+            results.append((label, "prepared gzip", *(await drive(client, path, n, {"accept-encoding": "gzip"}))[:3]))
+            results.append((label, "revalidate (304)",
+                            *(await drive(client, path, n, {"if-none-match": etag}))[:3]))
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Top picks response benchmark")
+    parser.add_argument("--requests", type=int, default=2000)
+    args = parser.parse_args()
+
+    with contextlib.redirect_stdout(io.StringIO()):
+        results = asyncio.run(run(args.requests))
+
+    print("\n" + "=" * 72)
+    print(f"TOP PICKS RESPONSE BENCHMARK ({args.requests} requests per case, in-process ASGI)")
+    print("=" * 72)
+    print(f"{'route':<18} {'case':<18} {'req/s':>8} {'status':>7} {'bytes':>8}")
+    for route, case, rps, status, size in results:
+        print(f"{route:<18} {case:<18} {rps:8.0f} {status:7d} {size:8,d}")
+    print(f"stats: {top_picks_responses.get_stats()}")
+
+
+if __name__ == "__main__":
+    main()
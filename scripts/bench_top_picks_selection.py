@@ -0,0 +1,78 @@
+"""
+Benchmark: TopPicksEngine post-analysis selection, baseline vs current.
+
+Parity check plus timing for what generate_daily_picks does between
+batch_analyze and _format_pick: confidence filter, ranking,
+recommendations, directional thresholds (policy, entry-bandit action,
+regime caps), Scalping long/short caps, the relaxed bear pass, the
+index-relative filter and the actionable fallback.
+
+Both paths come from selection_fixtures.py: ``reference_select`` is the
+baseline inline code (verbatim), ``current_select`` goes through
+pick_selection.py and the engine's index filter. Both work on the result
+dicts, so timings should match within noise; the change is structural
+(one thresholds table instead of a per-mode if/elif block).
+
+Usage (from repo root):
+    python scripts/bench_top_picks_selection.py --symbols 12 50 200
+"""
+import argparse
+import asyncio
+import contextlib
+import io
+import random
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from selection_fixtures import copy_case, current_select, reference_select, snapshot, synth_case
+
+
+async def run(cases, timed):
+    mismatches = 0
+    with contextlib.redirect_stdout(io.StringIO()):
+        for case in cases:
+            if snapshot(reference_select(**copy_case(case))) != snapshot(await current_select(**copy_case(case))):
+                mismatches += 1
+
+        timings = {}
+        runs = [copy_case(c) for c in cases[:timed]]
+        t0 = time.perf_counter()
+        for case in runs:
+            reference_select(**case)
+        timings["baseline"] = (time.perf_counter() - t0) * 1000 / len(runs)
+        runs = [copy_case(c) for c in cases[:timed]]
+        t0 = time.perf_counter()
+        for case in runs:
+            await current_select(**case)
+        timings["current"] = (time.perf_counter() - t0) * 1000 / len(runs)
+    return mismatches, timings
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Top picks selection parity and timing")
+    parser.add_argument("--symbols", type=int, nargs="+", default=[12, 50, 200])
+    parser.add_argument("--cases", type=int, default=1000)
+    parser.add_argument("--timed", type=int, default=500, help="cases used for timing")
+    parser.add_argument("--seed", type=int, default=5)
+    args = parser.parse_args()
+
+    print("\n" + "=" * 72)
+    print(f"TOP PICKS SELECTION BENCHMARK ({args.cases} cases per size)")
+    print("=" * 72)
+    print(f"{'results':>8}  {'parity':>10}  {'baseline ms/run':>16}  {'current ms/run':>15}")
+    failed = False
+    for n in args.symbols:
+        rng = random.Random(args.seed)
+        cases = [synth_case(rng, n) for _ in range(args.cases)]
+        mismatches, timings = asyncio.run(run(cases, args.timed))
+        failed = failed or mismatches > 0
+        parity = "OK" if mismatches == 0 else f"{mismatches} differ"
+        print(f"{n:>8}  {parity:>10}  {timings['baseline']:>16.3f}  {timings['current']:>15.3f}")
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,122 @@
+"""
+Benchmark: cost of pipeline spans, and what one traced run reports.
+
+1. Span overhead. Times a million-iteration loop that opens one span per
+   iteration (the pattern used around cache lookups, the most frequent
+   stage). It runs with tracing disabled, enabled outside a run (metrics
+   only), and enabled inside a run (metrics plus span recording). The
+   figures are compared with an empty loop.
+2. One top-picks run against synthetic fixtures (see pipeline_fixtures.py)
+   with every run kept. Prints the slow-run report for that run (top
+   contributors by self time, slowest spans) and the size of the /metrics
+   page. The fixtures replace the data provider and LLM manager, so their
+   time shows up as agent self time; fetch and llm spans only appear
+   against live upstreams.
+
+To check end-to-end overhead, run the pipeline benchmark with tracing off
+and on (each case runs in a fresh process, so the environment applies):
+    PIPELINE_TRACING=0 python scripts/bench_top_picks_pipeline.py --no-alloc --save off.json
+    python scripts/bench_top_picks_pipeline.py --no-alloc --baseline off.json
+
+Usage (from repo root):
+    python scripts/bench_tracing.py --universe banknifty --mode Intraday
+"""
+import argparse
+import asyncio
+import contextlib
+import io
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from pipeline_fixtures import LATENCY_MS, FixtureUpstreams, synthesize
+
+from app.core.metrics import metrics
+from app.core.tracing import span, trace_run, tracer
+
+
+def per_call_ns(fn, n):
+    t0 = time.perf_counter_ns()
+    fn(n)
+    return (time.perf_counter_ns() - t0) / n
+
+
+def empty_loop(n):
+    for i in range(n):
+        pass
+
+
+def span_loop(n):
+    for i in range(n):
+        with span("cache", "bench", key="k") as s:
+            s.set("cache_hit", True)
+
+
+def traced_loop(n):
+    # One run per 1000 spans, so recorded spans stay under TRACE_MAX_SPANS
+    for _ in range(n // 1000):
+        with trace_run("bench"):
+            span_loop(1000)
+
+
+def overhead(n):
+    base = per_call_ns(empty_loop, n)
+    tracer.enabled = False
+    off = per_call_ns(span_loop, n)
+    tracer.enabled = True
+    on = per_call_ns(span_loop, n)
+    tracer.sample_rate = 0.0
+    recorded = per_call_ns(traced_loop, n)
+    return {"disabled": off - base, "metrics only": on - base, "inside a run": recorded - base}
+
+
+def traced_pipeline(universe, mode, fixtures_dir, tmp):
+    from app.agents.compute_pool import agent_compute_pool
+    from app.services import event_logger, top_picks_engine as engine_module
+    from app.services.top_picks_engine import get_universe_symbols
+
+    synthesize(fixtures_dir, get_universe_symbols(universe))
+    FixtureUpstreams(fixtures_dir, LATENCY_MS).install(tmp)
+    agent_compute_pool.enabled = False
+    event_logger.EVENT_LOG_ENABLED = False
+    tracer.sample_rate = 1.0
+    with contextlib.redirect_stdout(io.StringIO()):
+        engine_module.top_picks_engine = engine_module.TopPicksEngine(storage_path=str(tmp / "top_picks"))
+        asyncio.run(engine_module.generate_top_picks(universe=universe, top_n=20, mode=mode))
+    return tracer.get_slow_runs(limit=1)["runs"][0]
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Pipeline tracing benchmark")
+    parser.add_argument("--spans", type=int, default=1_000_000)
+    parser.add_argument("--universe", default="banknifty")
+    parser.add_argument("--mode", default="Intraday")
+    args = parser.parse_args()
+
+    costs = overhead(args.spans)
+    with tempfile.TemporaryDirectory() as tmp:
+        run = traced_pipeline(args.universe, args.mode, Path(tmp) / "fixtures", Path(tmp))
+
+    print("\n" + "=" * 72)
+    print(f"TRACING BENCHMARK ({args.spans:,} spans; {args.universe}/{args.mode} pipeline run)")
+    print("=" * 72)
+    for label, ns in costs.items():
+        print(f"span overhead, {label:<13} {ns:8.0f} ns/span")
+    print(f"\nrun {run['trace_id']}: {run['duration_s']:.2f}s, {run['spans']} spans "
+          f"({run['dropped_spans']} dropped)")
+    print(f"{'stage':<12} {'name':<24} {'count':>6} {'self s':>8} {'total s':>8} {'max s':>7}")
+    for g in run["top_contributors"]:
+        print(f"{g['stage']:<12} {g['name']:<24} {g['count']:6d} {g['self_s']:8.2f} {g['total_s']:8.2f} {g['max_s']:7.2f}")
+    print("slowest spans:")
+    for s in run["slowest_spans"][:5]:
+        detail = s["attributes"].get("symbol") or s["attributes"].get("key") or ""
+        print(f"  {s['stage']:<12} {s['name']:<24} {detail:<12} {s['duration_s']:.2f}s")
+    page = metrics.render()
+    print(f"/metrics page: {len(page.splitlines())} lines, {len(page) / 1024:.1f} KiB")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,110 @@
+"""
+Benchmark: per-symbol regime/beta work versus one universe matrix build.
+
+Generates a synthetic year of daily candles for NIFTY, BANKNIFTY and N
+symbols with planted betas (returns = beta * market + idiosyncratic noise),
+then compares:
+- N MarketRegimeAgent.compute calls (one per symbol chart, as before) with
+  one build_matrix call (alignment, betas, correlations, volatility ranks,
+  breadth and the single index-level regime)
+- matrix betas with the planted betas and with a per-symbol pandas
+  cov/var reference
+
+No network access: frames are handed to build_matrix directly.
+
+Usage (from repo root):
+    python scripts/bench_universe_matrix.py --symbols 50
+"""
+import argparse
+import sys
+import time
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from app.agents.market_regime_agent import MarketRegimeAgent
+from app.services.universe_matrix import BETA_WINDOW, build_matrix
+
+
+def make_frames(n_symbols, sessions, seed=3):
+    rng = np.random.default_rng(seed)
+    dates = pd.bdate_range(end=pd.Timestamp("2026-10-16"), periods=sessions)
+    market = rng.normal(0.0004, 0.01, sessions)
+    bank = 0.8 * market + rng.normal(0.0, 0.006, sessions)
+
+    def frame(returns, start, missing=0):
+        close = start * np.exp(np.cumsum(returns))
+        spread = np.abs(rng.normal(0, 0.004, sessions)) * close
+        df = pd.DataFrame(
+            {"open": close * (1 + rng.normal(0, 0.002, sessions)), "high": close + spread,
+             "low": close - spread, "close": close, "volume": rng.integers(1e5, 1e6, sessions)},
+            index=dates,
+        )
+        if missing:
+            df = df.drop(df.index[rng.choice(sessions - 1, missing, replace=False)])
+        return df
+
+    frames = {"NIFTY": frame(market, 21000), "BANKNIFTY": frame(bank, 45000)}
+    betas = {}
+    for i in range(n_symbols):
+        symbol = f"SYM{i:03d}"
+        betas[symbol] = rng.uniform(0.4, 1.8)
+        returns = betas[symbol] * market + rng.normal(0.0, 0.012, sessions)
+        frames[symbol] = frame(returns, rng.uniform(100, 3000), missing=int(rng.integers(0, 5)))
+    return frames, betas
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Universe matrix benchmark")
+    parser.add_argument("--symbols", type=int, default=50)
+    parser.add_argument("--sessions", type=int, default=250)
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    frames, planted = make_frames(args.symbols, args.sessions)
+    symbols = sorted(planted)
+    agent = MarketRegimeAgent()
+
+    def per_symbol():
+        for s in symbols:
+            candles = frames[s][["open", "high", "low", "close"]].reset_index(drop=True)
+            agent.compute(s, {"candles": candles})
+
+    t0 = time.perf_counter()
+    for _ in range(args.repeat):
+        per_symbol()
+    per_symbol_ms = (time.perf_counter() - t0) / args.repeat * 1000.0
+
+    t0 = time.perf_counter()
+    for _ in range(args.repeat):
+        matrix = build_matrix("nifty50", frames, symbols)
+    matrix_ms = (time.perf_counter() - t0) / args.repeat * 1000.0
+
+    betas = np.array([matrix.slice_for(s)["beta"] for s in symbols])
+    truth = np.array([planted[s] for s in symbols])
+    # Reference: same window, reindexed on NIFTY sessions (gaps stay NaN)
+    ref = []
+    for s in symbols:
+        closes = frames[s]["close"].reindex(frames["NIFTY"].index)
+        pair = pd.concat([closes.pct_change(fill_method=None), frames["NIFTY"]["close"].pct_change()], axis=1)
+        window = pair.iloc[1:].tail(BETA_WINDOW).dropna()
+        ref.append(window.iloc[:, 0].cov(window.iloc[:, 1]) / window.iloc[:, 1].var(ddof=1))
+    ref = np.array(ref)
+
+    print("\n" + "=" * 60)
+    print(f"UNIVERSE MATRIX BENCHMARK ({args.symbols} symbols x {args.sessions} sessions)")
+    print("=" * 60)
+    print(f"per-symbol regime compute x{len(symbols)}: {per_symbol_ms:8.2f}ms")
+    print(f"one matrix build (betas, vol ranks, breadth, index regime): {matrix_ms:8.2f}ms")
+    print(f"beta vs pandas reference: max abs diff {np.nanmax(np.abs(betas - ref)):.4f}")
+    print(f"beta vs planted: mean abs error {np.mean(np.abs(betas - truth)):.3f}")
+    print(f"index regime: {matrix.regime['metadata']['regime']} (score {matrix.regime['score']:.1f})")
+    print(f"breadth: {matrix.breadth}")
+    print(f"sample slice: {matrix.slice_for(symbols[0])}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,391 @@
+"""
+Recorded upstream fixtures for the Top Picks pipeline benchmark.
+
+A fixture directory holds everything the pipeline fetches from outside the
+process during one run:
+- candles.db: a CandleArchive with the OHLCV bars served to
+  market_data_provider.fetch_ohlcv and chart_data_service.fetch_chart_data
+- upstreams.json: quotes, index quotes, global indices, news feeds, LLM
+  responses and the NSE equities (symbol, name) used for news tagging,
+  plus the ``as_of`` epoch the candles are read at
+
+``FixtureUpstreams.install()`` swaps the upstream entry points for local
+stand-ins that answer from the fixtures after a configurable latency and
+count every call. In record mode the real upstreams are called instead and
+their responses are written to the fixture directory, so a live run can be
+captured once and replayed offline afterwards.
+
+``synthesize()`` writes a deterministic synthetic fixture set for the
+nifty50/banknifty universes; it is what the benchmark uses when no
+recorded directory is given.
+"""
+import asyncio
+import hashlib
+import json
+import random
+import re
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Dict, Iterable, List, Optional
+
+import numpy as np
+import pandas as pd
+
+from app.services.candle_archive import CHART_TIMEFRAMES, CandleArchive, ReplaySession, ist_to_epoch
+
+# Simulated round trip per upstream call, in milliseconds
+LATENCY_MS = {
+    "ohlcv": 40.0,
+    "chart": 60.0,
+    "quotes": 30.0,
+    "indices": 30.0,
+    "global": 120.0,
+    "news": 80.0,
+    "symbol_news": 80.0,
+    "llm": 600.0,
+}
+
+# Daily drift of the synthetic symbols: trending up, down, range-bound
+DRIFTS = (0.006, -0.006, 0.0002)
+SYNTHETIC_AS_OF = datetime(2025, 6, 30, 15, 30)
+INDEX_SYMBOLS = ("NIFTY", "BANKNIFTY")
+
+POSITIVE = ("rise", "upgrade", "wins", "buyback", "rally", "buyers")
+NEGATIVE = ("falls", "probe", "weaken", "downgrade")
+
+_NUMBERED = re.compile(r"^\s*(\d+)\.\s+(.*)$")
+
+
+def llm_key(purpose: str, messages: List[Dict[str, Any]]) -> str:
+    body = json.dumps(messages, sort_keys=True, ensure_ascii=False)
+    return f"{purpose}:{hashlib.sha1(body.encode('utf-8')).hexdigest()}"
+
+
+def _stable(text: str) -> int:
+    return int(hashlib.sha1(text.encode("utf-8")).hexdigest()[:8], 16)
+
+
+def synthetic_llm_reply(purpose: str, messages: List[Dict[str, Any]]) -> str:
+    """Deterministic answer in the format the caller parses (no recording needed)."""
+    prompt = str(messages[-1].get("content", "")) if messages else ""
+    if purpose == "sentiment" and "number|sentiment|score|themes" in prompt:
+        lines = []
+        for line in prompt.splitlines():
+            m = _NUMBERED.match(line)
+            if m:
+                title = m.group(2).lower()
+                score = 50 + _stable(title) % 11 - 5
+                if any(w in title for w in POSITIVE):
+                    score += 25
+                elif any(w in title for w in NEGATIVE):
+                    score -= 25
+                label = "Bullish" if score >= 55 else "Bearish" if score <= 45 else "Neutral"
+                lines.append(f"{m.group(1)}|{label}|{score}|earnings, guidance")
+        return "\n".join(lines)
+    if purpose == "insights":
+        return ("KEY_FINDINGS: Technical 72%: breakout above 20-day average; regime supportive\n"
+                "STRATEGY_RATIONALE: The stock closed above resistance on rising volume. "
+                "Momentum and pattern agents agree on the setup, with risk contained below the breakout level.")
+    return "Neutral|50|general"
+
+
+class FixtureUpstreams:
+    """Stand-ins for every upstream the Top Picks pipeline calls."""
+
+    def __init__(self, fixture_dir: Path, latency_ms: Optional[Dict[str, float]] = None, record: bool = False):
+        self.dir = Path(fixture_dir)
+        self.record = record
+        self.latency = {k: v / 1000.0 for k, v in {**LATENCY_MS, **(latency_ms or {})}.items()}
+        self.calls = {kind: 0 for kind in LATENCY_MS}
+        self.misses = {kind: 0 for kind in LATENCY_MS}
+        self.archive = CandleArchive(self.dir / "candles.db")
+        path = self.dir / "upstreams.json"
+        self.data = json.loads(path.read_text()) if path.exists() else {}
+        for key in ("quotes", "indices", "news", "symbol_news", "llm"):
+            self.data.setdefault(key, {})
+        self.data.setdefault("global_indices", None)
+        self.data.setdefault("instruments", [])
+        if record:
+            self.data["as_of"] = int(datetime.utcnow().timestamp())
+        self.session = ReplaySession(archive=self.archive, as_of_ts=int(self.data.get("as_of") or 0))
+        self._originals: Dict[str, Any] = {}
+
+    async def _wait(self, kind: str) -> None:
+        self.calls[kind] += 1
+        if not self.record and self.latency.get(kind):
+            await asyncio.sleep(self.latency[kind])
+
+    # ---------- stand-ins ----------
+
+    async def fetch_ohlcv(self, symbol: str, interval: str = "1d", days: int = 365):
+        await self._wait("ohlcv")
+        if self.record:
+            df = await self._originals["ohlcv"](symbol, interval=interval, days=days)
+            self.archive.upsert_frame(symbol, interval, df)
+            return df
+        df = self.session.fetch_ohlcv(symbol, interval=interval, days=days)
+        if df is None:
+            self.misses["ohlcv"] += 1
+        return df
+
+    async def fetch_chart_data(self, symbol: str, timeframe: str = "3M") -> Dict[str, Any]:
+        await self._wait("chart")
+        if self.record:
+            chart = await self._originals["chart"](symbol, timeframe)
+            interval, _ = CHART_TIMEFRAMES.get(timeframe, ("1d", 30))
+            candles = (chart or {}).get("candles") or []
+            if candles:
+                self.archive.upsert_frame(symbol, interval, pd.DataFrame(candles))
+            return chart
+        from app.services.chart_data_service import chart_data_service
+
+        df = self.session.fetch_chart_frame(symbol, timeframe)
+        if df is None or len(df) == 0:
+            self.misses["chart"] += 1
+            raise ValueError(f"No fixture candles for {symbol}/{timeframe}")
+        return chart_data_service._format_chart_response(symbol, timeframe, df, "Fixture")
+
+    async def get_quote_async(self, symbols: List[str], max_age: float = 0.0) -> Dict[str, Any]:
+        await self._wait("quotes")
+        if self.record:
+            quotes = await self._originals["provider"].get_quote_async(symbols)
+            self.data["quotes"].update(quotes or {})
+            return quotes
+        out = {}
+        for s in symbols:
+            if s in self.data["quotes"]:
+                out[s] = dict(self.data["quotes"][s])
+            else:
+                self.misses["quotes"] += 1
+        return out
+
+    async def get_indices_quote_async(self) -> Dict[str, Any]:
+        await self._wait("indices")
+        if self.record:
+            indices = await self._originals["provider"].get_indices_quote_async()
+            self.data["indices"] = indices or {}
+            return indices
+        return json.loads(json.dumps(self.data["indices"]))
+
+    async def get_global_indices(self) -> Dict[str, Any]:
+        await self._wait("global")
+        if self.record:
+            self.data["global_indices"] = await self._originals["global"]()
+            return self.data["global_indices"]
+        if self.data["global_indices"] is None:
+            self.misses["global"] += 1
+            return {"indices": []}
+        return json.loads(json.dumps(self.data["global_indices"]))
+
+    async def aggregate_news(self, category: str = "general", limit: int = 20) -> List[Dict[str, Any]]:
+        await self._wait("news")
+        if self.record:
+            items = await self._originals["news"](category=category, limit=limit)
+            if len(items or []) >= len(self.data["news"].get(category, [])):
+                self.data["news"][category] = items or []
+            return items
+        if category not in self.data["news"]:
+            self.misses["news"] += 1
+        return [dict(n) for n in self.data["news"].get(category, [])[:limit]]
+
+    async def get_symbol_news(self, symbol: str, limit: int = 10) -> List[Dict[str, Any]]:
+        await self._wait("symbol_news")
+        if self.record:
+            items = await self._originals["symbol_news"](symbol, limit=limit)
+            self.data["symbol_news"][symbol] = items or []
+            return items
+        if symbol not in self.data["symbol_news"]:
+            self.misses["symbol_news"] += 1
+        return [dict(n) for n in self.data["symbol_news"].get(symbol, [])[:limit]]
+
+    async def chat_completion(self, messages: List[Dict[str, Any]], purpose: str = "default", **kwargs) -> Dict[str, Any]:
+        await self._wait("llm")
+        key = llm_key(purpose, messages)
+        if self.record:
+            result = await self._originals["llm"].chat_completion(messages=messages, purpose=purpose, **kwargs)
+            self.data["llm"][key] = (result or {}).get("content", "")
+            return result
+        content = self.data["llm"].get(key)
+        if content is None:
+            content = synthetic_llm_reply(purpose, messages)
+        return {"content": content, "model": "fixture", "cached": False}
+
+    @property
+    def client(self) -> bool:
+        return True
+
+    # ---------- wiring ----------
+
+    def install(self, tmp_dir: Path) -> None:
+        """Point the pipeline's upstream entry points at this object.
+
+        ``tmp_dir`` receives everything the run would otherwise write under
+        cache/ (instrument snapshot, headline sentiment cache).
+        """
+        from app.agents import global_market_agent, policy_macro_agent, sentiment_agent
+        from app.llm.openai_manager import llm_manager
+        from app.providers import get_data_provider
+        from app.services import instrument_master as master_module
+        from app.services import intelligent_insights, news_index as index_module
+        from app.services import realtime_prices, top_picks_engine
+        from app.services.chart_data_service import chart_data_service
+        from app.services.market_data_provider import market_data_provider
+
+        if self.record:
+            self._originals = {
+                "ohlcv": market_data_provider.fetch_ohlcv,
+                "chart": chart_data_service.fetch_chart_data,
+                "provider": get_data_provider(),
+                "global": global_market_agent.get_global_indices,
+                "news": sentiment_agent.aggregate_news,
+                "symbol_news": sentiment_agent.get_symbol_news,
+                "llm": llm_manager.get(),
+            }
+
+        market_data_provider.fetch_ohlcv = self.fetch_ohlcv
+        chart_data_service.fetch_chart_data = self.fetch_chart_data
+        top_picks_engine.get_data_provider = lambda: self
+        realtime_prices.get_data_provider = lambda: self
+        global_market_agent.get_global_indices = self.get_global_indices
+        sentiment_agent.aggregate_news = self.aggregate_news
+        policy_macro_agent.aggregate_news = self.aggregate_news
+        sentiment_agent.get_symbol_news = self.get_symbol_news
+        for module in (sentiment_agent, index_module, intelligent_insights):
+            module.llm_manager = self
+
+        master = master_module.InstrumentMaster(base_dir=Path(tmp_dir) / "instruments")
+        if self.record:
+            self.data["instruments"] = [list(row) for row in master_module.get_instrument_master().equities("NSE")]
+        master.refresh(_KiteInstruments(self.data["instruments"]))
+        master_module.instrument_master = master
+        index = index_module.NewsIndex(index_module.HeadlineSentimentCache(str(Path(tmp_dir) / "news_sentiment.db")))
+        index_module.news_index = index
+        sentiment_agent.news_index = index
+
+    def save(self) -> None:
+        """Write recorded responses (record mode)."""
+        (self.dir / "upstreams.json").write_text(json.dumps(self.data, default=str))
+
+
+class _KiteInstruments:
+    """instruments() answered from the fixture's (symbol, name) rows."""
+
+    def __init__(self, equities: Iterable[List[str]]):
+        self.rows = [
+            {"instrument_token": 1000 + i, "exchange_token": 1, "tradingsymbol": s, "name": n, "expiry": "",
+             "strike": 0.0, "tick_size": 0.05, "lot_size": 1, "instrument_type": "EQ", "segment": "NSE",
+             "exchange": "NSE"}
+            for i, (s, n) in enumerate(equities)
+        ]
+
+    def instruments(self, exchange=None):
+        return [dict(r) for r in self.rows if exchange in (None, r["exchange"])]
+
+
+# ---------- synthetic fixtures ----------
+
+BULLISH = ["{who} shares rise after strong quarterly results", "Brokerage upgrades {who}, raises target price",
+           "{who} wins large order, stock gains", "{who} board approves share buyback"]
+BEARISH = ["{who} falls as margins weaken", "Regulator probe into {who} weighs on stock",
+           "Brokerage downgrades {who} on weak demand outlook"]
+GENERAL = [
+    "Sensex, Nifty end higher as banks rally", "RBI cuts repo rate by 25 bps, signals accommodative stance",
+    "FIIs turn net buyers for third straight session", "Fed signals rate cut as inflation eases",
+    "Government raises capex allocation in budget, infrastructure push continues",
+    "GDP growth beats estimates; PMI at multi-month high",
+]
+
+
+def _frame(rng, stamps, base: float, drift: float, vol: float) -> pd.DataFrame:
+    close = base * np.exp(np.cumsum(rng.normal(drift, vol, len(stamps))))
+    return pd.DataFrame({
+        "time": [ist_to_epoch(t.to_pydatetime()) for t in stamps],
+        "open": close * (1 + rng.normal(0, vol / 4, len(stamps))),
+        "high": close * (1 + np.abs(rng.normal(vol / 2, vol / 4, len(stamps)))),
+        "low": close * (1 - np.abs(rng.normal(vol / 2, vol / 4, len(stamps)))),
+        "close": close,
+        "volume": rng.integers(50_000, 5_000_000, len(stamps)),
+    })
+
+
+def _session_stamps(days: pd.DatetimeIndex, freq: str) -> pd.DatetimeIndex:
+    stamps = [pd.date_range(f"{d.date()} 09:15", f"{d.date()} 15:29", freq=freq) for d in days]
+    return stamps[0].append(stamps[1:]) if stamps else pd.DatetimeIndex([])
+
+
+def synthesize(fixture_dir: Path, symbols: Iterable[str], seed: int = 7) -> None:
+    """Write a deterministic fixture set for ``symbols`` (plus NIFTY/BANKNIFTY)."""
+    fixture_dir = Path(fixture_dir)
+    fixture_dir.mkdir(parents=True, exist_ok=True)
+    symbols = list(dict.fromkeys(list(INDEX_SYMBOLS) + [str(s).upper() for s in symbols]))
+    archive = CandleArchive(fixture_dir / "candles.db")
+    sessions = pd.bdate_range(end=SYNTHETIC_AS_OF.date(), periods=400)
+    # interval -> (bar times, drift scale, volatility per bar)
+    intervals = {
+        "1d": (sessions, 1.0, 0.012),
+        "60m": (_session_stamps(sessions[-60:], "60min"), 1 / 7, 0.0045),
+        "15m": (_session_stamps(sessions[-30:], "15min"), 1 / 25, 0.0024),
+        "5m": (_session_stamps(sessions[-5:], "5min"), 1 / 75, 0.0014),
+    }
+    quotes = {}
+    for i, symbol in enumerate(symbols):
+        rng = np.random.default_rng(seed * 1000 + i)
+        base = 20_000.0 if symbol in INDEX_SYMBOLS else float(rng.uniform(100, 4000))
+        # Trending up, trending down or range-bound, so every mode has
+        # actionable longs and shorts to run the post-analysis stages on
+        drift = DRIFTS[i % 3]
+        for interval, (stamps, scale, vol) in intervals.items():
+            frame = _frame(rng, stamps, base, drift * scale, vol)
+            if interval == "1d":
+                last_close = float(frame["close"].iloc[-1])
+            else:
+                # intraday bars end where the daily series does
+                ratio = last_close / float(frame["close"].iloc[-1])
+                frame[["open", "high", "low", "close"]] *= ratio
+            archive.upsert_frame(symbol, interval, frame)
+            if interval == "1d":
+                last, prev = frame.iloc[-1], frame.iloc[-2]
+                quotes[symbol] = {
+                    "price": round(float(last["close"]), 2), "close": round(float(prev["close"]), 2),
+                    "open": round(float(last["open"]), 2), "high": round(float(last["high"]), 2),
+                    "low": round(float(last["low"]), 2), "volume": int(last["volume"]),
+                    "change_percent": round((last["close"] / prev["close"] - 1) * 100, 2), "source": "Fixture",
+                }
+
+    rng = random.Random(seed)
+    equities = [s for s in symbols if s not in INDEX_SYMBOLS]
+    # headlines lean the way the symbol's candles trend
+    trend = {s: DRIFTS[i % 3] for i, s in enumerate(symbols)}
+
+    def headline(who):
+        d = trend[who]
+        pool = BULLISH if d > 0.001 else BEARISH if d < -0.001 else BULLISH + BEARISH
+        return rng.choice(pool).format(who=who)
+
+    general = [{"title": headline(rng.choice(equities)), "description": "",
+                "source": "MoneyControl", "url": f"https://example.invalid/g{n}"} for n in range(40)]
+    general += [{"title": f"{rng.choice(GENERAL)} ({n})", "description": "", "source": "NDTV Profit",
+                 "url": f"https://example.invalid/m{n}"} for n in range(10)]
+    symbol_news = {
+        s: [{"title": headline(s), "description": "", "source": "FMP", "symbol": s,
+             "url": f"https://example.invalid/{s}/{n}"} for n in range(2)]
+        for s in equities
+    }
+    data = {
+        "as_of": ist_to_epoch(SYNTHETIC_AS_OF),
+        "instruments": [[s, f"{s} LIMITED"] for s in equities],
+        "quotes": quotes,
+        # Index up more than 0.8% so the index-relative filters run in full
+        "indices": {"NIFTY 50": {"price": 24150.0, "change_percent": 1.1},
+                    "NIFTY BANK": {"price": 52300.0, "change_percent": 0.9}},
+        "global_indices": {"indices": [
+            {"name": n, "price": p, "chg_pct": c, "source": "Fixture"}
+            for n, p, c in (("S&P 500", 5480.1, 0.92), ("Nasdaq", 17710.3, 1.25), ("Dow Jones", 39118.9, 0.71),
+                            ("Nikkei 225", 39583.1, 0.84), ("Hang Seng", 17718.6, 0.62),
+                            ("FTSE 100", 8164.2, 0.35), ("DAX", 18235.5, 0.48), ("VIX", 12.4, -6.2))
+        ], "source": "Fixture", "region": "Global"},
+        "news": {"general": general},
+        "symbol_news": symbol_news,
+        "llm": {},
+    }
+    (fixture_dir / "upstreams.json").write_text(json.dumps(data))
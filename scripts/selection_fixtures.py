@@ -0,0 +1,549 @@
+"""
+Fixtures for Top Picks selection parity tests and timing.
+
+``reference_select`` is generate_daily_picks' selection as it shipped before
+pick_selection.py, kept verbatim: confidence filter, sort, get_recommendation
+per row, the per-mode threshold if/elif block, Scalping long/short caps, the
+relaxed bear pass, the index-relative filter and the actionable fallback.
+The entry-bandit action and regime bias are taken as arguments, and the
+index filter (``reference_index_filter``) takes the index move and quotes
+instead of fetching them.
+
+``current_select`` runs the same steps through the code the engine calls
+now: the pick_selection functions in generate_daily_picks' order and the
+engine's _apply_index_relative_filters against a stand-in data provider
+(only the fallback's few lines are repeated here).
+
+``synth_case`` builds coordinator-shaped results (blend scores, confidences,
+risk agent scores, key signals) with a spread of modes, policy thresholds,
+bandit actions, regime multipliers, index moves and quotes.
+
+Used by test_pick_selection.py and scripts/bench_top_picks_selection.py.
+"""
+import copy
+from typing import Any, Dict, List, Optional
+
+from app.services import top_picks_engine as engine_module
+from app.services.pick_selection import (
+    attach_recommendations,
+    directional_thresholds,
+    filter_by_confidence,
+    pick_score,
+    split_directional,
+)
+from app.services.top_picks_engine import TopPicksEngine
+from app.utils.recommendation_system import filter_actionable_picks, get_recommendation
+
+MODES = ["Scalping", "Intraday", "Swing", "Options", "Futures", "Commodities"]
+SIGNALS = ["Bullish", "Buy", "Positive", "Bearish", "Sell", "Negative", "Neutral"]
+AGENTS = ["technical", "pattern_recognition", "microstructure", "risk", "market_regime", "sentiment", "options"]
+REC_FIELDS = ("recommendation", "is_actionable", "recommendation_note", "risk_reward_ratio", "color_scheme")
+
+
+def reference_index_filter(mode_key, bullish_results, bearish_results, index_change, quotes):
+    mode_norm = mode_key
+    if mode_norm in ("Intraday", "Futures"):
+        down_threshold = -0.8
+        up_threshold = 0.8
+        rel_threshold = 1.0
+        max_with_trend = 2
+    else:
+        down_threshold = -0.8
+        up_threshold = 0.8
+        rel_threshold = 0.5
+        max_with_trend = 3
+
+    if index_change >= up_threshold:
+        market_direction = "UP"
+    elif index_change <= down_threshold:
+        market_direction = "DOWN"
+    else:
+        return bullish_results, bearish_results
+
+    def _change(symbol: str) -> Optional[float]:
+        quote = quotes.get(symbol)
+        if not quote:
+            return None
+        value = quote.get("change_percent")
+        try:
+            return float(value)
+        except Exception:
+            return None
+
+    if market_direction == "DOWN":
+        filtered_bullish: List[Dict[str, Any]] = []
+        for r in bullish_results:
+            symbol = r.get("symbol")
+            if not symbol:
+                filtered_bullish.append(r)
+                continue
+            stock_change = _change(symbol)
+            if stock_change is None:
+                filtered_bullish.append(r)
+                continue
+            if stock_change >= index_change + rel_threshold:
+                filtered_bullish.append(r)
+        if len(filtered_bullish) > max_with_trend:
+            filtered_bullish = filtered_bullish[:max_with_trend]
+        bullish_results = filtered_bullish
+    else:
+        filtered_bearish: List[Dict[str, Any]] = []
+        for r in bearish_results:
+            symbol = r.get("symbol")
+            if not symbol:
+                filtered_bearish.append(r)
+                continue
+            stock_change = _change(symbol)
+            if stock_change is None:
+                filtered_bearish.append(r)
+                continue
+            if stock_change <= index_change - rel_threshold:
+                filtered_bearish.append(r)
+        if len(filtered_bearish) > max_with_trend:
+            filtered_bearish = filtered_bearish[:max_with_trend]
+        bearish_results = filtered_bearish
+
+    return bullish_results, bearish_results
+
+
+def reference_select(results, min_confidence, mode, top_n, thresholds, entry_action_cfg, entry_regime_bias, index):
+    """Baseline generate_daily_picks selection (verbatim), returning the actionable dicts."""
+    mode_key = mode
+    # Filter by confidence
+    confidence_levels = {'low': 1, 'medium': 2, 'high': 3}
+    min_level = confidence_levels.get(min_confidence.lower(), 2)
+
+    filtered_results = []
+    for result in results:
+        confidence = result.get('confidence', 'Low').lower()
+        result_level = confidence_levels.get(confidence, 1)
+
+        if result_level >= min_level:
+            filtered_results.append(result)
+
+    print(f"Filtered to {len(filtered_results)} stocks meeting confidence threshold")
+
+    # Sort by blend score
+    filtered_results.sort(key=lambda x: x.get('blend_score', 0), reverse=True)
+
+    # Apply recommendations and build bullish / bearish buckets for
+    # directional selection.
+    all_picks_with_recs: List[Dict[str, Any]] = []
+    for result in filtered_results:
+        risk_score = None
+        for agent in result.get('agents', []):
+            if agent.get('agent') == 'risk':
+                risk_score = agent.get('score')
+                break
+
+        rec_result = get_recommendation(
+            score=result.get('blend_score', 0),
+            confidence=result.get('confidence', 'Medium'),
+            risk_agent_score=risk_score,
+            agent_signals=result.get('key_signals', [])
+        )
+
+        result['recommendation'] = rec_result.recommendation.value
+        result['is_actionable'] = rec_result.is_actionable
+        result['recommendation_note'] = rec_result.note
+        result['risk_reward_ratio'] = rec_result.risk_reward_ratio
+        result['color_scheme'] = rec_result.color_scheme
+
+        all_picks_with_recs.append(result)
+
+    bullish_results: List[Dict[str, Any]] = []
+    bearish_results: List[Dict[str, Any]] = []
+
+    def _get_score(val: Any) -> float:
+        try:
+            v = val.get('score_blend', val.get('blend_score', 0.0))
+        except AttributeError:
+            try:
+                return float(val or 0.0)
+            except Exception:
+                return 0.0
+        try:
+            return float(v or 0.0)
+        except Exception:
+            return 0.0
+
+    def _get_rr(val: Any) -> Optional[float]:
+        rr_val = val.get('risk_reward_ratio')
+        if rr_val is None:
+            return None
+        try:
+            return float(rr_val)
+        except Exception:
+            return None
+
+    # Per-mode directional thresholds (defaults when not provided by policy)
+    mode_key = mode
+    bull_min_score = 0.0
+    bull_min_rr = 0.0
+    bear_max_score = 0.0
+    bear_min_rr = 0.0
+
+    max_long_picks: Optional[int] = None
+    max_short_picks: Optional[int] = None
+
+    if mode_key == "Scalping":
+        if entry_action_cfg:
+            bull_min_score = float(
+                entry_action_cfg.get("bull_min_score")
+                or thresholds.get("bull_min_score", 55)
+                or 55
+            )
+            bull_min_rr = float(
+                entry_action_cfg.get("bull_min_rr")
+                or thresholds.get("bull_min_rr", 1.2)
+                or 1.2
+            )
+            bear_max_score = float(
+                entry_action_cfg.get("bear_max_score")
+                or thresholds.get("bear_max_score", 44)
+                or 44
+            )
+            bear_min_rr = float(
+                entry_action_cfg.get("bear_min_rr")
+                or thresholds.get("bear_min_rr", 1.2)
+                or 1.2
+            )
+
+            try:
+                max_long_picks = int(
+                    entry_action_cfg.get("max_long_picks") or top_n
+                )
+            except Exception:
+                max_long_picks = top_n
+            try:
+                max_short_picks = int(
+                    entry_action_cfg.get("max_short_picks") or top_n
+                )
+            except Exception:
+                max_short_picks = top_n
+        else:
+            bull_min_score = float(thresholds.get("bull_min_score", 55) or 55)
+            bull_min_rr = float(thresholds.get("bull_min_rr", 1.2) or 1.2)
+            bear_max_score = float(thresholds.get("bear_max_score", 44) or 44)
+            bear_min_rr = float(thresholds.get("bear_min_rr", 1.2) or 1.2)
+            max_long_picks = top_n
+            max_short_picks = top_n
+
+        # Apply regime-aware multipliers for long/short caps.
+        try:
+            long_mult = float(entry_regime_bias.get("long_mult", 1.0) or 1.0)
+        except Exception:
+            long_mult = 1.0
+        try:
+            short_mult = float(entry_regime_bias.get("short_mult", 1.0) or 1.0)
+        except Exception:
+            short_mult = 1.0
+
+        if max_long_picks is not None:
+            max_long_picks = max(
+                0, min(top_n, int(round(max_long_picks * long_mult)))
+            )
+        if max_short_picks is not None:
+            max_short_picks = max(
+                0, min(top_n, int(round(max_short_picks * short_mult)))
+            )
+    elif mode_key == "Intraday":
+        if entry_action_cfg:
+            bull_min_score = float(
+                entry_action_cfg.get("bull_min_score")
+                or thresholds.get("bull_min_score", 60)
+                or 60
+            )
+            bull_min_rr = float(
+                entry_action_cfg.get("bull_min_rr")
+                or thresholds.get("bull_min_rr", 1.5)
+                or 1.5
+            )
+            bear_max_score = float(
+                entry_action_cfg.get("bear_max_score")
+                or thresholds.get("bear_max_score", 44)
+                or 44
+            )
+            bear_min_rr = float(
+                entry_action_cfg.get("bear_min_rr")
+                or thresholds.get("bear_min_rr", 1.5)
+                or 1.5
+            )
+        else:
+            bull_min_score = float(thresholds.get("bull_min_score", 60) or 60)
+            bull_min_rr = float(thresholds.get("bull_min_rr", 1.5) or 1.5)
+            bear_max_score = float(thresholds.get("bear_max_score", 44) or 44)
+            bear_min_rr = float(thresholds.get("bear_min_rr", 1.5) or 1.5)
+    elif mode_key == "Swing":
+        if entry_action_cfg:
+            bull_min_score = float(
+                entry_action_cfg.get("bull_min_score")
+                or thresholds.get("bull_min_score", 60)
+                or 60
+            )
+            bull_min_rr = float(
+                entry_action_cfg.get("bull_min_rr")
+                or thresholds.get("bull_min_rr", 1.8)
+                or 1.8
+            )
+            bear_max_score = float(
+                entry_action_cfg.get("bear_max_score")
+                or thresholds.get("bear_max_score", 45)
+                or 45
+            )
+            bear_min_rr = float(
+                entry_action_cfg.get("bear_min_rr")
+                or thresholds.get("bear_min_rr", 1.8)
+                or 1.8
+            )
+        else:
+            bull_min_score = float(thresholds.get("bull_min_score", 60) or 60)
+            bull_min_rr = float(thresholds.get("bull_min_rr", 1.8) or 1.8)
+            bear_max_score = float(thresholds.get("bear_max_score", 45) or 45)
+            bear_min_rr = float(thresholds.get("bear_min_rr", 1.8) or 1.8)
+    elif mode_key == "Options":
+        if entry_action_cfg:
+            bull_min_score = float(
+                entry_action_cfg.get("bull_min_score")
+                or thresholds.get("bull_min_score", 65)
+                or 65
+            )
+            bull_min_rr = float(
+                entry_action_cfg.get("bull_min_rr")
+                or thresholds.get("bull_min_rr", 1.8)
+                or 1.8
+            )
+            bear_max_score = float(
+                entry_action_cfg.get("bear_max_score")
+                or thresholds.get("bear_max_score", 40)
+                or 40
+            )
+            bear_min_rr = float(
+                entry_action_cfg.get("bear_min_rr")
+                or thresholds.get("bear_min_rr", 1.8)
+                or 1.8
+            )
+        else:
+            bull_min_score = float(thresholds.get("bull_min_score", 65) or 65)
+            bull_min_rr = float(thresholds.get("bull_min_rr", 1.8) or 1.8)
+            bear_max_score = float(thresholds.get("bear_max_score", 40) or 40)
+            bear_min_rr = float(thresholds.get("bear_min_rr", 1.8) or 1.8)
+    elif mode_key == "Futures":
+        if entry_action_cfg:
+            bull_min_score = float(
+                entry_action_cfg.get("bull_min_score")
+                or thresholds.get("bull_min_score", 60)
+                or 60
+            )
+            bull_min_rr = float(
+                entry_action_cfg.get("bull_min_rr")
+                or thresholds.get("bull_min_rr", 1.7)
+                or 1.7
+            )
+            bear_max_score = float(
+                entry_action_cfg.get("bear_max_score")
+                or thresholds.get("bear_max_score", 44)
+                or 44
+            )
+            bear_min_rr = float(
+                entry_action_cfg.get("bear_min_rr")
+                or thresholds.get("bear_min_rr", 1.7)
+                or 1.7
+            )
+        else:
+            bull_min_score = float(thresholds.get("bull_min_score", 60) or 60)
+            bull_min_rr = float(thresholds.get("bull_min_rr", 1.7) or 1.7)
+            bear_max_score = float(thresholds.get("bear_max_score", 44) or 44)
+            bear_min_rr = float(thresholds.get("bear_min_rr", 1.7) or 1.7)
+    else:
+        bull_min_score = float(thresholds.get("min_blend_score", 0) or 0)
+        bull_min_rr = float(thresholds.get("min_risk_reward", 0) or 0)
+
+    long_count = 0
+    short_count = 0
+
+    for r in all_picks_with_recs:
+        if not r.get('is_actionable', True):
+            continue
+
+        score_f = _get_score(r)
+        rr_f = _get_rr(r)
+        rec_text = str(r.get('recommendation') or "")
+
+        if rec_text in ("Strong Buy", "Buy"):
+            if bull_min_score > 0 and score_f < bull_min_score:
+                continue
+            if bull_min_rr > 0 and (rr_f is None or rr_f < bull_min_rr):
+                continue
+            if (
+                mode_key == "Scalping"
+                and max_long_picks is not None
+                and long_count >= max_long_picks
+            ):
+                continue
+            bullish_results.append(r)
+            if mode_key == "Scalping" and max_long_picks is not None:
+                long_count += 1
+        elif rec_text in ("Sell", "Strong Sell"):
+            if bear_max_score > 0 and score_f > bear_max_score:
+                continue
+            if bear_min_rr > 0 and (rr_f is None or rr_f < bear_min_rr):
+                continue
+            bearish_results.append(r)
+            if mode_key == "Scalping" and max_short_picks is not None:
+                short_count += 1
+
+    # Optional relaxed bear threshold when too few shorts are available
+    if mode_key in ("Scalping", "Intraday", "Futures") and not bearish_results:
+        relaxed_max = bear_max_score if bear_max_score > 0 else 48.0
+        relaxed_max = max(relaxed_max, 48.0)
+        for r in all_picks_with_recs:
+            if not r.get('is_actionable', True):
+                continue
+            rec_text = str(r.get('recommendation') or "")
+            if rec_text not in ("Sell", "Strong Sell"):
+                continue
+            score_f = _get_score(r)
+            rr_f = _get_rr(r)
+            if score_f <= relaxed_max and (
+                bear_min_rr <= 0 or (rr_f is not None and rr_f >= bear_min_rr)
+            ):
+                if (
+                    mode_key == "Scalping"
+                    and max_short_picks is not None
+                    and short_count >= max_short_picks
+                ):
+                    continue
+                bearish_results.append(r)
+                if mode_key == "Scalping" and max_short_picks is not None:
+                    short_count += 1
+
+    if mode_key in ("Scalping", "Intraday", "Futures") and index is not None:
+        bullish_results, bearish_results = reference_index_filter(
+            mode_key,
+            bullish_results,
+            bearish_results,
+            *index,
+        )
+
+    bullish_results.sort(key=lambda x: _get_score(x), reverse=True)
+    bearish_results.sort(key=lambda x: _get_score(x))
+
+    actionable_results = bullish_results + bearish_results
+
+    # Robust fallback: if no picks survive the directional thresholds for a
+    # given mode (e.g. overly strict score/RR cutoffs), fall back to the
+    # broader definition of "actionable" from the recommendation system.
+    # This guarantees that the engine still surfaces some ideas instead of
+    # returning an empty list and forcing the UI into deterministic
+    # placeholders.
+    if not actionable_results:
+        try:
+            fallback_actionable, ac_count, total_count = filter_actionable_picks(
+                all_picks_with_recs
+            )
+            if ac_count > 0:
+                print(
+                    f"[TopPicksEngine] No picks passed directional thresholds in {mode_key}; "
+                    f"falling back to {ac_count}/{total_count} actionable picks by recommendation."
+                )
+                fallback_actionable.sort(key=lambda x: _get_score(x), reverse=True)
+                actionable_results = fallback_actionable
+        except Exception as e:
+            print(f"[TopPicksEngine] Fallback actionable filter failed: {e}")
+    return actionable_results
+
+
+class FakeProvider:
+    """Data provider stand-in answering the index filter's two calls."""
+
+    def __init__(self, index_change, quotes):
+        self.index_change = index_change
+        self.quotes = quotes
+
+    async def get_indices_quote_async(self):
+        return {"NIFTY 50": {"change_percent": self.index_change}}
+
+    async def get_quote_async(self, symbols):
+        return {s: self.quotes[s] for s in symbols if s in self.quotes}
+
+
+async def current_select(results, min_confidence, mode, top_n, thresholds, entry_action_cfg, entry_regime_bias, index):
+    """Current generate_daily_picks selection (pick_selection steps), returning the actionable dicts."""
+    filtered_results = attach_recommendations(filter_by_confidence(results, min_confidence))
+    directional = directional_thresholds(mode, thresholds, entry_action_cfg, entry_regime_bias, top_n)
+    bullish_results, bearish_results = split_directional(filtered_results, mode, directional)
+    if mode in ("Scalping", "Intraday", "Futures") and index is not None:
+        get_data_provider = engine_module.get_data_provider
+        engine_module.get_data_provider = lambda: FakeProvider(*index)
+        try:
+            bullish_results, bearish_results = await TopPicksEngine._apply_index_relative_filters(
+                None, mode, bullish_results, bearish_results
+            )
+        finally:
+            engine_module.get_data_provider = get_data_provider
+
+    bullish_results.sort(key=lambda x: pick_score(x), reverse=True)
+    bearish_results.sort(key=lambda x: pick_score(x))
+    actionable_results = bullish_results + bearish_results
+    if not actionable_results:
+        fallback_actionable, ac_count, _ = filter_actionable_picks(filtered_results)
+        if ac_count > 0:
+            fallback_actionable.sort(key=lambda x: pick_score(x), reverse=True)
+            actionable_results = fallback_actionable
+    return actionable_results
+
+
+def synth_results(n, rng):
+    """Coordinator-shaped results; some carry a ``score_blend`` (number, string or None)."""
+    results = []
+    for i in range(n):
+        agents = [{"agent": a, "score": round(rng.uniform(20, 90), 1), "confidence": "Medium",
+                   "signals": [], "reasoning": "", "metadata": {}, "weight": 0.1}
+                  for a in AGENTS if a != "risk" or rng.random() < 0.8]
+        if rng.random() < 0.05:
+            agents.append({"agent": "risk", "score": None})
+        results.append({
+            "symbol": f"SYM{i:03d}",
+            "blend_score": round(rng.uniform(20, 85), rng.choice([0, 1, 2])),
+            "confidence": rng.choice(["High", "Medium", "Medium", "Low"]),
+            "agents": agents,
+            "key_signals": [{"type": "x", "signal": rng.choice(SIGNALS)} for _ in range(rng.randint(0, 6))],
+        })
+        if rng.random() < 0.1:
+            blend = round(rng.uniform(20, 85), 1)
+            results[-1]["score_blend"] = rng.choice([blend, str(blend), None, "n/a"])
+    return results
+
+
+def synth_case(rng, n):
+    mode = rng.choice(MODES)
+    thresholds = {}
+    if rng.random() < 0.5:
+        thresholds = {k: rng.choice([0, 40, 45, 50, 55, 60, 65, None]) for k in ("bull_min_score", "bear_max_score", "min_blend_score")}
+        thresholds.update({k: rng.choice([0, 1.0, 1.5, 2.0, None]) for k in ("bull_min_rr", "bear_min_rr", "min_risk_reward")})
+    entry_action_cfg = None
+    if rng.random() < 0.4:
+        entry_action_cfg = {"bull_min_score": rng.choice([None, 50, 58]), "bear_min_rr": rng.choice([None, 1.1]),
+                            "max_long_picks": rng.choice([None, 1, 2, 3, "x"]), "max_short_picks": rng.choice([None, 0, 2])}
+    entry_regime_bias = rng.choice([{}, {"long_mult": 0.5, "short_mult": 1.5}, {"long_mult": "bad"}])
+    index = None
+    results = synth_results(n, rng)
+    if rng.random() < 0.7:
+        index_change = rng.choice([-1.5, -0.9, 0.0, 0.9, 1.4])
+        quotes = {}
+        for r in results:
+            if rng.random() < 0.9:
+                quotes[r["symbol"]] = {"change_percent": rng.choice([round(rng.uniform(-3, 3), 2), None, "n/a"])}
+        index = (index_change, quotes)
+    return dict(results=results, min_confidence=rng.choice(["low", "medium", "high"]), mode=mode,
+                top_n=rng.choice([5, 10, 20]), thresholds=thresholds, entry_action_cfg=entry_action_cfg,
+                entry_regime_bias=entry_regime_bias, index=index)
+
+
+def snapshot(picks):
+    return [(p["symbol"],) + tuple(p.get(f) for f in REC_FIELDS) for p in picks]
+
+
+def copy_case(case):
+    return {**case, "results": copy.deepcopy(case["results"])}
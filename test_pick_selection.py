@@ -0,0 +1,101 @@
+"""
+Test Top Picks Selection (pick_selection.py)
+============================================
+
+generate_daily_picks' post-analysis selection moved into
+app/services/pick_selection.py (directional_thresholds table,
+split_directional). These tests pin it to the selection as it shipped:
+
+1. Every step of the current selection matches the baseline inline code,
+   kept verbatim in scripts/selection_fixtures.py. Fixed-seed synthetic
+   runs cover every mode, policy thresholds, entry-bandit actions, regime
+   multipliers, index moves and quotes, and results carrying score_blend.
+2. directional_thresholds resolves bandit action > policy > defaults and
+   the Scalping caps on explicit cases.
+3. The Scalping short cap counts shorts taken in the main pass.
+"""
+
+import asyncio
+import random
+import sys
+from pathlib import Path
+
+# Add parent directory (and scripts/ for the shared fixtures) to path
+sys.path.insert(0, str(Path(__file__).parent))
+sys.path.insert(0, str(Path(__file__).parent / "scripts"))
+
+from app.services.pick_selection import DirectionalThresholds, directional_thresholds, split_directional
+from selection_fixtures import copy_case, current_select, reference_select, snapshot, synth_case
+
+SEED = 20261018
+
+
+def test_selection_matches_baseline():
+    """Current selection == baseline inline selection, pick for pick"""
+    rng = random.Random(SEED)
+    cases = [synth_case(rng, rng.choice([0, 5, 12, 50])) for _ in range(600)]
+
+    async def run():
+        picks = indexed = 0
+        for case in cases:
+            expected = snapshot(reference_select(**copy_case(case)))
+            actual = snapshot(await current_select(**copy_case(case)))
+            assert actual == expected, (case["mode"], case["thresholds"], case["entry_action_cfg"])
+            picks += len(expected)
+            indexed += case["index"] is not None and case["mode"] in ("Scalping", "Intraday", "Futures")
+        return picks, indexed
+
+    picks, indexed = asyncio.run(run())
+    print(f"✓ {len(cases)} runs, {picks} picks identical ({indexed} with the index filter)")
+    assert picks > 2000 and indexed > 100
+
+
+def test_directional_thresholds():
+    """Bandit action > policy thresholds > mode defaults; Scalping caps"""
+    t = directional_thresholds("Swing", {}, None, {}, 10)
+    assert (t.bull_min_score, t.bull_min_rr, t.bear_max_score, t.bear_min_rr) == (60, 1.8, 45, 1.8)
+    assert t.max_long_picks is None and t.max_short_picks is None
+
+    t = directional_thresholds("Intraday", {"bull_min_score": 65, "bear_min_rr": 2.0}, {"bull_min_score": 58}, {}, 10)
+    assert (t.bull_min_score, t.bull_min_rr, t.bear_max_score, t.bear_min_rr) == (58, 1.5, 44, 2.0)
+
+    # Action cap x regime multiplier, clamped to top_n
+    t = directional_thresholds("Scalping", {}, {"max_long_picks": 4, "max_short_picks": 8},
+                               {"long_mult": 0.5, "short_mult": 2.0}, 10)
+    assert (t.max_long_picks, t.max_short_picks) == (2, 10)
+    t = directional_thresholds("Scalping", {}, {"max_long_picks": "x"}, {"long_mult": "bad"}, 5)
+    assert (t.max_long_picks, t.max_short_picks) == (5, 5)
+
+    # Other modes: only the generic blend-score / R:R floor
+    t = directional_thresholds("Commodities", {"min_blend_score": 50, "min_risk_reward": 1.2}, None, {}, 10)
+    assert (t.bull_min_score, t.bull_min_rr, t.bear_max_score, t.bear_min_rr) == (50, 1.2, 0, 0)
+    print("✓ directional thresholds")
+
+
+def test_split_directional_scalping_caps():
+    """Long cap applies in the main pass; short cap only limits the relaxed pass"""
+    def pick(symbol, rec, score, actionable=True):
+        return {"symbol": symbol, "recommendation": rec, "blend_score": score,
+                "risk_reward_ratio": 2.0, "is_actionable": actionable}
+
+    t = DirectionalThresholds(50, 1.0, 40, 1.0, max_long_picks=1, max_short_picks=1)
+    picks = [pick("L1", "Buy", 70), pick("L2", "Strong Buy", 65), pick("S1", "Sell", 38),
+             pick("S2", "Strong Sell", 30), pick("X", "Sell", 20, actionable=False)]
+    bulls, bears = split_directional(picks, "Scalping", t)
+    assert [p["symbol"] for p in bulls] == ["L1"]
+    assert [p["symbol"] for p in bears] == ["S1", "S2"]
+
+    # No short passes bear_max_score=30 -> relaxed pass (<= 48), capped at 1
+    t.bear_max_score = 25
+    _, bears = split_directional(picks, "Scalping", t)
+    assert [p["symbol"] for p in bears] == ["S1"]
+    _, bears = split_directional(picks, "Swing", t)
+    assert bears == []
+    print("✓ Scalping caps and relaxed bear pass")
+
+
+if __name__ == "__main__":
+    test_selection_matches_baseline()
+    test_directional_thresholds()
+    test_split_directional_scalping_caps()
+    print("✅ All pick selection tests passed!")